@@ -1,70 +1,102 @@
-import sys
-
-from PyQt5.QtSql import QSqlQuery, QSqlDatabase
-from PyQt5.QtWidgets import QMessageBox
+from source.connection import ApiError
+from source.backends import create_backend
+from source.sampler import Sampler
+from source.snapshot import load_snapshot
 
 
 class Api():
     """
     This class is the base class for the QuranApi and HadithApi classes.
 
+    The queries are run by a database backend. The backend is given by name,
+    so the Qt modules are only loaded if the QtSql backend is used. Database
+    errors are raised as ApiError exceptions.
+
     Methods
     -------
     __init__()
-        The class constructor. It creates a connection to the sqlite3 database
-        and sets the default language.
-    _display_error()
-        Error handling method.
+        The class constructor. It creates the database backend and loads
+        the meta data snapshot.
+    close()
+        Releases the database connection.
     _fetch_data()
-        It runs the given sql select query and returns the fetched data.    
+        It runs the given sql select query and returns the fetched data.
+    _iter_data()
+        It runs the given sql select query and yields each row.
+    _fetch_column()
+        It runs the given sql select query and returns the first field of
+        each row.
+    _fetch_row()
+        It runs the given sql select query and returns the first row.
+    _update_data()
+        It runs the given sql update query.
+    _begin()
+        Starts a transaction.
+    _commit()
+        Commits the current transaction.
+    _rollback()
+        Rolls back the current transaction.
+    get_query_stats()
+        Returns the query cache statistics of the backend.
+    set_sampler()
+        Sets the seed and mode of the random selection functions.
+    _get_sampler()
+        Returns the sampler of the given population.
+    _get_db_size()
+        Returns the size of the database in bytes.
+    _table_exists()
+        Checks if the given table exists in the database.
     """
 
-    def __init__(self, db_path: str) -> None:
-        """It creates a connection to the sqlite3 database.
+    def __init__(self, db_path: str, query_cache_size: int = 50,
+                 con_name: str = None, profile: dict = None,
+                 backend: str = "qtsql", snapshot_path: str = None) -> None:
+        """It creates the database backend and loads the meta data snapshot.
 
         :param db_path: The absolute path to the database.
         :type db_path: str.
+        :param query_cache_size: The maximum number of prepared queries to
+            keep in the query cache.
+        :type query_cache_size: int.
+        :param con_name: The name of the database connection. If it is not
+            given, then a pooled connection of the current thread is used.
+        :type con_name: str.
+        :param profile: The connection profile. The read_only key opens the
+            database read only. The mmap_size, cache_size, temp_store,
+            journal_mode and query_only keys are applied as PRAGMAs after
+            the database is opened. The SQLite defaults are used for missing
+            keys.
+        :type profile: dict.
+        :param backend: The database backend. It can be "qtsql" or "sqlite".
+        :type backend: str.
+        :param snapshot_path: The path of the meta data snapshot. The meta
+            data is read from the database if it is not given or the
+            snapshot does not match the database.
+        :type snapshot_path: str.
+        :raises ApiError: If the database cannot be opened.
         """        
         
-        # The database name and connection options are set
-        self.con = QSqlDatabase.addDatabase("QSQLITE")
-        self.con.setDatabaseName(db_path)
-        # self.con.setConnectOptions("QSQLITE_OPEN_READONLY=0")
-        # Try to open the connection and handle possible errors
-        if not self.con.open():
-            # The db path is printed
-            print(db_path)
-            # The error is shown in message box
-            self._display_error("")
-
-    def _display_error(self, last_query: str) -> None:
-        """Error handling method.
-
-        It displays the given error message in a message box and ends the
-        program. It also prints the error to console.
-
-        :param last_query: The last sql query.
-        :type last_query: str.
-        """
-
-        # The error message
-        msg = "Database error: %s" % self.con.lastError().databaseText()
-
-        # If the last query is given
-        if last_query != "":
-            msg += " Last query: " + last_query
+        # The connection profile
+        self.profile = profile or {}
+        # Indicates that the database is opened read only
+        self.read_only = bool(self.profile.get("read_only", False))
+        # The database backend
+        self.backend = create_backend(
+            backend, db_path, profile, con_name, query_cache_size)
+        # The meta data snapshot. It is None if there is no valid snapshot
+        self.snapshot = None
+        if snapshot_path:
+            self.snapshot = load_snapshot(snapshot_path, db_path)
+        # The seed and mode of the random selection functions
+        self.sampler_options = {"seed": None, "no_repeat": False}
+        # The samplers of the random selection functions, keyed by name
+        self.samplers = {}
 
-        QMessageBox.critical(
-            None,
-            "Quran Reader - Error!",
-            msg,
-        )
-
-        # The error message is printed to console
-        print(msg)
+    def close(self) -> None:
+        """Releases the database connection.
+        """
 
-        # The application exits
-        sys.exit(1)
+        self.backend.close()
 
     def _fetch_data(self, sql: str, bind_values: list, sel_count: int) -> list:
         """It runs the given sql select query and returns the fetched data
@@ -80,53 +112,82 @@ class Api():
         :type sel_count: int.
         :return: The required data.
         :rtype: list.
+        :raises ApiError: If the query fails.
         """
 
-        # Try to open the connection and handle possible errors
-        if not self.con.open():
-            # The error is shown in message box
-            self._display_error("")
-            
-        # The query object is created
-        query = QSqlQuery()
-
-        # If the sql query contains placeholders
-        if len(bind_values) > 0:
-            # Prepared query is used
-            query.prepare(sql)
-            # Each given bind value is added
-            for val in bind_values:            
-                # The bind value is added
-                query.addBindValue(val)
-            # The query is run
-            if not query.exec():
-                self._display_error(sql)
-        else:
-            # The query is run
-            if not query.exec(sql):
-                self._display_error(sql)
-
-        # All rows
-        rows = []
-        # All rows are fetched
-        while query.next():
-            # The row of data
-            row = []            
-            # All selected field values are fetched
-            for i in range(sel_count):
-                # The query value
-                qval = query.value(i)
-                # The query value is appended to the row
-                row.append(qval)
-            # The row in appended to the list of rows
-            rows.append(row)
-                
-        # The resources associated with the query object are freed
-        query.finish()
-        # The connection is closed
-        #self.con.close()
-        # The data is returned
-        return rows        
+        return self.backend.fetch(sql, bind_values, sel_count)
+
+    def _iter_data(self, sql: str, bind_values: list, sel_count: int,
+                   record: type = None):
+        """It runs the given sql select query and yields each row
+
+        The rows are read one at a time, so the result is not copied into a
+        list of lists. All rows should be read before the same query is run
+        again.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :param sel_count: The number of fields in select query.
+        :type sel_count: int.
+        :param record: The NamedTuple class of the rows. If it is not given,
+            then each row is a tuple.
+        :type record: type.
+        :return: The rows.
+        :rtype: Iterator[tuple].
+        :raises ApiError: If the query fails.
+        """
+
+        # The rows of the query
+        rows = self.backend.iterate(sql, bind_values, sel_count)
+        # If the rows should be returned as records
+        if record is not None:
+            rows = map(record._make, rows)
+
+        return rows
+
+    def _fetch_column(self, sql: str, bind_values: list) -> list:
+        """It runs the given sql select query and returns the first field of
+        each row
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :return: The value of the first field of each row.
+        :rtype: list.
+        :raises ApiError: If the query fails.
+        """
+
+        return self.backend.fetch_column(sql, bind_values)
+
+    def _fetch_row(self, sql: str, bind_values: list, sel_count: int,
+                   record: type = None) -> tuple:
+        """It runs the given sql select query and returns the first row
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :param sel_count: The number of fields in select query.
+        :type sel_count: int.
+        :param record: The NamedTuple class of the row. If it is not given,
+            then the row is a tuple.
+        :type record: type.
+        :return: The field values of the first row. It is None if the query
+            returned no rows.
+        :rtype: tuple.
+        :raises ApiError: If the query fails.
+        """
+
+        # The first row of the query
+        row = self.backend.fetch_one(sql, bind_values, sel_count)
+        # If the row should be returned as a record
+        if row is not None and record is not None:
+            row = record._make(row)
+
+        return row
         
     def _update_data(self, sql: str, bind_values: list) -> None:
         """It runs the given sql update query
@@ -138,33 +199,111 @@ class Api():
         :type sql: str.        
         :param bind_values: The values to bind to the query placeholders.
         :type bind_values: list.
+        :raises ApiError: If the query fails.
         """
 
-        # Try to open the connection and handle possible errors
-        if not self.con.open():
-            # The error is shown in message box
-            self._display_error("")
-            
-        # The query object is created
-        query = QSqlQuery()
-
-        # If the sql query contains placeholders
-        if len(bind_values) > 0:
-            # Prepared query is used
-            query.prepare(sql)
-            # Each given bind value is added
-            for val in bind_values:            
-                # The bind value is added
-                query.addBindValue(val)
-            # The query is run
-            if not query.exec():
-                self._display_error(sql)
-        else:
-            # The query is run
-            if not query.exec(sql):
-                self._display_error(sql)       
-                
-        # The resources associated with the query object are freed
-        query.finish()
-        # The connection is closed
-        #self.con.close()     
+        self.backend.execute(sql, bind_values)
+
+    def _begin(self) -> None:
+        """Starts a transaction.
+
+        :raises ApiError: If the transaction cannot be started.
+        """
+
+        self.backend.begin()
+
+    def _commit(self) -> None:
+        """Commits the current transaction.
+
+        :raises ApiError: If the transaction cannot be committed.
+        """
+
+        self.backend.commit()
+
+    def _rollback(self) -> None:
+        """Rolls back the current transaction.
+
+        :raises ApiError: If the transaction cannot be rolled back.
+        """
+
+        self.backend.rollback()
+
+    def get_query_stats(self) -> dict:
+        """Returns the query cache statistics of the backend.
+
+        :return: The number of cache hits, cache misses and cached queries
+            for the QtSql backend. The size of the statement cache for the
+            sqlite backend.
+        :rtype: dict.
+        """
+
+        return self.backend.get_query_stats()
+
+    def set_sampler(self, seed: int = None, no_repeat: bool = False) -> None:
+        """Sets the seed and mode of the random selection functions.
+
+        The random sequences are restarted.
+
+        :param seed: The seed of the random sequences. If it is not given,
+            then the sequences are different each time.
+        :type seed: int.
+        :param no_repeat: Indicates that an item is not selected again until
+            all items have been selected.
+        :type no_repeat: bool.
+        """
+
+        self.sampler_options = {"seed": seed, "no_repeat": no_repeat}
+        self.samplers.clear()
+
+    def _get_sampler(self, name: str, size: int) -> Sampler:
+        """Returns the sampler of the given population.
+
+        The sampler is created when it is first used, or when the size of
+        the population has changed.
+
+        :param name: The name of the population.
+        :type name: str.
+        :param size: The number of items in the population.
+        :type size: int.
+        :return: The sampler.
+        :rtype: Sampler.
+        """
+
+        # The sampler of the population
+        sampler = self.samplers.get(name)
+        # If the sampler does not exist or the population has changed
+        if sampler is None or sampler.size != size:
+            sampler = Sampler(size, **self.sampler_options)
+            self.samplers[name] = sampler
+
+        return sampler
+
+    def _get_db_size(self) -> int:
+        """Returns the size of the database in bytes.
+
+        :return: The number of pages multiplied by the page size.
+        :rtype: int.
+        """
+
+        # The number of pages in the database
+        page_count = self._fetch_row("PRAGMA page_count", [], 1)[0]
+        # The size of each page
+        page_size = self._fetch_row("PRAGMA page_size", [], 1)[0]
+
+        return page_count * page_size
+
+    def _table_exists(self, tbl_name: str) -> bool:
+        """Checks if the given table exists in the database.
+
+        :param tbl_name: The table name.
+        :type tbl_name: str.
+        :return: True if the table exists.
+        :rtype: bool.
+        """
+
+        # The sql query
+        sql = "SELECT name FROM sqlite_master WHERE type='table' AND name=?"
+        # The table data is fetched
+        row = self._fetch_row(sql, [tbl_name], 1)
+
+        return row is not None
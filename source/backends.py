@@ -0,0 +1,397 @@
+import importlib, sqlite3
+from urllib.parse import quote
+
+from source.connection import ApiError, ConnectionManager, PoolError
+from source.connection import get_pragmas
+
+# The module and class of each database backend. The module is imported when
+# the backend is first used, so the QtSql module is not loaded by the sqlite
+# backend
+BACKENDS = {
+    "qtsql": ("source.qtbackend", "QtSqlBackend"),
+    "sqlite": ("source.backends", "SqliteBackend")
+}
+# The number of prepared statements cached by each sqlite3 connection
+CACHED_STATEMENTS = 128
+
+class SqliteConnectionManager(ConnectionManager):
+    """This class manages the sqlite3 database connections.
+
+    Methods
+    -------
+    get()
+        Returns the sqlite3 connection with the given name.
+    _open()
+        Opens a new sqlite3 connection with the given name.
+    _remove()
+        Closes and removes the given sqlite3 connection.
+    """
+
+    def __init__(self, max_connections: int = 8, max_idle: int = 2) -> None:
+        """Initializes the connection manager.
+
+        :param max_connections: The maximum number of open connections in all
+            threads.
+        :type max_connections: int.
+        :param max_idle: The maximum number of idle connections kept open in
+            each thread.
+        :type max_idle: int.
+        """
+
+        super().__init__(max_connections, max_idle)
+        # The open connections, keyed by connection name
+        self.cons = {}
+
+    def get(self, name: str) -> sqlite3.Connection:
+        """Returns the sqlite3 connection with the given name.
+
+        :param name: The connection name.
+        :type name: str.
+        :return: The connection.
+        :rtype: sqlite3.Connection.
+        """
+
+        return self.cons[name]
+
+    def _open(self, name: str, db_path: str, profile: dict) -> None:
+        """Opens a new sqlite3 connection with the given name.
+
+        The connection is in autocommit mode, like the QtSql connections.
+        Transactions are started with the begin function of the backend. The
+        PRAGMAs of the connection profile are applied after the database is
+        opened.
+
+        :param name: The connection name.
+        :type name: str.
+        :param db_path: The absolute path to the database.
+        :type db_path: str.
+        :param profile: The connection profile.
+        :type profile: dict.
+        :raises PoolError: If the database cannot be opened or a PRAGMA
+            fails.
+        """
+
+        # The last sql query
+        sql = "connect"
+        try:
+            # If the database should be opened read only
+            if profile.get("read_only", False):
+                con = sqlite3.connect(
+                    "file:%s?mode=ro" % quote(db_path), uri=True,
+                    isolation_level=None,
+                    cached_statements=CACHED_STATEMENTS)
+            else:
+                con = sqlite3.connect(db_path, isolation_level=None,
+                                      cached_statements=CACHED_STATEMENTS)
+            # Each PRAGMA in the connection profile is applied
+            for sql in get_pragmas(profile):
+                con.execute(sql).fetchall()
+        except sqlite3.Error as err:
+            raise PoolError(
+                "Database error: %s. Database path: %s Last query: %s" % (
+                    err, db_path, sql))
+
+        self.cons[name] = con
+
+    def _remove(self, name: str) -> None:
+        """Closes and removes the given sqlite3 connection.
+
+        :param name: The connection name.
+        :type name: str.
+        """
+
+        self.cons.pop(name).close()
+
+class SqliteBackend():
+    """This class runs the Api queries using the sqlite3 module of the
+    Python standard library. It does not depend on Qt.
+
+    The sqlite3 module keeps its own cache of prepared statements for each
+    connection. It does not count the cache hits, so only the size of the
+    cache is reported.
+
+    Methods
+    -------
+    __init__()
+        The class constructor. It gets a connection from the connection
+        manager.
+    fetch()
+        Runs the given select query and returns the fetched rows.
+    iterate()
+        Runs the given select query and yields each row as a tuple.
+    fetch_column()
+        Runs the given select query and returns the first field of each row.
+    fetch_one()
+        Runs the given select query and returns the first row as a tuple.
+    execute()
+        Runs the given update query.
+    begin()
+        Starts a transaction.
+    commit()
+        Commits the current transaction.
+    rollback()
+        Rolls back the current transaction.
+    close()
+        Releases the connection.
+    get_query_stats()
+        Returns the size of the prepared statement cache.
+    _run_query()
+        Runs the given query and returns the cursor.
+    _to_row()
+        Replaces the NULL values in the given row with empty strings.
+    """
+
+    def __init__(self, db_path: str, profile: dict = None,
+                 con_name: str = None, query_cache_size: int = 50) -> None:
+        """Gets a connection from the connection manager.
+
+        :param db_path: The absolute path to the database.
+        :type db_path: str.
+        :param profile: The connection profile.
+        :type profile: dict.
+        :param con_name: The name of the connection. If it is not given, then
+            a pooled connection of the current thread is used.
+        :type con_name: str.
+        :param query_cache_size: Not used. The statement cache is kept by
+            the pooled connection, so its size is given by CACHED_STATEMENTS.
+        :type query_cache_size: int.
+        """
+
+        # An open connection is fetched from the connection manager
+        self.con_name = connections.acquire(db_path, profile, con_name)
+        # The database connection
+        self.con = connections.get(self.con_name)
+
+    def fetch(self, sql: str, bind_values: list, sel_count: int) -> list:
+        """Runs the given select query and returns the fetched rows.
+
+        NULL values are returned as empty strings, as they are by the QtSql
+        backend.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :param sel_count: The number of fields in select query.
+        :type sel_count: int.
+        :return: The fetched rows. Each row is a list of field values.
+        :rtype: list.
+        """
+
+        # The query is run
+        cursor = self._run_query(sql, bind_values)
+        try:
+            # All rows are fetched
+            rows = [
+                ["" if val is None else val for val in row[:sel_count]]
+                for row in cursor
+            ]
+        except sqlite3.Error as err:
+            raise ApiError("Database error: %s Last query: %s" % (err, sql))
+
+        return rows
+
+    def iterate(self, sql: str, bind_values: list, sel_count: int):
+        """Runs the given select query and yields each row as a tuple.
+
+        The rows are read from the cursor one at a time, so the complete
+        result is not copied into a list. The tuples created by the sqlite3
+        module are returned unless they contain NULL values.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :param sel_count: The number of fields in select query. The cursor
+            only returns the selected fields, so it is not used.
+        :type sel_count: int.
+        :return: The rows. Each row is a tuple of field values.
+        :rtype: Iterator[tuple].
+        """
+
+        # The query is run
+        cursor = self._run_query(sql, bind_values)
+        try:
+            # Each row is read
+            for row in cursor:
+                yield row if None not in row else self._to_row(row)
+        except sqlite3.Error as err:
+            raise ApiError("Database error: %s Last query: %s" % (err, sql))
+        finally:
+            cursor.close()
+
+    def fetch_column(self, sql: str, bind_values: list) -> list:
+        """Runs the given select query and returns the first field of each
+        row.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :return: The value of the first field of each row.
+        :rtype: list.
+        """
+
+        # The query is run
+        cursor = self._run_query(sql, bind_values)
+        try:
+            # The first field of each row is read
+            values = ["" if row[0] is None else row[0] for row in cursor]
+        except sqlite3.Error as err:
+            raise ApiError("Database error: %s Last query: %s" % (err, sql))
+
+        return values
+
+    def fetch_one(self, sql: str, bind_values: list, sel_count: int) -> tuple:
+        """Runs the given select query and returns the first row as a
+        tuple.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :param sel_count: The number of fields in select query. The cursor
+            only returns the selected fields, so it is not used.
+        :type sel_count: int.
+        :return: The field values of the first row. It is None if the query
+            returned no rows.
+        :rtype: tuple.
+        """
+
+        # The query is run
+        cursor = self._run_query(sql, bind_values)
+        try:
+            # The first row is read
+            row = cursor.fetchone()
+        except sqlite3.Error as err:
+            raise ApiError("Database error: %s Last query: %s" % (err, sql))
+        finally:
+            cursor.close()
+        # If the row contains NULL values
+        if row is not None and None in row:
+            row = self._to_row(row)
+
+        return row
+
+    def execute(self, sql: str, bind_values: list) -> None:
+        """Runs the given update query.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        """
+
+        # The query is run
+        self._run_query(sql, bind_values).close()
+
+    def begin(self) -> None:
+        """Starts a transaction.
+        """
+
+        self._run_query("BEGIN", []).close()
+
+    def commit(self) -> None:
+        """Commits the current transaction.
+        """
+
+        self._run_query("COMMIT", []).close()
+
+    def rollback(self) -> None:
+        """Rolls back the current transaction.
+        """
+
+        self._run_query("ROLLBACK", []).close()
+
+    def close(self) -> None:
+        """Releases the connection.
+        """
+
+        # If the connection was already released
+        if self.con is None:
+            return
+        # The connection is released, so it can be used by another Api
+        # object in the same thread
+        self.con = None
+        connections.release(self.con_name)
+
+    def get_query_stats(self) -> dict:
+        """Returns the size of the prepared statement cache.
+
+        The sqlite3 module does not count the cache hits and misses, so they
+        are not reported.
+
+        :return: The maximum number of prepared statements cached by the
+            connection.
+        :rtype: dict.
+        """
+
+        return {"cached_statements": CACHED_STATEMENTS}
+
+    def _run_query(self, sql: str, bind_values: list) -> sqlite3.Cursor:
+        """Runs the given query and returns the cursor.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :return: The cursor of the query.
+        :rtype: sqlite3.Cursor.
+        """
+
+        try:
+            # The query is run. The sqlite3 module prepares it or reuses the
+            # cached statement
+            cursor = self.con.execute(sql, bind_values)
+        except sqlite3.Error as err:
+            raise ApiError("Database error: %s Last query: %s" % (err, sql))
+        except (OverflowError, ValueError) as err:
+            # A value could not be bound to the query
+            raise ApiError("Invalid query parameter: %s Last query: %s" % (
+                err, sql))
+
+        return cursor
+
+    def _to_row(self, row: tuple) -> tuple:
+        """Replaces the NULL values in the given row with empty strings.
+
+        :param row: The row returned by the cursor.
+        :type row: tuple.
+        :return: The row without NULL values.
+        :rtype: tuple.
+        """
+
+        return tuple(["" if val is None else val for val in row])
+
+def create_backend(name: str, db_path: str, profile: dict = None,
+                   con_name: str = None, query_cache_size: int = 50):
+    """Creates the database backend with the given name.
+
+    :param name: The backend name. It can be "qtsql" or "sqlite".
+    :type name: str.
+    :param db_path: The absolute path to the database.
+    :type db_path: str.
+    :param profile: The connection profile.
+    :type profile: dict.
+    :param con_name: The name of the connection.
+    :type con_name: str.
+    :param query_cache_size: The size of the query cache.
+    :type query_cache_size: int.
+    :return: The backend object.
+    :rtype: QtSqlBackend or SqliteBackend.
+    :raises ApiError: If the backend is not supported or the database cannot
+        be opened.
+    """
+
+    # If the backend is not supported
+    if name not in BACKENDS:
+        raise ApiError("Unknown database backend: %s" % name)
+
+    # The backend class is imported
+    module_name, class_name = BACKENDS[name]
+    backend = getattr(importlib.import_module(module_name), class_name)
+
+    return backend(db_path, profile, con_name, query_cache_size)
+
+# The connection manager used by the sqlite backend
+connections = SqliteConnectionManager()
@@ -0,0 +1,117 @@
+"""Database Backend Benchmarks
+
+This script compares the QtSql and sqlite database backends. Each backend is
+measured in a new Python process, so the modules loaded by one backend do
+not affect the other. The time taken to import the QuranApi class and open
+the database, the time taken to read the ayat text of all rukus and the
+maximum resident memory of the process are printed.
+
+It can be run using the command: python -m source.bench.bench_backend
+"""
+
+import json, subprocess, sys, time
+
+# The names of the compared backends
+BACKEND_NAMES = ["qtsql", "sqlite"]
+
+class BackendBenchmark():
+    """Used to compare the QtSql and sqlite database backends.
+
+    Methods
+    -------
+    __init__()
+        Sets the number of processes started for each backend.
+    run()
+        Runs the benchmark of each backend and prints the results.
+    measure()
+        Measures the given backend in the current process.
+    """
+
+    def __init__(self, count: int = 5) -> None:
+        """Sets the number of processes started for each backend.
+
+        :param count: The number of processes started for each backend. The
+            median of the results is printed.
+        :type count: int.
+        """
+
+        # The number of processes started for each backend
+        self.count = count
+
+    def run(self) -> None:
+        """Runs the benchmark of each backend and prints the results.
+        """
+
+        # Each backend is measured
+        for name in BACKEND_NAMES:
+            # The results of each process
+            results = []
+            for i in range(self.count):
+                # The backend is measured in a new process
+                output = subprocess.check_output([
+                    sys.executable, "-m", "source.bench.bench_backend", name])
+                results.append(json.loads(output.decode("utf-8")))
+
+            # The median of each result
+            median = {}
+            for key in results[0]:
+                values = sorted(result[key] for result in results)
+                median[key] = values[len(values) // 2]
+
+            print("%s: import %.1f ms, open %.1f ms, walk %.1f ms, "
+                  "rss %.1f MB, qt modules %d" % (
+                      name, median["import"], median["open"],
+                      median["walk"], median["rss"], median["qt_modules"]))
+
+    def measure(self, name: str) -> dict:
+        """Measures the given backend in the current process.
+
+        :param name: The backend name.
+        :type name: str.
+        :return: The import, open and walk times in milliseconds, the maximum
+            resident memory in MB and the number of Qt modules loaded.
+        :rtype: dict.
+        """
+
+        # The start time
+        start = time.perf_counter()
+        from source.qapi import QuranApi
+        from source.qconfig import QConfig
+        # The import time
+        import_time = time.perf_counter() - start
+
+        # The quran reader configuration
+        config = QConfig().get_config()
+        start = time.perf_counter()
+        # The database is opened with the backend
+        api = QuranApi(config["db_path"], config["default_lang"],
+                       profile=config["db_profile"], backend=name)
+        open_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        # The ayat text of each ruku is read
+        for sura in range(1, len(api.get_sura_names()) + 1):
+            for ruku in range(1, api.get_ruku_count(sura) + 1):
+                api.get_ayat_text(sura, ruku)
+        walk_time = time.perf_counter() - start
+        api.close()
+
+        import resource
+        # The results. The maximum resident memory is given in KB on Linux
+        results = {
+            "import": import_time * 1000,
+            "open": open_time * 1000,
+            "walk": walk_time * 1000,
+            "rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "qt_modules": len(
+                [m for m in sys.modules if m.startswith("PyQt5")])
+        }
+
+        return results
+
+if __name__ == '__main__':
+    # If a backend is given, it is measured in this process
+    if len(sys.argv) > 1:
+        print(json.dumps(BackendBenchmark().measure(sys.argv[1])))
+    else:
+        BackendBenchmark().run()
@@ -0,0 +1,182 @@
+"""Database Connection Profile Benchmarks
+
+This script compares the connection profile given in the quran and hadith
+reader configurations with the default SQLite settings. The same reader
+queries are timed with a cold and a warm page cache on both databases.
+
+For the cold page cache, the database file is removed from the operating
+system page cache and a new connection is opened before each run. For the
+warm page cache, the same connection is used for all runs.
+
+It can be run using the command: python -m source.bench.bench_db
+"""
+
+import os, statistics, time
+
+from source.hapi import HadithApi
+from source.hconfig import HConfig
+from source.qapi import QuranApi
+from source.qconfig import QConfig
+
+class DbProfileBenchmark():
+    """Used to compare the connection profile with the default settings.
+
+    Methods
+    -------
+    __init__()
+        Reads the quran and hadith reader configurations.
+    run()
+        Runs all the benchmarks and prints the results.
+    bench_quran()
+        Times reading the ayat text of all rukus.
+    bench_hadith()
+        Times reading the titles and text of all hadith books.
+    _bench()
+        Times the given reader walk with both profiles and page cache states.
+    _evict_file()
+        Removes the given file from the operating system page cache.
+    """
+
+    def __init__(self, count: int = 5) -> None:
+        """Reads the quran and hadith reader configurations.
+
+        :param count: The number of times each reader walk is timed.
+        :type count: int.
+        """
+
+        # The reader configurations
+        self.qconfig = QConfig().get_config()
+        self.hconfig = HConfig().get_config()
+        # The number of times each reader walk is timed
+        self.count = count
+        # The number of connections opened. It is used for the connection
+        # names
+        self.con_count = 0
+
+    def run(self) -> None:
+        """Runs all the benchmarks and prints the results.
+        """
+
+        self.bench_quran()
+        self.bench_hadith()
+
+    def bench_quran(self) -> None:
+        """Times reading the ayat text of all rukus.
+
+        This is what the next button of the quran reader does when it is
+        clicked for each ruku.
+        """
+
+        def create_api(con_name: str, profile: dict) -> QuranApi:
+            """The QuranApi object is created"""
+            return QuranApi(self.qconfig["db_path"],
+                            self.qconfig["default_lang"], con_name, profile)
+
+        def walk(api: QuranApi) -> None:
+            """The ayat text of each ruku is read"""
+            for sura in range(1, len(api.get_sura_names()) + 1):
+                for ruku in range(1, api.get_ruku_count(sura) + 1):
+                    api.get_ayat_text(sura, ruku)
+
+        self._bench("Quran", self.qconfig, create_api, walk)
+
+    def bench_hadith(self) -> None:
+        """Times reading the titles and text of all hadith books.
+
+        This is what the hadith reader does when each book is selected. The
+        book cache is cleared before each walk, so the hadith are read from
+        the database.
+        """
+
+        def create_api(con_name: str, profile: dict) -> HadithApi:
+            """The HadithApi object is created"""
+            return HadithApi(self.hconfig["db_path"],
+                             self.hconfig["default_lang"],
+                             con_name=con_name, profile=profile)
+
+        def walk(api: HadithApi) -> None:
+            """The hadith of each book are read"""
+            api.book_cache.clear()
+            for source in api.get_source_list():
+                for book, name in api.get_book_list(source):
+                    api.get_title_list(book)
+
+        self._bench("Hadith", self.hconfig, create_api, walk)
+
+    def _bench(self, name: str, config: dict, create_api, walk) -> None:
+        """Times the given reader walk with both profiles and page cache
+        states.
+
+        The median time of the runs is printed.
+
+        :param name: The reader name.
+        :type name: str.
+        :param config: The reader configuration.
+        :type config: dict.
+        :param create_api: Creates an api object for the given connection
+            name and profile.
+        :type create_api: callable.
+        :param walk: Runs the reader queries on the given api object.
+        :type walk: callable.
+        """
+
+        # The connection profiles that are compared
+        profiles = [("default", None), ("tuned", config["db_profile"])]
+        # Each connection profile is timed
+        for profile_name, profile in profiles:
+            # The open and walk times with a cold page cache
+            open_times = []
+            cold_times = []
+            for i in range(self.count):
+                # The database file is removed from the page cache
+                self._evict_file(config["db_path"])
+                self.con_count += 1
+                # The connection is opened
+                start = time.perf_counter()
+                api = create_api("bench_%d" % self.con_count, profile)
+                open_times.append((time.perf_counter() - start) * 1000)
+                # The reader queries are run
+                start = time.perf_counter()
+                walk(api)
+                cold_times.append((time.perf_counter() - start) * 1000)
+                api.close()
+
+            # The walk times with a warm page cache
+            warm_times = []
+            self.con_count += 1
+            api = create_api("bench_%d" % self.con_count, profile)
+            # The page cache is warmed
+            walk(api)
+            for i in range(self.count):
+                start = time.perf_counter()
+                walk(api)
+                warm_times.append((time.perf_counter() - start) * 1000)
+            api.close()
+
+            print("%s (%s): open %.2f ms, cold %.2f ms, warm %.2f ms" % (
+                name, profile_name, statistics.median(open_times),
+                statistics.median(cold_times), statistics.median(warm_times)))
+
+    def _evict_file(self, path: str) -> None:
+        """Removes the given file from the operating system page cache.
+
+        It is only supported on Linux. On other systems the file stays in the
+        page cache, so the cold and warm times are similar.
+
+        :param path: The file path.
+        :type path: str.
+        """
+
+        # If the file cannot be removed from the page cache
+        if not hasattr(os, "posix_fadvise"):
+            return
+
+        # The file is opened and its pages are removed from the page cache
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+if __name__ == '__main__':
+    DbProfileBenchmark().run()
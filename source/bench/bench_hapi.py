@@ -0,0 +1,244 @@
+"""Hadith Api Benchmarks
+
+This script measures the time taken by the HadithApi methods on the
+database given in the hadith reader configuration. The memory allocated
+while the largest books are loaded is measured with tracemalloc. The time
+and memory taken to load the title combo box are measured for the smallest
+and largest books.
+
+It can be run using the command: python -m source.bench.bench_hapi
+"""
+
+import time, timeit, tracemalloc
+
+from source.hapi import HadithApi
+from source.hconfig import HConfig
+from source.models import create_combo_model
+
+class HadithApiBenchmark():
+    """Used to measure the time taken by the HadithApi methods.
+
+    Methods
+    -------
+    __init__()
+        Creates an instance of the HadithApi class.
+    run()
+        Runs all the benchmarks and prints the results.
+    bench_book_walk()
+        Compares reading all hadith in a book using the book cache with
+        reading them one query at a time.
+    bench_book_alloc()
+        Compares the memory allocated when the largest books are loaded from
+        a list of rows and from a row iterator.
+    bench_title_model()
+        Compares loading the title combo box item by item with loading it
+        through the paged list model.
+    """
+
+    def __init__(self, count: int = 10) -> None:
+        """Creates an instance of the HadithApi class.
+
+        :param count: The number of times each function is called.
+        :type count: int.
+        """
+
+        # The application configuration
+        hconfig = HConfig()
+        self.config = hconfig.get_config()
+        # The number of times each function is called
+        self.count = count
+        # An instance of the HadithApi class is created
+        self.api = HadithApi(
+            self.config["db_path"], self.config["default_lang"])
+
+    def run(self) -> None:
+        """Runs all the benchmarks and prints the results.
+        """
+
+        self.bench_book_walk()
+        self.bench_book_alloc()
+        self.bench_title_model()
+
+    def bench_book_walk(self) -> None:
+        """Compares reading all hadith in a book using the book cache with
+        reading them one query at a time.
+
+        The largest book of the first hadith source is used. This is what the
+        next button does when it is clicked for each hadith in the book.
+        """
+
+        # The books in the first hadith source
+        book_list = self.api.get_book_list(self.api.get_source_list()[0])
+        # The book with the most hadith
+        book = max(book_list, key=lambda b: len(self.api.get_title_list(b[0])))
+        # The hadith ids in the book
+        ids = [title[0] for title in self.api.get_title_list(book[0])]
+
+        def query_walk():
+            """Each hadith text is fetched using its own query"""
+            # The book cache is emptied
+            self.api.book_cache.clear()
+            # The title list is fetched without the book cache
+            sql = "SELECT id, title FROM " + self.api.tbl_text
+            self.api._fetch_data(sql + " WHERE book_id=?", [book[0]], 2)
+            sql = "SELECT hadith_text FROM " + self.api.tbl_text
+            for hadith_id in ids:
+                self.api._fetch_data(sql + " WHERE id=?", [hadith_id], 1)
+
+        def cache_walk():
+            """The hadith text is fetched using the book cache"""
+            # The book cache is emptied
+            self.api.book_cache.clear()
+            self.api.get_title_list(book[0])
+            for hadith_id in ids:
+                self.api.get_hadith_text(hadith_id)
+
+        # The time taken by each method in milliseconds
+        query_time = min(timeit.repeat(query_walk, number=self.count,
+                                       repeat=5)) / self.count * 1000
+        cache_time = min(timeit.repeat(cache_walk, number=self.count,
+                                       repeat=5)) / self.count * 1000
+
+        print("Book of %d hadith (one query per hadith): %.2f ms" %
+              (len(ids), query_time))
+        print("Book of %d hadith (book cache): %.2f ms" %
+              (len(ids), cache_time))
+
+    def bench_book_alloc(self, book_count: int = 3) -> None:
+        """Compares the memory allocated when the largest books are loaded
+        from a list of rows and from a row iterator.
+
+        The list version fetches the rows as a list of lists and copies them
+        into the title list and text dict, as the book cache did before the
+        row iterator was added. The peak memory and the number of memory
+        blocks allocated while the book is loaded are printed for each
+        database backend.
+
+        :param book_count: The number of largest books that are loaded.
+        :type book_count: int.
+        """
+
+        # The sql query for the number of hadith in each book
+        sql = "SELECT book_id, COUNT(*) FROM " + self.api.tbl_text
+        sql += " GROUP BY book_id ORDER BY COUNT(*) DESC LIMIT ?"
+        # The largest books
+        books = self.api._fetch_data(sql, [book_count], 2)
+
+        for backend in ["qtsql", "sqlite"]:
+            # The api that uses the backend
+            api = HadithApi(self.config["db_path"],
+                            self.config["default_lang"], backend=backend)
+            # The sql query for the hadith in a book
+            sql = "SELECT id, title, hadith_text FROM " + api.tbl_text
+            sql += " WHERE book_id=? ORDER BY id ASC"
+
+            def list_load(book: int) -> dict:
+                """The rows are fetched as a list and copied"""
+                rows = api._fetch_data(sql, [book], 3)
+                return {
+                    "titles": [[row[0], row[1]] for row in rows],
+                    "texts": {row[0]: row[2] for row in rows}
+                }
+
+            def iter_load(book: int) -> dict:
+                """The rows are read from the row iterator"""
+                return api._load_book(book)
+
+            for book, size in books:
+                # The query is run once, so it is prepared before measuring
+                list_load(book)
+                for name, load in [("list", list_load), ("iter", iter_load)]:
+                    # The book cache is emptied
+                    api.book_cache.clear()
+                    tracemalloc.start()
+                    # The memory blocks before the book is loaded
+                    before = tracemalloc.take_snapshot()
+                    cached_book = load(book)
+                    # The memory blocks after the book is loaded
+                    after = tracemalloc.take_snapshot()
+                    # The peak memory in KB
+                    peak = tracemalloc.get_traced_memory()[1] / 1024
+                    tracemalloc.stop()
+                    # The number of memory blocks allocated by the load
+                    blocks = sum(
+                        stat.count_diff for stat in
+                        after.compare_to(before, "filename")
+                        if stat.count_diff > 0)
+                    del cached_book
+                    print("%s: book %d of %d hadith (%s): peak %.1f KB, "
+                          "%d blocks" % (backend, book, size, name, peak,
+                                         blocks))
+            api.close()
+
+    def bench_title_model(self) -> None:
+        """Compares loading the title combo box item by item with loading it
+        through the paged list model.
+
+        The item version fetches the title list and adds each title to the
+        combo box, as the hadith reader did before the paged list model was
+        added. The paged version fetches the hadith ids of the book and the
+        first page of titles. The smallest and largest books are loaded with
+        and without the meta data snapshot. The time taken and the peak
+        memory are printed.
+        """
+
+        from PyQt5 import QtWidgets
+
+        # The application object is needed by the combo boxes
+        app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        # The sql query for the number of hadith in each book
+        sql = "SELECT book_id, COUNT(*) FROM " + self.api.tbl_text
+        sql += " GROUP BY book_id ORDER BY COUNT(*) ASC"
+        # The smallest and largest books
+        rows = self.api._fetch_data(sql, [], 2)
+        books = [rows[0], rows[-1]]
+
+        for snapshot_path in [None, self.config["snapshot_path"]]:
+            # The api that uses the snapshot
+            api = HadithApi(self.config["db_path"],
+                            self.config["default_lang"], backend="sqlite",
+                            snapshot_path=snapshot_path)
+            # The name of the measured configuration
+            mode = "snapshot" if api.snapshot is not None else "database"
+            # The combo boxes
+            item_combo = QtWidgets.QComboBox()
+            paged_combo = QtWidgets.QComboBox()
+            model = create_combo_model(paged_combo)
+
+            def item_load(book: int) -> None:
+                """Each title is added to the combo box"""
+                api.book_cache.clear()
+                item_combo.clear()
+                for hadith_id, title in api.get_title_list(book):
+                    item_combo.addItem(title, str(hadith_id))
+
+            def paged_load(book: int) -> None:
+                """The first page of titles is fetched by the model"""
+                ids = api.get_title_ids(book)
+                model.set_rows(len(ids), lambda start, count: [
+                    (title, str(hadith_id)) for hadith_id, title in
+                    api.get_title_range(book, ids[start],
+                                        ids[start + count - 1])])
+                paged_combo.setCurrentIndex(0)
+                paged_combo.currentText()
+
+            for book, size in books:
+                for name, load in [("items", item_load),
+                                   ("paged", paged_load)]:
+                    # The queries are prepared before measuring
+                    load(book)
+                    tracemalloc.start()
+                    start = time.perf_counter()
+                    load(book)
+                    # The time taken in milliseconds
+                    load_time = (time.perf_counter() - start) * 1000
+                    # The peak memory in KB
+                    peak = tracemalloc.get_traced_memory()[1] / 1024
+                    tracemalloc.stop()
+                    print("%s: book %d of %d hadith (%s): %.2f ms, peak "
+                          "%.1f KB" % (mode, book, size, name, load_time,
+                                       peak))
+            api.close()
+
+if __name__ == '__main__':
+    HadithApiBenchmark().run()
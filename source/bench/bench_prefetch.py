@@ -0,0 +1,129 @@
+"""Page Prefetch Benchmarks
+
+This script walks through the quran or hadith reader one page at a time and
+prints the page cache statistics, including the number of prefetched pages
+and the prefetch hit ratio. The readers use the database and the
+prefetch_depth config value given in the reader configuration. The reader
+window is not shown, so it can be run with the offscreen Qt platform.
+
+The walk moves forward by the given number of pages and then back by the
+same number, so the reading position saved in the database is not changed.
+
+It can be run using the command: python -m source.bench.bench_prefetch quran
+"""
+
+import argparse, time
+
+from PyQt5 import QtCore, QtWidgets
+
+class PrefetchBenchmark():
+    """Used to measure the prefetch hit ratio of the reader page cache.
+
+    Methods
+    -------
+    __init__()
+        Creates the reader window and its manager.
+    run()
+        Walks through the reader and prints the page cache statistics.
+    _step()
+        Shows the next or previous page and waits for the prefetched pages.
+    _wait()
+        Processes the gui events until the background thread is idle.
+    """
+
+    def __init__(self, reader: str, steps: int = 40) -> None:
+        """Creates the reader window and its manager.
+
+        :param reader: The reader that is used. It is quran or hadith.
+        :type reader: str.
+        :param steps: The number of pages shown in each direction.
+        :type steps: int.
+        """
+
+        # The application object
+        self.app = (QtWidgets.QApplication.instance() or
+                    QtWidgets.QApplication([]))
+        # If the quran reader is used
+        if reader == "quran":
+            from source.qreader import Ui_MainWindow
+            from source.qmanager import Ui_Manager
+        else:
+            from source.hreader import Ui_MainWindow
+            from source.hmanager import Ui_Manager
+        # The reader window
+        self.window = QtWidgets.QMainWindow()
+        self.ui = Ui_MainWindow()
+        self.ui.setupUi(self.window)
+        # The reader manager
+        self.manager = Ui_Manager()
+        self.manager.initialize_ui(self.ui)
+        # The functions that show the next and previous pages
+        if reader == "quran":
+            self.next_page = self.manager._next_ruku
+            self.prev_page = self.manager._prev_ruku
+        else:
+            self.next_page = self.manager._next_hadith
+            self.prev_page = self.manager._prev_hadith
+        # The number of pages shown in each direction
+        self.steps = steps
+
+    def run(self) -> None:
+        """Walks through the reader and prints the page cache statistics.
+        """
+
+        # The first page is shown and its neighbours are prefetched
+        self._wait()
+        # The time at which the walk started
+        start = time.perf_counter()
+        for func in [self.next_page] * self.steps + [self.prev_page] * \
+                self.steps:
+            self._step(func)
+        # The time taken by the walk in seconds
+        walk_time = time.perf_counter() - start
+        # The page cache statistics
+        stats = self.manager.pages.get_stats()
+
+        print("Pages shown: %d" % (self.steps * 2))
+        print("Walk time: %.2f s" % walk_time)
+        print("Cache hits: %d, misses: %d, hit ratio: %.2f" %
+              (stats["hits"], stats["misses"], stats["hit_ratio"]))
+        print("Prefetched pages: %d, used: %d, prefetch hit ratio: %.2f" %
+              (stats["prefetches"], stats["prefetch_hits"],
+               stats["prefetch_hit_ratio"]))
+
+        # The settings are saved and the background thread is stopped
+        QtCore.QTimer.singleShot(0, self.app.quit)
+        self.app.exec_()
+
+    def _step(self, func) -> None:
+        """Shows the next or previous page and waits for the prefetched pages.
+
+        :param func: The function that shows the page.
+        :type func: callable.
+        """
+
+        func()
+        self._wait()
+
+    def _wait(self) -> None:
+        """Processes the gui events until the background thread is idle.
+        """
+
+        # The gui events are processed at least once
+        self.app.processEvents()
+        # While the background thread has pending requests
+        while self.manager.dispatcher.callbacks:
+            self.app.processEvents()
+            time.sleep(0.001)
+
+if __name__ == '__main__':
+    # The command line arguments
+    parser = argparse.ArgumentParser(
+        description="Measures the prefetch hit ratio of the readers.")
+    parser.add_argument("reader", choices=["quran", "hadith"],
+                        help="The reader that is used.")
+    parser.add_argument("--steps", type=int, default=40,
+                        help="The number of pages shown in each direction.")
+    args = parser.parse_args()
+
+    PrefetchBenchmark(args.reader, args.steps).run()
@@ -0,0 +1,154 @@
+"""Quran Api Benchmarks
+
+This script measures the time taken by the QuranApi methods on the
+database given in the quran reader configuration, or on the database given
+as the first command line argument.
+
+It can be run using the command: python -m source.bench.bench_qapi
+"""
+
+import sys, timeit
+
+from source.qapi import QuranApi
+from source.qconfig import QConfig
+
+class QuranApiBenchmark():
+    """Used to measure the time taken by the QuranApi methods.
+
+    Methods
+    -------
+    __init__()
+        Creates an instance of the QuranApi class.
+    run()
+        Runs all the benchmarks and prints the results.
+    bench_lang_meta()
+        Compares the language meta data cache with the sql queries it
+        replaces.
+    bench_multi_lang()
+        Compares fetching the ayat text of several languages with one query
+        and with one query per language.
+    _time()
+        Returns the time taken by a single call of the given function.
+    """
+
+    def __init__(self, count: int = 1000, db_path: str = None) -> None:
+        """Creates an instance of the QuranApi class.
+
+        :param count: The number of times each function is called.
+        :type count: int.
+        :param db_path: The path of the quran database. The database given in
+            the quran reader configuration is used by default.
+        :type db_path: str.
+        """
+
+        # The application configuration
+        qconfig = QConfig()
+        self.config = qconfig.get_config()
+        # The number of times each function is called
+        self.count = count
+        # An instance of the QuranApi class is created
+        self.api = QuranApi(
+            db_path or self.config["db_path"], self.config["default_lang"])
+
+    def run(self) -> None:
+        """Runs all the benchmarks and prints the results.
+        """
+
+        self.bench_lang_meta()
+        self.bench_multi_lang()
+
+    def bench_lang_meta(self) -> None:
+        """Compares the language meta data cache with the sql queries it
+        replaces.
+
+        Each ayat box render needs the table name, text direction and font of
+        the current language.
+        """
+
+        # The current language
+        lang = self.api.lang
+
+        def sql_lookup():
+            """The language meta data is fetched using one query per field"""
+            sql = "SELECT tbl_name FROM ic_quranic_tbl_meta_data"
+            self.api._fetch_data(sql + " WHERE language=?", [lang], 1)
+            sql = "SELECT rtl FROM ic_quranic_tbl_meta_data"
+            self.api._fetch_data(sql + " WHERE language=?", [lang], 1)
+            sql = "SELECT font_family, font_size FROM ic_quranic_tbl_meta_data"
+            self.api._fetch_data(sql + " WHERE language=?", [lang], 2)
+
+        def cache_lookup():
+            """The language meta data is fetched from the cache"""
+            self.api.get_lang_meta(lang)
+
+        # The time taken by each method
+        sql_time = self._time(sql_lookup)
+        cache_time = self._time(cache_lookup)
+
+        print("Language meta data (sql queries): %.2f us" % sql_time)
+        print("Language meta data (cache): %.2f us" % cache_time)
+
+    def bench_multi_lang(self) -> None:
+        """Compares fetching the ayat text of several languages with one query
+        and with one query per language.
+
+        The parallel view of the quran reader shows the ayat text of several
+        languages. The longest ruku of the second sura is used. If the
+        database has fewer languages than a language count, then all of its
+        languages are used.
+        """
+
+        # The rukus of the second sura
+        rukus = range(1, self.api.get_ruku_count(2) + 1)
+        # The ruku with the most ayas
+        ruku = max(rukus, key=lambda r: len(self.api.get_ayat_text(2, r)))
+        # The languages in the database
+        lang_list = self.api.get_lang_list()
+
+        for lang_count in [2, 5, 10]:
+            # The languages used
+            langs = lang_list[:lang_count]
+
+            def single_fetch():
+                """The ayat text is fetched using one query per language"""
+                for lang in langs:
+                    self.api.set_lang(lang)
+                    self.api.get_ayat_text(2, ruku)
+
+            def multi_fetch():
+                """The ayat text is fetched using a single query"""
+                self.api.get_ayat_text_multi(2, ruku, langs)
+
+            # The time taken by each method
+            single_time = self._time(single_fetch)
+            multi_time = self._time(multi_fetch)
+
+            print("Ayat text of %d languages (query per language): %.2f us" %
+                  (len(langs), single_time))
+            print("Ayat text of %d languages (single query): %.2f us" %
+                  (len(langs), multi_time))
+
+    def _time(self, func) -> float:
+        """Returns the time taken by a single call of the given function.
+
+        The function is timed several times and the fastest time is used.
+
+        :param func: The function to time.
+        :type func: callable.
+        :return: The time taken by a single call in microseconds.
+        :rtype: float.
+        """
+
+        # The total time taken by each repetition
+        times = timeit.repeat(func, number=self.count, repeat=5)
+        # The time taken by a single call in microseconds
+        call_time = min(times) / self.count * 1000000
+
+        return call_time
+
+if __name__ == '__main__':
+    # If the database path is given
+    if len(sys.argv) > 1:
+        QuranApiBenchmark(db_path=sys.argv[1]).run()
+    else:
+        QuranApiBenchmark().run()
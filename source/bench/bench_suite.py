@@ -0,0 +1,402 @@
+"""Api Benchmark Suite
+
+This script times each public method of the QuranApi and HadithApi classes
+and the navigation sequences of the readers. Each method is called with
+arguments chosen at random using the given seed, so the same calls are made
+each time. The 50th, 95th and 99th percentile of the call times are printed.
+With the --json option the results are also saved as json, so they can be
+compared between runs.
+
+The databases given in the reader configurations are used, unless the
+--data option gives the folder of the databases built by the fixture
+generator. The fixture can be built using the command:
+python -m source.bench.fixture --out bench_data
+
+It can be run using the command: python -m source.bench.bench_suite --data
+bench_data --json results.json
+"""
+
+import argparse, json, math, os, platform, random, sqlite3, time
+
+from source.hapi import HadithApi
+from source.hconfig import HConfig
+from source.qapi import QuranApi
+from source.qconfig import QConfig
+
+# The percentiles that are reported
+PERCENTILES = [50, 95, 99]
+
+def get_percentile(samples: list, percentile: int) -> float:
+    """Returns the given percentile of the sorted samples.
+
+    The nearest rank method is used, so the result is one of the samples.
+
+    :param samples: The sorted samples.
+    :type samples: list.
+    :param percentile: The percentile.
+    :type percentile: int.
+    :return: The sample at the percentile.
+    :rtype: float.
+    """
+
+    # The rank of the sample
+    rank = max(1, math.ceil(percentile / 100 * len(samples)))
+
+    return samples[rank - 1]
+
+class BenchmarkSuite():
+    """Used to time the QuranApi and HadithApi methods.
+
+    Methods
+    -------
+    __init__()
+        Sets the databases, backend and number of calls.
+    run()
+        Runs all the benchmarks and returns the results.
+    get_quran_cases()
+        Returns the QuranApi benchmark cases.
+    get_hadith_cases()
+        Returns the HadithApi benchmark cases.
+    print_results()
+        Prints the given results as a table.
+    _time()
+        Returns the time taken by each call of the given function.
+    _walk_rukus()
+        Reads the ayat text of all rukus in the given direction.
+    _walk_books()
+        Reads the titles and text of all hadith in the given books.
+    """
+
+    def __init__(self, quran_path: str, hadith_path: str,
+                 backend: str = "qtsql", count: int = 200,
+                 seq_count: int = 10, seed: int = 1) -> None:
+        """Sets the databases, backend and number of calls.
+
+        :param quran_path: The path of the quran database.
+        :type quran_path: str.
+        :param hadith_path: The path of the hadith database.
+        :type hadith_path: str.
+        :param backend: The database backend.
+        :type backend: str.
+        :param count: The number of calls of each method.
+        :type count: int.
+        :param seq_count: The number of runs of each navigation sequence.
+        :type seq_count: int.
+        :param seed: The seed used to choose the method arguments.
+        :type seed: int.
+        """
+
+        # The quran reader configuration
+        self.qconfig = QConfig().get_config()
+        # The hadith reader configuration
+        self.hconfig = HConfig().get_config()
+        # The path of the quran database
+        self.quran_path = quran_path
+        # The path of the hadith database
+        self.hadith_path = hadith_path
+        # The database backend
+        self.backend = backend
+        # The number of calls of each method
+        self.count = count
+        # The number of runs of each navigation sequence
+        self.seq_count = seq_count
+        # The random number generator used to choose the arguments
+        self.rng = random.Random(seed)
+        # The seed
+        self.seed = seed
+
+    def run(self) -> dict:
+        """Runs all the benchmarks and returns the results.
+
+        :return: The run details and the time percentiles of each case in
+            milliseconds.
+        :rtype: dict.
+        """
+
+        # The results of each case
+        cases = {}
+        for name, func, args_list in (self.get_quran_cases() +
+                                      self.get_hadith_cases()):
+            # The time taken by each call in milliseconds
+            samples = sorted(self._time(func, args_list))
+            # The statistics of the case
+            stats = {"calls": len(samples)}
+            for percentile in PERCENTILES:
+                stats["p%d" % percentile] = get_percentile(
+                    samples, percentile)
+            stats["mean"] = sum(samples) / len(samples)
+            stats["max"] = samples[-1]
+            cases[name] = stats
+
+        # The results
+        results = {
+            "run": {
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "backend": self.backend,
+                "seed": self.seed,
+                "quran_db": os.path.abspath(self.quran_path),
+                "hadith_db": os.path.abspath(self.hadith_path),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "machine": platform.machine()
+            },
+            "cases": cases
+        }
+
+        return results
+
+    def get_quran_cases(self) -> list:
+        """Returns the QuranApi benchmark cases.
+
+        :return: The name, function and argument list of each case. The
+            function is called once with each item of the argument list.
+        :rtype: list.
+        """
+
+        # The api opened in the same way as the quran reader
+        api = QuranApi(self.quran_path, self.qconfig["default_lang"],
+                       profile=self.qconfig["db_profile"],
+                       backend=self.backend)
+        # The random choices
+        choice, randint = self.rng.choice, self.rng.randint
+        # The languages
+        langs = api.get_lang_list()
+        # The rukus
+        rukus = []
+        for sura in range(1, len(api.get_sura_names()) + 1):
+            for ruku in range(1, api.get_ruku_count(sura) + 1):
+                rukus.append((sura, ruku))
+        # The number of ayas
+        row_count = api._fetch_row(
+            "SELECT COUNT(*) FROM ic_quranic_meta_data", [], 1)[0]
+        # The search words
+        words = ["mercy", "light", "prayer", "guidance", "الله", "رحمة"]
+
+        def open_api() -> None:
+            """The database is opened and closed"""
+            QuranApi(self.quran_path, self.qconfig["default_lang"],
+                     profile=self.qconfig["db_profile"],
+                     backend=self.backend).close()
+
+        # The arguments for a random ruku
+        ruku_args = [choice(rukus) for i in range(self.count)]
+        # The arguments for a random language
+        lang_args = [(choice(langs),) for i in range(self.count)]
+        # The arguments for a random sura
+        sura_args = [(ruku[0],) for ruku in ruku_args]
+        # No arguments
+        no_args = [()] * self.count
+
+        # The cases
+        cases = [
+            ("quran.open", open_api, no_args[:self.seq_count]),
+            ("quran.set_lang", api.set_lang, lang_args),
+            ("quran.get_lang_meta", api.get_lang_meta, lang_args),
+            ("quran.get_lang_list", api.get_lang_list, no_args),
+            ("quran.get_settings", api.get_settings, no_args),
+            ("quran.get_row_id", api.get_row_id,
+             [(ruku[0], 1) for ruku in ruku_args]),
+            ("quran.get_font_details", api.get_font_details, lang_args),
+            ("quran.is_rtl", api.is_rtl, lang_args),
+            ("quran.get_random_ruku", api.get_random_ruku, no_args),
+            ("quran.get_next_ruku", api.get_next_ruku, ruku_args),
+            ("quran.get_prev_ruku", api.get_prev_ruku, ruku_args),
+            ("quran.get_ayat_text", api.get_ayat_text, ruku_args),
+            ("quran.get_ayat_text_multi", api.get_ayat_text_multi,
+             [ruku + (self.rng.sample(langs, min(len(langs), 3)),)
+              for ruku in ruku_args]),
+            ("quran.get_sura_names", api.get_sura_names, no_args),
+            ("quran.get_sura_short_name", api.get_sura_short_name,
+             sura_args),
+            ("quran.get_ruku_count", api.get_ruku_count, sura_args),
+            ("quran.get_ayat_range", api.get_ayat_range, ruku_args),
+            ("quran.get_row", api.get_row,
+             [(randint(1, row_count),) for i in range(self.count)]),
+            ("quran.has_search_index", api.has_search_index, lang_args),
+            ("quran.search", api.search,
+             [(choice(words), choice(langs)) for i in range(self.count)]),
+            ("quran.walk_next", self._walk_rukus,
+             [(api, 1)] * self.seq_count),
+            ("quran.walk_prev", self._walk_rukus,
+             [(api, -1)] * self.seq_count),
+        ]
+
+        return cases
+
+    def get_hadith_cases(self) -> list:
+        """Returns the HadithApi benchmark cases.
+
+        :return: The name, function and argument list of each case. The
+            function is called once with each item of the argument list.
+        :rtype: list.
+        """
+
+        # The api opened in the same way as the hadith reader
+        api = HadithApi(self.hadith_path, self.hconfig["default_lang"],
+                        profile=self.hconfig["db_profile"],
+                        backend=self.backend)
+        # The random choices
+        choice, randint = self.rng.choice, self.rng.randint
+        # The sources
+        sources = api.get_source_list()
+        # The books of each source
+        books = {source: [book[0] for book in api.get_book_list(source)]
+                 for source in sources}
+        # The ids of all books
+        book_ids = [book for source in sources for book in books[source]]
+        # The number of hadith
+        hadith_count = api._fetch_row(
+            "SELECT MAX(id) FROM " + api.tbl_text, [], 1)[0]
+        # The search words
+        words = ["prayer", "charity", "patience", "الله", "صلاة", "صبر"]
+
+        def get_title_list(book: int) -> list:
+            """The book is removed from the book cache and its titles read"""
+            api.book_cache.pop(book, None)
+            return api.get_title_list(book)
+
+        # The arguments for a random hadith
+        hadith_args = [(randint(1, hadith_count),)
+                       for i in range(self.count)]
+        # The arguments for a random search word
+        word_args = [(choice(words),) for i in range(self.count)]
+        # No arguments
+        no_args = [()] * self.count
+
+        # The cases
+        cases = [
+            ("hadith.set_lang", api.set_lang,
+             [(choice(["Urdu", "English", "Arabic"]),)
+              for i in range(self.count)]),
+            ("hadith.get_source_list", api.get_source_list, no_args),
+            ("hadith.get_book_list", api.get_book_list,
+             [(choice(sources),) for i in range(self.count)]),
+            ("hadith.get_title_list", get_title_list,
+             [(choice(book_ids),) for i in range(self.count)]),
+            ("hadith.get_hadith_text", api.get_hadith_text, hadith_args),
+            ("hadith.get_cache_stats", api.get_cache_stats, no_args),
+            ("hadith.has_search_index", api.has_search_index, no_args),
+            ("hadith.search", api.search, word_args),
+            ("hadith.get_search_count", api.get_search_count, word_args),
+            ("hadith.get_settings", api.get_settings, no_args),
+            ("hadith.get_row", api.get_row, hadith_args),
+            ("hadith.get_random_hadith", api.get_random_hadith, no_args),
+            ("hadith.walk_book", self._walk_books,
+             [(api, [choice(book_ids)]) for i in range(self.seq_count)]),
+            ("hadith.walk_source", self._walk_books,
+             [(api, books[sources[0]])] * self.seq_count),
+        ]
+
+        return cases
+
+    def print_results(self, results: dict) -> None:
+        """Prints the given results as a table.
+
+        :param results: The results returned by the run function.
+        :type results: dict.
+        """
+
+        print("%-28s %7s %10s %10s %10s" % ("case (ms)", "calls", "p50",
+                                           "p95", "p99"))
+        for name, stats in results["cases"].items():
+            print("%-28s %7d %10.3f %10.3f %10.3f" % (
+                name, stats["calls"], stats["p50"], stats["p95"],
+                stats["p99"]))
+
+    def _time(self, func, args_list: list) -> list:
+        """Returns the time taken by each call of the given function.
+
+        :param func: The function to call.
+        :type func: Callable.
+        :param args_list: The arguments of each call.
+        :type args_list: list.
+        :return: The time taken by each call in milliseconds.
+        :rtype: list.
+        """
+
+        # The time taken by each call
+        samples = []
+        # The timer
+        timer = time.perf_counter
+        for args in args_list:
+            start = timer()
+            func(*args)
+            samples.append((timer() - start) * 1000)
+
+        return samples
+
+    def _walk_rukus(self, api: QuranApi, step: int) -> None:
+        """Reads the ayat text of all rukus in the given direction.
+
+        This is what the next or previous button does when it is clicked on
+        each ruku.
+
+        :param api: The QuranApi object.
+        :type api: QuranApi.
+        :param step: 1 for the next ruku and -1 for the previous ruku.
+        :type step: int.
+        """
+
+        # The function that returns the next ruku
+        move = api.get_next_ruku if step > 0 else api.get_prev_ruku
+        # The first ruku
+        ruku = {"sura": 1, "sura_ruku": 1}
+        for i in range(len(api.index.ruku_sura)):
+            api.get_ayat_text(ruku["sura"], ruku["sura_ruku"])
+            ruku = move(ruku["sura"], ruku["sura_ruku"])
+
+    def _walk_books(self, api: HadithApi, books: list) -> None:
+        """Reads the titles and text of all hadith in the given books.
+
+        This is what the next button does when it is clicked on each hadith.
+        The book cache is emptied first.
+
+        :param api: The HadithApi object.
+        :type api: HadithApi.
+        :param books: The book ids.
+        :type books: list.
+        """
+
+        # The book cache is emptied
+        api.book_cache.clear()
+        for book in books:
+            for hadith_id, title in api.get_title_list(book):
+                api.get_hadith_text(hadith_id)
+
+if __name__ == "__main__":
+    # The command line arguments
+    parser = argparse.ArgumentParser(
+        description="Times the QuranApi and HadithApi methods.")
+    parser.add_argument("--data",
+                        help="The folder of the quran.db and hadith.db "
+                        "databases. The reader configurations are used by "
+                        "default.")
+    parser.add_argument("--backend", choices=["qtsql", "sqlite"],
+                        default="qtsql", help="The database backend.")
+    parser.add_argument("--count", type=int, default=200,
+                        help="The number of calls of each method.")
+    parser.add_argument("--seq-count", type=int, default=10,
+                        help="The number of runs of each sequence.")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="The seed used to choose the arguments.")
+    parser.add_argument("--json",
+                        help="The file in which the results are saved.")
+    args = parser.parse_args()
+
+    # If the database folder is given
+    if args.data:
+        quran_path = os.path.join(args.data, "quran.db")
+        hadith_path = os.path.join(args.data, "hadith.db")
+    else:
+        quran_path = QConfig().get_config()["db_path"]
+        hadith_path = HConfig().get_config()["db_path"]
+
+    # The benchmarks are run
+    suite = BenchmarkSuite(quran_path, hadith_path, args.backend,
+                           args.count, args.seq_count, args.seed)
+    results = suite.run()
+    suite.print_results(results)
+    # If the results should be saved
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
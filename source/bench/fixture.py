@@ -0,0 +1,332 @@
+"""Benchmark Fixture Generator
+
+This script builds a synthetic quran.db and hadith.db, so the benchmarks can
+be run without downloading the reader data. The databases have the tables
+and columns read by the QuranApi and HadithApi classes. The quran database
+has 114 suras with their real number of ayas and rukus, so it has 6236 ayas
+in each language. The hadith database has five sources. The number of
+hadith in each book follows a long tailed distribution, so some books are
+much larger than others. The text is made of random words, using the given
+seed, so the same databases are built each time.
+
+It can be run using the command: python -m source.bench.fixture --out
+bench_data. The --langs option sets the number of quran languages and the
+--hadith-scale option multiplies the number of hadith in each book. The
+search indexes of all languages are built unless the --no-search option is
+given.
+"""
+
+import argparse, os, random, sqlite3
+
+# The number of ayas in each sura
+SURA_AYAS = [
+    7, 286, 200, 176, 120, 165, 206, 75, 129, 109, 123, 111, 43, 52, 99, 128,
+    111, 110, 98, 135, 112, 78, 118, 64, 77, 227, 93, 88, 69, 60, 34, 30, 73,
+    54, 45, 83, 182, 88, 75, 85, 54, 53, 89, 59, 37, 35, 38, 29, 18, 45, 60,
+    49, 62, 55, 78, 96, 29, 22, 24, 13, 14, 11, 11, 18, 12, 12, 30, 52, 52,
+    44, 28, 28, 20, 56, 40, 31, 50, 40, 46, 42, 29, 19, 36, 25, 22, 17, 19,
+    26, 30, 20, 15, 21, 11, 8, 8, 19, 5, 8, 8, 11, 11, 8, 3, 9, 5, 4, 7, 3,
+    6, 3, 5, 4, 5, 6
+]
+# The number of rukus in each sura, using the division of the Indo-Pak
+# mushaf
+SURA_RUKUS = [
+    1, 40, 20, 24, 16, 20, 24, 10, 16, 11, 10, 12, 6, 7, 6, 16, 12, 12, 6, 8,
+    7, 10, 6, 9, 6, 11, 7, 9, 7, 6, 4, 3, 9, 6, 5, 5, 5, 5, 8, 9, 6, 5, 7, 3,
+    4, 4, 4, 4, 2, 3, 3, 2, 3, 3, 3, 3, 4, 3, 3, 2, 2, 2, 2, 2, 2, 2, 2, 2,
+    2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2
+] + [1] * 35
+# The first quran languages. Other languages are added with generated names
+QURAN_LANGS = [
+    ("Urdu", "ur", 1, "Nafees [PYRS]", 18),
+    ("English", "en", 0, "DejaVu Sans", 12),
+    ("Arabic", "ar", 1, "Nafees [PYRS]", 18)
+]
+# The hadith languages and the suffix of their table names
+HADITH_LANGS = [("Urdu", "urdu"), ("English", "english"),
+                ("Arabic", "arabic")]
+# The hadith sources and their number of books
+HADITH_SOURCES = [("Bukhari", 95), ("Muslim", 56), ("Abu Dawud", 43),
+                  ("Tirmidhi", 49), ("Nasai", 51)]
+# The words used for the text of left to right languages
+LATIN_WORDS = (
+    "and the of to in is who those allah lord people believe said day "
+    "mercy earth heavens good deeds prayer charity fear patience truth "
+    "messenger book guidance light path reward punishment fire garden "
+    "knowledge wise forgiving merciful signs night sun water").split()
+# The words used for the text of right to left languages
+ARABIC_WORDS = (
+    "الله رب الناس "
+    "قال يوم رحمة "
+    "أرض سماوات "
+    "صلاة صدقة صبر "
+    "حق رسول كتاب "
+    "هدى نور صراط "
+    "أجر علم حكيم "
+    "غفور رحيم آيات "
+    "ليل شمس ماء "
+    "و في من على "
+    "الَّهُ رَبّ").split()
+
+class FixtureGenerator():
+    """Used to build a synthetic quran and hadith database.
+
+    Methods
+    -------
+    __init__()
+        Sets the output folder and the size of the databases.
+    generate()
+        Builds the quran and hadith databases.
+    build_quran()
+        Builds the quran database.
+    build_hadith()
+        Builds the hadith database.
+    _get_text()
+        Returns random text with the given number of words.
+    _connect()
+        Removes the given database and opens a new one.
+    """
+
+    def __init__(self, out_dir: str, lang_count: int = 3,
+                 hadith_scale: float = 1.0, seed: int = 1,
+                 search: bool = True) -> None:
+        """Sets the output folder and the size of the databases.
+
+        :param out_dir: The folder in which the databases are created.
+        :type out_dir: str.
+        :param lang_count: The number of quran languages.
+        :type lang_count: int.
+        :param hadith_scale: The number of hadith in each book is multiplied
+            by this value.
+        :type hadith_scale: float.
+        :param seed: The seed of the random text.
+        :type seed: int.
+        :param search: Indicates if the search indexes should be built.
+        :type search: bool.
+        """
+
+        # The output folder
+        self.out_dir = out_dir
+        # The number of quran languages
+        self.lang_count = lang_count
+        # The scale of the hadith books
+        self.hadith_scale = hadith_scale
+        # The random number generator
+        self.rng = random.Random(seed)
+        # Indicates if the search indexes should be built
+        self.search = search
+
+    def generate(self) -> dict:
+        """Builds the quran and hadith databases.
+
+        :return: The paths of the quran and hadith databases.
+        :rtype: dict.
+        """
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        # The database paths
+        paths = {
+            "quran": self.build_quran(
+                os.path.join(self.out_dir, "quran.db")),
+            "hadith": self.build_hadith(
+                os.path.join(self.out_dir, "hadith.db"))
+        }
+
+        return paths
+
+    def build_quran(self, db_path: str) -> str:
+        """Builds the quran database.
+
+        The rukus of each sura are spread evenly over its ayas. The ayat meta
+        data index that is created by the QuranApi class is also created, so
+        the database can be opened read only.
+
+        :param db_path: The path of the quran database.
+        :type db_path: str.
+        :return: The path of the quran database.
+        :rtype: str.
+        """
+
+        con = self._connect(db_path)
+        con.execute("CREATE TABLE ic_quranic_meta_data (id INTEGER PRIMARY "
+                    "KEY, sura INTEGER, sura_ayat_id INTEGER, "
+                    "sura_ruku INTEGER)")
+        con.execute("CREATE TABLE ic_quranic_suras_meta (id INTEGER PRIMARY "
+                    "KEY, sindex INTEGER, ayas INTEGER, tname TEXT, "
+                    "ename TEXT, rukus INTEGER)")
+        con.execute("CREATE TABLE ic_quranic_tbl_meta_data (id INTEGER "
+                    "PRIMARY KEY, language TEXT, tbl_name TEXT, rtl INTEGER, "
+                    "font_family TEXT, font_size INTEGER)")
+        con.execute("CREATE TABLE ic_quranic_settings (id INTEGER PRIMARY "
+                    "KEY, language TEXT, row_id INTEGER)")
+
+        # The meta data of each ayat
+        meta_rows = []
+        # Each sura is added
+        for sura, (ayas, rukus) in enumerate(zip(SURA_AYAS, SURA_RUKUS), 1):
+            for ayat in range(ayas):
+                meta_rows.append((len(meta_rows) + 1, sura, ayat + 1,
+                                  ayat * rukus // ayas + 1))
+            con.execute("INSERT INTO ic_quranic_suras_meta (sindex, ayas, "
+                        "tname, ename, rukus) VALUES (?, ?, ?, ?, ?)",
+                        (sura, ayas, "Sura-%d" % sura, "Sura %d" % sura,
+                         rukus))
+        con.executemany("INSERT INTO ic_quranic_meta_data VALUES (?, ?, ?, ?)",
+                        meta_rows)
+        con.execute("CREATE INDEX ic_quranic_meta_data_ruku ON "
+                    "ic_quranic_meta_data (sura, sura_ruku, id, sura_ayat_id)")
+
+        # The languages. Generated languages are written left to right
+        langs = QURAN_LANGS[:self.lang_count]
+        for i in range(len(langs), self.lang_count):
+            langs.append(("Language %d" % (i + 1), "l%d" % (i + 1), 0,
+                          "DejaVu Sans", 12))
+        # The text table of each language is added
+        for lang, code, rtl, font_family, font_size in langs:
+            tbl = "ic_quranic_text-" + code
+            con.execute("INSERT INTO ic_quranic_tbl_meta_data (language, "
+                        "tbl_name, rtl, font_family, font_size) VALUES "
+                        "(?, ?, ?, ?, ?)",
+                        (lang, tbl, rtl, font_family, font_size))
+            con.execute("CREATE TABLE `" + tbl + "` (id INTEGER PRIMARY KEY,"
+                        " sura INTEGER, sura_ayat_id INTEGER, "
+                        "translated_text TEXT)")
+            con.executemany(
+                "INSERT INTO `" + tbl + "` VALUES (?, ?, ?, ?)",
+                [(row[0], row[1], row[2],
+                  self._get_text(self.rng.randint(6, 60), rtl))
+                 for row in meta_rows])
+        con.execute("INSERT INTO ic_quranic_settings (language, row_id) "
+                    "VALUES (?, 1)", (langs[0][0],))
+        con.commit()
+        con.close()
+
+        # If the search indexes should be built
+        if self.search:
+            from source.qapi import QuranApi
+            api = QuranApi(db_path, langs[0][0], backend="sqlite")
+            for lang in api.get_lang_list():
+                api.build_search_index(lang)
+            api.close()
+
+        return db_path
+
+    def build_hadith(self, db_path: str) -> str:
+        """Builds the hadith database.
+
+        The same books are added in each language. The number of hadith in
+        each book is taken from a Pareto distribution.
+
+        :param db_path: The path of the hadith database.
+        :type db_path: str.
+        :return: The path of the hadith database.
+        :rtype: str.
+        """
+
+        # The number of hadith in each book of each source. The largest
+        # books are limited to 1500 hadith
+        sizes = [[max(1, int(min(self.rng.paretovariate(1.2) * 8, 1500) *
+                             self.hadith_scale))
+                  for i in range(count)] for source, count in HADITH_SOURCES]
+
+        con = self._connect(db_path)
+        con.execute("CREATE TABLE ic_hadith_settings (id INTEGER PRIMARY "
+                    "KEY, language TEXT, row_id INTEGER)")
+        # The tables of each language are added
+        for lang, suffix in HADITH_LANGS:
+            # Indicates if the language is written right to left
+            rtl = lang != "English"
+            con.execute("CREATE TABLE ic_hadith_books_" + suffix + " (id "
+                        "INTEGER PRIMARY KEY, source TEXT, book TEXT, "
+                        "book_number INTEGER)")
+            con.execute("CREATE TABLE ic_hadith_" + suffix + " (id INTEGER "
+                        "PRIMARY KEY, source TEXT, book_id INTEGER, "
+                        "title TEXT, hadith_text TEXT)")
+            # The books and hadith of the language
+            books, hadith = [], []
+            for (source, count), book_sizes in zip(HADITH_SOURCES, sizes):
+                for number, size in enumerate(book_sizes, 1):
+                    books.append((len(books) + 1, source,
+                                  "%s book %d" % (source, number), number))
+                    for i in range(size):
+                        hadith.append((
+                            len(hadith) + 1, source, len(books),
+                            self._get_text(self.rng.randint(3, 12), rtl),
+                            self._get_text(self.rng.randint(30, 300), rtl)))
+            con.executemany("INSERT INTO ic_hadith_books_" + suffix +
+                            " VALUES (?, ?, ?, ?)", books)
+            con.executemany("INSERT INTO ic_hadith_" + suffix +
+                            " VALUES (?, ?, ?, ?, ?)", hadith)
+        con.execute("INSERT INTO ic_hadith_settings (language, row_id) "
+                    "VALUES ('Urdu', 1)")
+        con.commit()
+        con.close()
+
+        # If the search indexes should be built
+        if self.search:
+            from source.hapi import HadithApi
+            api = HadithApi(db_path, "Urdu", backend="sqlite")
+            for lang, suffix in HADITH_LANGS:
+                api.set_lang(lang)
+                api.build_search_index()
+            api.close()
+
+        return db_path
+
+    def _get_text(self, word_count: int, rtl: bool) -> str:
+        """Returns random text with the given number of words.
+
+        :param word_count: The number of words.
+        :type word_count: int.
+        :param rtl: Indicates if Arabic words should be used.
+        :type rtl: bool.
+        :return: The random text.
+        :rtype: str.
+        """
+
+        # The words of the language
+        words = ARABIC_WORDS if rtl else LATIN_WORDS
+
+        return " ".join(self.rng.choices(words, k=word_count))
+
+    def _connect(self, db_path: str) -> sqlite3.Connection:
+        """Removes the given database and opens a new one.
+
+        :param db_path: The path of the database.
+        :type db_path: str.
+        :return: The database connection.
+        :rtype: sqlite3.Connection.
+        """
+
+        # If the database exists, it is removed
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        con = sqlite3.connect(db_path)
+        # The database is only used if it is complete, so it is not
+        # journaled
+        con.execute("PRAGMA journal_mode = off")
+
+        return con
+
+if __name__ == "__main__":
+    # The command line arguments
+    parser = argparse.ArgumentParser(
+        description="Builds synthetic benchmark databases.")
+    parser.add_argument("--out", default="bench_data",
+                        help="The folder in which the databases are built.")
+    parser.add_argument("--langs", type=int, default=3,
+                        help="The number of quran languages.")
+    parser.add_argument("--hadith-scale", type=float, default=1.0,
+                        help="Multiplies the number of hadith in each book.")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="The seed of the random text.")
+    parser.add_argument("--no-search", action="store_true",
+                        help="Does not build the search indexes.")
+    args = parser.parse_args()
+
+    # The databases are built
+    paths = FixtureGenerator(args.out, args.langs, args.hadith_scale,
+                             args.seed, not args.no_search).generate()
+    for name, path in paths.items():
+        print("%s: %s, %.1f MB" % (
+            name, path, os.path.getsize(path) / 1024 / 1024))
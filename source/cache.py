@@ -0,0 +1,347 @@
+import time
+from collections import OrderedDict
+
+class PageCache():
+    """This class is used to cache rendered pages.
+
+    The pages are evicted in least recently used order when the total size of
+    the cached pages is more than the maximum size. The most recently used
+    page is never evicted. The time taken to render each page is saved, so
+    the render time saved by the cache can be reported. Pages that are added
+    before they are needed are counted as prefetched, so the prefetch hit
+    ratio can be reported.
+
+    Methods
+    -------
+    contains()
+        Checks if the page for the given key is cached.
+    get()
+        Returns the cached page for the given key.
+    put()
+        Adds a page to the cache.
+    clear()
+        Removes all pages from the cache.
+    get_stats()
+        Returns the cache statistics.
+    _evict()
+        Called when a page is removed from the cache.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Initializes the cache.
+
+        :param max_size: The maximum size of the cached pages in bytes.
+        :type max_size: int.
+        """
+
+        # The maximum size of the cached pages in bytes
+        self.max_size = max_size
+        # The cached pages. Each page is a tuple of value, size and render time
+        self.pages = OrderedDict()
+        # The total size of the cached pages in bytes
+        self.size = 0
+        # The number of cache hits
+        self.hits = 0
+        # The number of cache misses
+        self.misses = 0
+        # The render time saved by the cache hits in milliseconds
+        self.saved_time = 0
+        # The keys of the prefetched pages that have not been used
+        self.prefetched = set()
+        # The number of prefetched pages
+        self.prefetches = 0
+        # The number of prefetched pages that were used
+        self.prefetch_hits = 0
+
+    def contains(self, key: tuple) -> bool:
+        """Checks if the page for the given key is cached.
+
+        The cache statistics are not updated.
+
+        :param key: The page key.
+        :type key: tuple.
+        :return: True if the page is cached.
+        :rtype: bool.
+        """
+
+        return key in self.pages
+
+    def get(self, key: tuple) -> object:
+        """Returns the cached page for the given key.
+
+        :param key: The page key.
+        :type key: tuple.
+        :return: The cached page or None if the page is not cached.
+        :rtype: object.
+        """
+
+        # If the page is not cached
+        if key not in self.pages:
+            self.misses += 1
+            return None
+
+        # The page is marked as most recently used
+        self.pages.move_to_end(key)
+        # The cached page
+        value, size, render_time = self.pages[key]
+        # The cache statistics are updated
+        self.hits += 1
+        self.saved_time += render_time
+        # If the page was prefetched and is used for the first time
+        if key in self.prefetched:
+            self.prefetched.discard(key)
+            self.prefetch_hits += 1
+
+        return value
+
+    def put(self, key: tuple, value: object, size: int,
+            render_time: float, prefetch: bool = False) -> None:
+        """Adds a page to the cache.
+
+        The least recently used pages are removed if the cache is full.
+
+        :param key: The page key.
+        :type key: tuple.
+        :param value: The page.
+        :type value: object.
+        :param size: The size of the page in bytes.
+        :type size: int.
+        :param render_time: The time taken to render the page in milliseconds.
+        :type render_time: float.
+        :param prefetch: Indicates that the page was added before it is needed.
+        :type prefetch: bool.
+        """
+
+        # If the page is already cached
+        if key in self.pages:
+            # The old page is removed
+            old_value, old_size, old_time = self.pages.pop(key)
+            self.size -= old_size
+            # If the old page is not the new page
+            if old_value is not value:
+                self._evict(old_value)
+
+        # The page is added to the cache
+        self.pages[key] = (value, size, render_time)
+        self.size += size
+        # If the page is prefetched
+        if prefetch:
+            self.prefetched.add(key)
+            self.prefetches += 1
+        else:
+            self.prefetched.discard(key)
+        # The least recently used pages are removed until the cache fits
+        while self.size > self.max_size and len(self.pages) > 1:
+            old_key, (old_value, old_size, old_time) = self.pages.popitem(
+                last=False)
+            self.size -= old_size
+            self.prefetched.discard(old_key)
+            self._evict(old_value)
+
+    def clear(self) -> None:
+        """Removes all pages from the cache.
+        """
+
+        # Each cached page is removed
+        for value, size, render_time in self.pages.values():
+            self._evict(value)
+        self.pages.clear()
+        self.prefetched.clear()
+        self.size = 0
+
+    def get_stats(self) -> dict:
+        """Returns the cache statistics.
+
+        :return: The number of hits and misses, the hit ratio, the number of
+            cached pages, the size of the cached pages in bytes, the render
+            time saved in milliseconds, the number of prefetched pages, the
+            number of prefetched pages that were used and the prefetch hit
+            ratio.
+        :rtype: dict.
+        """
+
+        # The number of page requests
+        total = self.hits + self.misses
+        # The prefetch hit ratio
+        ratio = self.prefetch_hits / self.prefetches if self.prefetches else 0
+        # The cache statistics
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0,
+            "pages": len(self.pages),
+            "size": self.size,
+            "saved_time": round(self.saved_time, 3),
+            "prefetches": self.prefetches,
+            "prefetch_hits": self.prefetch_hits,
+            "prefetch_hit_ratio": ratio
+        }
+
+        return stats
+
+    def _evict(self, value: object) -> None:
+        """Called when a page is removed from the cache.
+
+        :param value: The removed page.
+        :type value: object.
+        """
+
+        pass
+
+class DocumentCache(PageCache):
+    """This class is used to cache the rendered html of a text box.
+
+    Each page is stored as a QTextDocument, so a cached page is shown by
+    setting the document of the text box. The html is not parsed again. The
+    size of a page is the size of its html text.
+
+    The Qt modules are imported when the class is used, so the PageCache
+    class can be used without loading Qt.
+
+    Methods
+    -------
+    show()
+        Shows the cached page for the given key in the text box.
+    render()
+        Renders the given html, caches it and shows it in the text box.
+    prepare()
+        Renders the given html and caches it without showing it.
+    _create_document()
+        Creates a document for the given html.
+    _set_document()
+        Sets the document of the text box.
+    _evict()
+        Deletes the document of the removed page.
+    """
+
+    def __init__(self, text_box: "QtWidgets.QTextEdit",
+                 max_size: int) -> None:
+        """Initializes the cache.
+
+        :param text_box: The text box that shows the pages.
+        :type text_box: QtWidgets.QTextEdit.
+        :param max_size: The maximum size of the cached pages in bytes.
+        :type max_size: int.
+        """
+
+        from PyQt5 import QtCore
+
+        super().__init__(max_size)
+        # The text box that shows the pages
+        self.text_box = text_box
+        # The parent of the cached documents
+        self.owner = QtCore.QObject()
+        # The removed document that is still shown in the text box
+        self.retired = None
+
+    def show(self, key: tuple) -> bool:
+        """Shows the cached page for the given key in the text box.
+
+        :param key: The page key.
+        :type key: tuple.
+        :return: True if the page was cached.
+        :rtype: bool.
+        """
+
+        # The cached document
+        document = self.get(key)
+        # If the page is cached
+        if document is not None:
+            # The document is shown
+            self._set_document(document)
+
+        return document is not None
+
+    def render(self, key: tuple, html: str) -> None:
+        """Renders the given html, caches it and shows it in the text box.
+
+        :param key: The page key.
+        :type key: tuple.
+        :param html: The page html.
+        :type html: str.
+        """
+
+        # The start time
+        start = time.perf_counter()
+        # The document is created
+        document = self._create_document(html)
+        # The document is shown
+        self._set_document(document)
+        # The render time in milliseconds
+        render_time = (time.perf_counter() - start) * 1000
+        # The document is cached. The html is stored as utf-16 by Qt
+        self.put(key, document, len(html) * 2, render_time)
+
+    def prepare(self, key: tuple, html: str) -> None:
+        """Renders the given html and caches it without showing it.
+
+        It is used to prefetch the pages that are likely to be shown next.
+
+        :param key: The page key.
+        :type key: tuple.
+        :param html: The page html.
+        :type html: str.
+        """
+
+        # The start time
+        start = time.perf_counter()
+        # The document is created
+        document = self._create_document(html)
+        # The render time in milliseconds
+        render_time = (time.perf_counter() - start) * 1000
+        # The document is cached as a prefetched page
+        self.put(key, document, len(html) * 2, render_time, True)
+
+    def _create_document(self, html: str) -> "QtGui.QTextDocument":
+        """Creates a document for the given html.
+
+        The current font of the text box is used as the document font.
+
+        :param html: The page html.
+        :type html: str.
+        :return: The document.
+        :rtype: QtGui.QTextDocument.
+        """
+
+        from PyQt5 import QtGui
+
+        # The document is created
+        document = QtGui.QTextDocument(self.owner)
+        document.setDefaultFont(self.text_box.font())
+        document.setHtml(html)
+
+        return document
+
+    def _set_document(self, document: "QtGui.QTextDocument") -> None:
+        """Sets the document of the text box.
+
+        If the previous document was removed from the cache while it was
+        shown, then it is deleted.
+
+        :param document: The document.
+        :type document: QtGui.QTextDocument.
+        """
+
+        # The document is set
+        self.text_box.setDocument(document)
+        # If a removed document was shown
+        if self.retired is not None and self.retired is not document:
+            # The removed document is deleted
+            self.retired.deleteLater()
+            self.retired = None
+
+    def _evict(self, document: "QtGui.QTextDocument") -> None:
+        """Deletes the document of the removed page.
+
+        The document is not deleted if it is shown in the text box. It is
+        deleted when another document is shown.
+
+        :param document: The document.
+        :type document: QtGui.QTextDocument.
+        """
+
+        # If the document is shown in the text box
+        if document is self.text_box.document():
+            self.retired = document
+        else:
+            document.deleteLater()
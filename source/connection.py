@@ -0,0 +1,273 @@
+import abc, itertools, threading, weakref
+from collections import OrderedDict
+
+# The connection profile settings that are applied as PRAGMAs, in the order
+# in which they are applied. query_only is applied last, since it prevents
+# changes to the journal mode
+PROFILE_PRAGMAS = (
+    "mmap_size", "cache_size", "temp_store", "journal_mode", "query_only"
+)
+
+class ApiError(Exception):
+    """This exception is raised for database errors.
+    """
+
+class PoolError(ApiError):
+    """This exception is raised if a database connection cannot be opened or
+    the connection limit is reached.
+    """
+
+class ConnectionManager(abc.ABC):
+    """This class is the base class for the connection managers of the
+    database backends. It manages the database connections of the Api objects.
+
+    Each Api object gets its own named connection, so several Api objects can
+    be used in the same process. A database connection can only be used in
+    the thread that opened it, so the connections are pooled per thread.
+    When an Api object is closed, its connection is kept open and is given
+    to the next Api object in the same thread that uses the same database
+    and connection profile. The connection profile is then not applied
+    again.
+
+    The connections are opened and closed by the connection manager of each
+    backend, which must implement the _open and _remove methods. The base
+    class does not depend on a database library and cannot be instantiated.
+
+    Methods
+    -------
+    __init__()
+        The class constructor.
+    acquire()
+        Returns an open connection for the given database and profile.
+    release()
+        Returns the given connection to the pool of the current thread.
+    close_thread()
+        Closes the idle connections of the current thread.
+    get_stats()
+        Returns the connection counters.
+    _open()
+        Opens a new connection with the given name.
+    _remove()
+        Closes and removes the given connection.
+    """
+
+    # The numbers used for the connection names. They are shared by all
+    # connection managers, since the Qt connection names are global
+    _numbers = itertools.count(1)
+    # The connection managers. They are used to close the idle connections
+    # of a thread
+    managers = weakref.WeakSet()
+
+    def __init__(self, max_connections: int = 8, max_idle: int = 2) -> None:
+        """Initializes the connection manager.
+
+        :param max_connections: The maximum number of open connections in all
+            threads.
+        :type max_connections: int.
+        :param max_idle: The maximum number of idle connections kept open in
+            each thread.
+        :type max_idle: int.
+        """
+
+        # The connection limits
+        self.max_connections = max_connections
+        self.max_idle = max_idle
+        # The lock used to access the pool from several threads
+        self.lock = threading.Lock()
+        # The pool key of each open connection, keyed by connection name
+        self.keys = {}
+        # The names of the idle connections, keyed by pool key. The least
+        # recently released connection is the first item
+        self.idle = OrderedDict()
+        # The number of connections opened so far
+        self.opened = 0
+        # The number of connections given out from the pool
+        self.reused = 0
+        # The connection manager is added to the list of managers
+        ConnectionManager.managers.add(self)
+
+    def acquire(self, db_path: str, profile: dict = None,
+                con_name: str = None) -> str:
+        """Returns an open connection for the given database and profile.
+
+        An idle connection of the current thread is used if possible.
+
+        :param db_path: The absolute path to the database.
+        :type db_path: str.
+        :param profile: The connection profile. The read_only key opens the
+            database read only. The other keys are applied as PRAGMAs.
+        :type profile: dict.
+        :param con_name: The name of the connection. If it is given, then a
+            new connection with this name is opened. It is not pooled.
+        :type con_name: str.
+        :return: The name of the connection.
+        :rtype: str.
+        :raises PoolError: If the connection cannot be opened, the given name
+            is in use or the connection limit is reached.
+        """
+
+        # The connection profile
+        profile = profile or {}
+        # The pool key. Connections are shared by Api objects in the same
+        # thread that use the same database and profile
+        key = (threading.get_ident(), db_path, tuple(sorted(profile.items())))
+
+        with self.lock:
+            # If an idle connection with the same key exists
+            if con_name is None and self.idle.get(key):
+                # The idle connection is reused
+                self.reused += 1
+                return self.idle[key].pop()
+            # If the given connection name is in use
+            if con_name is not None and con_name in self.keys:
+                raise PoolError("Connection %s is in use" % con_name)
+            # If the connection limit is reached
+            if len(self.keys) >= self.max_connections:
+                raise PoolError("Connection limit of %d reached" %
+                                self.max_connections)
+
+            self.opened += 1
+            # The connection name
+            name = con_name or "ic_connection_%d" % next(self._numbers)
+            # Pooled and named connections count towards the limit
+            self.keys[name] = key if con_name is None else None
+
+        try:
+            # The connection is opened
+            self._open(name, db_path, profile)
+        except PoolError:
+            with self.lock:
+                del self.keys[name]
+            raise
+
+        return name
+
+    def release(self, name: str) -> None:
+        """Returns the given connection to the pool of the current thread.
+
+        Named connections and connections above the idle limit are closed.
+        The Api object must not use the connection after it is released.
+
+        :param name: The connection name.
+        :type name: str.
+        """
+
+        with self.lock:
+            # The pool key of the connection
+            key = self.keys.get(name)
+            # The idle connections with the same key
+            idle = self.idle.setdefault(key, []) if key else None
+            # The number of idle connections of the current thread
+            idle_count = sum(
+                len(names) for k, names in self.idle.items()
+                if k[0] == threading.get_ident())
+            # If the connection can be kept open
+            if idle is not None and idle_count < self.max_idle:
+                idle.append(name)
+                return
+            # The connection no longer counts towards the limit
+            self.keys.pop(name, None)
+
+        # The connection is closed
+        self._remove(name)
+
+    def close_thread(self) -> None:
+        """Closes the idle connections of the current thread.
+
+        It should be called before a thread that used the Api objects ends.
+        """
+
+        # The names of the idle connections of the current thread
+        names = []
+        with self.lock:
+            for key in list(self.idle):
+                # If the connections were opened in the current thread
+                if key[0] == threading.get_ident():
+                    names.extend(self.idle.pop(key))
+            for name in names:
+                del self.keys[name]
+
+        # Each idle connection is closed
+        for name in names:
+            self._remove(name)
+
+    def get_stats(self) -> dict:
+        """Returns the connection counters.
+
+        :return: The number of open connections, idle connections, opened
+            connections and reused connections.
+        :rtype: dict.
+        """
+
+        with self.lock:
+            # The connection counters
+            stats = {
+                "open": len(self.keys),
+                "idle": sum(len(names) for names in self.idle.values()),
+                "opened": self.opened,
+                "reused": self.reused
+            }
+
+        return stats
+
+    @abc.abstractmethod
+    def _open(self, name: str, db_path: str, profile: dict) -> None:
+        """Opens a new connection with the given name.
+
+        It is implemented by the connection manager of each backend. The
+        PRAGMAs of the connection profile must be applied after the database
+        is opened.
+
+        :param name: The connection name.
+        :type name: str.
+        :param db_path: The absolute path to the database.
+        :type db_path: str.
+        :param profile: The connection profile.
+        :type profile: dict.
+        :raises PoolError: If the database cannot be opened or a PRAGMA
+            fails.
+        """
+
+    @abc.abstractmethod
+    def _remove(self, name: str) -> None:
+        """Closes and removes the given connection.
+
+        It is implemented by the connection manager of each backend.
+
+        :param name: The connection name.
+        :type name: str.
+        """
+
+def get_pragmas(profile: dict) -> list:
+    """Returns the PRAGMA queries of the given connection profile.
+
+    :param profile: The connection profile.
+    :type profile: dict.
+    :return: The PRAGMA queries in the order in which they are run.
+    :rtype: list.
+    """
+
+    # The PRAGMA queries
+    pragmas = []
+    # Each PRAGMA in the connection profile is added
+    for pragma in PROFILE_PRAGMAS:
+        # If the PRAGMA is not in the profile
+        if pragma not in profile:
+            continue
+        # The PRAGMA value. Boolean values are given as numbers
+        value = profile[pragma]
+        if isinstance(value, bool):
+            value = int(value)
+        pragmas.append("PRAGMA %s = %s" % (pragma, value))
+
+    return pragmas
+
+def close_thread_connections() -> None:
+    """Closes the idle connections of the current thread in all connection
+    managers.
+
+    It should be called before a thread that used the Api objects ends.
+    """
+
+    for manager in list(ConnectionManager.managers):
+        manager.close_thread()
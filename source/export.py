@@ -0,0 +1,549 @@
+"""Translation Exporter
+
+This script exports whole quran translations and hadith collections to
+files. The rows are streamed from the database and written one at a time, so
+the memory used does not depend on the size of the translation. Each
+language is exported to its own file. Several languages are exported at the
+same time by a pool of worker processes. The number of rows, the time taken
+and the rows per second are printed for each language.
+
+It can be run using the command: python -m source.export quran --format jsonl
+The hadith collections can be exported using the command: python -m
+source.export hadith. The languages to export may be given with the --lang
+option. By default all languages are exported. The supported formats are
+jsonl, csv, html and epub. The files are written to the folder given by the
+--out option. The number of worker processes is set by the --workers option.
+"""
+
+import argparse, csv, html, json, multiprocessing, os, re, time, zipfile
+
+from source.hapi import HadithApi
+from source.hconfig import HConfig
+from source.qapi import QuranApi
+from source.qconfig import QConfig
+
+# The languages of the hadith data
+HADITH_LANGS = ["Urdu", "English", "Arabic"]
+# The hadith languages that are written right to left
+HADITH_RTL_LANGS = ["Urdu", "Arabic"]
+# The BCP 47 language tag of each language. The language names are the names
+# used in the quran and hadith databases
+LANG_CODES = {
+    "Albanian": "sq", "Amharic": "am", "Arabic": "ar", "Azerbaijani": "az",
+    "Bengali": "bn", "Bosnian": "bs", "Bulgarian": "bg", "Chinese": "zh",
+    "Czech": "cs", "Divehi": "dv", "Dutch": "nl", "English": "en",
+    "Finnish": "fi", "French": "fr", "German": "de", "Hausa": "ha",
+    "Hindi": "hi", "Indonesian": "id", "Italian": "it", "Japanese": "ja",
+    "Korean": "ko", "Kurdish": "ku", "Malay": "ms", "Malayalam": "ml",
+    "Norwegian": "no", "Pashto": "ps", "Persian": "fa", "Polish": "pl",
+    "Portuguese": "pt", "Romanian": "ro", "Russian": "ru", "Sindhi": "sd",
+    "Somali": "so", "Spanish": "es", "Swahili": "sw", "Swedish": "sv",
+    "Tajik": "tg", "Tamil": "ta", "Tatar": "tt", "Thai": "th",
+    "Turkish": "tr", "Urdu": "ur", "Uyghur": "ug", "Uzbek": "uz"
+}
+# The style of the html and epub files
+STYLE = ("body { line-height: 1.8; margin: 2em; }\n"
+         ".ref, .title { color: green; font-weight: bold; }\n")
+
+def get_lang_code(lang: str) -> str:
+    """Returns the BCP 47 language tag of the given language.
+
+    :param lang: The language name.
+    :type lang: str.
+    :return: The language tag. It is "und" if the language is not known.
+    :rtype: str.
+    """
+
+    return LANG_CODES.get(lang, "und")
+
+def get_ayat_chapter(row) -> str:
+    """Returns the chapter title of the given ayat.
+
+    :param row: The ayat.
+    :type row: AyatRecord.
+    :return: The sura number and name.
+    :rtype: str.
+    """
+
+    return "%d. %s" % (row.sura, row.sura_name)
+
+def get_ayat_html(row) -> str:
+    """Returns the html of the given ayat.
+
+    :param row: The ayat.
+    :type row: AyatRecord.
+    :return: The ayat text followed by the ayat reference.
+    :rtype: str.
+    """
+
+    return "<p>%s <span class=\"ref\">(%d:%d)</span></p>\n" % (
+        html.escape(row.text), row.sura, row.ayat)
+
+def get_hadith_chapter(row) -> str:
+    """Returns the chapter title of the given hadith.
+
+    :param row: The hadith.
+    :type row: HadithRecord.
+    :return: The hadith source and book.
+    :rtype: str.
+    """
+
+    return row.source + " - " + row.book
+
+def get_hadith_html(row) -> str:
+    """Returns the html of the given hadith.
+
+    :param row: The hadith.
+    :type row: HadithRecord.
+    :return: The hadith title followed by the hadith text.
+    :rtype: str.
+    """
+
+    return "<p class=\"title\">%s</p>\n<p>%s</p>\n" % (
+        html.escape(row.title), html.escape(row.text))
+
+# The chapter and html functions of each reader
+READERS = {
+    "quran": (get_ayat_chapter, get_ayat_html),
+    "hadith": (get_hadith_chapter, get_hadith_html)
+}
+
+def get_page(title: str, lang: str, rtl: bool, body: str = "") -> tuple:
+    """Returns the start and end of an xhtml page.
+
+    :param title: The page title.
+    :type title: str.
+    :param lang: The language of the page. Its language tag is set on the
+        html element.
+    :type lang: str.
+    :param rtl: Indicates if the language is written right to left.
+    :type rtl: bool.
+    :param body: The start of the page body.
+    :type body: str.
+    :return: The page before and after the rows.
+    :rtype: tuple.
+    """
+
+    # The language tag of the page
+    code = get_lang_code(lang)
+    # The start of the page
+    start = "<?xml version=\"1.0\" encoding=\"utf-8\"?>\n<!DOCTYPE html>\n"
+    start += "<html xmlns=\"http://www.w3.org/1999/xhtml\""
+    start += " xmlns:epub=\"http://www.idpf.org/2007/ops\""
+    start += " lang=\"%s\" xml:lang=\"%s\"" % (code, code)
+    start += " dir=\"%s\">\n<head>\n<meta charset=\"utf-8\"/>\n" % (
+        "rtl" if rtl else "ltr")
+    start += "<title>%s</title>\n<style>%s</style>\n</head>\n<body>\n" % (
+        html.escape(title), STYLE)
+    start += body
+
+    return (start, "</body>\n</html>\n")
+
+def write_jsonl(rows, path: str, reader: str, title: str, lang: str,
+                rtl: bool) -> int:
+    """Writes the given rows to a json lines file.
+
+    Each row is written as a json object on its own line.
+
+    :param rows: The rows to write.
+    :type rows: Iterator[NamedTuple].
+    :param path: The path of the file.
+    :type path: str.
+    :param reader: The reader of the rows. It is "quran" or "hadith".
+    :type reader: str.
+    :param title: The title of the export.
+    :type title: str.
+    :param lang: The language of the rows.
+    :type lang: str.
+    :param rtl: Indicates if the language is written right to left.
+    :type rtl: bool.
+    :return: The number of rows written.
+    :rtype: int.
+    """
+
+    # The number of rows written
+    count = 0
+    with open(path, "w", encoding="utf-8") as out_file:
+        for row in rows:
+            out_file.write(json.dumps(row._asdict(), ensure_ascii=False))
+            out_file.write("\n")
+            count += 1
+
+    return count
+
+def write_csv(rows, path: str, reader: str, title: str, lang: str,
+              rtl: bool) -> int:
+    """Writes the given rows to a csv file.
+
+    The first line contains the field names.
+
+    :param rows: The rows to write.
+    :type rows: Iterator[NamedTuple].
+    :param path: The path of the file.
+    :type path: str.
+    :param reader: The reader of the rows. It is "quran" or "hadith".
+    :type reader: str.
+    :param title: The title of the export.
+    :type title: str.
+    :param lang: The language of the rows.
+    :type lang: str.
+    :param rtl: Indicates if the language is written right to left.
+    :type rtl: bool.
+    :return: The number of rows written.
+    :rtype: int.
+    """
+
+    # The number of rows written
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as out_file:
+        writer = csv.writer(out_file)
+        for row in rows:
+            # The field names are written before the first row
+            if count == 0:
+                writer.writerow(row._fields)
+            writer.writerow(row)
+            count += 1
+
+    return count
+
+def write_html(rows, path: str, reader: str, title: str, lang: str,
+               rtl: bool) -> int:
+    """Writes the given rows to a single html file.
+
+    A heading is written at the start of each sura or hadith book. The text
+    is escaped, so it is shown as plain text.
+
+    :param rows: The rows to write.
+    :type rows: Iterator[NamedTuple].
+    :param path: The path of the file.
+    :type path: str.
+    :param reader: The reader of the rows. It is "quran" or "hadith".
+    :type reader: str.
+    :param title: The title of the export.
+    :type title: str.
+    :param lang: The language of the rows.
+    :type lang: str.
+    :param rtl: Indicates if the language is written right to left.
+    :type rtl: bool.
+    :return: The number of rows written.
+    :rtype: int.
+    """
+
+    # The chapter and html functions of the reader
+    get_chapter, get_html = READERS[reader]
+    # The start and end of the page
+    start, end = get_page(title, lang, rtl,
+                          "<h1>%s</h1>\n" % html.escape(title))
+    # The number of rows written
+    count = 0
+    # The current chapter
+    chapter = None
+    with open(path, "w", encoding="utf-8") as out_file:
+        out_file.write(start)
+        for row in rows:
+            # If a new chapter starts
+            if get_chapter(row) != chapter:
+                chapter = get_chapter(row)
+                out_file.write("<h2>%s</h2>\n" % html.escape(chapter))
+            out_file.write(get_html(row))
+            count += 1
+        out_file.write(end)
+
+    return count
+
+def write_epub(rows, path: str, reader: str, title: str, lang: str,
+               rtl: bool) -> int:
+    """Writes the given rows to an epub book.
+
+    Each sura or hadith book is written to its own chapter file in the epub
+    archive. The chapter files are written while the rows are read. The
+    table of contents and package files are written at the end.
+
+    :param rows: The rows to write.
+    :type rows: Iterator[NamedTuple].
+    :param path: The path of the file.
+    :type path: str.
+    :param reader: The reader of the rows. It is "quran" or "hadith".
+    :type reader: str.
+    :param title: The title of the export.
+    :type title: str.
+    :param lang: The language of the rows.
+    :type lang: str.
+    :param rtl: Indicates if the language is written right to left.
+    :type rtl: bool.
+    :return: The number of rows written.
+    :rtype: int.
+    """
+
+    # The chapter and html functions of the reader
+    get_chapter, get_html = READERS[reader]
+    # The number of rows written
+    count = 0
+    # The titles of the chapters
+    chapters = []
+    # The open chapter file
+    chapter_file = None
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as book:
+        # The mimetype must be the first file and it is not compressed
+        book.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip")
+        book.writestr("META-INF/container.xml", (
+            "<?xml version=\"1.0\"?>\n<container version=\"1.0\" "
+            "xmlns=\"urn:oasis:names:tc:opendocument:xmlns:container\">\n"
+            "<rootfiles><rootfile full-path=\"OEBPS/content.opf\" "
+            "media-type=\"application/oebps-package+xml\"/></rootfiles>\n"
+            "</container>\n"))
+
+        for row in rows:
+            # If a new chapter starts
+            if len(chapters) == 0 or get_chapter(row) != chapters[-1]:
+                # The previous chapter file is closed
+                if chapter_file is not None:
+                    chapter_file.write(end.encode("utf-8"))
+                    chapter_file.close()
+                chapters.append(get_chapter(row))
+                # The start and end of the chapter page
+                start, end = get_page(
+                    chapters[-1], lang, rtl,
+                    "<h2>%s</h2>\n" % html.escape(chapters[-1]))
+                # The chapter file is compressed
+                info = zipfile.ZipInfo(
+                    "OEBPS/chapter%d.xhtml" % len(chapters),
+                    time.localtime()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                chapter_file = book.open(info, "w")
+                chapter_file.write(start.encode("utf-8"))
+            chapter_file.write(get_html(row).encode("utf-8"))
+            count += 1
+        # The last chapter file is closed
+        if chapter_file is not None:
+            chapter_file.write(end.encode("utf-8"))
+            chapter_file.close()
+
+        # The table of contents
+        start, end = get_page(title, lang, rtl)
+        nav = start + "<nav epub:type=\"toc\">\n<h1>%s</h1>\n<ol>\n" % (
+            html.escape(title))
+        for i, chapter in enumerate(chapters, 1):
+            nav += "<li><a href=\"chapter%d.xhtml\">%s</a></li>\n" % (
+                i, html.escape(chapter))
+        book.writestr("OEBPS/nav.xhtml", nav + "</ol>\n</nav>\n" + end)
+
+        # The package file
+        opf = "<?xml version=\"1.0\" encoding=\"utf-8\"?>\n"
+        opf += "<package xmlns=\"http://www.idpf.org/2007/opf\" "
+        opf += "version=\"3.0\" unique-identifier=\"id\">\n"
+        opf += "<metadata xmlns:dc=\"http://purl.org/dc/elements/1.1/\">\n"
+        opf += "<dc:identifier id=\"id\">islamcompanion-%s" % (
+            re.sub(r"\W+", "-", title.lower()))
+        opf += "</dc:identifier>\n"
+        opf += "<dc:title>%s</dc:title>\n" % html.escape(title)
+        opf += "<dc:language>%s</dc:language>\n" % get_lang_code(lang)
+        opf += "<meta property=\"dcterms:modified\">%s</meta>\n" % (
+            time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+        opf += "</metadata>\n<manifest>\n"
+        opf += "<item id=\"nav\" href=\"nav.xhtml\" properties=\"nav\" "
+        opf += "media-type=\"application/xhtml+xml\"/>\n"
+        for i in range(1, len(chapters) + 1):
+            opf += "<item id=\"c%d\" href=\"chapter%d.xhtml\" " % (i, i)
+            opf += "media-type=\"application/xhtml+xml\"/>\n"
+        opf += "</manifest>\n<spine page-progression-direction=\"%s\">\n" % (
+            "rtl" if rtl else "ltr")
+        for i in range(1, len(chapters) + 1):
+            opf += "<itemref idref=\"c%d\"/>\n" % i
+        opf += "</spine>\n</package>\n"
+        book.writestr("OEBPS/content.opf", opf)
+
+    return count
+
+# The writer function of each format
+WRITERS = {
+    "jsonl": write_jsonl,
+    "csv": write_csv,
+    "html": write_html,
+    "epub": write_epub
+}
+
+def get_file_name(reader: str, lang: str, fmt: str) -> str:
+    """Returns the name of the export file for the given language.
+
+    :param reader: The reader. It is "quran" or "hadith".
+    :type reader: str.
+    :param lang: The language.
+    :type lang: str.
+    :param fmt: The export format.
+    :type fmt: str.
+    :return: The file name.
+    :rtype: str.
+    """
+
+    return "%s-%s.%s" % (reader, re.sub(r"\W+", "_", lang.lower()), fmt)
+
+def export_language(reader: str, db_path: str, lang: str, fmt: str,
+                    out_dir: str, backend: str = "sqlite") -> dict:
+    """Exports the rows of the given language to a file.
+
+    It is called in the worker processes, so it opens its own database
+    connection.
+
+    :param reader: The reader. It is "quran" or "hadith".
+    :type reader: str.
+    :param db_path: The path of the database.
+    :type db_path: str.
+    :param lang: The language.
+    :type lang: str.
+    :param fmt: The export format.
+    :type fmt: str.
+    :param out_dir: The folder in which the file is written.
+    :type out_dir: str.
+    :param backend: The database backend.
+    :type backend: str.
+    :return: The language, file path, number of rows and time taken.
+    :rtype: dict.
+    """
+
+    # The start time
+    start = time.perf_counter()
+    # The databases are only read
+    profile = {"read_only": True, "query_only": True}
+    # If the quran translation is exported
+    if reader == "quran":
+        api = QuranApi(db_path, lang, profile=profile, backend=backend)
+        # The rows and text direction of the translation
+        rows = api.iter_ayat_text(lang)
+        rtl = api.is_rtl(lang)
+        title = "The Holy Quran - " + lang
+    else:
+        api = HadithApi(db_path, lang, profile=profile, backend=backend)
+        # The rows and text direction of the hadith
+        rows = api.iter_hadith()
+        rtl = lang in HADITH_RTL_LANGS
+        title = "Hadith - " + lang
+
+    # The path of the export file
+    path = os.path.join(out_dir, get_file_name(reader, lang, fmt))
+    # The rows are written
+    count = WRITERS[fmt](rows, path, reader, title, lang, rtl)
+    api.close()
+
+    # The export statistics
+    stats = {
+        "lang": lang,
+        "path": path,
+        "rows": count,
+        "time": time.perf_counter() - start
+    }
+
+    return stats
+
+def _export_task(args: tuple) -> dict:
+    """Exports a language in a worker process.
+
+    :param args: The arguments of export_language.
+    :type args: tuple.
+    :return: The export statistics.
+    :rtype: dict.
+    """
+
+    return export_language(*args)
+
+def export_languages(reader: str, db_path: str, langs: list, fmt: str,
+                     out_dir: str, workers: int = 4,
+                     backend: str = "sqlite"):
+    """Exports the given languages and yields the statistics of each one.
+
+    The languages are exported by a pool of worker processes. The worker
+    processes are started with the spawn method, so they do not share the
+    database connections of this process.
+
+    :param reader: The reader. It is "quran" or "hadith".
+    :type reader: str.
+    :param db_path: The path of the database.
+    :type db_path: str.
+    :param langs: The languages to export.
+    :type langs: list.
+    :param fmt: The export format.
+    :type fmt: str.
+    :param out_dir: The folder in which the files are written.
+    :type out_dir: str.
+    :param workers: The number of worker processes. If it is 1, then the
+        languages are exported in this process.
+    :type workers: int.
+    :param backend: The database backend.
+    :type backend: str.
+    :return: The statistics of each language, as each export finishes.
+    :rtype: Iterator[dict].
+    """
+
+    os.makedirs(out_dir, exist_ok=True)
+    # The arguments of each export
+    tasks = [(reader, db_path, lang, fmt, out_dir, backend)
+             for lang in langs]
+    # If the languages are exported in this process
+    if workers <= 1:
+        for task in tasks:
+            yield _export_task(task)
+        return
+
+    # The pool of worker processes
+    pool = multiprocessing.get_context("spawn").Pool(
+        min(workers, len(tasks)))
+    try:
+        # The statistics are yielded as each export finishes
+        for stats in pool.imap_unordered(_export_task, tasks):
+            yield stats
+    finally:
+        pool.terminate()
+
+if __name__ == "__main__":
+    # The command line arguments
+    parser = argparse.ArgumentParser(
+        description="Exports quran translations and hadith collections.")
+    parser.add_argument("reader", choices=["quran", "hadith"],
+                        help="The reader whose data is exported.")
+    parser.add_argument("--format", choices=sorted(WRITERS),
+                        default="jsonl", help="The export format.")
+    parser.add_argument("--lang", action="append", default=[],
+                        help="A language to export. May be repeated.")
+    parser.add_argument("--out", default="export",
+                        help="The folder in which the files are written.")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="The number of worker processes.")
+    parser.add_argument("--db", help="The path of the database. The path in "
+                        "the reader configuration is used by default.")
+    parser.add_argument("--backend", choices=["qtsql", "sqlite"],
+                        default="sqlite", help="The database backend.")
+    args = parser.parse_args()
+
+    # If the quran data is exported
+    if args.reader == "quran":
+        config = QConfig().get_config()
+        db_path = args.db or config["db_path"]
+        # If no languages are given, then all languages are exported
+        if len(args.lang) == 0:
+            api = QuranApi(db_path, config["default_lang"],
+                           profile=config["db_profile"],
+                           backend=args.backend)
+            args.lang = api.get_lang_list()
+            api.close()
+    else:
+        db_path = args.db or HConfig().get_config()["db_path"]
+        # If no languages are given, then all languages are exported
+        if len(args.lang) == 0:
+            args.lang = HADITH_LANGS
+
+    # The start time
+    start = time.perf_counter()
+    # The total number of rows
+    total = 0
+    # Each language is exported
+    for stats in export_languages(args.reader, db_path, args.lang,
+                                  args.format, args.out, args.workers,
+                                  args.backend):
+        total += stats["rows"]
+        print("%s: %d rows in %.2f s, %.0f rows/s, %s" % (
+            stats["lang"], stats["rows"], stats["time"],
+            stats["rows"] / max(stats["time"], 1e-9), stats["path"]))
+    # The total time
+    total_time = time.perf_counter() - start
+    print("Total: %d rows in %.2f s, %.0f rows/s" % (
+        total, total_time, total / max(total_time, 1e-9)))
@@ -0,0 +1,234 @@
+import os, re, struct
+
+from PyQt5 import QtGui
+
+# The font file extensions
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+# The ids of the family names in the font name table. The id 16 is the
+# typographic family name, which is used by fonts with many styles
+FAMILY_NAME_IDS = (1, 16)
+
+class FontRegistry():
+    """This class is used to load custom fonts only when they are needed.
+
+    The font families in the fonts folder are read from the name table of
+    each font file. The folder is scanned the first time a font is needed.
+    A font file is added to the Qt font database the first time its font
+    family is loaded. All the font files of a family, such as the bold and
+    italic styles, are added together. The result is saved, so each font file
+    is added only once.
+
+    Methods
+    -------
+    load_font()
+        Adds the font files of the given font family to the font database.
+    get_font_map()
+        Returns the font files in the fonts folder keyed by font family.
+    get_stats()
+        Returns the number of font files and the number of loaded fonts.
+    _get_family_key()
+        Returns the key used to find the font file of a font family.
+    _scan_font_dir()
+        Reads the font families of each font file in the fonts folder.
+    _read_family_names()
+        Reads the font family names from the given font file.
+    """
+
+    def __init__(self, font_dir: str) -> None:
+        """Initializes the font registry.
+
+        :param font_dir: The fonts folder.
+        :type font_dir: str.
+        """
+
+        # The fonts folder
+        self.font_dir = font_dir
+        # The font files keyed by font family. It is loaded on first use
+        self.font_map = None
+        # The font database ids of the loaded fonts keyed by font family
+        self.loaded = {}
+
+    def load_font(self, family: str) -> bool:
+        """Adds the font files of the given font family to the font database.
+
+        The font family may include the foundry name in square brackets, for
+        example "Nafees [PYRS]". If there is no font file for the family,
+        then the font is assumed to be a system font.
+
+        :param family: The font family.
+        :type family: str.
+        :return: True if a font file was added to the font database.
+        :rtype: bool.
+        """
+
+        # The key used to find the font files
+        key = self._get_family_key(family)
+        # If the font family has not been loaded before
+        if key not in self.loaded:
+            # The font database ids of the font files
+            self.loaded[key] = []
+            # Each font file of the font family is added to the font database
+            for file_path in self.get_font_map().get(key, []):
+                # The font is added to the font database
+                font_id = QtGui.QFontDatabase.addApplicationFont(file_path)
+                # If the font was added
+                if font_id != -1:
+                    self.loaded[key].append(font_id)
+
+        return len(self.loaded[key]) > 0
+
+    def get_font_map(self) -> dict:
+        """Returns the font files in the fonts folder keyed by font family.
+
+        :return: The list of font file paths for each font family.
+        :rtype: dict.
+        """
+
+        # If the fonts folder has not been scanned
+        if self.font_map is None:
+            # The fonts folder is scanned
+            self.font_map = self._scan_font_dir()
+
+        return self.font_map
+
+    def get_stats(self) -> dict:
+        """Returns the number of font files and the number of loaded fonts.
+
+        :return: The number of font families with a font file and the number
+            of fonts added to the font database.
+        :rtype: dict.
+        """
+
+        # The number of fonts that were added to the font database
+        loaded = sum([len(ids) for ids in self.loaded.values()])
+        # The font statistics
+        stats = {
+            "families": len(self.font_map) if self.font_map else 0,
+            "loaded": loaded
+        }
+
+        return stats
+
+    def _get_family_key(self, family: str) -> str:
+        """Returns the key used to find the font file of a font family.
+
+        The foundry name in square brackets is removed and the family name is
+        converted to lower case.
+
+        :param family: The font family.
+        :type family: str.
+        :return: The font family key.
+        :rtype: str.
+        """
+
+        return re.sub(r"\s*\[[^\]]*\]$", "", family).strip().lower()
+
+    def _scan_font_dir(self) -> dict:
+        """Reads the font families of each font file in the fonts folder.
+
+        Only the name table of each font file is read. The files that are not
+        valid font files are ignored.
+
+        :return: The list of font file paths for each font family.
+        :rtype: dict.
+        """
+
+        # The font files keyed by font family
+        font_map = {}
+        try:
+            # The files in the fonts folder
+            file_list = sorted(os.listdir(self.font_dir))
+        except OSError:
+            print("Font files could not be loaded !")
+            return font_map
+
+        # Each font file in the fonts folder is checked
+        for file in file_list:
+            # If the file is not a font file
+            if not file.lower().endswith(FONT_EXTENSIONS):
+                continue
+            # The font file path
+            file_path = os.path.join(self.font_dir, file)
+            try:
+                # The family names in the font file
+                families = self._read_family_names(file_path)
+            except (OSError, struct.error, UnicodeDecodeError):
+                continue
+            # The font file is added to the files of each family name
+            for family in families:
+                key = self._get_family_key(family)
+                font_map.setdefault(key, []).append(file_path)
+
+        return font_map
+
+    def _read_family_names(self, file_path: str) -> set:
+        """Reads the font family names from the given font file.
+
+        It supports TrueType and OpenType font files and font collections.
+
+        :param file_path: The font file path.
+        :type file_path: str.
+        :return: The font family names.
+        :rtype: set.
+        """
+
+        # The font family names
+        families = set()
+        with open(file_path, "rb") as fh:
+            # The font file tag
+            tag = fh.read(4)
+            # If the file is a font collection
+            if tag == b"ttcf":
+                # The number of fonts in the collection
+                fh.seek(8)
+                count = struct.unpack(">L", fh.read(4))[0]
+                # The offset of each font in the collection
+                offsets = struct.unpack(">%dL" % count, fh.read(4 * count))
+            else:
+                offsets = (0,)
+
+            # The name table of each font is read
+            for offset in offsets:
+                # The number of tables in the font
+                fh.seek(offset + 4)
+                num_tables = struct.unpack(">H", fh.read(2))[0]
+                # The table records
+                fh.seek(offset + 12)
+                records = fh.read(16 * num_tables)
+                # The offset of the name table
+                name_offset = None
+                # Each table record is checked
+                for i in range(num_tables):
+                    # If the table is the name table
+                    if records[i*16:i*16 + 4] == b"name":
+                        name_offset = struct.unpack(
+                            ">L", records[i*16 + 8:i*16 + 12])[0]
+                        break
+                # If the font does not have a name table
+                if name_offset is None:
+                    continue
+
+                # The name table header
+                fh.seek(name_offset)
+                fmt, count, str_offset = struct.unpack(">HHH", fh.read(6))
+                # The name records
+                names = fh.read(12 * count)
+                # Each name record is checked
+                for i in range(count):
+                    # The name record fields
+                    platform, encoding, lang, name_id, length, pos = (
+                        struct.unpack(">HHHHHH", names[i*12:i*12 + 12]))
+                    # If the name is not a family name
+                    if name_id not in FAMILY_NAME_IDS:
+                        continue
+                    # The name is read
+                    fh.seek(name_offset + str_offset + pos)
+                    data = fh.read(length)
+                    # Mac names use a single byte encoding
+                    if platform == 1:
+                        families.add(data.decode("latin-1"))
+                    # Unicode and Windows names use utf-16
+                    elif platform in (0, 3):
+                        families.add(data.decode("utf-16-be"))
+
+        return families
@@ -13,14 +13,18 @@ The script then further customizes the QMainWindow instance
 by loading Hadith data
 
 Finally the script runs the applications by calling the exec_ method
+
+Database errors that are not handled are shown in a message box.
 """
 
 import sys
 from source.hreader import Ui_MainWindow
 from source.hmanager import Ui_Manager
+from source.worker import excepthook
 from PyQt5 import QtWidgets
 
 if __name__ == "__main__":    
+    sys.excepthook = excepthook
     app        = QtWidgets.QApplication(sys.argv)
     MainWindow = QtWidgets.QMainWindow()
     ui         = Ui_MainWindow()
@@ -1,6 +1,26 @@
-import os, sys
+import os, sys, time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import NamedTuple
 
 from source.api import Api
+from source.search import SearchIndexError, normalize, to_match_query
+
+class HadithRecord(NamedTuple):
+    """A hadith of a hadith collection, as streamed by iter_hadith.
+    """
+
+    # The hadith id
+    id: int
+    # The hadith source
+    source: str
+    # The hadith book
+    book: str
+    # The hadith title
+    title: str
+    # The hadith text
+    text: str
 
 class HadithApi(Api):
     """
@@ -10,6 +30,8 @@ class HadithApi(Api):
     -------
     set_lang()
         Sets the language and db tables for the hadith text.
+    get_lang_list()
+        Returns the list of all supported languages.
     get_source_list()
         Fetches list of all hadith sources from database.
     get_book_list()
@@ -18,15 +40,53 @@ class HadithApi(Api):
     get_title_list()
         Fetches list of all hadith books and titles for given
         source from database.
+    get_title_ids()
+        Returns the ids of the hadith in the given book.
+    get_title_range()
+        Returns the titles of the hadith in the given range of ids.
     get_hadith_text()
         Fetches the hadith text for the given source and book.
-    update_settings()
-        Updates the current settings in database.
+    get_hadith_ids()
+        Returns the ids of all hadith of the current language.
+    get_random_hadith()
+        Returns the id, book and source of a random hadith.
+    iter_hadith()
+        Yields each hadith of the current language in order.
+    get_settings()
+        Reads the settings saved in the database by older versions.
     get_row()
         Gets the field values for the given row.
+    get_cache_stats()
+        Returns the hit and miss counters of the book cache.
+    search()
+        Searches the hadith titles and text of the current language.
+    get_search_count()
+        Returns the number of hadith that match the given search text.
+    has_search_index()
+        Checks if the search index for the current language is complete.
+    build_search_index()
+        Builds the search index for the current language in batches.
+    _get_search_state()
+        Returns the id of the last hadith added to the search index.
+    _load_book()
+        Fetches the titles and text of all hadith in the given book.
+    _prefetch_next_book()
+        Fetches the first hadith of the book after the given book.
+    _add_book()
+        Adds the given book to the book cache.
+    _has_snapshot()
+        Checks if the snapshot contains the meta data of the current language.
+    _get_snapshot_titles()
+        Returns the position of the first and last title of the given book
+        in the snapshot.
+    _get_snapshot_book()
+        Returns the titles and next book of the given book from the snapshot.
     """
     
-    def __init__(self, db_path: str, default_lang: str) -> None:
+    def __init__(self, db_path: str, default_lang: str,
+                 book_cache_size: int = 3, prefetch_count: int = 20,
+                 con_name: str = None, profile: dict = None,
+                 backend: str = "qtsql", snapshot_path: str = None) -> None:
         """It creates a connection to the SQLite3 database and sets the default
         language.
  
@@ -34,12 +94,47 @@ class HadithApi(Api):
         :type db_path: str.
         :param default_lang: The default language.
         :type default_lang: str.
+        :param book_cache_size: The maximum number of books in the book cache.
+        :type book_cache_size: int.
+        :param prefetch_count: The number of hadith prefetched from the next
+            book.
+        :type prefetch_count: int.
+        :param con_name: The name of the database connection. If it is not
+            given, then a pooled connection of the current thread is used.
+        :type con_name: str.
+        :param profile: The connection profile. If the database is opened
+            read only, then the search index is not updated on demand.
+        :type profile: dict.
+        :param backend: The database backend. It can be "qtsql" or "sqlite".
+        :type backend: str.
+        :param snapshot_path: The path of the meta data snapshot. If it
+            matches the database, then the sources, books and hadith titles
+            are read from it.
+        :type snapshot_path: str.
         """
 
+        # The cached books, keyed by book id. Each book contains the title
+        # list and the hadith text keyed by hadith id. The least recently
+        # used book is the first item
+        self.book_cache = OrderedDict()
+        # The maximum number of books in the book cache
+        self.book_cache_size = book_cache_size
+        # The number of hadith prefetched from the next book
+        self.prefetch_count = prefetch_count
+        # The number of hadith text served from the book cache
+        self.text_hits = 0
+        # The number of hadith text fetched from database
+        self.text_misses = 0
+        # The position of each book in the snapshot, keyed by language and
+        # book id
+        self.snapshot_books = {}
+        # The ids of all hadith, keyed by language
+        self.hadith_ids = {}
         # The default language is set
         self.set_lang(default_lang)
         # The parent class constructor is called
-        super().__init__(db_path)        
+        super().__init__(db_path, con_name=con_name, profile=profile,
+                         backend=backend, snapshot_path=snapshot_path)
 
     def set_lang(self, lang: str) -> None:
         """It sets the language and db tables for the hadith text.
@@ -48,6 +143,11 @@ class HadithApi(Api):
         :type lang: str.
         """
         
+        # If the language has changed
+        if lang != getattr(self, "lang", None):
+            # The cached books are in the previous language, so they are
+            # removed
+            self.book_cache.clear()
         # The language for the ayat text is set
         self.lang = lang    
         
@@ -69,50 +169,82 @@ class HadithApi(Api):
             self.tbl_text = "ic_hadith_arabic"
             # The db table for hadith books is set
             self.tbl_books = "ic_hadith_books_arabic"
+        # The db table for the hadith search index is set
+        self.tbl_fts = self.tbl_text + "_fts"
+
+    def get_lang_list(self) -> list:
+        """Returns the list of all supported languages.
+
+        :return: The languages of the hadith text tables.
+        :rtype: list.
+        """
+
+        return ["Urdu", "English", "Arabic"]
                             
     def get_source_list(self) -> list:
         """It fetches and returns list of all hadith sources from database.
+
+        The sources are read from the meta data snapshot if it is loaded.
         
         :return: The list of hadith sources.
         :rtype: list.
         """
+
+        # If the snapshot contains the sources of the current language
+        if self._has_snapshot():
+            return self.snapshot.get_strings(self.lang + ".sources")
         
-        # The required source list
-        source_list = []        
         # The sql query
         sql         = "SELECT DISTINCT source FROM " + self.tbl_books
-        # The hadith source data is fetched
-        rows        = self._fetch_data(sql, [], 1)
-        # Each row is checked
-        for row in rows:
-            source_list.append(row[0])
+        # The hadith sources are fetched as a flat list
+        source_list = self._fetch_column(sql, [])
 
         return source_list
         
     def get_book_list(self, source: str) -> list:
         """It fetches and returns list of all hadith books in the given source.
+
+        The books are read from the meta data snapshot if it is loaded.
         
         :param source: The hadith source.
         :type lang: str.
         :return: The list of hadith books.
         :rtype: list.
         """
+
+        # If the snapshot contains the books of the current language
+        if self._has_snapshot():
+            # The position of the source
+            sources = self.snapshot.get_strings(self.lang + ".sources")
+            if source not in sources:
+                return []
+            pos = sources.index(source)
+            # The position of the first and last book of the source
+            offsets = self.snapshot.get_array(self.lang + ".source_books")
+            start, end = offsets[pos], offsets[pos + 1]
+            # The id and name of each book
+            book_ids = self.snapshot.get_array(self.lang + ".book_ids")
+            return list(zip(book_ids[start:end].tolist(),
+                            self.snapshot.get_strings(
+                                self.lang + ".book_names", start, end)))
         
-        # The required hadith book list
-        book_list = []
         # The bind values for the sql query
         args      = [source]
         # The sql query
         sql       = "SELECT id, book FROM " + self.tbl_books
         sql       += " WHERE source=? ORDER BY book_number ASC"
         
-        # The hadith book data is fetched
-        book_list = self._fetch_data(sql, args, 2)
+        # The id and name of each book are fetched as tuples
+        book_list = list(self._iter_data(sql, args, 2))
         
         return book_list
         
     def get_title_list(self, book: int) -> list:
         """It fetches and returns list of hadith titles for the given book.
+
+        The titles and text of all hadith in the book are fetched together
+        and added to the book cache. The first hadith of the next book are
+        also prefetched.
         
         :param book: The hadith book id.
         :type book: int.
@@ -120,21 +252,96 @@ class HadithApi(Api):
         :rtype: list.
         """
         
-        # The required hadith title list
-        title_list = []
-        # The bind values for the sql query
-        args  = [book]
-        # The sql query
-        sql   = "SELECT id, title FROM " + self.tbl_text + " WHERE book_id=?"
-        sql   += " ORDER BY id ASC"
-        
-        # The hadith book data is fetched
-        title_list = self._fetch_data(sql, args, 2)
+        # The book is fetched from the book cache
+        cached_book = self.book_cache.get(book)
+        # If the book is not cached or only some of its hadith are cached
+        if cached_book is None or cached_book["titles"] is None:
+            # All hadith in the book are fetched
+            cached_book = self._load_book(book)
+        else:
+            # The book is marked as the most recently used
+            self.book_cache.move_to_end(book)
+
+        # The first hadith of the next book are prefetched
+        self._prefetch_next_book(book)
+        # The hadith title list
+        title_list = cached_book["titles"]
 
         return title_list
         
+    def get_title_ids(self, book: int):
+        """It returns the ids of the hadith in the given book.
+
+        Only the ids are fetched, so the title combo box can fetch the
+        titles it shows in pages. The ids are read from the meta data
+        snapshot or the book cache if possible.
+
+        :param book: The hadith book id.
+        :type book: int.
+        :return: The hadith ids in ascending order.
+        :rtype: Sequence[int].
+        """
+
+        # The position of the titles in the snapshot
+        titles = self._get_snapshot_titles(book)
+        # If the book is in the snapshot
+        if titles is not None:
+            # The ids are read from the snapshot without copying them
+            return self.snapshot.get_array(
+                self.lang + ".title_ids")[titles[0]:titles[1]]
+
+        # The book is fetched from the book cache
+        cached_book = self.book_cache.get(book)
+        # If the title list of the book is cached
+        if cached_book is not None and cached_book["titles"] is not None:
+            return array("I", [title[0] for title in cached_book["titles"]])
+
+        # The sql query
+        sql = "SELECT id FROM " + self.tbl_text
+        sql += " WHERE book_id=? ORDER BY id ASC"
+
+        return array("I", self._fetch_column(sql, [book]))
+
+    def get_title_range(self, book: int, first_id: int,
+                        last_id: int) -> list:
+        """It returns the titles of the hadith in the given range of ids.
+
+        The titles are read from the meta data snapshot if possible.
+        Otherwise they are read by primary key range.
+
+        :param book: The hadith book id.
+        :type book: int.
+        :param first_id: The id of the first hadith.
+        :type first_id: int.
+        :param last_id: The id of the last hadith.
+        :type last_id: int.
+        :return: The id and title of each hadith of the book in the range.
+        :rtype: list.
+        """
+
+        # The position of the titles in the snapshot
+        titles = self._get_snapshot_titles(book)
+        # If the book is in the snapshot
+        if titles is not None:
+            # The hadith ids of the book
+            ids = self.snapshot.get_array(
+                self.lang + ".title_ids")[titles[0]:titles[1]]
+            # The position of the first and last hadith in the range
+            start = bisect_left(ids, first_id)
+            end = bisect_right(ids, last_id)
+            return list(zip(ids[start:end].tolist(), self.snapshot.get_strings(
+                self.lang + ".titles", titles[0] + start, titles[0] + end)))
+
+        # The sql query
+        sql = "SELECT id, title FROM " + self.tbl_text
+        sql += " WHERE id>=? AND id<=? AND book_id=? ORDER BY id ASC"
+
+        return list(self._iter_data(sql, [first_id, last_id, book], 2))
+
     def get_hadith_text(self, hadith_id: int) -> str:
         """It fetches and returns the hadith text for the given hadith id.
+
+        The hadith text is read from the book cache if possible.
         
         :param hadith_id: The hadith id.
         :type hadith_id: int.
@@ -142,10 +349,22 @@ class HadithApi(Api):
         :rtype: str.    
         """
 
-        # The required hadith text
-        hadith_text = ""
+        # The hadith id is converted to int
+        hadith_id = int(hadith_id)
+        # Each cached book is checked, starting with the most recently used
+        for book_id in reversed(self.book_cache):
+            # The hadith text in the book
+            texts = self.book_cache[book_id]["texts"]
+            # If the book contains the hadith
+            if hadith_id in texts:
+                # The cache hit counter is increased
+                self.text_hits += 1
+                return texts[hadith_id]
+
+        # The cache miss counter is increased
+        self.text_misses += 1
         # The bind values for the sql query
-        args    = [int(hadith_id)]
+        args    = [hadith_id]
         # The sql query
         sql     = "SELECT hadith_text FROM " + self.tbl_text + " WHERE id=?"
         
@@ -156,17 +375,544 @@ class HadithApi(Api):
 
         return hadith_text
 
-    def update_settings(self, lang: str, row_id: int) -> None:
-        """Updates the current settings in database.
-        
-        :param row_id: The current row id.
-        :type row_id: int.        
+    def get_hadith_ids(self):
+        """It returns the ids of all hadith of the current language.
+
+        The ids are read from the meta data snapshot if possible. Otherwise
+        they are fetched with one query. They are kept in memory, so they are
+        read once for each language.
+
+        :return: The hadith ids in ascending order.
+        :rtype: Sequence[int].
+        """
+
+        # The cached hadith ids
+        ids = self.hadith_ids.get(self.lang)
+        if ids is not None:
+            return ids
+
+        # If the snapshot contains the titles of the current language
+        if self._has_snapshot():
+            # The ids of the titles of each book
+            ids = self.snapshot.get_array(self.lang + ".title_ids")
+            # The ids are sorted if the books are not in id order
+            id_list = ids.tolist()
+            if any(a > b for a, b in zip(id_list, id_list[1:])):
+                ids = array("I", sorted(id_list))
+        else:
+            # The sql query
+            sql = "SELECT id FROM " + self.tbl_text + " ORDER BY id ASC"
+            ids = array("I", self._fetch_column(sql, []))
+        self.hadith_ids[self.lang] = ids
+
+        return ids
+
+    def get_random_hadith(self) -> dict:
+        """It returns the id, book and source of a random hadith.
+
+        Each hadith of the current language is selected with the same
+        probability. The seed and mode of the selection are set with the
+        set_sampler function.
+
+        :return: The hadith id, book id and source. It is None if there are
+            no hadith.
+        :rtype: dict.
+        """
+
+        # The ids of all hadith
+        ids = self.get_hadith_ids()
+        # If there are no hadith
+        if len(ids) == 0:
+            return None
+
+        # The sampler of the hadith of the current language
+        sampler = self._get_sampler("hadith." + self.lang, len(ids))
+        # The random hadith id
+        hadith_id = ids[sampler.get_next()]
+        # The sql query
+        sql = "SELECT t.book_id, b.source FROM " + self.tbl_text + " t, "
+        sql += self.tbl_books + " b WHERE t.id=? AND b.id=t.book_id"
+        # The book and source of the hadith
+        row = self._fetch_row(sql, [hadith_id], 2)
+
+        return {"id": hadith_id, "book_id": int(row[0]), "source": row[1]}
+
+    def iter_hadith(self):
+        """It yields each hadith of the current language in order.
+
+        The hadith are read from the database one at a time, so all hadith
+        of a language can be read without keeping them in memory. The book
+        cache is not used.
+
+        :return: The hadith of the current language.
+        :rtype: Iterator[HadithRecord].
+        """
+
+        # The sql query
+        sql = "SELECT t.id, b.source, b.book, t.title, t.hadith_text FROM "
+        sql += self.tbl_text + " t JOIN " + self.tbl_books + " b"
+        sql += " ON b.id=t.book_id ORDER BY t.id ASC"
+
+        return self._iter_data(sql, [], 5, HadithRecord)
+
+    def get_cache_stats(self) -> dict:
+        """Returns the hit and miss counters of the book cache.
+
+        :return: The number of hadith text cache hits and misses and the ids
+            of the cached books.
+        :rtype: dict.
+        """
+
+        # The book cache statistics
+        stats = {
+            "hits": self.text_hits,
+            "misses": self.text_misses,
+            "books": list(self.book_cache.keys())
+        }
+
+        return stats
+
+    def _load_book(self, book: int) -> dict:
+        """It fetches the titles and text of all hadith in the given book.
+
+        The book is added to the book cache.
+
+        :param book: The hadith book id.
+        :type book: int.
+        :return: The cached book.
+        :rtype: dict.
+        """
+
+        # The titles and next book from the snapshot
+        snapshot_book = self._get_snapshot_book(book)
+        # If the titles are in the snapshot, only the text is fetched
+        if snapshot_book is not None:
+            # The sql query
+            sql    = "SELECT id, hadith_text FROM " + self.tbl_text
+            sql    += " WHERE book_id=? ORDER BY id ASC"
+            # The id and title of each hadith
+            titles = snapshot_book[0]
+            # The text of each hadith, keyed by hadith id
+            texts  = dict(self._iter_data(sql, [book], 2))
+        else:
+            # The sql query
+            sql    = "SELECT id, title, hadith_text FROM " + self.tbl_text
+            sql    += " WHERE book_id=? ORDER BY id ASC"
+            # The id and title of each hadith
+            titles = []
+            # The text of each hadith, keyed by hadith id
+            texts  = {}
+            # Each row is read once, without copying the rows into a list
+            for hadith_id, title, text in self._iter_data(sql, [book], 3):
+                titles.append((hadith_id, title))
+                texts[hadith_id] = text
+
+        # The cached book
+        cached_book = {"titles": titles, "texts": texts}
+        # The book is added to the book cache
+        self._add_book(book, cached_book)
+
+        return cached_book
+
+    def _prefetch_next_book(self, book: int) -> None:
+        """It fetches the first hadith of the book after the given book.
+
+        The next book is the book with the next book number in the same
+        hadith source. Only the hadith text is fetched. The titles are fetched
+        when the title list of the next book is requested.
+
+        :param book: The hadith book id.
+        :type book: int.
         """
 
-        # The bind values for the query
-        bind_values = [lang, row_id]
-        sql = "UPDATE ic_hadith_settings SET language=?, row_id=?"
-        self._update_data(sql, bind_values)
+        # If prefetching is disabled
+        if self.prefetch_count <= 0:
+            return
+
+        # The titles and next book from the snapshot
+        snapshot_book = self._get_snapshot_book(book)
+        # If the book is in the snapshot
+        if snapshot_book is not None:
+            # The next book id
+            row = snapshot_book[1]
+        else:
+            # The sql query for the next book id
+            sql   = "SELECT id FROM " + self.tbl_books + " WHERE"
+            sql   += " source=(SELECT source FROM " + self.tbl_books
+            sql   += " WHERE id=?) AND book_number>(SELECT book_number FROM "
+            sql   += self.tbl_books + " WHERE id=?)"
+            sql   += " ORDER BY book_number ASC LIMIT 1"
+            # The next book id is fetched
+            row   = self._fetch_row(sql, [book, book], 1)
+        # If there is no next book or it is already cached
+        if row is None or row[0] in self.book_cache:
+            return
+
+        # The sql query for the first hadith of the next book
+        sql   = "SELECT id, hadith_text FROM " + self.tbl_text
+        sql   += " WHERE book_id=? ORDER BY id ASC LIMIT ?"
+        # The hadith data is fetched
+        hrows = self._iter_data(sql, [row[0], self.prefetch_count], 2)
+
+        # The partially cached book. It does not contain the title list
+        cached_book = {"titles": None, "texts": dict(hrows)}
+        # The book is added to the book cache as the least recently used
+        self._add_book(row[0], cached_book)
+        self.book_cache.move_to_end(row[0], last=False)
+
+    def _add_book(self, book: int, cached_book: dict) -> None:
+        """It adds the given book to the book cache.
+
+        If the cache is full, the least recently used book is removed.
+
+        :param book: The hadith book id.
+        :type book: int.
+        :param cached_book: The titles and text of the book.
+        :type cached_book: dict.
+        """
+
+        # The old version of the book is removed
+        self.book_cache.pop(book, None)
+        # While the cache is full
+        while (len(self.book_cache) > 0 and
+                len(self.book_cache) >= self.book_cache_size):
+            # The least recently used book is removed
+            self.book_cache.popitem(last=False)
+        # The book is added to the cache
+        self.book_cache[book] = cached_book
+
+    def _has_snapshot(self) -> bool:
+        """Checks if the snapshot contains the meta data of the current
+        language.
+
+        :return: True if the meta data is in the snapshot.
+        :rtype: bool.
+        """
+
+        return (self.snapshot is not None and
+                self.snapshot.has(self.lang + ".sources"))
+
+    def _get_snapshot_titles(self, book: int) -> tuple:
+        """Returns the position of the first and last title of the given book
+        in the snapshot.
+
+        :param book: The hadith book id.
+        :type book: int.
+        :return: The position of the first title, the position after the
+            last title and the position of the book. It is None if the book
+            is not in the snapshot.
+        :rtype: tuple.
+        """
+
+        # If the snapshot does not contain the current language
+        if not self._has_snapshot():
+            return None
+        # The position of each book of the current language
+        books = self.snapshot_books.get(self.lang)
+        if books is None:
+            book_ids = self.snapshot.get_array(self.lang + ".book_ids")
+            books = {book_id: pos for pos, book_id in enumerate(book_ids)}
+            self.snapshot_books[self.lang] = books
+        # The position of the book
+        pos = books.get(int(book))
+        # If the book is not in the snapshot
+        if pos is None:
+            return None
+
+        # The position of the first and last title of the book
+        offsets = self.snapshot.get_array(self.lang + ".book_titles")
+
+        return (offsets[pos], offsets[pos + 1], pos)
+
+    def _get_snapshot_book(self, book: int) -> tuple:
+        """Returns the titles and next book of the given book from the
+        snapshot.
+
+        The next book is the book after the given book in the same source.
+
+        :param book: The hadith book id.
+        :type book: int.
+        :return: The id and title of each hadith and a tuple that contains
+            the id of the next book. The tuple is None if the book is the
+            last book of its source. The result is None if the book is not
+            in the snapshot.
+        :rtype: tuple.
+        """
+
+        # The position of the titles and the book in the snapshot
+        titles = self._get_snapshot_titles(book)
+        # If the book is not in the snapshot
+        if titles is None:
+            return None
+        start, end, pos = titles
+
+        # The id and title of each hadith
+        title_ids = self.snapshot.get_array(self.lang + ".title_ids")
+        titles = list(zip(title_ids[start:end].tolist(),
+                          self.snapshot.get_strings(
+                              self.lang + ".titles", start, end)))
+
+        # The position of the first book of the next source
+        offsets = self.snapshot.get_array(self.lang + ".source_books")
+        last = offsets[bisect_right(offsets, pos)]
+        # The id of the next book
+        next_book = None
+        if pos + 1 < last:
+            next_book = (self.snapshot.get_array(
+                self.lang + ".book_ids")[pos + 1],)
+
+        return (titles, next_book)
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> list:
+        """It searches the hadith titles and text of the current language.
+
+        The search text is normalized in the same way as the indexed text.
+        The results are ranked using the bm25 function. If the search index
+        is not complete, the remaining hadith are indexed first. If the
+        database is read only, then the existing index is searched. If
+        there is no index, then an error is raised.
+
+        :param query: The search text entered by the user.
+        :type query: str.
+        :param limit: The maximum number of results.
+        :type limit: int.
+        :param offset: The number of results to skip.
+        :type offset: int.
+        :return: The hadith id, source, book id, book, title, snippet and
+            rank of each matching hadith.
+        :rtype: list.
+        :raises SearchIndexError: If the search index is not built and the
+            database is read only.
+        """
+
+        # The required search results
+        results = []
+        # The search text is converted to a match query
+        match = to_match_query(normalize(query))
+        # If the search text has no words
+        if match == "":
+            return results
+
+        # If the search index is not complete
+        if not self.has_search_index():
+            # If the database is read only, the existing index is searched
+            if self.read_only:
+                # If there is no search index
+                if not self._table_exists(self.tbl_fts):
+                    raise SearchIndexError(
+                        "The %s search index is not built. It is built using "
+                        "the command: python -m source.search hadith" %
+                        self.lang)
+            else:
+                # The remaining hadith are indexed
+                self.build_search_index()
+
+        # The sql query
+        fts = "`" + self.tbl_fts + "`"
+        sql = "SELECT t.id, b.source, t.book_id, b.book, t.title,"
+        sql += " snippet(" + fts + ", 1, '<b>', '</b>', '...', 24), rank"
+        sql += " FROM " + fts + " JOIN " + self.tbl_text + " t"
+        sql += " ON t.id=" + fts + ".rowid JOIN " + self.tbl_books + " b"
+        sql += " ON b.id=t.book_id WHERE " + fts + " MATCH ?"
+        sql += " ORDER BY rank LIMIT ? OFFSET ?"
+
+        # The matching hadith are fetched
+        rows = self._iter_data(sql, [match, limit, offset], 7)
+        # Each row is added to the search results
+        for row in rows:
+            # The search result
+            result = {
+                "id": row[0],
+                "source": row[1],
+                "book_id": row[2],
+                "book": row[3],
+                "title": row[4],
+                "snippet": row[5],
+                "rank": row[6]
+            }
+            results.append(result)
+
+        return results
+
+    def get_search_count(self, query: str) -> int:
+        """It returns the number of hadith that match the given search text.
+
+        :param query: The search text entered by the user.
+        :type query: str.
+        :return: The number of matching hadith.
+        :rtype: int.
+        """
+
+        # The search text is converted to a match query
+        match = to_match_query(normalize(query))
+        # If the search text has no words or the search index does not exist
+        if match == "" or not self._table_exists(self.tbl_fts):
+            return 0
+
+        # The sql query
+        sql = "SELECT COUNT(*) FROM `" + self.tbl_fts + "`"
+        sql += " WHERE `" + self.tbl_fts + "` MATCH ?"
+        # The number of matching hadith is fetched
+        row = self._fetch_row(sql, [match], 1)
+
+        return row[0]
+
+    def has_search_index(self) -> bool:
+        """It checks if the search index for the current language is complete.
+
+        The index is complete if the last hadith in the hadith table has been
+        indexed.
+
+        :return: True if the search index is complete.
+        :rtype: bool.
+        """
+
+        # The sql query for the id of the last hadith
+        sql = "SELECT MAX(id) FROM " + self.tbl_text
+        # The hadith data is fetched
+        rows = self._fetch_data(sql, [], 1)
+
+        return self._get_search_state() >= int(rows[0][0] or 0)
+
+    def build_search_index(self, batch_size: int = 1000,
+                           rebuild: bool = False) -> dict:
+        """It builds the search index for the current language in batches.
+
+        The titles and text of the hadith are normalized and added to an FTS5
+        table. Each batch of hadith is added in its own transaction, together
+        with the id of the last hadith in the batch. If the build is
+        interrupted, it resumes after the last complete batch. Hadith that
+        were added to the hadith table after the last build are indexed
+        when the build is run again.
+
+        :param batch_size: The number of hadith indexed in each transaction.
+        :type batch_size: int.
+        :param rebuild: Indicates if the existing index should be removed.
+        :type rebuild: bool.
+        :return: The number of indexed rows, the time taken in seconds and the
+            size of the index in bytes.
+        :rtype: dict.
+        """
+
+        # The start time
+        start_time = time.perf_counter()
+        # The size of the database before the index is built
+        size = self._get_db_size()
+        # The name of the search index table
+        fts = "`" + self.tbl_fts + "`"
+
+        # The sql query for creating the build state table
+        sql = "CREATE TABLE IF NOT EXISTS ic_hadith_search_state"
+        sql += " (tbl_name TEXT PRIMARY KEY, last_id INTEGER NOT NULL)"
+        self._update_data(sql, [])
+        # If the existing index should be removed
+        if rebuild:
+            # The index and its build state are removed
+            self._update_data("DROP TABLE IF EXISTS " + fts, [])
+            sql = "DELETE FROM ic_hadith_search_state WHERE tbl_name=?"
+            self._update_data(sql, [self.tbl_fts])
+        # The sql query for creating the index
+        sql = "CREATE VIRTUAL TABLE IF NOT EXISTS " + fts
+        sql += " USING fts5(title, hadith_text,"
+        sql += " tokenize='unicode61 remove_diacritics 2')"
+        self._update_data(sql, [])
+
+        # The id of the last indexed hadith
+        last_id = self._get_search_state()
+        # The number of hadith indexed
+        row_count = 0
+        # The sql query for fetching a batch of hadith
+        sel_sql = "SELECT id, title, hadith_text FROM " + self.tbl_text
+        sel_sql += " WHERE id>? ORDER BY id ASC LIMIT ?"
+        # The sql query for adding a hadith to the index
+        ins_sql = "INSERT INTO " + fts + " (rowid, title, hadith_text)"
+        ins_sql += " VALUES (?, ?, ?)"
+        # The sql query for saving the build state
+        state_sql = "INSERT OR REPLACE INTO ic_hadith_search_state"
+        state_sql += " (tbl_name, last_id) VALUES (?, ?)"
+
+        while True:
+            # The next batch of hadith is fetched
+            rows = self._fetch_data(sel_sql, [last_id, batch_size], 3)
+            # If all hadith have been indexed
+            if len(rows) == 0:
+                break
+            # The batch is added in a single transaction
+            self._begin()
+            try:
+                # Each hadith is normalized and added to the index
+                for row in rows:
+                    self._update_data(ins_sql, [
+                        row[0], normalize(row[1] or ""),
+                        normalize(row[2] or "")])
+                # The id of the last hadith in the batch is saved
+                self._update_data(state_sql, [self.tbl_fts, rows[-1][0]])
+                # The transaction is committed
+                self._commit()
+            except Exception:
+                # The batch is rolled back, so the connection can be used
+                # for the next transaction
+                self._rollback()
+                raise
+            # The id of the last indexed hadith
+            last_id = rows[-1][0]
+            # The number of hadith indexed is updated
+            row_count += len(rows)
+
+        # The index build statistics
+        stats = {
+            "rows": row_count,
+            "time": time.perf_counter() - start_time,
+            "size": self._get_db_size() - size
+        }
+
+        return stats
+
+    def _get_search_state(self) -> int:
+        """It returns the id of the last hadith added to the search index.
+
+        :return: The id of the last indexed hadith. It is 0 if the search
+            index has not been built.
+        :rtype: int.
+        """
+
+        # If the build state table does not exist
+        if not self._table_exists("ic_hadith_search_state"):
+            return 0
+
+        # The sql query
+        sql = "SELECT last_id FROM ic_hadith_search_state WHERE tbl_name=?"
+        # The build state is fetched
+        rows = self._fetch_data(sql, [self.tbl_fts], 1)
+        # The id of the last indexed hadith
+        last_id = int(rows[0][0]) if len(rows) > 0 else 0
+
+        return last_id
+
+    def get_settings(self) -> dict:
+        """Reads the settings saved in the database by older versions.
+
+        The settings are now saved in the state file. They are read from the
+        database when the state file does not exist yet.
+
+        :return: The language and row id. It is None if the database does not
+            contain the settings table or the table is empty.
+        :rtype: dict.
+        """
+
+        # If the settings table does not exist
+        if not self._table_exists("ic_hadith_settings"):
+            return None
+
+        # The sql query
+        sql = "SELECT language, row_id FROM `ic_hadith_settings`"
+        # The settings data is fetched
+        row = self._fetch_row(sql, [], 2)
+        # If the settings table is empty
+        if row is None:
+            return None
+
+        return {"language": row[0], "row_id": row[1]}
 
     def get_row(self, row_id: int) -> dict:
         """It returns the field values for the given row.
@@ -174,7 +920,8 @@ class HadithApi(Api):
         :param row_id: The row id.
         :type row_id: int.                    
         :return: The field values for the given row.
-        :rtype: dict.    
+        :rtype: dict.
+        :raises IndexError: If the hadith or its book is not in the database.
         """
 
         # The bind values for the sql query
@@ -183,11 +930,14 @@ class HadithApi(Api):
         sql = "SELECT book_id, title FROM `" + self.tbl_text + "`"
         sql += " WHERE id=?"        
         # The required data is fetched
-        rows = self._fetch_data(sql, args, 2)
+        row = self._fetch_row(sql, args, 2)
+        # If the hadith is not in the database
+        if row is None:
+            raise IndexError("Hadith %s is not in the database" % row_id)
         # The book id
-        book_id = rows[0][0]
+        book_id = row[0]
         # The title
-        title = rows[0][1]
+        title = row[1]
 
         # The bind values for the sql query
         args = [book_id]
@@ -195,11 +945,14 @@ class HadithApi(Api):
         sql = "SELECT book, source FROM `" + self.tbl_books + "`"
         sql += " WHERE id=?"        
         # The required data is fetched
-        rows = self._fetch_data(sql, args, 2)
+        row = self._fetch_row(sql, args, 2)
+        # If the book is not in the database
+        if row is None:
+            raise IndexError("Book %s is not in the database" % book_id)
         # The source
-        book = rows[0][0]
+        book = row[0]
         # The book
-        source = rows[0][1]
+        source = row[1]
 
         data = {"title": title, "source": source, "book": book}
 
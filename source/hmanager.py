@@ -1,10 +1,17 @@
-import sys, os
-from random import randint
+import sys, os, re
+from bisect import bisect_left
+from typing import Callable
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 from source.hapi import HadithApi
 from source.hconfig import HConfig
+from source.worker import DataDispatcher
+from source.settings import SettingsWriter
+from source.state import StateStore
+from source.cache import DocumentCache
+from source.models import create_combo_model
+from source.search import SearchIndexError
 
 class Ui_Manager():
     """
@@ -15,6 +22,10 @@ class Ui_Manager():
     initialize_ui()
         Loads the source, book and title combo boxes and the hadith text.
     
+    _create_worker_api()
+        Creates the HadithApi object used by the background thread.
+    _shutdown()
+        Saves the settings and stops the background thread.
     _update_btn_icon()
         Updates the path to the random icon to an absolute path.       
     _update_layout()
@@ -32,6 +43,16 @@ class Ui_Manager():
         Loads the next hadith.
     _prev_hadith()
         Loads the previous hadith.
+    _select_hadith()
+        Loads the given hadith in the hadith box.
+    _create_search_box()
+        Adds a search box to the menu bar.
+    _search()
+        Searches the hadith text in the background thread.
+    _show_search_results()
+        Shows the search results in a menu below the search box.
+    _show_search_result()
+        Loads the hadith for the given search result.
     _source_selected()
         It loads the book and title combo boxes and also the hadith box.
     _book_selected()
@@ -40,6 +61,18 @@ class Ui_Manager():
         It returns the currently selected source, book and title.
     _load_hadith()
         It updates the hadith box with the current hadith.
+    _show_hadith_text()
+        Shows the given hadith text in the hadith box.
+    _get_hadith_html()
+        Returns the html for the given hadith title and text.
+    _prefetch_pages()
+        Prefetches the hadith pages before and after the current hadith.
+    _prefetch_book()
+        Prefetches the first hadith of the next or previous book.
+    _create_hadith_fetch()
+        Returns a function that fetches the text of the given hadith.
+    _create_page_callback()
+        Returns a function that adds a prefetched hadith page to the cache.
     _load_source_list()
         It loads the source combo box with list of sources.
     _load_book_list()
@@ -47,6 +80,10 @@ class Ui_Manager():
     _load_title_list()
         It loads the title combo box with list of titles for the selected
         hadith source and book.
+    _show_title_list()
+        Loads the title combo box with the given hadith ids.
+    _find_title()
+        Returns the position of the given hadith in the title combo box.
     _update_settings()
         It saves the current settings to database.
     _load_settings()
@@ -75,11 +112,37 @@ class Ui_Manager():
         # The current language
         self.lang     = self.config["default_lang"]
         # Creates an instance of the HadithApi class
-        self.api = HadithApi(self.config["db_path"], self.lang)
+        self.api = HadithApi(self.config["db_path"], self.lang,
+                             profile=self.config["db_profile"],
+                             backend=self.config["db_backend"],
+                             snapshot_path=self.config["snapshot_path"])
+        # The seed and mode of the random hadith selection are set
+        self.api.set_sampler(self.config["random_seed"],
+                             self.config["random_no_repeat"])
+        # The reader state is saved in the state file
+        self.state = StateStore(self.config["state_path"])
+        # Starts the background thread used for fetching the hadith data
+        self.dispatcher = DataDispatcher(self._create_worker_api)
+        # The settings are written after a short delay
+        self.settings_writer = SettingsWriter(
+            self.dispatcher, self.config["settings_delay"])
+        # The settings are saved and the background thread is stopped when
+        # the application exits
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._shutdown)
         # Loads settings from database
         self._load_settings()
         # The main window object is set as obj attribute
         self.MainWindow = MainWindow
+        # The cache of rendered hadith pages
+        self.pages = DocumentCache(
+            self.MainWindow.hadithText, self.config["page_cache_size"])
+        # The titles of the title combo box are fetched in pages
+        self.title_model = create_combo_model(self.MainWindow.titleComboBox)
+        # The ids of the hadith in the title combo box
+        self.title_ids = []
+        # Indicates that the titles of a book are being fetched. The title
+        # combo box still holds the titles of the previous book
+        self.titles_pending = False
         
         # The layout is updated for the new language
         self._update_layout()
@@ -106,14 +169,41 @@ class Ui_Manager():
         
         # Updates the icon path
         self._update_btn_icon()          
+        # Adds a search box to the menu bar
+        self._create_search_box()
         # Loads the source combo box with list of sources
         self._load_source_list()
         # Loads the book combo box with list of books
         self._load_book_list()
-        # Loads the title combo box with list of titles
-        self._load_title_list()
-        # Displays the hadith text
-        self._load_hadith_box()        
+        # Loads the title combo box with list of titles and then displays
+        # the hadith text
+        self._load_title_list(self._load_hadith_box)
+
+    def _create_worker_api(self) -> HadithApi:
+        """Creates the HadithApi object used by the background thread.
+
+        It is called in the background thread. The object uses a pooled
+        connection of the background thread.
+
+        :return: The HadithApi object.
+        :rtype: HadithApi.
+        """
+
+        return HadithApi(self.config["db_path"], self.lang,
+                         profile=self.config["db_profile"],
+                         backend=self.config["db_backend"],
+                         snapshot_path=self.config["snapshot_path"])
+
+    def _shutdown(self) -> None:
+        """Saves the settings and stops the background thread.
+
+        It is called when the application exits.
+        """
+
+        # The unsaved settings are written
+        self.settings_writer.flush()
+        # The background thread is stopped after the settings are written
+        self.dispatcher.stop()
 
     def _update_btn_icon(self) -> None:
         """Updates the path to the random icon to an absolute path.
@@ -304,12 +394,10 @@ class Ui_Manager():
         self._load_source_list()
         # Loads the book combo box with list of books
         self._load_book_list()
-        # Loads the title combo box with list of titles
-        self._load_title_list()
-        # Loads the hadith box with text
-        self._load_hadith_box()
-         # The settings are updated in database
-        self._update_settings()
+        # Loads the title combo box with list of titles and then loads the
+        # hadith box with text. The settings are updated when the hadith box
+        # is loaded
+        self._load_title_list(self._load_hadith_box)
         
     def _next_btn_handler(self) -> None:
         """Even handler for the next button.
@@ -323,10 +411,9 @@ class Ui_Manager():
             # The _prev_hadith method is called
             self._prev_hadith()
         else:
-            # The _next_hadith method is called
+            # The _next_hadith method is called. The settings are updated
+            # when the hadith box is loaded
             self._next_hadith()    
-         # The settings are updated in database
-        self._update_settings()        
             
     def _prev_btn_handler(self) -> None:
         """Even handler for the prev button.
@@ -340,55 +427,41 @@ class Ui_Manager():
             # The _next_hadith method is called
             self._next_hadith()
         else:
-            # The _prev_hadith method is called
+            # The _prev_hadith method is called. The settings are updated
+            # when the hadith box is loaded
             self._prev_hadith()
-         # The settings are updated in database
-        self._update_settings()  
                     
     def _rand_hadith(self) -> None:
         """Loads a random hadith in the hadith box.
         
         It loads the text of a random hadith to hadith box.
-        It also loads the source, book and title combo boxes.
+        It also loads the source, book and title combo boxes. Each hadith of
+        the current language is selected with the same probability.
         """
     
-        # The number of hadith sources
-        scount  = self.MainWindow.sourceComboBox.count()
-        # A random source index
-        sindex  = randint(0, scount-1)
-        # The current index of source combo box is set
-        self.MainWindow.sourceComboBox.setCurrentIndex(sindex)
-        
-        # The book list is loaded
-        self._load_book_list()
-        # The number of hadith books
-        bcount  = self.MainWindow.bookComboBox.count()
-        # A random book index
-        bindex  = randint(0, bcount-1)
-        # The current index of book combo box is set
-        self.MainWindow.bookComboBox.setCurrentIndex(bindex)
-        
-        # The title list is loaded
-        self._load_title_list()
-        # The number of hadith titles
-        tcount  = self.MainWindow.titleComboBox.count()
-        # A random book title
-        tindex  = randint(0, tcount-1)
-        # The current index of title combo box is set
-        self.MainWindow.titleComboBox.setCurrentIndex(tindex)
-        
-        # The hadith text box is loaded
-        self._load_hadith_box()
-         # The settings are updated in database
-        self._update_settings()
+        # A random hadith
+        hadith = self.api.get_random_hadith()
+        # If there are no hadith
+        if hadith is None:
+            return
+
+        # The hadith is loaded. The settings are updated when the hadith box
+        # is loaded
+        self._select_hadith(hadith["source"], hadith["book_id"], hadith["id"])
                             
     def _next_hadith(self) -> None:
         """Loads the next hadith.
         
         It loads the text of next hadith to hadith box.
         It also loads the source, title and book combo boxes if needed.
+        It does nothing while the titles of a book are being fetched, since
+        the title combo box still holds the titles of the previous book.
         """
 
+        # If the titles of a book are being fetched
+        if self.titles_pending:
+            return
+
         # The current selection
         sel     = self._get_current_selection()
         
@@ -422,26 +495,30 @@ class Ui_Manager():
                     self.MainWindow.sourceComboBox.setCurrentIndex(csindex+1)
                 # The book combo box is updated
                 self._load_book_list()
-                # The title combo box is updated
-                self._load_title_list()
             else:
                 # The book combo box selected item is updated
                 self.MainWindow.bookComboBox.setCurrentIndex(cbindex+1)
-            # The title combo box is loaded
-            self._load_title_list()
+            # The title combo box is loaded and then the hadith box is loaded
+            self._load_title_list(self._load_hadith_box)
         else:
             # The currently selected item in the title combo box is set
             self.MainWindow.titleComboBox.setCurrentIndex(ctindex+1)
-        # The hadith box is loaded
-        self._load_hadith_box()            
+            # The hadith box is loaded
+            self._load_hadith_box()            
         
     def _prev_hadith(self) -> None:
         """Loads the previous hadith.
         
         It loads the text of previous hadith to hadith box.
         It also loads the source, title and book combo boxes.
+        It does nothing while the titles of a book are being fetched, since
+        the title combo box still holds the titles of the previous book.
         """
 
+        # If the titles of a book are being fetched
+        if self.titles_pending:
+            return
+
         # The current selection
         sel     = self._get_current_selection()
         
@@ -472,44 +549,188 @@ class Ui_Manager():
                     # to the previous one
                     self.MainWindow.sourceComboBox.setCurrentIndex(csindex-1)
                 # The book combo box is loaded
-                # The title combo box is loaded
                 self._load_book_list()
-                self._load_title_list()                    
             else:
                 # The book combo box selected item is set to the previous one
                 self.MainWindow.bookComboBox.setCurrentIndex(cbindex-1)
-            # The title combo box is loaded
-            self._load_title_list()                
+            # The title combo box is loaded and then the hadith text box is
+            # loaded
+            self._load_title_list(self._load_hadith_box)
         else:
             # The title combo box selected item is set to the previous one
             self.MainWindow.titleComboBox.setCurrentIndex(ctindex-1)
-
-        # The hadith text box is loaded
-        self._load_hadith_box() 
+            # The hadith text box is loaded
+            self._load_hadith_box() 
                     
+    def _select_hadith(self, source: str, book: int, hadith_id: int) -> None:
+        """Loads the given hadith in the hadith box.
+
+        It selects the given source, book and title in the combo boxes. The
+        book and title combo boxes are reloaded for the new source and book.
+
+        :param source: The hadith source.
+        :type source: str.
+        :param book: The hadith book id.
+        :type book: int.
+        :param hadith_id: The hadith id.
+        :type hadith_id: int.
+        """
+
+        # The source is selected
+        self.MainWindow.sourceComboBox.setCurrentText(source)
+        # The book combo box is loaded
+        self._load_book_list()
+        # The book is selected
+        self.MainWindow.bookComboBox.setCurrentIndex(
+            self.MainWindow.bookComboBox.findData(str(book)))
+
+        def select_title() -> None:
+            # The title is selected
+            self.MainWindow.titleComboBox.setCurrentIndex(
+                self._find_title(hadith_id))
+            # The hadith text box is loaded
+            self._load_hadith_box()
+
+        # The title combo box is loaded and then the title is selected
+        self._load_title_list(select_title)
+
+    def _create_search_box(self) -> None:
+        """Adds a search box to the right corner of the menu bar.
+
+        The hadith titles and text of the current language are searched when
+        the enter key is pressed in the search box.
+        """
+
+        # The translate function
+        _translate = QtCore.QCoreApplication.translate
+        # The search box is created
+        self.searchBox = QtWidgets.QLineEdit(self.MainWindow.menuBar)
+        self.searchBox.setObjectName("searchBox")
+        self.searchBox.setMinimumWidth(200)
+        self.searchBox.setClearButtonEnabled(True)
+        self.searchBox.setPlaceholderText(_translate("MainWindow", "Search"))
+        self.searchBox.setStatusTip(
+            _translate("MainWindow", "Search the hadith text (Ctrl+F)"))
+        # The search box is added to the menu bar
+        self.MainWindow.menuBar.setCornerWidget(
+            self.searchBox, QtCore.Qt.TopRightCorner)
+        # Connects the search box to a call back
+        self.searchBox.returnPressed.connect(lambda: self._search(0))
+        # The search box is focused using the Ctrl+F shortcut
+        self.searchShortcut = QtWidgets.QShortcut(
+            QtGui.QKeySequence("Ctrl+F"), self.MainWindow.centralwidget)
+        self.searchShortcut.activated.connect(self.searchBox.setFocus)
+
+    def _search(self, offset: int) -> None:
+        """Searches the hadith text and shows the results in a menu.
+
+        Each result is shown as a menu item below the search box. Selecting
+        a menu item loads the hadith. If there are more results, the last
+        menu item shows the next page of results.
+
+        :param offset: The number of results to skip.
+        :type offset: int.
+        """
+
+        # The number of results in each page
+        limit = 20
+        # The search text
+        query = self.searchBox.text()
+
+        def fetch(api: HadithApi) -> tuple:
+            try:
+                # The search results and the total number of results
+                return (api.search(query, limit, offset),
+                        api.get_search_count(query), None)
+            except SearchIndexError as err:
+                # The search index is not built, so the error is shown
+                return ([], 0, str(err))
+
+        # The search results are fetched in the background thread
+        self.dispatcher.submit(
+            "search", fetch,
+            lambda data: self._show_search_results(offset, limit, *data))
+
+    def _show_search_results(self, offset: int, limit: int, results: list,
+                             count: int, error: str = None) -> None:
+        """Shows the search results in a menu below the search box.
+
+        :param offset: The number of results that were skipped.
+        :type offset: int.
+        :param limit: The number of results in each page.
+        :type limit: int.
+        :param results: The search results.
+        :type results: list.
+        :param count: The total number of results.
+        :type count: int.
+        :param error: The error message. It is given if the search index is
+            not built.
+        :type error: str.
+        """
+
+        # If the search index is not built
+        if error is not None:
+            # The error is shown in the status bar
+            self.MainWindow.statusbar.showMessage(error, 5000)
+            return
+        # If there are no results
+        if len(results) == 0:
+            # A message is shown in the status bar
+            self.MainWindow.statusbar.showMessage("No hadith found", 3000)
+            return
+
+        # The menu for the search results
+        menu = QtWidgets.QMenu(self.searchBox)
+        # Each search result is added to the menu
+        for result in results:
+            # The snippet without the html tags used for highlighting
+            snippet = re.sub("<[^>]+>", "", result["snippet"])
+            # The menu item is added
+            action = menu.addAction(
+                result["source"] + " - " + result["title"] + ": " + snippet)
+            # Connects the menu item to a call back
+            action.triggered.connect(
+                lambda checked=False, r=result: self._show_search_result(r))
+        # If there are more results
+        if offset + limit < count:
+            # The menu item for the next page is added
+            menu.addSeparator()
+            action = menu.addAction("More results...")
+            action.triggered.connect(
+                lambda checked=False: self._search(offset + limit))
+
+        # The menu is shown below the search box
+        menu.exec_(self.searchBox.mapToGlobal(
+            self.searchBox.rect().bottomLeft()))
+
+    def _show_search_result(self, result: dict) -> None:
+        """Loads the hadith for the given search result.
+
+        :param result: The search result.
+        :type result: dict.
+        """
+
+        # The hadith is loaded. The settings are updated when the hadith box
+        # is loaded
+        self._select_hadith(result["source"], result["book_id"], result["id"])
+
     def _source_selected(self) -> None:
         """It loads the book and title combo boxes and also the hadith box.
         """
         
         # The book combo box is loaded
         self._load_book_list()
-        # The title combo box is loaded
-        self._load_title_list()
-        # The hadith text box is loaded
-        self._load_hadith_box()
-         # The settings are updated in database
-        self._update_settings()   
+        # The title combo box is loaded and then the hadith text box is
+        # loaded. The settings are updated when the hadith box is loaded
+        self._load_title_list(self._load_hadith_box)
         
     def _book_selected(self) -> None:
         """It loads the title combo box and the hadith box.
         """
 
-        # The title combo box is loaded
-        self._load_title_list()
-        # The hadith text box is loaded
-        self._load_hadith_box()
-         # The settings are updated in database
-        self._update_settings()
+        # The title combo box is loaded and then the hadith text box is
+        # loaded. The settings are updated when the hadith box is loaded
+        self._load_title_list(self._load_hadith_box)
         
     def _get_current_selection(self) -> dict:
         """It returns the currently selected source, book and title.
@@ -560,24 +781,221 @@ class Ui_Manager():
 
     def _load_hadith_box(self) -> None:
         """It updates the hadith box with the current hadith.
+
+        If the hadith page is cached, then it is shown from the cache.
+        Otherwise the hadith text is fetched in the background thread.
         """
         
         # The current selection
         sel   = self._get_current_selection()
-        # The hadith text is fetched
-        htext = self.api.get_hadith_text(sel["title"])
+        # The current language
+        lang  = self.lang
+        # The key of the hadith page
+        key   = (lang, sel["title"])
+        # If the hadith page is cached
+        if self.pages.show(key):
+            # The pending hadith text request is cancelled, so it does not
+            # replace the cached page
+            self.dispatcher.cancel("hadith")
+            # The settings are updated in database
+            self._update_settings()
+            # The neighbouring hadith pages are prefetched
+            self._prefetch_pages()
+            return
+
+        def fetch(api: HadithApi) -> str:
+            # The language of the worker api is updated
+            api.set_lang(lang)
+            # The hadith text is fetched
+            return api.get_hadith_text(sel["title"])
+
+        # The hadith text is fetched in the background thread
+        self.dispatcher.submit(
+            "hadith", fetch,
+            lambda htext: self._show_hadith_text(key, sel, htext))
+
+    def _show_hadith_text(self, key: tuple, sel: dict, htext: str) -> None:
+        """Shows the given hadith text in the hadith box.
+
+        The rendered hadith page is added to the page cache.
+
+        :param key: The key of the hadith page.
+        :type key: tuple.
+        :param sel: The selection for which the text was fetched.
+        :type sel: dict.
+        :param htext: The hadith text.
+        :type htext: str.
+        """
+
+        # The hadith text html is set and cached
+        self.pages.render(key, self._get_hadith_html(sel["ttext"], htext))
+        # The settings are updated in database
+        self._update_settings()
+        # The neighbouring hadith pages are prefetched
+        self._prefetch_pages()
+
+    def _get_hadith_html(self, ttext: str, htext: str) -> str:
+        """Returns the html for the given hadith title and text.
+
+        :param ttext: The hadith title.
+        :type ttext: str.
+        :param htext: The hadith text.
+        :type htext: str.
+        :return: The hadith html.
+        :rtype: str.
+        """
+
         # The style for the hadith text
         style = "margin: 15px; padding-top: 20px;"
         style += "line-height:50px; padding-bottom: 20px";
         text  = "<div style='" + style + "'>"
         text  += "<div style='color: green;'>" 
-        text  += sel["ttext"] + "</div><br/>"
+        text  += ttext + "</div><br/>"
         text += htext
         text += "</div>"
-        # The hadith text html is set
-        self.MainWindow.hadithText.setHtml(text)
-        # The settings are updated in database
-        self._update_settings()
+
+        return text
+
+    def _prefetch_pages(self) -> None:
+        """Prefetches the hadith pages before and after the current hadith.
+
+        The number of hadith prefetched in each direction is set by the
+        prefetch_depth config value. If the current hadith is the first or
+        last one in its book, then the first hadith of the previous or next
+        book is prefetched. This is the hadith shown by the previous and next
+        buttons. At the last book of a source, the first book of the next
+        source is used. The hadith text is fetched in the background thread
+        and the pages are added to the page cache without being shown.
+        """
+
+        # The current language
+        lang   = self.lang
+        # The index of the current item in the title combo box
+        tindex = self.MainWindow.titleComboBox.currentIndex()
+        # The number of items in the title combo box
+        tcount = self.MainWindow.titleComboBox.count()
+        # Each position up to the prefetch depth is checked
+        for step in range(1, self.config["prefetch_depth"] + 1):
+            for offset in (step, -step):
+                # The index of the title
+                index = tindex + offset
+                # If the title is not in the current book
+                if index < 0 or index >= tcount:
+                    continue
+                # The hadith id and title
+                hadith_id = int(self.MainWindow.titleComboBox.itemData(index))
+                ttext     = self.MainWindow.titleComboBox.itemText(index)
+                # If the hadith page is already cached
+                if self.pages.contains((lang, hadith_id)):
+                    continue
+                # The hadith text is fetched in the background thread. Each
+                # position has its own channel, so the pending request for a
+                # position is replaced when the current hadith changes
+                self.dispatcher.submit(
+                    "prefetch" + str(offset),
+                    self._create_hadith_fetch(lang, hadith_id, ttext),
+                    self._create_page_callback(lang))
+
+        # If the current hadith is the last one in its book
+        if tindex == tcount - 1:
+            # The first hadith of the next book is prefetched
+            self._prefetch_book(lang, 1)
+        # If the current hadith is the first one in its book
+        if tindex == 0:
+            # The first hadith of the previous book is prefetched
+            self._prefetch_book(lang, -1)
+
+    def _prefetch_book(self, lang: str, offset: int) -> None:
+        """Prefetches the first hadith of the next or previous book.
+
+        :param lang: The language of the hadith text.
+        :type lang: str.
+        :param offset: 1 for the next book and -1 for the previous book.
+        :type offset: int.
+        """
+
+        # The index of the book in the book combo box
+        bindex = self.MainWindow.bookComboBox.currentIndex() + offset
+        # If the book is in the current source
+        if 0 <= bindex < self.MainWindow.bookComboBox.count():
+            # The source and book
+            source = None
+            book   = int(self.MainWindow.bookComboBox.itemData(bindex))
+        else:
+            # The number of items in the source combo box
+            scount = self.MainWindow.sourceComboBox.count()
+            # The index of the source. The sources wrap around
+            sindex = self.MainWindow.sourceComboBox.currentIndex() + offset
+            # The first book of the source is used
+            source = self.MainWindow.sourceComboBox.itemText(sindex % scount)
+            book   = None
+
+        def fetch(api: HadithApi) -> tuple:
+            # The language of the worker api is updated
+            api.set_lang(lang)
+            # The first book of the source is used if the book is not known
+            books = [[book]] if book else api.get_book_list(source)
+            # The titles of the book
+            titles = api.get_title_list(int(books[0][0])) if books else []
+            # If the book has no hadith, there is nothing to prefetch
+            if not titles:
+                return None
+            # The first hadith of the book
+            hadith_id, ttext = titles[0]
+            # The hadith id, title and text
+            return hadith_id, ttext, api.get_hadith_text(hadith_id)
+
+        # The hadith text is fetched in the background thread
+        self.dispatcher.submit(
+            "prefetch-book" + str(offset), fetch,
+            self._create_page_callback(lang))
+
+    def _create_hadith_fetch(self, lang: str, hadith_id: int,
+                             ttext: str) -> Callable:
+        """Returns a function that fetches the text of the given hadith.
+
+        :param lang: The language of the hadith text.
+        :type lang: str.
+        :param hadith_id: The hadith id.
+        :type hadith_id: int.
+        :param ttext: The hadith title.
+        :type ttext: str.
+        :return: The function that is called in the background thread.
+        :rtype: Callable.
+        """
+
+        def fetch(api: HadithApi) -> tuple:
+            # The language of the worker api is updated
+            api.set_lang(lang)
+            # The hadith id, title and text
+            return hadith_id, ttext, api.get_hadith_text(hadith_id)
+
+        return fetch
+
+    def _create_page_callback(self, lang: str) -> Callable:
+        """Returns a function that adds a prefetched hadith page to the cache.
+
+        :param lang: The language of the hadith text.
+        :type lang: str.
+        :return: The function that is called with the hadith id, title and
+            text.
+        :rtype: Callable.
+        """
+
+        def callback(result: tuple) -> None:
+            # If there was nothing to prefetch
+            if result is None:
+                return
+            # The hadith id, title and text
+            hadith_id, ttext, htext = result
+            # If the language has not changed and the page is not cached
+            if lang == self.lang and not self.pages.contains(
+                    (lang, hadith_id)):
+                # The hadith page is rendered and cached
+                self.pages.prepare((lang, hadith_id),
+                                   self._get_hadith_html(ttext, htext))
+
+        return callback
                 
     def _load_source_list(self) -> None:
         """It loads the source combo box with list of sources.
@@ -626,47 +1044,136 @@ class Ui_Manager():
         # The book value is set to the settings value
         self.MainWindow.bookComboBox.setCurrentText(self.settings["book"])
             
-    def _load_title_list(self) -> None:
+    def _load_title_list(self, callback: Callable = None) -> None:
         """It loads the title combo box with list of titles for the selected
         hadith source and book.
+
+        The hadith ids of the book are fetched in the background thread.
+        The titles are fetched in pages when the combo box shows them. The
+        callback is called after the title combo box is loaded.
+
+        :param callback: The function to call after the titles are loaded.
+        :type callback: Callable.
         """
 
-        # The title combo box is cleared               
-        self.MainWindow.titleComboBox.clear()
         # The current selection is fetched
         sel         = self._get_current_selection()        
-        # The title list for the current book
-        title_list  = self.api.get_title_list(sel["book"])
-        # Each title in the title list is added to the title combo box
-        for title in title_list:
-            # The title is added to the title combo box
-            self.MainWindow.titleComboBox.addItem(title[1], str(title[0]))
-        # The title value is set to the settings value
-        self.MainWindow.titleComboBox.setCurrentText(self.settings["title"])
+        # The current language
+        lang        = self.lang
 
-    def _load_settings(self) -> None:
-        """Loads the current settings from database.
+        def fetch(api: HadithApi) -> tuple:
+            # The language of the worker api is updated
+            api.set_lang(lang)
+            # The hadith ids of the current book
+            return sel["book"], api.get_title_ids(sel["book"])
+
+        # The titles are being fetched until the title list is shown
+        self.titles_pending = True
+        # The hadith ids are fetched in the background thread
+        self.dispatcher.submit(
+            "titles", fetch,
+            lambda result: self._show_title_list(result, callback))
+
+    def _show_title_list(self, result: tuple,
+                         callback: Callable = None) -> None:
+        """Loads the title combo box with the given hadith ids.
+
+        The titles are fetched by the api object of the main thread, one
+        page at a time, when the combo box shows them. Each page is read by
+        primary key range or from the meta data snapshot.
+
+        :param result: The hadith book id and the ids of its hadith.
+        :type result: tuple.
+        :param callback: The function to call after the titles are loaded.
+        :type callback: Callable.
+        """
+
+        # The book id and hadith ids
+        book, title_ids = result
+        # The titles of the book are no longer being fetched
+        self.titles_pending = False
+
+        def fetch_page(start: int, count: int) -> list:
+            # The hadith ids of the page
+            ids = title_ids[start:start + count]
+            # The titles of the page, keyed by hadith id
+            titles = dict(self.api.get_title_range(book, ids[0], ids[-1]))
+            # The title and hadith id of each row
+            return [(titles.get(hadith_id, ""), str(hadith_id))
+                    for hadith_id in ids]
+
+        # The title combo box is loaded
+        self.title_ids = title_ids
+        self.title_model.set_rows(len(title_ids), fetch_page)
+        # The title is set to the settings value if it is in the book
+        self.MainWindow.titleComboBox.setCurrentIndex(
+            max(self._find_title(self.settings["id"]), 0))
+        # If a callback was given
+        if callback is not None:
+            # The callback is called
+            callback()
+
+    def _find_title(self, hadith_id: int) -> int:
+        """Returns the position of the given hadith in the title combo box.
+
+        :param hadith_id: The hadith id.
+        :type hadith_id: int.
+        :return: The position of the hadith. It is -1 if the hadith is not in
+            the current book.
+        :rtype: int.
         """
 
-        # The sql query
-        sql = "SELECT language, row_id FROM `ic_hadith_settings`"            
-        # The settings data is fetched
-        rows = self.api._fetch_data(sql, [], 2)        
-        # The language settings value
-        self.lang = rows[0][0]
-        # The row id
-        row_id = rows[0][1]
+        # The position of the hadith in the sorted hadith ids
+        pos = bisect_left(self.title_ids, hadith_id)
+        # If the hadith is not in the current book
+        if pos == len(self.title_ids) or self.title_ids[pos] != hadith_id:
+            return -1
+
+        return pos
+
+    def _load_settings(self) -> None:
+        """Loads the current settings from the state file.
+
+        If the state file does not exist, then the settings saved in the
+        database by older versions are used.
+        """
+        
+        # The saved state
+        state = self.state.load()
+        # If the state file does not exist
+        if "language" not in state:
+            # The settings are read from the database
+            state = self.api.get_settings() or {
+                "language": self.config["default_lang"], "row_id": 1}
+        # The language settings value. The default language is used if the
+        # saved language is not known
+        self.lang = state["language"]
+        if self.lang not in self.api.get_lang_list():
+            self.lang = self.config["default_lang"]
         # The language is set in the hapi object
         self.api.set_lang(self.lang)
-        # The row values are fetched
-        self.settings = self.api.get_row(row_id)                
+        try:
+            # The row id
+            row_id = int(state.get("row_id"))
+            # The row values are fetched
+            self.settings = self.api.get_row(row_id)
+        except (IndexError, TypeError, ValueError):
+            # If the saved hadith is not in the database, the first hadith is
+            # shown
+            row_id = self.api.get_hadith_ids()[0]
+            self.settings = self.api.get_row(row_id)
+        # The hadith id
+        self.settings["id"] = row_id
         
 
     def _update_settings(self) -> None:
-        """It saves the current settings to database.
+        """It saves the current settings to the state file.
         """
         
         # The current selection is fetched
         sel = self._get_current_selection()  
-        # The settings are updated in database
-        self.api.update_settings(self.lang, sel["title"])
+        # The current state
+        state = {"language": self.lang, "row_id": sel["title"]}
+        # The state file is written by the background thread after a short
+        # delay
+        self.settings_writer.update(lambda api: self.state.save(state))
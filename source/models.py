@@ -0,0 +1,222 @@
+from collections import OrderedDict
+from typing import Callable
+
+from PyQt5 import QtCore, QtWidgets
+
+class PagedListModel(QtCore.QAbstractListModel):
+    """This class is a list model that fetches its rows in pages.
+
+    It is used by the combo boxes that list the hadith titles, suras and
+    rukus. The model only knows the number of rows. The rows are fetched
+    with the page function when the view asks for them, so only the rows
+    that are shown are created. The fetched pages are kept in a cache and the
+    least recently used page is removed when the cache is full. Each row is a
+    tuple of the text that is shown and the item data.
+
+    Methods
+    -------
+    __init__()
+        Initializes the model and the page cache.
+    set_rows()
+        Replaces the rows of the model.
+    clear()
+        Removes all rows from the model.
+    rowCount()
+        Returns the number of rows.
+    data()
+        Returns the data of the given row for the given role.
+    get_row()
+        Returns the text and item data of the given row.
+    get_stats()
+        Returns the page cache statistics.
+    _get_page()
+        Returns the rows of the given page.
+    """
+
+    def __init__(self, page_size: int = 50, max_pages: int = 8,
+                 parent: QtCore.QObject = None) -> None:
+        """Initializes the model and the page cache.
+
+        :param page_size: The number of rows in each page.
+        :type page_size: int.
+        :param max_pages: The maximum number of cached pages.
+        :type max_pages: int.
+        :param parent: The parent object.
+        :type parent: QtCore.QObject.
+        """
+
+        super().__init__(parent)
+        # The number of rows in each page
+        self.page_size = page_size
+        # The maximum number of cached pages
+        self.max_pages = max_pages
+        # The number of rows
+        self.row_count = 0
+        # The function that fetches the rows. It is called with the position
+        # of the first row and the number of rows
+        self.fetch_page = None
+        # The cached pages, keyed by page number. The least recently used
+        # page is the first item
+        self.pages = OrderedDict()
+        # The number of pages fetched
+        self.fetches = 0
+
+    def set_rows(self, row_count: int, fetch_page: Callable) -> None:
+        """Replaces the rows of the model.
+
+        No rows are fetched until the view asks for them.
+
+        :param row_count: The number of rows.
+        :type row_count: int.
+        :param fetch_page: The function that fetches the rows. It is called
+            with the position of the first row and the number of rows and
+            returns a list of text and item data tuples.
+        :type fetch_page: Callable.
+        """
+
+        self.beginResetModel()
+        self.row_count = row_count
+        self.fetch_page = fetch_page
+        self.pages.clear()
+        self.endResetModel()
+
+    def clear(self) -> None:
+        """Removes all rows from the model.
+        """
+
+        self.set_rows(0, None)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()
+                 ) -> int:
+        """Returns the number of rows.
+
+        :param parent: The parent index. The list has no child rows.
+        :type parent: QtCore.QModelIndex.
+        :return: The number of rows.
+        :rtype: int.
+        """
+
+        # If the parent is a row, it has no child rows
+        if parent.isValid():
+            return 0
+
+        return self.row_count
+
+    def data(self, index: QtCore.QModelIndex,
+             role: int = QtCore.Qt.DisplayRole) -> object:
+        """Returns the data of the given row for the given role.
+
+        :param index: The index of the row.
+        :type index: QtCore.QModelIndex.
+        :param role: The data role. The text is returned for the display and
+            edit roles and the item data is returned for the user role.
+        :type role: int.
+        :return: The data. It is None for other roles.
+        :rtype: object.
+        """
+
+        # If the index is not valid or the role is not supported
+        if (not index.isValid() or role not in (
+                QtCore.Qt.DisplayRole, QtCore.Qt.EditRole,
+                QtCore.Qt.UserRole)):
+            return None
+
+        # The text and item data of the row
+        text, item_data = self.get_row(index.row())
+
+        return item_data if role == QtCore.Qt.UserRole else text
+
+    def get_row(self, row: int) -> tuple:
+        """Returns the text and item data of the given row.
+
+        :param row: The position of the row.
+        :type row: int.
+        :return: The text and item data.
+        :rtype: tuple.
+        """
+
+        return self._get_page(row // self.page_size)[row % self.page_size]
+
+    def get_stats(self) -> dict:
+        """Returns the page cache statistics.
+
+        :return: The number of rows, the number of pages fetched and the
+            numbers of the cached pages.
+        :rtype: dict.
+        """
+
+        # The page cache statistics
+        stats = {
+            "rows": self.row_count,
+            "fetches": self.fetches,
+            "pages": list(self.pages.keys())
+        }
+
+        return stats
+
+    def _get_page(self, page: int) -> list:
+        """Returns the rows of the given page.
+
+        If the page is not cached, it is fetched and added to the cache.
+
+        :param page: The page number.
+        :type page: int.
+        :return: The text and item data of each row in the page.
+        :rtype: list.
+        """
+
+        # If the page is cached
+        if page in self.pages:
+            # The page is marked as the most recently used
+            self.pages.move_to_end(page)
+            return self.pages[page]
+
+        # The position of the first row
+        start = page * self.page_size
+        # The rows of the page are fetched
+        rows = self.fetch_page(start, min(self.page_size,
+                                          self.row_count - start))
+        self.fetches += 1
+        # If the cache is full, the least recently used page is removed
+        if len(self.pages) >= self.max_pages:
+            self.pages.popitem(last=False)
+        self.pages[page] = rows
+
+        return rows
+
+def create_combo_model(combo_box: QtWidgets.QComboBox,
+                       page_size: int = 50,
+                       min_length: int = 20) -> PagedListModel:
+    """Creates a paged list model and sets it as the model of the given combo
+    box.
+
+    The items of the list have the same height, so the list only asks for
+    the rows it shows. The list is shown below the combo box instead of in a
+    popup over it. The popup is made wide enough for the text of every row,
+    so it would fetch all rows. The size of the combo box is given by a
+    number of characters instead of the text of its rows for the same
+    reason.
+
+    :param combo_box: The combo box.
+    :type combo_box: QtWidgets.QComboBox.
+    :param page_size: The number of rows in each page.
+    :type page_size: int.
+    :param min_length: The number of characters shown by the combo box.
+    :type min_length: int.
+    :return: The model.
+    :rtype: PagedListModel.
+    """
+
+    # The model is owned by the combo box
+    model = PagedListModel(page_size, parent=combo_box)
+    combo_box.setModel(model)
+    # The size of the combo box does not depend on the text of the rows
+    combo_box.setSizeAdjustPolicy(
+        QtWidgets.QComboBox.AdjustToMinimumContentsLengthWithIcon)
+    combo_box.setMinimumContentsLength(min_length)
+    # The rows of the popup list are not measured one by one
+    combo_box.view().setUniformItemSizes(True)
+    # The list is shown below the combo box
+    combo_box.setStyleSheet("combobox-popup: 0;")
+
+    return model
@@ -0,0 +1,207 @@
+import os, sys, json, time
+from typing import Callable
+
+from PyQt5 import QtCore
+
+# The time at which the profiler module was imported. The readers import this
+# module before the other modules, so the time taken by the imports is
+# included in the startup profile
+START_TIME = time.perf_counter()
+# The environment variable that enables the startup profiler. Its value is
+# the path of the json file
+PROFILE_ENV = "IC_PROFILE_STARTUP"
+# The command line option that enables the startup profiler
+PROFILE_OPTION = "--profile-startup"
+# The command line option that disables the lazy startup
+EAGER_OPTION = "--eager-startup"
+# The default path of the json file
+DEFAULT_PROFILE_PATH = "startup-profile.json"
+
+class StartupProfiler():
+    """This class is used to record the duration of each startup phase.
+
+    Each phase ends when it is marked. It starts when the previous phase was
+    marked. The first phase starts when the module is imported. If the
+    profiler is disabled, then the phases are not recorded.
+
+    Methods
+    -------
+    from_args()
+        Creates a profiler from the command line arguments.
+    is_lazy()
+        Checks if the lazy startup mode is used.
+    mark()
+        Ends the current phase and records its duration.
+    get_phases()
+        Returns the recorded phases.
+    save()
+        Saves the recorded phases to the json file.
+    """
+
+    def __init__(self, path: str = None, mode: str = "lazy") -> None:
+        """Initializes the profiler.
+
+        :param path: The path of the json file. If it is None, then the
+            profiler is disabled.
+        :type path: str.
+        :param mode: The startup mode. It is "lazy" or "eager".
+        :type mode: str.
+        """
+
+        # The path of the json file
+        self.path = path
+        # The profiler is enabled if the path is given
+        self.enabled = path is not None
+        # The startup mode
+        self.mode = mode
+        # The recorded phases
+        self.phases = []
+        # The time at which the previous phase ended
+        self.last_time = START_TIME
+
+    @classmethod
+    def from_args(cls, argv: list) -> "StartupProfiler":
+        """Creates a profiler from the command line arguments.
+
+        The profiler is enabled by the --profile-startup[=path] option or by
+        the IC_PROFILE_STARTUP environment variable. The --eager-startup
+        option sets the startup mode to "eager". The options are removed from
+        the argument list, so they are not passed to QApplication.
+
+        :param argv: The command line arguments.
+        :type argv: list.
+        :return: The profiler.
+        :rtype: StartupProfiler.
+        """
+
+        # The path of the json file is read from the environment
+        path = os.environ.get(PROFILE_ENV)
+        # The startup mode
+        mode = "lazy"
+        # Each command line argument is checked
+        for arg in list(argv[1:]):
+            # If the argument enables the profiler
+            if arg == PROFILE_OPTION:
+                path = DEFAULT_PROFILE_PATH
+            elif arg.startswith(PROFILE_OPTION + "="):
+                path = arg[len(PROFILE_OPTION) + 1:]
+            # If the argument disables the lazy startup
+            elif arg == EAGER_OPTION:
+                mode = "eager"
+            else:
+                continue
+            # The option is removed from the argument list
+            argv.remove(arg)
+
+        return cls(path, mode)
+
+    def is_lazy(self) -> bool:
+        """Checks if the lazy startup mode is used.
+
+        :return: True if the lazy startup mode is used.
+        :rtype: bool.
+        """
+
+        return self.mode == "lazy"
+
+    def mark(self, name: str) -> None:
+        """Ends the current phase and records its duration.
+
+        :param name: The name of the phase.
+        :type name: str.
+        """
+
+        # If the profiler is disabled
+        if not self.enabled:
+            return
+
+        # The current time
+        now = time.perf_counter()
+        # The phase is recorded. The times are in milliseconds
+        self.phases.append({
+            "name": name,
+            "start": round((self.last_time - START_TIME) * 1000, 3),
+            "end": round((now - START_TIME) * 1000, 3),
+            "duration": round((now - self.last_time) * 1000, 3)
+        })
+        # The end time of the phase is saved
+        self.last_time = now
+
+    def get_phases(self) -> list:
+        """Returns the recorded phases.
+
+        :return: The list of phases. Each phase contains the name, start
+            time, end time and duration in milliseconds.
+        :rtype: list.
+        """
+
+        return self.phases
+
+    def save(self) -> None:
+        """Saves the recorded phases to the json file.
+
+        The file contains the startup mode, the total startup time and the
+        list of phases. The total time is the end time of the last phase.
+        """
+
+        # If the profiler is disabled
+        if not self.enabled:
+            return
+
+        # The profile data
+        data = {
+            "mode": self.mode,
+            "total": self.phases[-1]["end"] if self.phases else 0,
+            "phases": self.phases
+        }
+        try:
+            # The profile data is written to the json file
+            with open(self.path, "w") as fh:
+                json.dump(data, fh, indent=2)
+        except OSError as e:
+            print("Startup profile could not be saved: " + str(e),
+                  file=sys.stderr)
+
+class FirstPaintFilter(QtCore.QObject):
+    """This class is used to run a function after the first paint of a widget.
+
+    The filter is installed on the widget. When the widget is painted for the
+    first time, the filter removes itself and the function is called from the
+    event loop once the paint event has been handled.
+
+    Methods
+    -------
+    eventFilter()
+        Checks the widget events for the first paint event.
+    """
+
+    def __init__(self, callback: Callable) -> None:
+        """Initializes the filter.
+
+        :param callback: The function to call after the first paint.
+        :type callback: Callable.
+        """
+
+        super().__init__()
+        # The function to call after the first paint
+        self.callback = callback
+
+    def eventFilter(self, obj: QtCore.QObject, event: QtCore.QEvent) -> bool:
+        """Checks the widget events for the first paint event.
+
+        :param obj: The widget.
+        :type obj: QtCore.QObject.
+        :param event: The widget event.
+        :type event: QtCore.QEvent.
+        :return: False, so the event is handled by the widget.
+        :rtype: bool.
+        """
+
+        # If the widget is painted
+        if event.type() == QtCore.QEvent.Paint:
+            # The filter is removed, so the function is called only once
+            obj.removeEventFilter(self)
+            # The function is called after the paint event is handled
+            QtCore.QTimer.singleShot(0, self.callback)
+
+        return False
@@ -1,6 +1,45 @@
-import os, sys
+import os, sys, time
+from collections import OrderedDict
+from typing import NamedTuple
 
 from source.api import Api
+from source.qindex import QuranIndex
+from source.search import SearchIndexError, to_match_query
+
+
+class LangMeta(NamedTuple):
+    """The meta data for a quran translation language.
+    """
+
+    # The language name
+    language: str
+    # The name of the db table that contains the translated text
+    tbl_name: str
+    # Indicates if the language is written right to left
+    rtl: bool
+    # The font family used to display the text
+    font_family: str
+    # The font size used to display the text
+    font_size: int
+
+
+class AyatRecord(NamedTuple):
+    """An ayat of a quran translation, as streamed by iter_ayat_text.
+    """
+
+    # The row id
+    id: int
+    # The sura number
+    sura: int
+    # The transliterated sura name
+    sura_name: str
+    # The ayat number within the sura
+    ayat: int
+    # The ruku number within the sura
+    ruku: int
+    # The ayat text
+    text: str
+
 
 class QuranApi(Api):
     """
@@ -14,6 +53,8 @@ class QuranApi(Api):
 
     set_lang()
         Sets the language for the ayat text.
+    get_lang_meta()
+        Gets the meta data for the given language.
     is_rtl()
         Check if the given language is rtl.
     get_font_details()
@@ -30,15 +71,46 @@ class QuranApi(Api):
         Fetches the start and end ayat for the given sura and ruku.
     get_ayat_text()
         Fetches the ayat text for the given sura and ruku.,
+    get_ayat_text_multi()
+        Fetches the ayat text of the given sura and ruku in several
+        languages.
+    iter_ayat_text()
+        Yields each ayat of the given language in order.
     get_random_ruku()
         Fetches details for a randomly choosen ruku.
-    update_settings()
-        Updates the current settings in database.
+    get_next_ruku()
+        Returns the ruku after the given sura and ruku.
+    get_prev_ruku()
+        Returns the ruku before the given sura and ruku.
+    get_sura_short_name()
+        Returns the transliterated name of the given sura.
+    get_settings()
+        Reads the settings saved in the database by older versions.
+    get_row_id()
+        Returns the row id of the given sura and ayat.
     get_row()
         Gets the field values for the given row.
+    search()
+        Searches the ayat text of the given language.
+    has_search_index()
+        Checks if the search index for the given language exists.
+    build_search_index()
+        Builds the search index for the given language.
+    build_meta_index()
+        Creates a covering index on the ayat meta data.
+    _get_fts_tbl_name()
+        Gets the name of the search index table for the given language.
+    _has_meta_ids()
+        Checks if the row ids of a text table match the ayat meta data.
+    _load_index()
+        Loads the sura and ruku navigation index from database.
+    _load_lang_meta()
+        Loads the meta data for all languages from database.
     """
 
-    def __init__(self, db_path: str, default_lang: str) -> None:
+    def __init__(self, db_path: str, default_lang: str,
+                 con_name: str = None, profile: dict = None,
+                 backend: str = "qtsql", snapshot_path: str = None) -> None:
         """It creates a connection to the sqlite3 database and sets the default
         language.
 
@@ -46,10 +118,32 @@ class QuranApi(Api):
         :type db_path: str.
         :param default_lang: The default language.
         :type default_lang: str.
+        :param con_name: The name of the database connection. If it is not
+            given, then a pooled connection of the current thread is used.
+        :type con_name: str.
+        :param profile: The connection profile. If the database is opened
+            read only, then the search indexes are not built on demand.
+        :type profile: dict.
+        :param backend: The database backend. It can be "qtsql" or "sqlite".
+        :type backend: str.
+        :param snapshot_path: The path of the meta data snapshot. If it
+            matches the database, then the navigation index and language
+            meta data are read from it.
+        :type snapshot_path: str.
         """
         
         # The parent class constructor is called
-        super().__init__(db_path)
+        super().__init__(db_path, con_name=con_name, profile=profile,
+                         backend=backend, snapshot_path=snapshot_path)
+        # The sura and ruku navigation index is loaded
+        self.index = self._load_index()
+        # The meta data for all languages is loaded
+        self.lang_meta = self._load_lang_meta()
+        # The languages whose search index is known to exist
+        self.search_indexes = set()
+        # Indicates if the row ids of each checked text table match the row
+        # ids of the ayat meta data, keyed by table name
+        self.meta_ids = {}
         # The default language is set
         self.set_lang(default_lang)
 
@@ -66,45 +160,65 @@ class QuranApi(Api):
         # Returns the name of the db table for the given language
         self.tbl = self._get_db_tbl_name(lang)        
 
+    def get_lang_meta(self, lang: str) -> LangMeta:
+        """Gets the meta data for the given language.
+
+        The meta data is read from the language meta data cache.
+
+        :param lang: The language.
+        :type lang: str.
+        :return: The table name, text direction and font for the language.
+        :rtype: LangMeta.
+        """
+
+        return self.lang_meta[lang]
+
     def get_lang_list(self) -> list:
-        """Gets the list of all supported languages from database.
+        """Gets the list of all supported languages.
         """
 
-        sql = "SELECT language FROM ic_quranic_tbl_meta_data "
-        sql += "ORDER BY language ASC"
+        return list(self.lang_meta.keys())
 
-        # The required language list
-        lang_list = []
-        # The language data is fetched
-        rows = self._fetch_data(sql, [], 1)
-        # Each row is added to a list
-        for row in rows:
-                lang_list.append(row[0])
+    def get_settings(self) -> dict:
+        """Reads the settings saved in the database by older versions.
 
-        return lang_list
+        The settings are now saved in the state file. They are read from the
+        database when the state file does not exist yet.
 
-    def update_settings(self, lang: str, sura:int, ayat_id:int) -> None:
-        """Updates the current settings in database.
-        
-        :param lang: The current language.
-        :type lang: string
-        :param sura: The current sura.
-        :type sura: int
-        :param ayat_id: The start ayat id.
-        :type ayat_id: int
+        :return: The language and row id. It is None if the database does not
+            contain the settings table or the table is empty.
+        :rtype: dict.
         """
 
+        # If the settings table does not exist
+        if not self._table_exists("ic_quranic_settings"):
+            return None
+
         # The sql query
-        sql = "SELECT id FROM `" + self.tbl + "` WHERE sura=? AND "
-        sql += "sura_ayat_id=?"
-        
-        # The language data is fetched
-        rows = self._fetch_data(sql, [sura, ayat_id], 1)
-        
-        # The bind values for the query
-        bind_values = [lang, rows[0][0]]
-        sql = "UPDATE ic_quranic_settings SET language=?, row_id=?"
-        self._update_data(sql, bind_values)
+        sql = "SELECT language, row_id FROM `ic_quranic_settings`"
+        # The settings data is fetched
+        row = self._fetch_row(sql, [], 2)
+        # If the settings table is empty
+        if row is None:
+            return None
+
+        return {"language": row[0], "row_id": row[1]}
+
+    def get_row_id(self, sura: int, ayat_id: int) -> int:
+        """Returns the row id of the given sura and ayat.
+
+        The row id is fetched from the navigation index.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :param ayat_id: The ayat number in the sura.
+        :type ayat_id: int.
+        :return: The row id.
+        :rtype: int.
+        :raises IndexError: If the sura or ayat is not in the quran.
+        """
+
+        return self.index.get_row_id(sura, ayat_id)
         
     def get_font_details(self, lang:str) -> dict:
         """Gets the font family and font size for the given language.
@@ -113,16 +227,12 @@ class QuranApi(Api):
         :type lang: string.        
         """
 
-        # The sql query
-        sql = "SELECT font_family, font_size FROM ic_quranic_tbl_meta_data"
-        sql += " WHERE language=?"        
-        
-        # The language data is fetched
-        rows = self._fetch_data(sql, [lang], 2)
+        # The language meta data
+        meta = self.get_lang_meta(lang)
         # The font details
         font_details = {}
-        font_details["family"] = rows[0][0]
-        font_details["size"] = int(rows[0][1])        
+        font_details["family"] = meta.font_family
+        font_details["size"] = meta.font_size
     
         return font_details
 
@@ -133,15 +243,7 @@ class QuranApi(Api):
         :type lang: string.        
         """
 
-        # The sql query
-        sql = "SELECT rtl FROM ic_quranic_tbl_meta_data WHERE language=?"        
-        
-        # The language data is fetched
-        rows = self._fetch_data(sql, [lang], 1)
-        # The rtl value
-        rtl = bool(rows[0][0])
-        
-        return rtl
+        return self.get_lang_meta(lang).rtl
 
     def _get_db_tbl_name(self, lang: str) -> str:
         """Gets the name of the db table for the given language.
@@ -150,37 +252,62 @@ class QuranApi(Api):
         :type lang: string.        
         """
 
-        # The sql query
-        sql = "SELECT tbl_name FROM ic_quranic_tbl_meta_data WHERE language=?"        
-        
-        # The language data is fetched
-        rows = self._fetch_data(sql, [lang], 1)
-        # The table name
-        tbl_name = rows[0][0]
-
-        return tbl_name
+        return self.get_lang_meta(lang).tbl_name
 
     def get_random_ruku(self) -> dict:
-        """It fetches and returns the sura id and sura ruku id of a random ruku.       
+        """It returns the sura id and sura ruku id of a random ruku.
+
+        Each ruku is selected with the same probability. The seed and mode
+        of the selection are set with the set_sampler function.
 
         :return: The sura id and sura ruku id of a random ruku.
         :rtype: dict.            
         """
 
-        sql = "SELECT sura, sura_ruku FROM ic_quranic_meta_data "
-        sql += "ORDER BY random() LIMIT 0,1"
+        # The sampler of the rukus
+        sampler = self._get_sampler("rukus", self.index.get_ruku_total())
+
+        return self.index.get_ruku_details(sampler.get_next())
+
+    def get_next_ruku(self, sura: int, ruku: int) -> dict:
+        """It returns the sura id and sura ruku id of the next ruku.
+
+        The ruku after the last ruku of the last sura is the first ruku of
+        the first sura.
+
+        :param sura: The sura number.
+        :type sura: int.        
+        :param ruku: The ruku number
+        :type ruku: int.
+        :return: The sura id and sura ruku id of the next ruku.
+        :rtype: dict.            
+        """
 
-        # The ruku data is fetched
-        rows = self._fetch_data(sql, [], 2)
+        return self.index.get_next_ruku(sura, ruku)
 
-        # The required ruku details
-        ruku_details = {"sura": rows[0][0], "sura_ruku": rows[0][1]}
+    def get_prev_ruku(self, sura: int, ruku: int) -> dict:
+        """It returns the sura id and sura ruku id of the previous ruku.
 
-        return ruku_details
+        The ruku before the first ruku of the first sura is the last ruku of
+        the last sura.
+
+        :param sura: The sura number.
+        :type sura: int.        
+        :param ruku: The ruku number
+        :type ruku: int.
+        :return: The sura id and sura ruku id of the previous ruku.
+        :rtype: dict.            
+        """
+
+        return self.index.get_prev_ruku(sura, ruku)
 
     def get_ayat_text(self, sura: int, ruku: int) -> list:
         """It fetches and returns the ayat text for the given sura and ruku.
 
+        The ayas are read by primary key range if the row ids of the text
+        table are the same as the row ids of the ayat meta data. Otherwise
+        the ayas are read by sura and ayat number.
+
         :param sura: The sura number.
         :type sura: int.        
         :param ruku: The ruku number
@@ -189,47 +316,146 @@ class QuranApi(Api):
         :rtype: list.
         """
 
-        # The required list of ayas
-        ayat_list = []
-        # The range of ayas is fetched
-        data = self.get_ayat_range(sura, ruku)
-        # The bind values for the sql query
-        args = [str(sura), str(data['start']), str(data['end'])]
+        # If the row ids of the text table match the ayat meta data
+        if self._has_meta_ids(self.tbl):
+            # The range of row ids is fetched from the navigation index
+            args = list(self.index.get_id_range(sura, ruku))
+            # The sql query. The ayas are read by primary key range
+            sql = "SELECT translated_text FROM `" + self.tbl + "`"
+            sql += " WHERE id>=? AND id<=? ORDER BY id ASC"
+        else:
+            # The range of ayas
+            data = self.index.get_ayat_range(sura, ruku)
+            args = [sura, data["start"], data["end"]]
+            # The sql query. The ayas are read by sura and ayat number
+            sql = "SELECT translated_text FROM `" + self.tbl + "`"
+            sql += " WHERE sura=? AND sura_ayat_id>=? AND sura_ayat_id<=?"
+            sql += " ORDER BY sura_ayat_id ASC"
+
+        # The ayat text is fetched as a flat list
+        ayat_list = self._fetch_column(sql, args)
 
-        # The sql query
-        sql = "SELECT translated_text FROM `" + self.tbl + "`"
-        sql += " WHERE sura=?"
-        sql += " and sura_ayat_id>=?"
-        sql += " and sura_ayat_id<=?"
+        return ayat_list
 
-        # The required data is fetched
-        rows = self._fetch_data(sql, args, 1)
-        # Each row is checked
-        for row in rows:
-                ayat_list.append(row[0])
+    def get_ayat_text_multi(self, sura: int, ruku: int,
+                            langs: list) -> OrderedDict:
+        """It returns the ayat text of the given ruku in each given language.
 
-        return ayat_list
+        The text tables whose row ids match the ayat meta data are read by
+        primary key range with a single UNION ALL query, so the ayat text of
+        the ruku is fetched in one database call. Each part of the query
+        selects the position of its language and the row id, and the rows
+        are ordered by both, so the ayas are split into languages by the
+        returned position. The ayas of the other languages are read by sura
+        and ayat number. The current language is not changed.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :param ruku: The ruku number.
+        :type ruku: int.
+        :param langs: The languages.
+        :type langs: list.
+        :return: The list of ayas in each language, keyed by language and in
+            the order of the given languages.
+        :rtype: OrderedDict.
+        """
+
+        # The required ayat text of each language
+        ayat_texts = OrderedDict((lang, []) for lang in langs)
+        # If no languages are given
+        if len(ayat_texts) == 0:
+            return ayat_texts
+
+        # The languages in the order of their position in the query
+        lang_list = list(ayat_texts)
+        # The name of the text table of each language
+        tbl_names = [self.get_lang_meta(lang).tbl_name for lang in lang_list]
+        # The select query for each language whose row ids match the ayat
+        # meta data. The position of the language is selected, so the rows
+        # of each language can be found
+        selects = []
+        # The positions of the languages that are read by sura and ayat
+        others = []
+        for pos, tbl in enumerate(tbl_names):
+            if self._has_meta_ids(tbl):
+                selects.append("SELECT " + str(pos) + ", id, translated_text" +
+                               " FROM `" + tbl + "` WHERE id>=? AND id<=?")
+            else:
+                others.append(pos)
+
+        # If a text table is read by primary key range
+        if selects:
+            # The range of row ids is fetched from the navigation index
+            first_id, last_id = self.index.get_id_range(sura, ruku)
+            # The sql query. The rows are ordered by language position and
+            # row id
+            sql = " UNION ALL ".join(selects) + " ORDER BY 1, 2"
+            # The ayat text of the languages is fetched
+            rows = self._fetch_data(
+                sql, [first_id, last_id] * len(selects), 3)
+            # The ayas are added to the list of their language
+            for row in rows:
+                ayat_texts[lang_list[int(row[0])]].append(row[2])
+
+        # If a text table is read by sura and ayat number
+        if others:
+            # The range of ayas
+            data = self.index.get_ayat_range(sura, ruku)
+            for pos in others:
+                # The sql query. The ayas are read by sura and ayat number
+                sql = "SELECT translated_text FROM `" + tbl_names[pos] + "`"
+                sql += " WHERE sura=? AND sura_ayat_id>=? AND sura_ayat_id<=?"
+                sql += " ORDER BY sura_ayat_id ASC"
+                ayat_texts[lang_list[pos]] = self._fetch_column(
+                    sql, [sura, data["start"], data["end"]])
+
+        return ayat_texts
+
+    def iter_ayat_text(self, lang: str):
+        """It yields each ayat of the given language in order.
+
+        The ayas are read from the database one at a time, so all ayas of a
+        translation can be read without keeping them in memory.
+
+        :param lang: The language.
+        :type lang: str.
+        :return: The ayas of the language.
+        :rtype: Iterator[AyatRecord].
+        """
+
+        # The name of the text table
+        tbl = self.get_lang_meta(lang).tbl_name
+        # The sql query. The sura names and rukus are read from the meta
+        # data. The ayat meta data is joined by sura and ayat number, so the
+        # row ids of the text table do not need to match the meta data
+        sql = "SELECT t.id, t.sura, s.tname, t.sura_ayat_id, m.sura_ruku,"
+        sql += " t.translated_text FROM `" + tbl + "` t"
+        sql += " JOIN ic_quranic_meta_data m ON m.sura=t.sura"
+        sql += " AND m.sura_ayat_id=t.sura_ayat_id"
+        sql += " JOIN ic_quranic_suras_meta s ON s.sindex=t.sura"
+        sql += " ORDER BY t.id ASC"
+
+        return self._iter_data(sql, [], 6, AyatRecord)
 
     def get_sura_names(self) -> list:
-        """It fetches and returns list of all sura names from database.
+        """It returns list of all sura names.
 
         :return: The list of sura names.
         :rtype: list.
         """
 
-        sura_list = []
-        sql = "SELECT tname, ename FROM ic_quranic_suras_meta"
+        return self.index.get_sura_names()
 
-        # The required data is fetched
-        rows = self._fetch_data(sql, [], 2)
-        # Each row is checked
-        for row in rows:
-            # The sura name
-            sura_name = (row[0] + " (" + row[1] + ")")
-            # The sura name is appended to the sura list
-            sura_list.append(sura_name)                
+    def get_sura_short_name(self, sura: int) -> str:
+        """It returns the transliterated name of the given sura.
+
+        :param sura: The sura number.
+        :type sura: int.            
+        :return: The transliterated sura name.
+        :rtype: str.
+        """
 
-        return sura_list
+        return self.index.get_sura_short_name(sura)
 
     def get_ruku_count(self, sura: int) -> int:
         """It returns the number of rukus in the given sura.
@@ -240,17 +466,7 @@ class QuranApi(Api):
         :rtype: int.
         """
 
-        # The bind values for the sql query
-        args = [sura]
-        # The sql query
-        sql  = "SELECT rukus FROM ic_quranic_suras_meta WHERE sindex=?"
-
-        # The required data is fetched
-        rows = self._fetch_data(sql, args, 1)
-        # The ruku count
-        ruku_count = int(rows[0][0])
-
-        return ruku_count
+        return self.index.get_ruku_count(sura)
 
     def get_ayat_range(self, sura: int, ruku: int) -> dict:
         """It returns the start and end ayat number for the given sura and ruku.
@@ -263,30 +479,7 @@ class QuranApi(Api):
         :rtype: dict.    
         """
 
-        # The bind values for the sql query
-        args = [sura, ruku]
-        # The required ayat data
-        ayat_data = {"start": "1", "end": "1"}
-
-        # The sql query for start ayat
-        sql = "SELECT sura_ayat_id FROM ic_quranic_meta_data"
-        sql += " WHERE sura=?"
-        sql += " AND sura_ruku=?"
-        query = sql + " ORDER BY id ASC"
-
-        # The required data is fetched
-        rows = self._fetch_data(query, args, 1)
-        # The start ayat
-        ayat_data['start'] = rows[0][0]
-
-        # The sql query for end ayat
-        query = sql + " ORDER BY id DESC"
-        # The required data is fetched
-        rows = self._fetch_data(query, args, 1)
-        # The end ayat
-        ayat_data['end'] = rows[0][0]
-
-        return ayat_data
+        return self.index.get_ayat_range(sura, ruku)
 
     def get_row(self, row_id: int) -> list:
         """It returns the field values for the given row.
@@ -294,17 +487,291 @@ class QuranApi(Api):
         :param row_id: The row id.
         :type row_id: int.                    
         :return: The field values for the given row.
-        :rtype: list.    
+        :rtype: list.
+        :raises IndexError: If the row id is not in the quran.
         """
 
-        # The bind values for the sql query
-        args = [row_id]
+        # The sura and ruku that contain the row
+        ruku_details = self.index.get_row(row_id)
+        # The required field values
+        rows = [[ruku_details["sura"], ruku_details["sura_ruku"]]]
+  
+        return rows
+
+    def search(self, query: str, lang: str, limit: int = 20,
+               offset: int = 0) -> list:
+        """It searches the ayat text of the given language.
+
+        The results are ranked using the bm25 function. The search index is
+        built if it does not exist. If the database is read only, then the
+        index is not built and an error is raised.
+
+        :param query: The search text entered by the user.
+        :type query: str.
+        :param lang: The language to search.
+        :type lang: str.
+        :param limit: The maximum number of results.
+        :type limit: int.
+        :param offset: The number of results to skip.
+        :type offset: int.
+        :return: The sura, ayat, ruku, reference, snippet and rank of each
+            matching ayat.
+        :rtype: list.
+        :raises SearchIndexError: If the search index is not built and the
+            database is read only.
+        """
 
+        # The required search results
+        results = []
+        # The search text is converted to a match query
+        match = to_match_query(query)
+        # If the search text has no words
+        if match == "":
+            return results
+
+        # If the search index does not exist
+        if not self.has_search_index(lang):
+            # If the database is read only, the index cannot be built
+            if self.read_only:
+                raise SearchIndexError(
+                    "The %s search index is not built. It is built using the "
+                    "command: python -m source.search quran" % lang)
+            # The search index is built
+            self.build_search_index(lang)
+
+        # The name of the text table
+        tbl = self._get_db_tbl_name(lang)
+        # The name of the search index table
+        fts = "`" + self._get_fts_tbl_name(lang) + "`"
         # The sql query
-        sql = "SELECT sura, sura_ruku FROM `ic_quranic_meta_data`"
-        sql += " WHERE id=?"        
+        sql = "SELECT t.sura, t.sura_ayat_id, t.id,"
+        sql += " snippet(" + fts + ", 0, '<b>', '</b>', '...', 16), rank"
+        sql += " FROM " + fts + " JOIN `" + tbl + "` t ON t.id=" + fts
+        sql += ".rowid WHERE " + fts + " MATCH ?"
+        sql += " ORDER BY rank LIMIT ? OFFSET ?"
+
+        # The matching ayas are fetched
+        rows = self._iter_data(sql, [match, limit, offset], 5)
+        # Each row is added to the search results
+        for row in rows:
+            # The ruku that contains the ayat
+            ruku_details = self.index.get_row(row[2])
+            # The search result
+            result = {
+                "sura": row[0],
+                "ayat": row[1],
+                "ruku": ruku_details["sura_ruku"],
+                "ref": str(row[0]) + ":" + str(row[1]),
+                "snippet": row[3],
+                "rank": row[4]
+            }
+            results.append(result)
+
+        return results
+
+    def has_search_index(self, lang: str) -> bool:
+        """It checks if the search index for the given language exists.
+
+        :param lang: The language.
+        :type lang: str.
+        :return: True if the search index exists.
+        :rtype: bool.
+        """
+
+        # If the search index is known to exist
+        if lang in self.search_indexes:
+            return True
+
+        # If the search index exists
+        if self._table_exists(self._get_fts_tbl_name(lang)):
+            self.search_indexes.add(lang)
+
+        return lang in self.search_indexes
 
+    def build_search_index(self, lang: str) -> dict:
+        """It builds the search index for the given language.
+
+        The index is an FTS5 table that uses the text table of the language
+        as its content, so the ayat text is not copied. An existing index is
+        rebuilt.
+
+        :param lang: The language.
+        :type lang: str.
+        :return: The number of indexed rows, the time taken in seconds and the
+            size of the index in bytes.
+        :rtype: dict.
+        """
+
+        # The start time
+        start_time = time.perf_counter()
+        # The name of the text table
+        tbl = self._get_db_tbl_name(lang)
+        # The name of the search index table
+        fts = self._get_fts_tbl_name(lang)
+        # The size of the database before the index is built
+        size = self._get_db_size()
+
+        # The sql query for removing the old index
+        sql = "DROP TABLE IF EXISTS `" + fts + "`"
+        self._update_data(sql, [])
+        # The sql query for creating the index
+        sql = "CREATE VIRTUAL TABLE `" + fts + "` USING fts5("
+        sql += "translated_text, content='" + tbl + "', content_rowid='id',"
+        sql += " tokenize='unicode61 remove_diacritics 2')"
+        self._update_data(sql, [])
+        # The sql query for indexing the ayat text
+        sql = "INSERT INTO `" + fts + "`(`" + fts + "`) VALUES('rebuild')"
+        self._update_data(sql, [])
+
+        # The number of indexed rows
+        rows = self._fetch_data("SELECT COUNT(*) FROM `" + tbl + "`", [], 1)
+        # The search index is marked as existing
+        self.search_indexes.add(lang)
+
+        # The index build statistics
+        stats = {
+            "rows": rows[0][0],
+            "time": time.perf_counter() - start_time,
+            "size": self._get_db_size() - size
+        }
+
+        return stats
+
+    def _get_fts_tbl_name(self, lang: str) -> str:
+        """Gets the name of the search index table for the given language.
+                
+        :param lang: The language.
+        :type lang: string.        
+        """
+
+        return self._get_db_tbl_name(lang) + "_fts"
+
+    def _has_meta_ids(self, tbl: str) -> bool:
+        """Checks if the row ids of the given text table match the ayat meta
+        data.
+
+        The row ids match if each row of the text table has the sura and
+        ayat number of the meta data row with the same id. The check is run
+        once for each table, when the table is first read.
+
+        :param tbl: The name of the text table.
+        :type tbl: str.
+        :return: True if the row ids match the ayat meta data.
+        :rtype: bool.
+        """
+
+        # If the table has not been checked
+        if tbl not in self.meta_ids:
+            # The sql query for the number of rows that match the meta data
+            sql = "SELECT count(*) FROM `" + tbl + "` t"
+            sql += " JOIN ic_quranic_meta_data m ON m.id=t.id"
+            sql += " AND m.sura=t.sura AND m.sura_ayat_id=t.sura_ayat_id"
+            matched = self._fetch_row(sql, [], 1)[0]
+            # The sql query for the number of rows
+            sql = "SELECT count(*) FROM `" + tbl + "`"
+            total = self._fetch_row(sql, [], 1)[0]
+            self.meta_ids[tbl] = (int(matched) == int(total))
+
+        return self.meta_ids[tbl]
+
+    def build_meta_index(self) -> None:
+        """It creates a covering index on the ayat meta data.
+
+        The index allows the rukus to be grouped by sura and ruku without
+        reading or sorting the table rows. It is only created if the
+        database does not already contain it. It is created by the
+        source.search command, since the readers open the database read
+        only.
+        """
+
+        # The sql query for creating the index
+        sql = "CREATE INDEX IF NOT EXISTS ic_quranic_meta_data_ruku"
+        sql += " ON ic_quranic_meta_data"
+        sql += " (sura, sura_ruku, id, sura_ayat_id)"
+        # The index is created
+        self._update_data(sql, [])
+
+    def _load_index(self) -> QuranIndex:
+        """It loads the sura and ruku navigation index from database.
+
+        The start ayat, end ayat and first row id of each ruku are read from
+        the ayat meta data. The names and ruku counts of each sura are read
+        from the sura meta data. The query uses the covering index on the
+        ayat meta data if it has been built. If the meta data snapshot is
+        loaded, then the index arrays are read from the snapshot instead.
+
+        :return: The navigation index.
+        :rtype: QuranIndex.    
+        """
+
+        # If the snapshot contains the navigation index
+        if self.snapshot is not None and self.snapshot.has("quran.ruku_sura"):
+            # The index uses the arrays of the snapshot
+            index = QuranIndex()
+            index.set_arrays({
+                "ruku_sura": self.snapshot.get_array("quran.ruku_sura"),
+                "ruku_start": self.snapshot.get_array("quran.ruku_start"),
+                "ruku_end": self.snapshot.get_array("quran.ruku_end"),
+                "ruku_first_id": self.snapshot.get_array(
+                    "quran.ruku_first_id"),
+                "sura_offset": self.snapshot.get_array("quran.sura_offset"),
+                "sura_tnames": self.snapshot.get_strings("quran.sura_tnames"),
+                "sura_names": self.snapshot.get_strings("quran.sura_names")
+            })
+            return index
+
+        # The sura, ruku, start ayat, end ayat and first row id of each ruku
+        # are fetched with a single aggregate query
+        sql = "SELECT sura, sura_ruku, MIN(sura_ayat_id), MAX(sura_ayat_id),"
+        sql += " MIN(id) FROM ic_quranic_meta_data"
+        sql += " GROUP BY sura, sura_ruku ORDER BY sura ASC, sura_ruku ASC"
         # The required data is fetched
-        rows = self._fetch_data(sql, args, 2)
-  
-        return rows
\ No newline at end of file
+        ruku_rows = self._fetch_data(sql, [], 5)
+
+        # The sql query for the sura meta data
+        sql = "SELECT tname, ename, rukus FROM ic_quranic_suras_meta"
+        sql += " ORDER BY sindex ASC"
+        # The required data is fetched
+        sura_rows = self._fetch_data(sql, [], 3)
+
+        # The navigation index is created
+        index = QuranIndex(ruku_rows, sura_rows)
+
+        return index
+
+    def _load_lang_meta(self) -> OrderedDict:
+        """It loads the meta data for all languages from database.
+
+        The language meta data does not change while the application runs, so
+        it is read once and kept in memory. It is read from the meta data
+        snapshot if the snapshot is loaded.
+
+        :return: The language meta data, keyed by language and ordered by
+            language.
+        :rtype: OrderedDict.
+        """
+
+        # If the snapshot contains the language meta data
+        if self.snapshot is not None and self.snapshot.has("quran.languages"):
+            # The meta data of each language is read from the snapshot
+            rows = zip(self.snapshot.get_strings("quran.languages"),
+                       self.snapshot.get_strings("quran.tbl_names"),
+                       self.snapshot.get_array("quran.rtl"),
+                       self.snapshot.get_strings("quran.font_families"),
+                       self.snapshot.get_array("quran.font_sizes"))
+            rows = map(LangMeta._make, rows)
+        else:
+            # The sql query
+            sql = "SELECT language, tbl_name, rtl, font_family, font_size"
+            sql += " FROM ic_quranic_tbl_meta_data ORDER BY language ASC"
+            # The language data is read as records
+            rows = self._iter_data(sql, [], 5, LangMeta)
+
+        # The required language meta data
+        lang_meta = OrderedDict()
+        # Each row is added to the language meta data
+        for row in rows:
+            lang_meta[row.language] = row._replace(
+                rtl=bool(row.rtl), font_size=int(row.font_size))
+
+        return lang_meta
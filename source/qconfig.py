@@ -11,14 +11,48 @@ class QConfig():
             "db_path": "source/data/quran.db",
             "font_dir": "./source/data/fonts", 
             "random_icon_path": "source/data/random.png",
-            "default_lang": "Urdu"
+            "default_lang": "Urdu",
+            "page_cache_size": 4 * 1024 * 1024,
+            "prefetch_depth": 1,
+            "settings_delay": 1000,
+            "state_path": "~/.config/islamcompanion/quran.json",
+            "snapshot_path": "source/data/quran.snap",
+            "random_seed": None,
+            "random_no_repeat": False,
+            "parallel_langs": ["Arabic", "English"],
+            "db_backend": "qtsql",
+            "db_profile": {
+                "read_only": True,
+                "mmap_size": 64 * 1024 * 1024,
+                "cache_size": -8 * 1024,
+                "temp_store": "memory",
+                "journal_mode": "off",
+                "query_only": True
+            }
         }
         # The production environment settings
         self.prod_config = {
             "db_path": "/usr/local/share/islamcompanion/quran.db",
             "font_dir": "/usr/local/share/islamcompanion/fonts",
             "random_icon_path": "/usr/local/share/islamcompanion/random.png",  
-            "default_lang": "Urdu"
+            "default_lang": "Urdu",
+            "page_cache_size": 4 * 1024 * 1024,
+            "prefetch_depth": 1,
+            "settings_delay": 1000,
+            "state_path": "~/.config/islamcompanion/quran.json",
+            "snapshot_path": "/usr/local/share/islamcompanion/quran.snap",
+            "random_seed": None,
+            "random_no_repeat": False,
+            "parallel_langs": ["Arabic", "English"],
+            "db_backend": "qtsql",
+            "db_profile": {
+                "read_only": True,
+                "mmap_size": 64 * 1024 * 1024,
+                "cache_size": -8 * 1024,
+                "temp_store": "memory",
+                "journal_mode": "off",
+                "query_only": True
+            }
         }
 
     def get_config(self) -> dict:
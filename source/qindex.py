@@ -0,0 +1,357 @@
+from array import array
+from bisect import bisect_right
+
+
+class QuranIndex():
+    """
+    This class is an in-memory index of the quran suras and rukus. It is used
+    by the QuranApi class to answer navigation queries without accessing the
+    database.
+
+    The rukus of all suras are numbered from 0 to 555 in the order in which
+    they appear in the quran. The details of each ruku are stored in flat
+    arrays at the position given by its number. A sura, ruku or row id that
+    is not in the index raises an IndexError.
+
+    Methods
+    -------
+    __init__()
+        The class constructor. It builds the index from the given ruku and
+        sura rows.
+    get_sura_count()
+        Returns the number of suras.
+    get_sura_names()
+        Returns the list of all sura names.
+    get_sura_short_name()
+        Returns the transliterated name of the given sura.
+    get_ruku_count()
+        Returns the number of rukus in the given sura.
+    get_ayat_range()
+        Returns the start and end ayat numbers for the given sura and ruku.
+    get_id_range()
+        Returns the first and last row ids for the given sura and ruku.
+    get_ruku_pos()
+        Returns the position of the given sura and ruku in the index.
+    get_ruku_details()
+        Returns the sura and ruku at the given position in the index.
+    get_next_ruku()
+        Returns the ruku after the given sura and ruku.
+    get_prev_ruku()
+        Returns the ruku before the given sura and ruku.
+    get_ruku_total()
+        Returns the number of rukus in the quran.
+    get_row_id()
+        Returns the row id of the given sura and ayat.
+    get_row()
+        Returns the sura and ruku that contain the given row id.
+    get_arrays()
+        Returns the arrays of the index.
+    set_arrays()
+        Replaces the arrays of the index with the given arrays.
+    _check_sura()
+        Checks that the given sura is in the index.
+    """
+
+    def __init__(self, ruku_rows: list = (), sura_rows: list = ()) -> None:
+        """It builds the index from the given ruku and sura rows.
+
+        If no rows are given, then the index is empty. Its arrays can be set
+        with the set_arrays function.
+
+        :param ruku_rows: The sura, ruku, start ayat, end ayat and first row
+            id of each ruku, ordered by sura and ruku.
+        :type ruku_rows: list.
+        :param sura_rows: The transliterated name, english name and ruku
+            count of each sura, ordered by sura.
+        :type sura_rows: list.
+        """
+
+        # The sura of each ruku
+        self.ruku_sura = array("B")
+        # The start ayat of each ruku
+        self.ruku_start = array("H")
+        # The end ayat of each ruku
+        self.ruku_end = array("H")
+        # The row id of the first ayat of each ruku
+        self.ruku_first_id = array("I")
+        # The position of the first ruku of each sura. The last item is the
+        # total number of rukus
+        self.sura_offset = array("H", [0])
+        # The transliterated sura names
+        self.sura_tnames = []
+        # The sura names, as displayed in the sura list
+        self.sura_names = []
+
+        # Each ruku is added to the index
+        for row in ruku_rows:
+            self.ruku_sura.append(int(row[0]))
+            self.ruku_start.append(int(row[2]))
+            self.ruku_end.append(int(row[3]))
+            self.ruku_first_id.append(int(row[4]))
+
+        # Each sura is added to the index
+        for row in sura_rows:
+            # The transliterated sura name
+            self.sura_tnames.append(row[0])
+            # The sura name
+            self.sura_names.append(row[0] + " (" + row[1] + ")")
+            # The position of the first ruku of the next sura
+            self.sura_offset.append(self.sura_offset[-1] + int(row[2]))
+
+    def get_sura_count(self) -> int:
+        """Returns the number of suras.
+
+        :return: The number of suras.
+        :rtype: int.
+        """
+
+        return len(self.sura_names)
+
+    def get_sura_names(self) -> list:
+        """Returns the list of all sura names.
+
+        :return: The list of sura names.
+        :rtype: list.
+        """
+
+        return list(self.sura_names)
+
+    def get_sura_short_name(self, sura: int) -> str:
+        """Returns the transliterated name of the given sura.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :return: The transliterated sura name.
+        :rtype: str.
+        :raises IndexError: If the sura is not in the index.
+        """
+
+        self._check_sura(sura)
+
+        return self.sura_tnames[sura-1]
+
+    def get_ruku_count(self, sura: int) -> int:
+        """Returns the number of rukus in the given sura.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :return: The number of rukus in the given sura.
+        :rtype: int.
+        :raises IndexError: If the sura is not in the index.
+        """
+
+        self._check_sura(sura)
+
+        return self.sura_offset[sura] - self.sura_offset[sura-1]
+
+    def get_ruku_pos(self, sura: int, ruku: int) -> int:
+        """Returns the position of the given sura and ruku in the index.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :param ruku: The ruku number.
+        :type ruku: int.
+        :return: The position of the ruku.
+        :rtype: int.
+        :raises IndexError: If the sura or ruku is not in the index.
+        """
+
+        # If the ruku is not in the sura
+        if not 1 <= ruku <= self.get_ruku_count(sura):
+            raise IndexError("Ruku %s is not in sura %s" % (ruku, sura))
+
+        return self.sura_offset[sura-1] + ruku - 1
+
+    def get_ruku_details(self, pos: int) -> dict:
+        """Returns the sura and ruku at the given position in the index.
+
+        :param pos: The position of the ruku.
+        :type pos: int.
+        :return: The sura id and sura ruku id.
+        :rtype: dict.
+        :raises IndexError: If the position is not in the index.
+        """
+
+        # If the position is not in the index
+        if not 0 <= pos < len(self.ruku_sura):
+            raise IndexError("Ruku position %s is not in the index" % pos)
+
+        # The sura of the ruku
+        sura = self.ruku_sura[pos]
+        # The ruku number within the sura
+        ruku = pos - self.sura_offset[sura-1] + 1
+
+        return {"sura": sura, "sura_ruku": ruku}
+
+    def get_ayat_range(self, sura: int, ruku: int) -> dict:
+        """Returns the start and end ayat numbers for the given sura and ruku.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :param ruku: The ruku number.
+        :type ruku: int.
+        :return: The start and end ayat numbers.
+        :rtype: dict.
+        """
+
+        # The position of the ruku
+        pos = self.get_ruku_pos(sura, ruku)
+
+        return {"start": self.ruku_start[pos], "end": self.ruku_end[pos]}
+
+    def get_id_range(self, sura: int, ruku: int) -> tuple:
+        """Returns the first and last row ids for the given sura and ruku.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :param ruku: The ruku number.
+        :type ruku: int.
+        :return: The first and last row ids.
+        :rtype: tuple.
+        """
+
+        # The position of the ruku
+        pos = self.get_ruku_pos(sura, ruku)
+        # The row id of the first ayat
+        first_id = self.ruku_first_id[pos]
+        # The row id of the last ayat
+        last_id = first_id + self.ruku_end[pos] - self.ruku_start[pos]
+
+        return (first_id, last_id)
+
+    def get_next_ruku(self, sura: int, ruku: int) -> dict:
+        """Returns the ruku after the given sura and ruku.
+
+        The ruku after the last ruku of the quran is the first ruku.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :param ruku: The ruku number.
+        :type ruku: int.
+        :return: The sura id and sura ruku id of the next ruku.
+        :rtype: dict.
+        """
+
+        # The position of the next ruku
+        pos = (self.get_ruku_pos(sura, ruku) + 1) % len(self.ruku_sura)
+
+        return self.get_ruku_details(pos)
+
+    def get_prev_ruku(self, sura: int, ruku: int) -> dict:
+        """Returns the ruku before the given sura and ruku.
+
+        The ruku before the first ruku of the quran is the last ruku.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :param ruku: The ruku number.
+        :type ruku: int.
+        :return: The sura id and sura ruku id of the previous ruku.
+        :rtype: dict.
+        """
+
+        # The position of the previous ruku
+        pos = (self.get_ruku_pos(sura, ruku) - 1) % len(self.ruku_sura)
+
+        return self.get_ruku_details(pos)
+
+    def get_ruku_total(self) -> int:
+        """Returns the number of rukus in the quran.
+
+        :return: The number of rukus.
+        :rtype: int.
+        """
+
+        return len(self.ruku_sura)
+
+    def get_row_id(self, sura: int, ayat: int) -> int:
+        """Returns the row id of the given sura and ayat.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :param ayat: The ayat number within the sura.
+        :type ayat: int.
+        :return: The row id of the ayat.
+        :rtype: int.
+        :raises IndexError: If the sura or ayat is not in the index.
+        """
+
+        self._check_sura(sura)
+        # The position of the first and last ruku in the sura
+        first = self.sura_offset[sura-1]
+        last = self.sura_offset[sura] - 1
+        # If the ayat is not in the sura
+        if not self.ruku_start[first] <= ayat <= self.ruku_end[last]:
+            raise IndexError("Ayat %s is not in sura %s" % (ayat, sura))
+        # The position of the ruku that contains the ayat
+        pos = bisect_right(self.ruku_start, ayat, first, last + 1) - 1
+
+        return self.ruku_first_id[pos] + ayat - self.ruku_start[pos]
+
+    def get_row(self, row_id: int) -> dict:
+        """Returns the sura and ruku that contain the given row id.
+
+        :param row_id: The row id.
+        :type row_id: int.
+        :return: The sura id and sura ruku id.
+        :rtype: dict.
+        :raises IndexError: If the row id is not in the index.
+        """
+
+        # The position of the ruku that contains the row
+        pos = bisect_right(self.ruku_first_id, row_id) - 1
+        # If the row is before the first ruku or after the last ayat of the
+        # ruku
+        if pos < 0 or row_id - self.ruku_first_id[pos] > (
+                self.ruku_end[pos] - self.ruku_start[pos]):
+            raise IndexError("Row id %s is not in the index" % row_id)
+
+        return self.get_ruku_details(pos)
+
+    def get_arrays(self) -> dict:
+        """Returns the arrays of the index.
+
+        They are used to save the index in the meta data snapshot.
+
+        :return: The arrays of the index, keyed by attribute name.
+        :rtype: dict.
+        """
+
+        # The arrays of the index
+        arrays = {
+            "ruku_sura": self.ruku_sura,
+            "ruku_start": self.ruku_start,
+            "ruku_end": self.ruku_end,
+            "ruku_first_id": self.ruku_first_id,
+            "sura_offset": self.sura_offset,
+            "sura_tnames": self.sura_tnames,
+            "sura_names": self.sura_names
+        }
+
+        return arrays
+
+    def set_arrays(self, arrays: dict) -> None:
+        """Replaces the arrays of the index with the given arrays.
+
+        The number arrays may be any sequence of numbers, such as the
+        memoryview objects of the meta data snapshot.
+
+        :param arrays: The arrays of the index, keyed by attribute name.
+        :type arrays: dict.
+        """
+
+        # Each array is set
+        for name, values in arrays.items():
+            setattr(self, name, values)
+
+    def _check_sura(self, sura: int) -> None:
+        """Checks that the given sura is in the index.
+
+        :param sura: The sura number.
+        :type sura: int.
+        :raises IndexError: If the sura is not in the index.
+        """
+
+        # If the sura is not in the index
+        if not 1 <= sura <= len(self.sura_offset) - 1:
+            raise IndexError("Sura %s is not in the index" % sura)
@@ -1,9 +1,18 @@
-import sys, os
+import sys, os, re
+from typing import Callable
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 from source.qapi import QuranApi
 from source.qconfig import QConfig
+from source.worker import DataDispatcher
+from source.settings import SettingsWriter
+from source.state import StateStore
+from source.profiler import StartupProfiler, FirstPaintFilter
+from source.fonts import FontRegistry
+from source.cache import DocumentCache
+from source.models import create_combo_model
+from source.search import SearchIndexError
 
 class Ui_Manager():
     """This class is used to add quran data to the user interface.
@@ -13,8 +22,18 @@ class Ui_Manager():
     initialize_ui()
         Loads the sura, ruku combo boxes, ayat range and the ayat text.
     
+    _create_worker_api()
+        Creates the QuranApi object used by the background thread.
+    _shutdown()
+        Saves the settings and stops the background thread.
+    _on_first_paint()
+        Finishes the startup after the first ayat text is painted.
     _select_lang()
         Event handler for the language menu items.
+    _toggle_parallel()
+        Event handler for the parallel view menu item.
+    _get_view()
+        Returns the languages shown in the ayat box.
      _next_btn_handler()
         Even handler for the next button.
     _prev_btn_handler()
@@ -25,6 +44,14 @@ class Ui_Manager():
         Loads the previous ruku in the ayat box.
     _rand_ruku()
         Loads a random ruku in the ayat box.
+    _select_ruku()
+        Loads the given ruku in the ayat box.
+    _search()
+        Searches the ayat text in the background thread.
+    _show_search_results()
+        Shows the given search results in a menu.
+    _show_search_result()
+        Loads the ruku that contains the given search result.
     _sura_selected()
         It loads the ruku combo box and the ayat box.
     _ruku_selected()
@@ -36,13 +63,29 @@ class Ui_Manager():
     _add_languages()
         Reads the list of languages from database and adds them to the top
         menu.
+    _create_search_box()
+        Adds a search box to the menu bar.
     _setFont()
         It sets the font for the ayat text box depending on the current
         language.
     _get_text_styles()
         It returns the html styles for the ayat text as a dictionary obj.
     _load_ayat_box()
-        It sets the ayat text.
+        It fetches the ayat text in the background thread.
+    _show_ayat_text()
+        It displays the given ayat text in the ayat box.
+    _get_page_html()
+        It returns the html of the ayat page for the given languages.
+    _get_ayat_html()
+        It returns the html list for the given ayat text.
+    _get_parallel_html()
+        It returns the html table for the ayat text in several languages.
+    _prefetch_pages()
+        Prefetches the ayat pages before and after the current ruku.
+    _create_ayat_fetch()
+        Returns a function that fetches the ayat text of the given ruku.
+    _create_page_callback()
+        Returns a function that adds the prefetched ayat page to the cache.
     _load_ayat_range()
         It updates the ayat range label.
     _load_ruku_list()
@@ -55,7 +98,8 @@ class Ui_Manager():
         It loads the current settings from database.    
     """
 
-    def initialize_ui(self, MainWindow: QtWidgets.QMainWindow) -> None:
+    def initialize_ui(self, MainWindow: QtWidgets.QMainWindow,
+                      profiler: StartupProfiler = None) -> None:
         """It initializes the reader layout
 
         - It loads the sura combo box with list of sura names.
@@ -66,26 +110,53 @@ class Ui_Manager():
         - It connects the next and previous buttons to callback.
         - It sets the current language to Urdu.
 
+        In the lazy startup mode, the font files are loaded and the language
+        menu is created after the first ayat text is painted.
+
         :param MainWindow: The quran reader window object.
         :type MainWindow: QtWidgets.QMainWindow.
+        :param profiler: The startup profiler. If it is not given, then the
+            startup is not profiled and the lazy startup mode is used.
+        :type profiler: StartupProfiler.
         """        
 
+        # The startup profiler
+        self.profiler = profiler if profiler else StartupProfiler()
         # The application configuration
         qconfig       = QConfig()
         self.config   = qconfig.get_config()    
         # The current language
         self.lang = self.config["default_lang"]
         # Creates an instance of the QuranApi class
-        self.api = QuranApi(self.config["db_path"], self.lang)
+        self.api = QuranApi(self.config["db_path"], self.lang,
+                            profile=self.config["db_profile"],
+                            backend=self.config["db_backend"],
+                            snapshot_path=self.config["snapshot_path"])
+        # The seed and mode of the random ruku selection are set
+        self.api.set_sampler(self.config["random_seed"],
+                             self.config["random_no_repeat"])
+        # The reader state is saved in the state file
+        self.state = StateStore(self.config["state_path"])
+        self.profiler.mark("api")
+        # Starts the background thread used for fetching the ayat text
+        self.dispatcher = DataDispatcher(self._create_worker_api)
+        # The settings are written after a short delay
+        self.settings_writer = SettingsWriter(
+            self.dispatcher, self.config["settings_delay"])
+        # The settings are saved and the background thread is stopped when
+        # the application exits
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self._shutdown)
+        self.profiler.mark("worker")
         # Loads settings from database
         self._load_settings()
+        self.profiler.mark("settings")
         # The main window object is set as obj attribute
         self.MainWindow = MainWindow
 
         # Updates the path of the random.png icon
         self._update_icon_path()
-        # Creates a menu for each language in the database
-        self._create_lang_menu()
+        # Adds a search box to the menu bar
+        self._create_search_box()
         # Connects the sura combo box to a call back
         self.MainWindow.suraComboBox.activated.connect(self._sura_selected)
         # Connects the ruku combo box to a call back
@@ -98,35 +169,76 @@ class Ui_Manager():
         self.MainWindow.randomButton.clicked.connect(self._rand_ruku)
         # Update the language menu so only one item can be selected at a time
         self.MainWindow.langGroup.setExclusive(True)
-
-        # Loads the custom language fonts
-        self._load_font_files()
+        self.profiler.mark("widgets")
+
+        # The custom language fonts are loaded when a language needs them
+        self.fonts = FontRegistry(self.config["font_dir"])
+        # If the lazy startup mode is not used
+        if not self.profiler.is_lazy():
+            # Creates a menu for each language in the database
+            self._create_lang_menu()
+            self.profiler.mark("lang_menu")
+        # The suras and rukus of the combo boxes are created in pages
+        self.sura_model = create_combo_model(self.MainWindow.suraComboBox)
+        self.ruku_model = create_combo_model(self.MainWindow.rukuComboBox)
         # Loads the sura combo box with list of suras
         self._load_sura_list()
         # Loads the ruku combo box with list of rukus
         self._load_ruku_list()
         # Sets the start and end ayat numbers
         self._load_ayat_range()
+        self.profiler.mark("sura_list")
+        # The cache of rendered ayat pages
+        self.pages = DocumentCache(
+            self.MainWindow.ayatText, self.config["page_cache_size"])
+        # The startup is finished after the first ayat text is painted
+        self.paint_filter = FirstPaintFilter(self._on_first_paint)
+        # Indicates that the ayat text has not been displayed yet
+        self.first_render = True
         # Displays the ayat text
         self._load_ayat_box()        
 
-    def _load_font_files(self) -> None:
-        """Loads custom font files from the fonts folder
+    def _create_worker_api(self) -> QuranApi:
+        """Creates the QuranApi object used by the background thread.
+
+        It is called in the background thread. The object uses a pooled
+        connection of the background thread.
+
+        :return: The QuranApi object.
+        :rtype: QuranApi.
         """
 
-        try:
-            # The font directory
-            font_dir = self.config["font_dir"]
-            # The files in the fonts folder
-            file_list = os.listdir(font_dir)
-            # Each font file in the fonts folder is added to the font database
-            for file in file_list:               
-                # The font file path     
-                file_path = font_dir + "/" + file            
-                # The font is added to the font database
-                id = QtGui.QFontDatabase.addApplicationFont(file_path)
-        except:
-            print("Font files could not be loaded !")
+        return QuranApi(self.config["db_path"], self.lang,
+                        profile=self.config["db_profile"],
+                        backend=self.config["db_backend"],
+                        snapshot_path=self.config["snapshot_path"])
+
+    def _shutdown(self) -> None:
+        """Saves the settings and stops the background thread.
+
+        It is called when the application exits.
+        """
+
+        # The unsaved settings are written
+        self.settings_writer.flush()
+        # The background thread is stopped after the settings are written
+        self.dispatcher.stop()
+
+    def _on_first_paint(self) -> None:
+        """Finishes the startup after the first ayat text is painted.
+
+        In the lazy startup mode, it creates the language menu. The startup
+        profile is then saved.
+        """
+
+        self.profiler.mark("first_paint")
+        # If the lazy startup mode is used
+        if self.profiler.is_lazy():
+            # Creates a menu for each language in the database
+            self._create_lang_menu()
+            self.profiler.mark("lang_menu")
+        # The startup profile is saved
+        self.profiler.save()
 
     def _create_lang_menu(self) -> None:
         """Reads the list of languages from database and adds them to the top
@@ -165,6 +277,48 @@ class Ui_Manager():
             # The object is added to the language menu
             self.MainWindow.menuLanguage.addAction(actionLang)
 
+        # The parallel view menu item is added after the languages
+        self.MainWindow.menuLanguage.addSeparator()
+        self.actionParallel = QtWidgets.QAction(self.MainWindow.menuLanguage)
+        self.actionParallel.setCheckable(True)
+        self.actionParallel.setChecked(self.parallel)
+        self.actionParallel.setObjectName("actionParallel")
+        self.actionParallel.setText(_translate("MainWindow", "Parallel View"))
+        self.actionParallel.setShortcut(_translate("MainWindow", "Ctrl+L"))
+        self.actionParallel.setStatusTip(_translate(
+            "MainWindow", "Show the ayat text in " +
+            ", ".join(self.config["parallel_langs"]) + " side by side"))
+        # Connects the menu item to a call back
+        self.actionParallel.triggered.connect(self._toggle_parallel)
+        self.MainWindow.menuLanguage.addAction(self.actionParallel)
+
+    def _create_search_box(self) -> None:
+        """Adds a search box to the right corner of the menu bar.
+
+        The ayat text of the current language is searched when the enter key
+        is pressed in the search box.
+        """
+
+        # The translate function
+        _translate = QtCore.QCoreApplication.translate
+        # The search box is created
+        self.searchBox = QtWidgets.QLineEdit(self.MainWindow.menuBar)
+        self.searchBox.setObjectName("searchBox")
+        self.searchBox.setMinimumWidth(200)
+        self.searchBox.setClearButtonEnabled(True)
+        self.searchBox.setPlaceholderText(_translate("MainWindow", "Search"))
+        self.searchBox.setStatusTip(
+            _translate("MainWindow", "Search the ayat text (Ctrl+F)"))
+        # The search box is added to the menu bar
+        self.MainWindow.menuBar.setCornerWidget(
+            self.searchBox, QtCore.Qt.TopRightCorner)
+        # Connects the search box to a call back
+        self.searchBox.returnPressed.connect(self._search)
+        # The search box is focused using the Ctrl+F shortcut
+        self.searchShortcut = QtWidgets.QShortcut(
+            QtGui.QKeySequence("Ctrl+F"), self.MainWindow.centralwidget)
+        self.searchShortcut.activated.connect(self.searchBox.setFocus)
+
     def _update_icon_path(self) -> None:
         """Sets the file path of the random.png icon to an absolute path.        
         """
@@ -189,8 +343,8 @@ class Ui_Manager():
         # The translate function
         _translate = QtCore.QCoreApplication.translate
 
-        # The list of actions
-        actions = self.MainWindow.menuLanguage.actions()
+        # The list of language actions
+        actions = self.MainWindow.langGroup.actions()
         # Check if action is checked
         for action in actions:
             if action.isChecked():
@@ -229,6 +383,41 @@ class Ui_Manager():
         # The settings are updated in database
         self._update_settings()
 
+    def _toggle_parallel(self) -> None:
+        """Event handler for the parallel view menu item.
+
+        It shows the ayat text of the current language next to the ayat text
+        of the languages given by the parallel_langs config value, or shows
+        the current language only.
+        """
+
+        # The parallel view is turned on or off
+        self.parallel = self.actionParallel.isChecked()
+        # The ayat box is loaded
+        self._load_ayat_box()
+        # The settings are updated in the state file
+        self._update_settings()
+
+    def _get_view(self) -> tuple:
+        """Returns the languages shown in the ayat box.
+
+        In the parallel view, the current language is followed by the
+        languages given by the parallel_langs config value.
+
+        :return: The languages shown in the ayat box.
+        :rtype: tuple.
+        """
+
+        # The current language
+        view = [self.lang]
+        # If the parallel view is used
+        if self.parallel:
+            # The other languages that are in the database
+            view += [lang for lang in self.config["parallel_langs"]
+                     if lang != self.lang and lang in self.api.lang_meta]
+
+        return tuple(view)
+
     def _next_btn_handler(self) -> None:
         """Even handler for the next button.
 
@@ -274,33 +463,11 @@ class Ui_Manager():
 
         # The current selection
         selection = self._get_current_selection()
-        next_sura = selection["sura"]
-        next_ruku = selection["ruku"]
-
-        # If the current ruku is not the last one in the ruku combo box
-        if selection["ruku"] < self.MainWindow.rukuComboBox.count():
-            next_ruku += 1
-        # If the current ruku is the last one in the ruku combo box
-        else:
-            # The next ruku is set to 1
-            next_ruku = 1
-            # The sura is set to the next one
-            next_sura += 1
-            # If the next sura number is out of range
-            if next_sura > self.MainWindow.suraComboBox.count():
-                # The next sura is set to 1
-                next_sura = 1
-            # The current sura is set
-            self.MainWindow.suraComboBox.setCurrentIndex(next_sura-1)
-            #  The ruku combo box is loaded
-            self._load_ruku_list()
-
-        # The current ruku is selected
-        self.MainWindow.rukuComboBox.setCurrentIndex(next_ruku-1)
-        # The ayat range is updated
-        self._load_ayat_range()
-        # The ayat box is loaded
-        self._load_ayat_box()
+        # The next ruku is fetched from the navigation index
+        ruku_details = self.api.get_next_ruku(
+            selection["sura"], selection["ruku"])
+        # The next ruku is loaded
+        self._select_ruku(ruku_details)
 
     def _prev_ruku(self) -> None:
         """Loads the prev ruku in the ayat box.
@@ -312,36 +479,11 @@ class Ui_Manager():
 
         # The current selection is fetched
         selection = self._get_current_selection()
-        # The previous sura
-        prev_sura = selection["sura"]
-        # The previous ruku
-        prev_ruku = selection["ruku"]
-
-        # If a ruku is currently selected
-        if selection["ruku"] > 1:
-            # The previous ruku is set
-            prev_ruku -= 1
-        # If a ruku is not currently selected
-        else:
-            # The previous ruku is set
-            prev_sura -= 1
-            # If the previous sura id is less than 1
-            if prev_sura < 1:
-                # The previous sura is set to the last sura
-                prev_sura = 114
-            # The current sura is updated
-            self.MainWindow.suraComboBox.setCurrentIndex(prev_sura-1)
-            # The ruku list is updated
-            self._load_ruku_list()
-            # The number of items in the ruku combo box
-            prev_ruku = self.MainWindow.rukuComboBox.count()
-
-        # The current ruku is updated
-        self.MainWindow.rukuComboBox.setCurrentIndex(prev_ruku-1)
-        # The ayat range is updated
-        self._load_ayat_range()
-        # The ayat box is updated
-        self._load_ayat_box()
+        # The previous ruku is fetched from the navigation index
+        ruku_details = self.api.get_prev_ruku(
+            selection["sura"], selection["ruku"])
+        # The previous ruku is loaded
+        self._select_ruku(ruku_details)
 
     def _rand_ruku(self) -> None:
         """Loads a random ruku in the ayat box.
@@ -352,16 +494,109 @@ class Ui_Manager():
 
         # A random sura is fetched
         ruku_details = self.api.get_random_ruku()
-        # The sura is selected
-        self.MainWindow.suraComboBox.setCurrentIndex(
-            ruku_details["sura"]-1)
-        # The ruku list box is loaded
-        self._load_ruku_list()
+        # The random ruku is loaded
+        self._select_ruku(ruku_details)
+        # The settings are updated in database
+        self._update_settings()
+
+    def _select_ruku(self, ruku_details: dict) -> None:
+        """Loads the given ruku in the ayat box.
+
+        It selects the given sura and ruku in the sura and ruku combo boxes.
+        The ruku combo box is only reloaded if the sura has changed. It also
+        updates the ayat range and the ayat box.
+
+        :param ruku_details: The sura id and sura ruku id.
+        :type ruku_details: dict.
+        """
+
+        # If the sura has changed
+        if ruku_details["sura"] != self._get_current_selection()["sura"]:
+            # The sura is selected
+            self.MainWindow.suraComboBox.setCurrentIndex(
+                ruku_details["sura"]-1)
+            # The ruku list box is loaded
+            self._load_ruku_list()
         # The ruku is selected in the ruku combo box
         self.MainWindow.rukuComboBox.setCurrentIndex(
             ruku_details["sura_ruku"]-1)
+        # The ayat range is updated
         self._load_ayat_range()
+        # The ayat box is loaded
         self._load_ayat_box()
+
+    def _search(self) -> None:
+        """Searches the ayat text in the background thread.
+
+        The ayat text of the current language is searched for the text in the
+        search box. The results are shown by _show_search_results. Each
+        result is shown as a menu item below the search box. Selecting a menu
+        item loads the ruku that contains the ayat.
+        """
+
+        # The search text
+        query = self.searchBox.text()
+        # The current language
+        lang = self.lang
+        def fetch(api: QuranApi) -> tuple:
+            try:
+                # The search results
+                return (api.search(query, lang), None)
+            except SearchIndexError as err:
+                # The search index is not built, so the error is shown
+                return ([], str(err))
+
+        # The ayat text is searched in the background thread
+        self.dispatcher.submit(
+            "search", fetch, lambda data: self._show_search_results(*data))
+
+    def _show_search_results(self, results: list, error: str = None) -> None:
+        """Shows the given search results in a menu below the search box.
+
+        :param results: The search results.
+        :type results: list.
+        :param error: The error message. It is given if the search index is
+            not built.
+        :type error: str.
+        """
+
+        # If the search index is not built
+        if error is not None:
+            # The error is shown in the status bar
+            self.MainWindow.statusbar.showMessage(error, 5000)
+            return
+        # If there are no results
+        if len(results) == 0:
+            # A message is shown in the status bar
+            self.MainWindow.statusbar.showMessage("No ayas found", 3000)
+            return
+
+        # The menu for the search results
+        menu = QtWidgets.QMenu(self.searchBox)
+        # Each search result is added to the menu
+        for result in results:
+            # The snippet without the html tags used for highlighting
+            snippet = re.sub("<[^>]+>", "", result["snippet"])
+            # The menu item is added
+            action = menu.addAction(result["ref"] + "  " + snippet)
+            # Connects the menu item to a call back
+            action.triggered.connect(
+                lambda checked=False, r=result: self._show_search_result(r))
+
+        # The menu is shown below the search box
+        menu.exec_(self.searchBox.mapToGlobal(
+            self.searchBox.rect().bottomLeft()))
+
+    def _show_search_result(self, result: dict) -> None:
+        """Loads the ruku that contains the given search result.
+
+        :param result: The search result.
+        :type result: dict.
+        """
+
+        # The ruku is loaded
+        self._select_ruku({"sura": result["sura"],
+                           "sura_ruku": result["ruku"]})
         # The settings are updated in database
         self._update_settings()
 
@@ -381,19 +616,34 @@ class Ui_Manager():
         self._update_settings()
 
     def _load_settings(self) -> None:
-        """Loads the current settings from database.
+        """Loads the current settings from the state file.
+
+        If the state file does not exist, then the settings saved in the
+        database by older versions are used.
         """
         
-        # The sql query
-        sql = "SELECT language, row_id FROM `ic_quranic_settings`"            
-        # The settings data is fetched
-        rows = self.api._fetch_data(sql, [], 2)
-        # The language settings value
-        self.lang = rows[0][0]
-        # The row id
-        row_id = rows[0][1]
-        # The row values are fetched
-        row  = self.api.get_row(row_id)
+        # The saved state
+        state = self.state.load()
+        # If the state file does not exist
+        if "language" not in state:
+            # The settings are read from the database
+            state = self.api.get_settings() or {
+                "language": self.config["default_lang"], "row_id": 1}
+        # The language settings value. The default language is used if the
+        # saved language is not known
+        self.lang = state["language"]
+        if self.lang not in self.api.get_lang_list():
+            self.lang = self.config["default_lang"]
+        # Indicates if the parallel view is used
+        self.parallel = bool(state.get("parallel", False))
+        try:
+            # The row id
+            row_id = int(state.get("row_id"))
+            # The row values are fetched
+            row  = self.api.get_row(row_id)
+        except (IndexError, TypeError, ValueError):
+            # If the saved row is not in the database, the first ruku is shown
+            row  = self.api.get_row(1)
         # The row values are set
         self.settings = row[0]
         # The language is set in the qapi object
@@ -401,13 +651,20 @@ class Ui_Manager():
         
 
     def _update_settings(self) -> None:
-        """It saves the current settings to database.
+        """It saves the current settings to the state file.
         """
         
         # The current selection is fetched
         sel = self._get_current_selection()
-        # The settings are updated in database
-        self.api.update_settings(self.lang, sel["sura"], sel["start"])
+        # The current state
+        state = {
+            "language": self.lang,
+            "row_id": self.api.get_row_id(sel["sura"], sel["start"]),
+            "parallel": self.parallel
+        }
+        # The state file is written by the background thread after a short
+        # delay
+        self.settings_writer.update(lambda api: self.state.save(state))
         
     def _get_current_selection(self) -> None:
         """It returns the currently selected sura and ruku.
@@ -467,17 +724,19 @@ class Ui_Manager():
         language.
         """
 
-        # Check if the selected language is right to left
-        rtl = self.api.is_rtl(self.lang)
-        # Get the font name and size for the selected language
-        font_details = self.api.get_font_details(self.lang)
+        # The meta data for the selected language
+        meta = self.api.get_lang_meta(self.lang)
+        # The font files of the shown languages are loaded if they are not
+        # loaded
+        for lang in self._get_view():
+            self.fonts.load_font(self.api.get_lang_meta(lang).font_family)
         # The font object
         font = QtGui.QFont()
         
         # The font family is set
-        font.setFamily(font_details["family"])
+        font.setFamily(meta.font_family)
         # The font size is set
-        font.setPointSize(font_details["size"])        
+        font.setPointSize(meta.font_size)
         # The font is set
         self.MainWindow.ayatText.setFont(font)
 
@@ -517,17 +776,109 @@ class Ui_Manager():
 
     def _load_ayat_box(self) -> None:
         """It sets the ayat text
+
+        If the ayat page is cached, then it is shown from the cache.
+        Otherwise the ayat text is fetched in the background thread. It is
+        displayed by _show_ayat_text.
         """
 
         # The font for the ayat text is set
         self._setFont()
+        # The current ruku and ayat selection
+        sel = self._get_current_selection()
+        # The languages shown in the ayat box
+        view = self._get_view()
+        # The key of the ayat page
+        key = (view, sel["sura"], sel["ruku"])
+        # If the ayat page is cached
+        if self.pages.show(key):
+            # The pending ayat text request is cancelled, so it does not
+            # replace the cached page
+            self.dispatcher.cancel("ayat")
+            # The neighbouring ayat pages are prefetched
+            self._prefetch_pages()
+            return
+
         # The styles for the ayat box
         styles = self._get_text_styles()
 
-        # The current ruku and ayat selection
-        sel = self._get_current_selection()
-        # The ayat text is fetched
-        ayat_list = self.api.get_ayat_text(sel["sura"], sel["ruku"])
+        # The ayat text is fetched in the background thread
+        self.dispatcher.submit(
+            "ayat", self._create_ayat_fetch(view, sel["sura"], sel["ruku"]),
+            lambda ayat_data: self._show_ayat_text(
+                key, sel, styles, ayat_data))
+
+    def _show_ayat_text(self, key: tuple, sel: dict, styles: dict,
+                        ayat_data) -> None:
+        """It displays the given ayat text in the ayat box.
+
+        The rendered ayat page is added to the page cache.
+
+        :param key: The key of the ayat page.
+        :type key: tuple.
+        :param sel: The ruku and ayat selection of the ayat text.
+        :type sel: dict.
+        :param styles: The html styles for the ayat text.
+        :type styles: dict.
+        :param ayat_data: The list of ayas, or the list of ayas in each
+            language for the parallel view.
+        :type ayat_data: list or dict.
+        """
+
+        # The html is displayed and cached
+        self.pages.render(
+            key, self._get_page_html(key[0], sel, styles, ayat_data))
+
+        # If the ayat text is displayed for the first time
+        if self.first_render:
+            self.first_render = False
+            self.profiler.mark("first_render")
+            # The startup is finished after the ayat text is painted
+            self.MainWindow.ayatText.viewport().installEventFilter(
+                self.paint_filter)
+
+        # The neighbouring ayat pages are prefetched
+        self._prefetch_pages()
+
+    def _get_page_html(self, view: tuple, sel: dict, styles: dict,
+                       ayat_data) -> str:
+        """It returns the html of the ayat page for the given languages.
+
+        :param view: The languages shown in the ayat box.
+        :type view: tuple.
+        :param sel: The sura, start ayat number and sura name of the ayat
+            text.
+        :type sel: dict.
+        :param styles: The html styles for the ayat text.
+        :type styles: dict.
+        :param ayat_data: The list of ayas, or the list of ayas in each
+            language for the parallel view.
+        :type ayat_data: list or dict.
+        :return: The html of the ayat page.
+        :rtype: str.
+        """
+
+        # If a single language is shown
+        if len(view) == 1:
+            return self._get_ayat_html(sel, styles, ayat_data)
+
+        return self._get_parallel_html(sel, ayat_data)
+
+    def _get_ayat_html(self, sel: dict, styles: dict,
+                       ayat_list: list) -> str:
+        """It returns the html list for the given ayat text.
+
+        :param sel: The sura, start ayat number and sura name of the ayat
+            text.
+        :type sel: dict.
+        :param styles: The html styles for the ayat text.
+        :type styles: dict.
+        :param ayat_list: The list of ayas.
+        :type ayat_list: list.
+        :return: The html list.
+        :rtype: str.
+        """
+
         # The start ayat number
         aya = sel["start"]
         # The html list for the ayat text
@@ -543,8 +894,155 @@ class Ui_Manager():
         # The closing tag for the html list
         text += "</ol>"
 
-        # The html list is displayed
-        self.MainWindow.ayatText.setHtml(text)
+        return text
+
+    def _get_parallel_html(self, sel: dict, ayat_texts: dict) -> str:
+        """It returns the html table for the ayat text in several languages.
+
+        Each language is shown in its own column, with its own font and text
+        direction. Each ayat is shown in its own row.
+
+        :param sel: The sura, start ayat number and sura name of the ayat
+            text.
+        :type sel: dict.
+        :param ayat_texts: The list of ayas in each language.
+        :type ayat_texts: dict.
+        :return: The html table.
+        :rtype: str.
+        """
+
+        # The style for the green text
+        cs = "color:green;font-size: 10pt;font-weight: bold;"
+        # The opening tag and the header row of the html table
+        text = "<table width='100%' cellspacing='0' cellpadding='10'><tr>"
+        # The cell attributes of each language
+        cells = []
+        for lang in ayat_texts:
+            # The meta data of the language
+            meta = self.api.get_lang_meta(lang)
+            # The text direction and font of the language
+            cells.append(
+                "<td valign='top' " +
+                ("dir='rtl' align='right'" if meta.rtl else "dir='ltr'") +
+                " style='font-family: " + meta.font_family + "; font-size: " +
+                str(meta.font_size) + "pt; line-height: 40px'>")
+            text += "<th style='" + cs + "'>" + lang + "</th>"
+        text += "</tr>"
+
+        # Each ayat is added to the table
+        for i, lines in enumerate(zip(*ayat_texts.values())):
+            text += "<tr>"
+            # The ayat text in each language
+            for cell, line in zip(cells, lines):
+                text += cell + line + "</td>"
+            # The ayat reference is added below the ayat text
+            text += "</tr><tr><td colspan='" + str(len(cells)) + "'"
+            text += " align='center' style='" + cs + "'>("
+            text += sel["stext"] + " " + str(sel["sura"]) + ":"
+            text += str(sel["start"] + i) + ")</td></tr>"
+        # The closing tag for the html table
+        text += "</table>"
+
+        return text
+
+    def _prefetch_pages(self) -> None:
+        """Prefetches the ayat pages before and after the current ruku.
+
+        The number of rukus prefetched in each direction is set by the
+        prefetch_depth config value. The navigation wraps around at the first
+        and last ruku. The ayat text is fetched in the background thread and
+        the pages are added to the page cache without being shown.
+        """
+
+        # The languages shown in the ayat box
+        view = self._get_view()
+        # The styles for the ayat box
+        styles = self._get_text_styles()
+        # Each direction is checked
+        for direction, get_ruku in ((1, self.api.get_next_ruku),
+                                    (-1, self.api.get_prev_ruku)):
+            # The current selection
+            sel = self._get_current_selection()
+            # The ruku details of the current ruku
+            ruku_details = {"sura": sel["sura"], "sura_ruku": sel["ruku"]}
+            # Each ruku up to the prefetch depth is checked
+            for step in range(1, self.config["prefetch_depth"] + 1):
+                # The next ruku in the direction
+                ruku_details = get_ruku(
+                    ruku_details["sura"], ruku_details["sura_ruku"])
+                # The sura and ruku
+                sura = ruku_details["sura"]
+                ruku = ruku_details["sura_ruku"]
+                # If the ayat page is already cached
+                if self.pages.contains((view, sura, ruku)):
+                    continue
+                # The sura, start ayat and sura name of the ruku
+                page_sel = {
+                    "sura": sura,
+                    "ruku": ruku,
+                    "start": self.api.get_ayat_range(sura, ruku)["start"],
+                    "stext": self.MainWindow.suraComboBox.itemText(
+                        sura - 1).split(" (")[0]
+                }
+                # The ayat text is fetched in the background thread. Each
+                # position has its own channel, so the pending request for a
+                # position is replaced when the current ruku changes
+                self.dispatcher.submit(
+                    "prefetch" + str(direction * step),
+                    self._create_ayat_fetch(view, sura, ruku),
+                    self._create_page_callback(view, page_sel, styles))
+
+    def _create_ayat_fetch(self, view: tuple, sura: int,
+                           ruku: int) -> Callable:
+        """Returns a function that fetches the ayat text of the given ruku.
+
+        In the parallel view, the ayat text of all languages is fetched with
+        a single query.
+
+        :param view: The languages of the ayat text.
+        :type view: tuple.
+        :param sura: The sura number.
+        :type sura: int.
+        :param ruku: The ruku number in the sura.
+        :type ruku: int.
+        :return: The function that is called in the background thread.
+        :rtype: Callable.
+        """
+
+        def fetch(api: QuranApi):
+            """Fetches the ayat text in the background thread"""
+            # If several languages are shown
+            if len(view) > 1:
+                return api.get_ayat_text_multi(sura, ruku, view)
+            api.set_lang(view[0])
+            return api.get_ayat_text(sura, ruku)
+
+        return fetch
+
+    def _create_page_callback(self, view: tuple, sel: dict,
+                              styles: dict) -> Callable:
+        """Returns a function that adds the prefetched ayat page to the cache.
+
+        :param view: The languages of the ayat text.
+        :type view: tuple.
+        :param sel: The sura, ruku, start ayat number and sura name.
+        :type sel: dict.
+        :param styles: The html styles for the ayat text.
+        :type styles: dict.
+        :return: The function that is called with the ayat text.
+        :rtype: Callable.
+        """
+
+        def callback(ayat_data) -> None:
+            # The key of the ayat page
+            key = (view, sel["sura"], sel["ruku"])
+            # If the languages have not changed and the page is not cached
+            if view == self._get_view() and not self.pages.contains(key):
+                # The ayat page is rendered and cached
+                self.pages.prepare(key, self._get_page_html(
+                    view, sel, styles, ayat_data))
+
+        return callback
 
     def _load_ayat_range(self) -> None:
         """It updates the ayat range label.
@@ -567,11 +1065,10 @@ class Ui_Manager():
         """It loads the ruku combo box with list of rukus.
 
         It fetches number of rukus in the selected sura. It loads the ruku
-        combo box with list of rukus.
+        combo box with list of rukus. The ruku numbers are created when the
+        combo box shows them.
         """
 
-        # The ruku combo box is cleared
-        self.MainWindow.rukuComboBox.clear()
         # If the sura combo box has items
         if self.MainWindow.suraComboBox.count() > 0:
             # The sura combo box data
@@ -581,32 +1078,33 @@ class Ui_Manager():
             sura = 1
         # The ruku count is fetched
         ruku_count = self.api.get_ruku_count(sura)
-        # For each ruku number
-        for i in range(1, (ruku_count+1)):
-            # The ruku number
-            ruku = (str(i))
-            # The ruku number is added to the combo box
-            self.MainWindow.rukuComboBox.addItem(ruku, ruku)
+
+        def fetch_page(start: int, count: int) -> list:
+            # The text and data of each ruku is its number
+            return [(str(i), str(i)) for i in range(start+1, start+count+1)]
+
+        # The ruku combo box is loaded
+        self.ruku_model.set_rows(ruku_count, fetch_page)
         # The sura value is set to the settings value
         self.MainWindow.rukuComboBox.setCurrentIndex(self.settings[1]-1)
 
     def _load_sura_list(self) -> None:
         """It loads the sura combo box with list of suras.
 
-        It fetches list of sura names from database. It loads the sura combo
-        box with sura names.
+        It fetches list of sura names from the navigation index. It loads the
+        sura combo box with sura names. The items of the combo box are
+        created when the combo box shows them.
         """
 
-        # The loop counter
-        count = 1
         # The sura names are fetched
         sura_list = self.api.get_sura_names()
-        # Each sura is added to the sura combo box
-        for i in sura_list:
-            # The sura is added
-            self.MainWindow.suraComboBox.addItem(i, count)
-            # The loop counter is increased
-            count += 1
+
+        def fetch_page(start: int, count: int) -> list:
+            # The name and number of each sura
+            return [(sura_list[i], i+1) for i in range(start, start+count)]
+
+        # The sura combo box is loaded
+        self.sura_model.set_rows(len(sura_list), fetch_page)
 
         # The sura value is set to the settings value
         self.MainWindow.suraComboBox.setCurrentIndex(self.settings[0]-1)
@@ -0,0 +1,424 @@
+from collections import OrderedDict
+
+from PyQt5.QtSql import QSqlDatabase, QSqlQuery
+
+from source.connection import ApiError, ConnectionManager, PoolError
+from source.connection import get_pragmas
+
+class QtSqlConnectionManager(ConnectionManager):
+    """This class manages the QtSql database connections.
+
+    Methods
+    -------
+    _open()
+        Opens a new QtSql connection with the given name.
+    _remove()
+        Closes and removes the given QtSql connection.
+    """
+
+    def _open(self, name: str, db_path: str, profile: dict) -> None:
+        """Opens a new QtSql connection with the given name.
+
+        The PRAGMAs of the connection profile are applied after the database
+        is opened. They only affect this connection.
+
+        :param name: The connection name.
+        :type name: str.
+        :param db_path: The absolute path to the database.
+        :type db_path: str.
+        :param profile: The connection profile.
+        :type profile: dict.
+        :raises PoolError: If the database cannot be opened or a PRAGMA
+            fails.
+        """
+
+        # The database name and connection options are set
+        con = QSqlDatabase.addDatabase("QSQLITE", name)
+        con.setDatabaseName(db_path)
+        # If the database should be opened read only
+        if profile.get("read_only", False):
+            con.setConnectOptions("QSQLITE_OPEN_READONLY")
+        # The error message
+        msg = None
+        # If the connection cannot be opened
+        if not con.open():
+            msg = "Database error: %s. Database path: %s" % (
+                con.lastError().databaseText(), db_path)
+
+        # Each PRAGMA in the connection profile is applied
+        for sql in get_pragmas(profile):
+            # If the connection failed
+            if msg is not None:
+                break
+            # The PRAGMA is run
+            query = QSqlQuery(con)
+            if not query.exec(sql):
+                msg = "Database error: %s Last query: %s" % (
+                    query.lastError().databaseText(), sql)
+            query.finish()
+            del query
+
+        # If the connection could not be set up
+        if msg is not None:
+            del con
+            self._remove(name)
+            raise PoolError(msg)
+
+    def _remove(self, name: str) -> None:
+        """Closes and removes the given QtSql connection.
+
+        :param name: The connection name.
+        :type name: str.
+        """
+
+        # The connection is closed
+        con = QSqlDatabase.database(name, False)
+        con.close()
+        del con
+        # The connection is removed from the list of Qt connections
+        QSqlDatabase.removeDatabase(name)
+
+class QtSqlBackend():
+    """This class runs the Api queries using the QtSql module.
+
+    The prepared queries are kept in a query cache, so they are not parsed
+    again.
+
+    Methods
+    -------
+    __init__()
+        The class constructor. It gets a connection from the connection
+        manager.
+    fetch()
+        Runs the given select query and returns the fetched rows.
+    iterate()
+        Runs the given select query and yields each row as a tuple.
+    fetch_column()
+        Runs the given select query and returns the first field of each row.
+    fetch_one()
+        Runs the given select query and returns the first row as a tuple.
+    execute()
+        Runs the given update query.
+    begin()
+        Starts a transaction.
+    commit()
+        Commits the current transaction.
+    rollback()
+        Rolls back the current transaction.
+    close()
+        Frees the cached queries and releases the connection.
+    get_query_stats()
+        Returns the hit and miss counters of the query cache.
+    _get_query()
+        Returns a prepared query object for the given sql.
+    _run_query()
+        Binds the given values to the prepared query and runs it.
+    _raise_error()
+        Raises an ApiError for the given query.
+    """
+
+    def __init__(self, db_path: str, profile: dict = None,
+                 con_name: str = None, query_cache_size: int = 50) -> None:
+        """Gets a connection from the connection manager.
+
+        :param db_path: The absolute path to the database.
+        :type db_path: str.
+        :param profile: The connection profile.
+        :type profile: dict.
+        :param con_name: The name of the connection. If it is not given, then
+            a pooled connection of the current thread is used.
+        :type con_name: str.
+        :param query_cache_size: The maximum number of prepared queries to
+            keep in the query cache.
+        :type query_cache_size: int.
+        """
+
+        # The prepared queries, keyed by sql. The least recently used query
+        # is the first item
+        self.query_cache = OrderedDict()
+        # The maximum number of prepared queries in the cache
+        self.query_cache_size = query_cache_size
+        # The number of queries served from the query cache
+        self.cache_hits = 0
+        # The number of queries that had to be prepared
+        self.cache_misses = 0
+        # An open connection is fetched from the connection manager
+        self.con_name = connections.acquire(db_path, profile, con_name)
+        # The database connection
+        self.con = QSqlDatabase.database(self.con_name, False)
+
+    def fetch(self, sql: str, bind_values: list, sel_count: int) -> list:
+        """Runs the given select query and returns the fetched rows.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :param sel_count: The number of fields in select query.
+        :type sel_count: int.
+        :return: The fetched rows. Each row is a list of field values.
+        :rtype: list.
+        """
+
+        # The prepared query is run
+        query = self._run_query(sql, bind_values)
+
+        # All rows
+        rows = []
+        # All rows are fetched
+        while query.next():
+            # The row of data
+            row = []
+            # All selected field values are fetched
+            for i in range(sel_count):
+                row.append(query.value(i))
+            # The row in appended to the list of rows
+            rows.append(row)
+
+        # The query is reset, so it can be run again. It stays prepared
+        query.finish()
+
+        return rows
+
+    def iterate(self, sql: str, bind_values: list, sel_count: int):
+        """Runs the given select query and yields each row as a tuple.
+
+        The rows are read from the query one at a time, so the complete
+        result is not copied into a list. The same query should not be run
+        again before all rows have been read.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :param sel_count: The number of fields in select query.
+        :type sel_count: int.
+        :return: The rows. Each row is a tuple of field values.
+        :rtype: Iterator[tuple].
+        """
+
+        # The prepared query is run
+        query = self._run_query(sql, bind_values)
+        # The functions used for each row
+        next_row, value = query.next, query.value
+        # The positions of the selected fields
+        positions = range(sel_count)
+        try:
+            # Each row is read
+            while next_row():
+                yield tuple([value(i) for i in positions])
+        finally:
+            # The query is reset, so it can be run again. It stays prepared
+            query.finish()
+
+    def fetch_column(self, sql: str, bind_values: list) -> list:
+        """Runs the given select query and returns the first field of each
+        row.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :return: The value of the first field of each row.
+        :rtype: list.
+        """
+
+        # The prepared query is run
+        query = self._run_query(sql, bind_values)
+        # The functions used for each row
+        next_row, value = query.next, query.value
+
+        # The field values
+        values = []
+        # The first field of each row is read
+        while next_row():
+            values.append(value(0))
+
+        # The query is reset, so it can be run again. It stays prepared
+        query.finish()
+
+        return values
+
+    def fetch_one(self, sql: str, bind_values: list, sel_count: int) -> tuple:
+        """Runs the given select query and returns the first row as a
+        tuple.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :param sel_count: The number of fields in select query.
+        :type sel_count: int.
+        :return: The field values of the first row. It is None if the query
+            returned no rows.
+        :rtype: tuple.
+        """
+
+        # The prepared query is run
+        query = self._run_query(sql, bind_values)
+        # The first row
+        row = None
+        # If the query returned a row
+        if query.next():
+            row = tuple([query.value(i) for i in range(sel_count)])
+
+        # The query is reset, so it can be run again. It stays prepared
+        query.finish()
+
+        return row
+
+    def execute(self, sql: str, bind_values: list) -> None:
+        """Runs the given update query.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        """
+
+        # The prepared query is run
+        query = self._run_query(sql, bind_values)
+        # The query is reset, so it can be run again. It stays prepared
+        query.finish()
+
+    def begin(self) -> None:
+        """Starts a transaction.
+        """
+
+        # If the transaction cannot be started
+        if not self.con.transaction():
+            self._raise_error(self.con, "BEGIN")
+
+    def commit(self) -> None:
+        """Commits the current transaction.
+        """
+
+        # If the transaction cannot be committed
+        if not self.con.commit():
+            self._raise_error(self.con, "COMMIT")
+
+    def rollback(self) -> None:
+        """Rolls back the current transaction.
+        """
+
+        # If the transaction cannot be rolled back
+        if not self.con.rollback():
+            self._raise_error(self.con, "ROLLBACK")
+
+    def close(self) -> None:
+        """Frees the cached queries and releases the connection.
+        """
+
+        # The resources associated with each cached query are freed
+        for query in self.query_cache.values():
+            query.finish()
+        # The query cache is emptied
+        self.query_cache.clear()
+        # If the connection was already released
+        if self.con is None:
+            return
+        # The connection is released, so it can be used by another Api
+        # object in the same thread
+        self.con = None
+        connections.release(self.con_name)
+
+    def get_query_stats(self) -> dict:
+        """Returns the hit and miss counters of the query cache.
+
+        :return: The number of cache hits, cache misses and cached queries.
+        :rtype: dict.
+        """
+
+        # The query cache statistics
+        stats = {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self.query_cache)
+        }
+
+        return stats
+
+    def _get_query(self, sql: str) -> QSqlQuery:
+        """Returns a prepared query object for the given sql.
+
+        The query is taken from the query cache if it was prepared before.
+        Otherwise it is prepared and added to the cache. If the cache is full,
+        the least recently used query is removed.
+
+        :param sql: The sql query.
+        :type sql: str.
+        :return: The prepared query object.
+        :rtype: QSqlQuery.
+        """
+
+        # The query is looked up in the cache
+        query = self.query_cache.get(sql)
+        # If the query was prepared before
+        if query is not None:
+            # The query is marked as the most recently used
+            self.query_cache.move_to_end(sql)
+            # The cache hit counter is increased
+            self.cache_hits += 1
+            return query
+
+        # The cache miss counter is increased
+        self.cache_misses += 1
+        # The query object is created for the api connection
+        query = QSqlQuery(self.con)
+        # The rows are only read once, so Qt does not need to buffer them
+        query.setForwardOnly(True)
+        # The query is prepared
+        if not query.prepare(sql):
+            self._raise_error(query, sql)
+
+        # If the cache is full
+        if len(self.query_cache) >= self.query_cache_size:
+            # The least recently used query is removed
+            old_sql, old_query = self.query_cache.popitem(last=False)
+            # The resources associated with the old query are freed
+            old_query.finish()
+        # The query is added to the cache
+        self.query_cache[sql] = query
+
+        return query
+
+    def _run_query(self, sql: str, bind_values: list) -> QSqlQuery:
+        """Binds the given values to the prepared query and runs it.
+
+        :param sql: The sql query to run.
+        :type sql: str.
+        :param bind_values: The values to bind to the query placeholders.
+        :type bind_values: list.
+        :return: The query object after it has been run.
+        :rtype: QSqlQuery.
+        """
+
+        # The prepared query is fetched
+        query = self._get_query(sql)
+        # Each given bind value is bound to its placeholder position
+        for pos, val in enumerate(bind_values):
+            query.bindValue(pos, val)
+        # The query is run
+        if not query.exec():
+            self._raise_error(query, sql)
+
+        return query
+
+    def _raise_error(self, source, sql: str) -> None:
+        """Raises an ApiError for the given query.
+
+        :param source: The query or connection that has the error.
+        :type source: QSqlQuery.
+        :param sql: The sql query.
+        :type sql: str.
+        :raises ApiError: Always.
+        """
+
+        # The error message
+        msg = "Database error: %s Last query: %s" % (
+            source.lastError().databaseText(), sql)
+
+        raise ApiError(msg)
+
+# The connection manager used by the QtSql backend
+connections = QtSqlConnectionManager()
@@ -12,21 +12,36 @@ instance by adding widgets and layouts.
 The script then further customizes the QMainWindow instance.
 
 Finally the script runs the applications by calling the exec_ method.
+
+The startup time of each phase is saved to a json file if the script is run
+with the --profile-startup[=path] option or if the IC_PROFILE_STARTUP
+environment variable is set to the file path. The language menu is created
+after the window is painted. The --eager-startup option creates it before the
+window is shown.
+
+Database errors that are not handled are shown in a message box.
 """
 
 import sys,os
 
+from source.profiler import StartupProfiler
 from source.qreader import Ui_MainWindow
 from source.qmanager import Ui_Manager
+from source.worker import excepthook
 from PyQt5 import QtWidgets
 
 if __name__ == "__main__":    
+    sys.excepthook = excepthook
+    profiler   = StartupProfiler.from_args(sys.argv)
+    profiler.mark("imports")
     app        = QtWidgets.QApplication(sys.argv)
     MainWindow = QtWidgets.QMainWindow()
     ui         = Ui_MainWindow()
     ui.setupUi(MainWindow)
+    profiler.mark("setup_ui")
     
     ui_manager = Ui_Manager()
-    ui_manager.initialize_ui(ui);
+    ui_manager.initialize_ui(ui, profiler);
     MainWindow.show()
+    profiler.mark("show")
     sys.exit(app.exec_())
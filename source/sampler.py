@@ -0,0 +1,105 @@
+from random import Random
+
+
+class Sampler():
+    """
+    This class selects random positions from a population of the given size.
+
+    It is used by the QuranApi and HadithApi classes to select random rukus
+    and hadith. Each position is selected with the same probability in
+    constant time. If a seed is given, then the same sequence of positions
+    is selected each time.
+
+    In the no repeat mode the positions are returned in shuffled order, so no
+    position is selected again until all positions have been selected. The
+    shuffle is a Fisher-Yates shuffle that is done one step per selection.
+    Only the swapped positions are stored, so the population is not copied.
+
+    Methods
+    -------
+    __init__()
+        Initializes the random number generator and the shuffle state.
+    get_next()
+        Returns the next random position.
+    get_remaining()
+        Returns the number of positions left in the current shuffle.
+    reset()
+        Restarts the sequence of random positions.
+    """
+
+    def __init__(self, size: int, seed: int = None,
+                 no_repeat: bool = False) -> None:
+        """Initializes the random number generator and the shuffle state.
+
+        :param size: The number of positions in the population.
+        :type size: int.
+        :param seed: The seed of the random number generator. If it is not
+            given, then the sequence is different each time.
+        :type seed: int.
+        :param no_repeat: Indicates that a position is not selected again
+            until all positions have been selected.
+        :type no_repeat: bool.
+        :raises ValueError: If the population is empty.
+        """
+
+        # If the population is empty
+        if size <= 0:
+            raise ValueError("The population is empty")
+
+        # The number of positions in the population
+        self.size = size
+        # The seed of the random number generator
+        self.seed = seed
+        # Indicates that the positions are not repeated
+        self.no_repeat = no_repeat
+        self.reset()
+
+    def get_next(self) -> int:
+        """Returns the next random position.
+
+        :return: The position, from 0 to the population size minus 1.
+        :rtype: int.
+        """
+
+        # If the positions may be repeated
+        if not self.no_repeat:
+            return self.random.randrange(self.size)
+
+        # If all positions have been selected, then a new shuffle is started
+        if self.pos == self.size:
+            self.swaps.clear()
+            self.pos = 0
+        # A random position that has not been selected yet
+        pick = self.random.randrange(self.pos, self.size)
+        # The position stored at the picked and current places
+        value = self.swaps.get(pick, pick)
+        current = self.swaps.pop(self.pos, self.pos)
+        # The position at the current place is moved to the picked place
+        if pick != self.pos:
+            self.swaps[pick] = current
+        self.pos += 1
+
+        return value
+
+    def get_remaining(self) -> int:
+        """Returns the number of positions left in the current shuffle.
+
+        :return: The number of positions that have not been selected. It is
+            the population size if the positions may be repeated.
+        :rtype: int.
+        """
+
+        return self.size - self.pos if self.no_repeat else self.size
+
+    def reset(self) -> None:
+        """Restarts the sequence of random positions.
+
+        If a seed was given, then the same sequence is selected again.
+        """
+
+        # The random number generator
+        self.random = Random(self.seed)
+        # The positions swapped by the shuffle, keyed by place
+        self.swaps = {}
+        # The number of positions selected in the current shuffle
+        self.pos = 0
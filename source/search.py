@@ -0,0 +1,173 @@
+"""Search Index Builder
+
+This script builds the full text search indexes used by the quran and hadith
+readers. It prints the time taken to build each index and the size of the
+index. The quran command also creates the covering index used to load the
+ruku index.
+
+It can be run using the command: python -m source.search quran
+The hadith indexes can be built using the command: python -m source.search
+hadith. The languages to index may be given with the --lang option. By
+default all languages are indexed. The hadith indexes are built in batches.
+If the build is interrupted, running the command again resumes it.
+
+The module also contains the helper functions used to normalize Arabic and
+Urdu text and to convert the text entered by the user to a full text search
+query.
+"""
+
+import argparse, re
+
+class SearchIndexError(Exception):
+    """This exception is raised when a search index has not been built and
+    the database is opened read only, so the reader cannot build it.
+    """
+
+# The characters that make up a search term. The Arabic diacritics are
+# included, so they do not split words
+TERM_PATTERN = re.compile(
+    r"[\w\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED]+", re.UNICODE)
+
+# The Arabic diacritics, Quranic annotation marks and the tatweel. They are
+# removed from the text
+DIACRITICS = (
+    list(range(0x0610, 0x061B)) + list(range(0x064B, 0x0660)) + [0x0670] +
+    list(range(0x06D6, 0x06DD)) + list(range(0x06DF, 0x06E9)) +
+    list(range(0x06EA, 0x06EE)) + [0x0640]
+)
+# The forms of alef. They are replaced with the plain alef
+ALEF_FORMS = [0x0622, 0x0623, 0x0625, 0x0671, 0x0672, 0x0673]
+# The forms of yeh. They are replaced with the Arabic yeh
+YEH_FORMS = [0x0649, 0x06CC, 0x06CD, 0x06D0]
+
+# The translation table used to normalize text
+NORMALIZE_TABLE = {c: None for c in DIACRITICS}
+NORMALIZE_TABLE.update({c: "\u0627" for c in ALEF_FORMS})
+NORMALIZE_TABLE.update({c: "\u064A" for c in YEH_FORMS})
+
+def normalize(text: str) -> str:
+    """Normalizes the given Arabic or Urdu text for searching.
+
+    The diacritics are removed and the different forms of alef and yeh are
+    replaced with a single form. Other text is not changed.
+
+    :param text: The text to normalize.
+    :type text: str.
+    :return: The normalized text.
+    :rtype: str.
+    """
+
+    return text.translate(NORMALIZE_TABLE)
+
+def to_match_query(text: str) -> str:
+    """Converts the given search text to an FTS5 match query.
+
+    Each word in the text is quoted, so characters that have a special
+    meaning in the FTS5 query syntax are not interpreted. All words must be
+    present in a matching row. The last word is treated as a prefix, so
+    results are found while the user is still typing.
+
+    :param text: The search text entered by the user.
+    :type text: str.
+    :return: The FTS5 match query. It is empty if the text has no words.
+    :rtype: str.
+    """
+
+    # The words in the search text
+    terms = TERM_PATTERN.findall(text)
+    # If the text has no words
+    if len(terms) == 0:
+        return ""
+
+    # Each word is quoted
+    terms = ['"' + term + '"' for term in terms]
+    # The last word is used as a prefix
+    terms[-1] += "*"
+    # The match query
+    query = " ".join(terms)
+
+    return query
+
+def build_quran_indexes(lang_list: list) -> None:
+    """Builds the quran search indexes for the given languages.
+
+    The covering index on the ayat meta data is also created.
+
+    :param lang_list: The languages to index. All languages are indexed if
+        the list is empty.
+    :type lang_list: list.
+    """
+
+    from source.qapi import QuranApi
+    from source.qconfig import QConfig
+
+    # The application configuration
+    config = QConfig().get_config()
+    # An instance of the QuranApi class is created
+    api = QuranApi(config["db_path"], config["default_lang"])
+    # The covering index used to build the ruku index is created
+    api.build_meta_index()
+    # If no languages are given, then all languages are indexed
+    if len(lang_list) == 0:
+        lang_list = api.get_lang_list()
+
+    # Each language is indexed
+    for lang in lang_list:
+        # The search index is built
+        stats = api.build_search_index(lang)
+        print("%s: %d rows indexed in %.2f s, index size %.1f KB" % (
+            lang, stats["rows"], stats["time"], stats["size"] / 1024))
+
+def build_hadith_indexes(lang_list: list, batch_size: int,
+                         rebuild: bool) -> None:
+    """Builds the hadith search indexes for the given languages.
+
+    :param lang_list: The languages to index. All languages are indexed if
+        the list is empty.
+    :type lang_list: list.
+    :param batch_size: The number of hadith indexed in each transaction.
+    :type batch_size: int.
+    :param rebuild: Indicates if the existing indexes should be removed
+        first.
+    :type rebuild: bool.
+    """
+
+    from source.hapi import HadithApi
+    from source.hconfig import HConfig
+
+    # The application configuration
+    config = HConfig().get_config()
+    # An instance of the HadithApi class is created
+    api = HadithApi(config["db_path"], config["default_lang"])
+    # If no languages are given, then all languages are indexed
+    if len(lang_list) == 0:
+        lang_list = ["Urdu", "English", "Arabic"]
+
+    # Each language is indexed
+    for lang in lang_list:
+        # The language is set
+        api.set_lang(lang)
+        # The search index is built
+        stats = api.build_search_index(batch_size, rebuild)
+        print("%s: %d rows indexed in %.2f s, index size %.1f KB" % (
+            lang, stats["rows"], stats["time"], stats["size"] / 1024))
+
+if __name__ == "__main__":
+    # The command line arguments
+    parser = argparse.ArgumentParser(description="Builds search indexes.")
+    parser.add_argument("reader", choices=["quran", "hadith"],
+                        help="The reader whose data is indexed.")
+    parser.add_argument("--lang", action="append", default=[],
+                        help="A language to index. May be repeated.")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="The number of hadith indexed in each batch.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Removes the hadith indexes before building.")
+    args = parser.parse_args()
+
+    # If the quran data is indexed
+    if args.reader == "quran":
+        build_quran_indexes(args.lang)
+    # If the hadith data is indexed
+    elif args.reader == "hadith":
+        build_hadith_indexes(args.lang, args.batch_size, args.rebuild)
@@ -0,0 +1,706 @@
+"""Headless Api Server
+
+This script serves the quran and hadith data as json over http, without the
+reader user interface. The requests are read by an asyncio event loop. The
+database queries are run by a pool of worker threads. Each worker thread uses
+its own read only QuranApi and HadithApi objects, with pooled connections.
+The responses are cached in memory. By default the sqlite database backend
+is used, so Qt is not loaded.
+
+It can be run using the command: python -m source.server
+The address is set with the --host and --port options. The number of worker
+threads is set with the --workers option. The database backend is set with
+the --backend option.
+
+The following GET requests are supported. The quran and hadith requests take
+an optional lang parameter. By default the language in the reader
+configuration is used.
+
+  /quran/languages                  The list of quran languages.
+  /quran/suras                      The name and ruku count of each sura.
+  /quran/ruku?sura=2&ruku=3         The ayat range and ayat text of a ruku.
+  /quran/range?sura=2&ruku=3        The ayat range of a ruku.
+  /quran/random                     A random sura and ruku.
+  /hadith/sources                   The list of hadith sources.
+  /hadith/books?source=Bukhari      The books of a hadith source.
+  /hadith/titles?book=1             The hadith titles of a book.
+  /hadith/text?id=1                 The text of a hadith.
+  /hadith/random                    The id, book and source of a random hadith.
+  /stats                            The response cache statistics.
+"""
+
+import argparse, asyncio, importlib, json, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+
+from source.api import ApiError
+from source.backends import BACKENDS
+from source.cache import PageCache
+from source.hapi import HadithApi
+from source.hconfig import HConfig
+from source.qapi import QuranApi
+from source.qconfig import QConfig
+
+# The languages of the hadith data
+HADITH_LANGS = ("Urdu", "English", "Arabic")
+# The reason phrases of the http status codes used by the server
+STATUS_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 500: "Internal Server Error"
+}
+# The maximum size of the request line and each header line
+MAX_LINE_SIZE = 8192
+
+class HttpError(Exception):
+    """This exception is raised for requests that cannot be answered. It
+    contains the http status code.
+    """
+
+    def __init__(self, status: int, msg: str) -> None:
+        """Initializes the exception.
+
+        :param status: The http status code.
+        :type status: int.
+        :param msg: The error message.
+        :type msg: str.
+        """
+
+        super().__init__(msg)
+        # The http status code
+        self.status = status
+
+class ApiService():
+    """This class answers the api requests. It does not depend on asyncio,
+    so it can be used without the server.
+
+    The requests are answered by the worker threads. Each worker thread
+    creates its own QuranApi and HadithApi objects the first time it is used.
+
+    Methods
+    -------
+    __init__()
+        The class constructor.
+    handle()
+        Returns the status and json response for the given request.
+    get_routes()
+        Returns the request handler and cache flag of each path.
+    quran_languages()
+        Returns the list of quran languages.
+    quran_suras()
+        Returns the name and ruku count of each sura.
+    quran_ruku()
+        Returns the ayat range and ayat text of a ruku.
+    quran_range()
+        Returns the ayat range of a ruku.
+    quran_random()
+        Returns a random sura and ruku.
+    hadith_sources()
+        Returns the list of hadith sources.
+    hadith_books()
+        Returns the books of a hadith source.
+    hadith_titles()
+        Returns the hadith titles of a book.
+    hadith_text()
+        Returns the text of a hadith.
+    hadith_random()
+        Returns the id, book and source of a random hadith.
+    _get_quran_api()
+        Returns the QuranApi object of the current thread.
+    _get_hadith_api()
+        Returns the HadithApi object of the current thread.
+    _get_ruku()
+        Returns the sura and ruku in the given parameters.
+    _get_int()
+        Returns the given integer parameter.
+    """
+
+    def __init__(self, qconfig: dict, hconfig: dict,
+                 backend: str = "sqlite") -> None:
+        """Initializes the service.
+
+        :param qconfig: The quran reader configuration.
+        :type qconfig: dict.
+        :param hconfig: The hadith reader configuration.
+        :type hconfig: dict.
+        :param backend: The database backend.
+        :type backend: str.
+        """
+
+        # The reader configurations
+        self.qconfig = qconfig
+        self.hconfig = hconfig
+        # The database backend
+        self.backend = backend
+        # The api objects of each worker thread
+        self.local = threading.local()
+
+    def handle(self, path: str, params: dict) -> tuple:
+        """Returns the status and json response for the given request.
+
+        :param path: The request path.
+        :type path: str.
+        :param params: The query parameters.
+        :type params: dict.
+        :return: The http status code and the response body.
+        :rtype: tuple.
+        """
+
+        try:
+            # The request handler
+            route = self.get_routes().get(path)
+            # If the path is not supported
+            if route is None:
+                raise HttpError(404, "Unknown path: " + path)
+            # The request is answered
+            status, data = 200, route[0](params)
+        except HttpError as err:
+            status, data = err.status, {"error": str(err)}
+        except ApiError as err:
+            status, data = 500, {"error": str(err)}
+        except Exception as err:
+            # Any other error is answered, so the client gets a response
+            status, data = 500, {"error": "Internal error: %s" % err}
+
+        # The response body
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+        return (status, body)
+
+    def get_routes(self) -> dict:
+        """Returns the request handler and cache flag of each path.
+
+        :return: The request handler and a flag that indicates if the
+            response can be cached, keyed by path.
+        :rtype: dict.
+        """
+
+        # The supported paths
+        routes = {
+            "/quran/languages": (self.quran_languages, True),
+            "/quran/suras": (self.quran_suras, True),
+            "/quran/ruku": (self.quran_ruku, True),
+            "/quran/range": (self.quran_range, True),
+            "/quran/random": (self.quran_random, False),
+            "/hadith/sources": (self.hadith_sources, True),
+            "/hadith/books": (self.hadith_books, True),
+            "/hadith/titles": (self.hadith_titles, True),
+            "/hadith/text": (self.hadith_text, True),
+            "/hadith/random": (self.hadith_random, False)
+        }
+
+        return routes
+
+    def quran_languages(self, params: dict) -> dict:
+        """Returns the list of quran languages.
+
+        :param params: The query parameters.
+        :type params: dict.
+        :return: The list of languages.
+        :rtype: dict.
+        """
+
+        return {"languages": self._get_quran_api(params).get_lang_list()}
+
+    def quran_suras(self, params: dict) -> dict:
+        """Returns the name and ruku count of each sura.
+
+        :param params: The query parameters.
+        :type params: dict.
+        :return: The sura number, name and ruku count of each sura.
+        :rtype: dict.
+        """
+
+        # The QuranApi object
+        api = self._get_quran_api(params)
+        # The details of each sura
+        suras = []
+        for sura, name in enumerate(api.get_sura_names(), 1):
+            suras.append({
+                "sura": sura,
+                "name": name,
+                "rukus": api.get_ruku_count(sura)
+            })
+
+        return {"suras": suras}
+
+    def quran_ruku(self, params: dict) -> dict:
+        """Returns the ayat range and ayat text of a ruku.
+
+        :param params: The query parameters. The sura and ruku are required.
+        :type params: dict.
+        :return: The sura, ruku, start and end ayat and the ayat text.
+        :rtype: dict.
+        """
+
+        # The QuranApi object
+        api = self._get_quran_api(params)
+        # The requested sura and ruku
+        sura, ruku = self._get_ruku(api, params)
+        # The ayat range
+        ayat_range = api.get_ayat_range(sura, ruku)
+        # The response data
+        data = {
+            "lang": api.lang,
+            "sura": sura,
+            "ruku": ruku,
+            "start": ayat_range["start"],
+            "end": ayat_range["end"],
+            "ayat": api.get_ayat_text(sura, ruku)
+        }
+
+        return data
+
+    def quran_range(self, params: dict) -> dict:
+        """Returns the ayat range of a ruku.
+
+        :param params: The query parameters. The sura and ruku are required.
+        :type params: dict.
+        :return: The sura, ruku and the start and end ayat.
+        :rtype: dict.
+        """
+
+        # The QuranApi object
+        api = self._get_quran_api(params)
+        # The requested sura and ruku
+        sura, ruku = self._get_ruku(api, params)
+        # The response data
+        data = {"sura": sura, "ruku": ruku}
+        data.update(api.get_ayat_range(sura, ruku))
+
+        return data
+
+    def quran_random(self, params: dict) -> dict:
+        """Returns a random sura and ruku.
+
+        :param params: The query parameters.
+        :type params: dict.
+        :return: The sura and ruku.
+        :rtype: dict.
+        """
+
+        # The random ruku
+        ruku = self._get_quran_api(params).get_random_ruku()
+
+        return {"sura": ruku["sura"], "ruku": ruku["sura_ruku"]}
+
+    def hadith_sources(self, params: dict) -> dict:
+        """Returns the list of hadith sources.
+
+        :param params: The query parameters.
+        :type params: dict.
+        :return: The list of sources.
+        :rtype: dict.
+        """
+
+        return {"sources": self._get_hadith_api(params).get_source_list()}
+
+    def hadith_books(self, params: dict) -> dict:
+        """Returns the books of a hadith source.
+
+        :param params: The query parameters. The source is required.
+        :type params: dict.
+        :return: The id and name of each book.
+        :rtype: dict.
+        """
+
+        # If the source is not given
+        if "source" not in params:
+            raise HttpError(400, "The source parameter is required")
+        # The books of the source
+        rows = self._get_hadith_api(params).get_book_list(params["source"])
+        # If the source does not exist
+        if len(rows) == 0:
+            raise HttpError(404, "Unknown source: " + params["source"])
+
+        return {"books": [{"id": row[0], "name": row[1]} for row in rows]}
+
+    def hadith_titles(self, params: dict) -> dict:
+        """Returns the hadith titles of a book.
+
+        :param params: The query parameters. The book id is required.
+        :type params: dict.
+        :return: The id and title of each hadith.
+        :rtype: dict.
+        """
+
+        # The book id
+        book = self._get_int(params, "book")
+        # The hadith titles of the book
+        rows = self._get_hadith_api(params).get_title_list(book)
+        # If the book does not exist
+        if len(rows) == 0:
+            raise HttpError(404, "Unknown book: %d" % book)
+
+        return {"titles": [{"id": row[0], "title": row[1]} for row in rows]}
+
+    def hadith_text(self, params: dict) -> dict:
+        """Returns the text of a hadith.
+
+        :param params: The query parameters. The hadith id is required.
+        :type params: dict.
+        :return: The hadith id and text.
+        :rtype: dict.
+        """
+
+        # The hadith id
+        hadith_id = self._get_int(params, "id")
+        try:
+            # The hadith text
+            text = self._get_hadith_api(params).get_hadith_text(hadith_id)
+        except IndexError:
+            raise HttpError(404, "Unknown hadith: %d" % hadith_id)
+
+        return {"id": hadith_id, "text": text}
+
+    def hadith_random(self, params: dict) -> dict:
+        """Returns the id, book and source of a random hadith.
+
+        :param params: The query parameters.
+        :type params: dict.
+        :return: The hadith id, book id and source.
+        :rtype: dict.
+        """
+
+        # The random hadith
+        hadith = self._get_hadith_api(params).get_random_hadith()
+        # If there are no hadith
+        if hadith is None:
+            raise HttpError(404, "No hadith found")
+
+        return {"id": hadith["id"], "book": hadith["book_id"],
+                "source": hadith["source"]}
+
+    def _get_quran_api(self, params: dict) -> QuranApi:
+        """Returns the QuranApi object of the current thread.
+
+        The language is set from the lang parameter.
+
+        :param params: The query parameters.
+        :type params: dict.
+        :return: The QuranApi object.
+        :rtype: QuranApi.
+        """
+
+        # The QuranApi object of the current thread
+        api = getattr(self.local, "quran", None)
+        # If the object does not exist
+        if api is None:
+            api = QuranApi(self.qconfig["db_path"],
+                           self.qconfig["default_lang"],
+                           profile=self.qconfig["db_profile"],
+                           backend=self.backend,
+                           snapshot_path=self.qconfig["snapshot_path"])
+            self.local.quran = api
+        # The requested language
+        lang = params.get("lang", self.qconfig["default_lang"])
+        # If the language is not supported
+        if lang not in api.lang_meta:
+            raise HttpError(400, "Unknown language: " + lang)
+        api.set_lang(lang)
+
+        return api
+
+    def _get_hadith_api(self, params: dict) -> HadithApi:
+        """Returns the HadithApi object of the current thread.
+
+        The language is set from the lang parameter.
+
+        :param params: The query parameters.
+        :type params: dict.
+        :return: The HadithApi object.
+        :rtype: HadithApi.
+        """
+
+        # The HadithApi object of the current thread
+        api = getattr(self.local, "hadith", None)
+        # If the object does not exist
+        if api is None:
+            api = HadithApi(self.hconfig["db_path"],
+                            self.hconfig["default_lang"],
+                            profile=self.hconfig["db_profile"],
+                            backend=self.backend,
+                            snapshot_path=self.hconfig["snapshot_path"])
+            self.local.hadith = api
+        # The requested language
+        lang = params.get("lang", self.hconfig["default_lang"])
+        # If the language is not supported
+        if lang not in HADITH_LANGS:
+            raise HttpError(400, "Unknown language: " + lang)
+        api.set_lang(lang)
+
+        return api
+
+    def _get_ruku(self, api: QuranApi, params: dict) -> tuple:
+        """Returns the sura and ruku in the given parameters.
+
+        :param api: The QuranApi object.
+        :type api: QuranApi.
+        :param params: The query parameters.
+        :type params: dict.
+        :return: The sura and ruku numbers.
+        :rtype: tuple.
+        """
+
+        # The sura and ruku numbers
+        sura = self._get_int(params, "sura")
+        ruku = self._get_int(params, "ruku")
+        # If the sura does not exist
+        if sura < 1 or sura > len(api.get_sura_names()):
+            raise HttpError(404, "Unknown sura: %d" % sura)
+        # If the ruku does not exist
+        if ruku < 1 or ruku > api.get_ruku_count(sura):
+            raise HttpError(404, "Unknown ruku: %d" % ruku)
+
+        return (sura, ruku)
+
+    def _get_int(self, params: dict, name: str) -> int:
+        """Returns the given integer parameter.
+
+        :param params: The query parameters.
+        :type params: dict.
+        :param name: The parameter name.
+        :type name: str.
+        :return: The parameter value.
+        :rtype: int.
+        """
+
+        try:
+            value = int(params[name])
+        except KeyError:
+            raise HttpError(400, "The %s parameter is required" % name)
+        except ValueError:
+            raise HttpError(400, "The %s parameter must be a number" % name)
+        # If the value does not fit in a database integer
+        if not -2 ** 63 <= value < 2 ** 63:
+            raise HttpError(400, "The %s parameter is out of range" % name)
+
+        return value
+
+class ApiServer():
+    """This class serves the api requests over http.
+
+    The requests are read by the asyncio event loop and answered by the
+    ApiService in a pool of worker threads. The responses of cacheable
+    requests are kept in a page cache, so they are sent without using a
+    worker thread. Keep alive connections are supported.
+
+    Methods
+    -------
+    __init__()
+        The class constructor.
+    start()
+        Starts listening for connections.
+    get_response()
+        Returns the status and body for the given request target.
+    get_stats()
+        Returns the response cache statistics.
+    _handle_client()
+        Reads the requests of a client connection and sends the responses.
+    _send()
+        Sends an http response.
+    """
+
+    def __init__(self, service: ApiService, workers: int = 4,
+                 cache_size: int = 8 * 1024 * 1024) -> None:
+        """Initializes the server.
+
+        :param service: The service that answers the requests.
+        :type service: ApiService.
+        :param workers: The number of worker threads.
+        :type workers: int.
+        :param cache_size: The maximum size of the cached responses in bytes.
+        :type cache_size: int.
+        """
+
+        # The service that answers the requests
+        self.service = service
+        # The worker threads
+        self.executor = ThreadPoolExecutor(workers)
+        # The response cache. It is only used by the event loop thread
+        self.cache = PageCache(cache_size)
+        # The asyncio server
+        self.server = None
+
+    async def start(self, host: str, port: int) -> None:
+        """Starts listening for connections.
+
+        :param host: The address to listen on.
+        :type host: str.
+        :param port: The port to listen on. If it is 0, a free port is used.
+        :type port: int.
+        """
+
+        self.server = await asyncio.start_server(
+            self._handle_client, host, port)
+
+    async def get_response(self, target: str) -> tuple:
+        """Returns the status and body for the given request target.
+
+        :param target: The request path and query string.
+        :type target: str.
+        :return: The http status code and the response body.
+        :rtype: tuple.
+        """
+
+        # The path and query parameters
+        url = urlsplit(target)
+        params = dict(parse_qsl(url.query))
+        # If the cache statistics are requested
+        if url.path == "/stats":
+            return (200, json.dumps(self.get_stats()).encode("utf-8"))
+
+        # The cache key
+        key = (url.path, tuple(sorted(params.items())))
+        # The cached response
+        body = self.cache.get(key)
+        # If the response is cached
+        if body is not None:
+            return (200, body)
+
+        # The start time
+        start = time.perf_counter()
+        # The request is answered by a worker thread
+        loop = asyncio.get_event_loop()
+        status, body = await loop.run_in_executor(
+            self.executor, self.service.handle, url.path, params)
+        # The time taken in milliseconds
+        run_time = (time.perf_counter() - start) * 1000
+        # The request handler
+        route = self.service.get_routes().get(url.path)
+        # If the response can be cached
+        if status == 200 and route is not None and route[1]:
+            self.cache.put(key, body, len(body), run_time)
+
+        return (status, body)
+
+    def get_stats(self) -> dict:
+        """Returns the response cache statistics.
+
+        :return: The page cache statistics.
+        :rtype: dict.
+        """
+
+        return self.cache.get_stats()
+
+    async def _handle_client(self, reader: asyncio.StreamReader,
+                             writer: asyncio.StreamWriter) -> None:
+        """Reads the requests of a client connection and sends the responses.
+
+        :param reader: The stream used to read the requests.
+        :type reader: asyncio.StreamReader.
+        :param writer: The stream used to send the responses.
+        :type writer: asyncio.StreamWriter.
+        """
+
+        try:
+            while True:
+                # The request line
+                line = await reader.readline()
+                # If the client closed the connection
+                if not line:
+                    break
+                # The request headers
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    # If the end of the headers is reached
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    # If the header is too long
+                    if len(header) > MAX_LINE_SIZE:
+                        raise ValueError("Header too long")
+                    name, sep, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                # The parts of the request line
+                parts = line.decode("latin-1").split()
+                # If the request line is invalid
+                if len(parts) != 3 or len(line) > MAX_LINE_SIZE:
+                    self._send(writer, 400, b'{"error": "Bad request"}', False)
+                    break
+                method, target, version = parts
+                # Indicates that the connection is kept open
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close" and
+                    version == "HTTP/1.1")
+                # If the method is not supported
+                if method not in ("GET", "HEAD"):
+                    status = 405
+                    body = b'{"error": "Only GET requests are supported"}'
+                else:
+                    status, body = await self.get_response(target)
+                # The response is sent
+                self._send(writer, status, body, keep_alive, method == "HEAD")
+                await writer.drain()
+                # If the connection is not kept open
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _send(self, writer: asyncio.StreamWriter, status: int, body: bytes,
+              keep_alive: bool, head: bool = False) -> None:
+        """Sends an http response.
+
+        :param writer: The stream used to send the response.
+        :type writer: asyncio.StreamWriter.
+        :param status: The http status code.
+        :type status: int.
+        :param body: The json response body.
+        :type body: bytes.
+        :param keep_alive: Indicates that the connection is kept open.
+        :type keep_alive: bool.
+        :param head: Indicates that the body is not sent.
+        :type head: bool.
+        """
+
+        # The response headers
+        headers = [
+            "HTTP/1.1 %d %s" % (status, STATUS_REASONS[status]),
+            "Content-Type: application/json; charset=utf-8",
+            "Content-Length: %d" % len(body),
+            "Connection: " + ("keep-alive" if keep_alive else "close"),
+            "", ""
+        ]
+        # The response is written
+        writer.write("\r\n".join(headers).encode("latin-1"))
+        if not head:
+            writer.write(body)
+
+if __name__ == "__main__":
+    # The command line arguments
+    parser = argparse.ArgumentParser(
+        description="Serves the quran and hadith data as json.")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="The address to listen on.")
+    parser.add_argument("--port", type=int, default=8080,
+                        help="The port to listen on.")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="The number of worker threads.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        default="sqlite", help="The database backend.")
+    args = parser.parse_args()
+
+    # The connection manager of the backend
+    module = importlib.import_module(BACKENDS[args.backend][0])
+    connections = module.connections
+    # Each worker thread uses a quran and a hadith connection
+    connections.max_connections = max(
+        connections.max_connections, 2 * args.workers)
+    # The service uses the reader configurations
+    service = ApiService(QConfig().get_config(), HConfig().get_config(),
+                         args.backend)
+    server = ApiServer(service, args.workers)
+    # The event loop
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(server.start(args.host, args.port))
+    print("Serving on http://%s:%d" % (args.host, args.port))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.close()
+        server.executor.shutdown()
@@ -0,0 +1,117 @@
+import time
+from typing import Callable
+
+from PyQt5 import QtCore
+
+from source.worker import DataDispatcher
+
+class SettingsWriter(QtCore.QObject):
+    """This class is used to save the reader settings without writing to the
+    database on every navigation action.
+
+    The settings updates are kept in memory. Only the latest update is
+    written. It is written when no update has been made for a short time, when
+    the oldest unsaved update reaches the maximum delay, or when flush is
+    called on application exit. The write is sent to the background thread.
+
+    Methods
+    -------
+    __init__()
+        The class constructor.
+    update()
+        Saves the given settings update in memory.
+    flush()
+        Writes the latest settings update to the database.
+    get_stats()
+        Returns the number of updates, writes and saved writes.
+    """
+
+    def __init__(self, dispatcher: DataDispatcher, delay: int = 1000,
+                 max_delay: int = 5000) -> None:
+        """Initializes the settings writer.
+
+        :param dispatcher: The dispatcher used to send the writes to the
+            background thread.
+        :type dispatcher: DataDispatcher.
+        :param delay: The time in milliseconds without updates after which
+            the settings are written.
+        :type delay: int.
+        :param max_delay: The maximum time in milliseconds that an update is
+            kept in memory.
+        :type max_delay: int.
+        """
+
+        # The parent class constructor is called
+        super().__init__()
+        # The dispatcher for the background thread
+        self.dispatcher = dispatcher
+        # The write delays in milliseconds
+        self.delay = delay
+        self.max_delay = max_delay
+        # The function that writes the latest settings update
+        self.pending = None
+        # The time of the oldest unsaved update
+        self.first_update = None
+        # The number of settings updates
+        self.updates = 0
+        # The number of database writes
+        self.writes = 0
+        # The timer used to write the settings
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def update(self, func: Callable) -> None:
+        """Saves the given settings update in memory.
+
+        It replaces the previous unsaved update.
+
+        :param func: The function that writes the settings. It is called with
+            the api object of the background thread.
+        :type func: Callable.
+        """
+
+        # The update is saved
+        self.pending = func
+        self.updates += 1
+        # If this is the oldest unsaved update
+        if self.first_update is None:
+            self.first_update = time.monotonic()
+        # The time in milliseconds since the oldest unsaved update
+        waited = (time.monotonic() - self.first_update) * 1000
+        # The timer is restarted. It does not wait beyond the maximum delay
+        self.timer.start(int(max(0, min(self.delay, self.max_delay - waited))))
+
+    def flush(self) -> None:
+        """Writes the latest settings update to the database.
+        """
+
+        # The timer is stopped
+        self.timer.stop()
+        # If there is no unsaved update
+        if self.pending is None:
+            return
+
+        # The write is sent to the background thread
+        self.dispatcher.submit("settings", self.pending)
+        self.writes += 1
+        # The update is marked as saved
+        self.pending = None
+        self.first_update = None
+
+    def get_stats(self) -> dict:
+        """Returns the number of updates, writes and saved writes.
+
+        :return: The number of settings updates, the number of database
+            writes and the number of writes saved.
+        :rtype: dict.
+        """
+
+        # The writer statistics
+        stats = {
+            "updates": self.updates,
+            "writes": self.writes,
+            "saved": self.updates - self.writes
+        }
+
+        return stats
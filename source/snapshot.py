@@ -0,0 +1,559 @@
+"""Meta Data Snapshot Builder
+
+This script compiles the meta data of the quran and hadith databases into a
+binary snapshot file. The meta data does not change, so the readers can load
+it from the snapshot instead of querying the database at startup. The quran
+snapshot contains the sura and ruku navigation index and the language meta
+data. The hadith snapshot contains the sources, books and hadith titles of
+each language.
+
+It can be run using the command: python -m source.snapshot quran
+The hadith snapshot can be built using the command: python -m source.snapshot
+hadith. The snapshot is written to the path given by the snapshot_path config
+value. The snapshot records the checksum of the database it was built from.
+If the database changes, for example when the search indexes are built, the
+snapshot is no longer used and should be built again.
+
+The snapshot file starts with a header and a directory of sections. Each
+section is an array of numbers that is read through a memory map without
+copying it. The strings are stored once in a string table and the sections
+refer to them by their position in the table.
+"""
+
+import argparse, logging, mmap, os, struct, tempfile, time, zlib
+from array import array, typecodes as array_typecodes
+from collections import OrderedDict
+
+# The first bytes of each snapshot file
+MAGIC = b"ICSNAP\x00\x00"
+# The version of the snapshot format
+VERSION = 2
+# Used to check that the snapshot was written with the same byte order
+BYTE_ORDER = 0x01020304
+# The header. It contains the magic bytes, byte order, format version,
+# number of sections, database size, database checksum and the checksum of
+# the directory and sections
+HEADER = struct.Struct("=8sIIIQII")
+# A directory entry. It contains the section name, array type code, offset
+# and number of items
+ENTRY = struct.Struct("=32s4sQQ")
+# The number of bytes read from the start of the database for the checksum.
+# The SQLite header contains the file change counter and the schema cookie
+DB_HEADER_SIZE = 100
+# The languages of the hadith data
+HADITH_LANGS = ["Urdu", "English", "Arabic"]
+
+class SnapshotError(Exception):
+    """Raised when the snapshot cannot be read or does not match the
+    database.
+    """
+
+def get_db_checksum(db_path: str) -> tuple:
+    """Returns the size and checksum of the given database.
+
+    The checksum is the crc32 of the SQLite database header. The header
+    contains the file change counter, which is increased by each write
+    transaction, so reading it is enough to detect changes to the database.
+
+    :param db_path: The path of the database.
+    :type db_path: str.
+    :return: The size of the database in bytes and the checksum.
+    :rtype: tuple.
+    :raises OSError: If the database cannot be read.
+    """
+
+    with open(db_path, "rb") as db_file:
+        # The database header
+        header = db_file.read(DB_HEADER_SIZE)
+        # The size of the database
+        size = os.fstat(db_file.fileno()).st_size
+
+    return (size, zlib.crc32(header))
+
+class SnapshotWriter():
+    """Used to write a snapshot file.
+
+    Methods
+    -------
+    __init__()
+        Initializes the sections and the string table.
+    add_array()
+        Adds an array of numbers to the snapshot.
+    add_strings()
+        Adds a list of strings to the snapshot.
+    write()
+        Writes the snapshot to the given path.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the sections and the string table.
+        """
+
+        # The sections, keyed by section name
+        self.sections = OrderedDict()
+        # The position of each string in the string table
+        self.strings = {}
+        # The utf-8 encoded strings
+        self.string_data = bytearray()
+        # The offset of each string in the string data. The last item is the
+        # size of the string data
+        self.string_offsets = array("I", [0])
+
+    def add_array(self, name: str, typecode: str, values) -> None:
+        """Adds an array of numbers to the snapshot.
+
+        :param name: The section name.
+        :type name: str.
+        :param typecode: The array type code, such as "B", "H" or "I".
+        :type typecode: str.
+        :param values: The numbers.
+        :type values: Iterable[int].
+        """
+
+        self.sections[name] = array(typecode, values)
+
+    def add_strings(self, name: str, values) -> None:
+        """Adds a list of strings to the snapshot.
+
+        Each string is added to the string table once. The section contains
+        the position of each string in the string table.
+
+        :param name: The section name.
+        :type name: str.
+        :param values: The strings.
+        :type values: Iterable[str].
+        """
+
+        # The position of each string in the string table
+        ids = array("I")
+        for value in values:
+            # If the string is not in the string table
+            if value not in self.strings:
+                self.strings[value] = len(self.strings)
+                self.string_data += value.encode("utf-8")
+                self.string_offsets.append(len(self.string_data))
+            ids.append(self.strings[value])
+
+        self.sections[name] = ids
+
+    def write(self, path: str, db_path: str) -> int:
+        """Writes the snapshot to the given path.
+
+        The snapshot is written to a temporary file first, which then
+        replaces the snapshot file.
+
+        :param path: The path of the snapshot file.
+        :type path: str.
+        :param db_path: The path of the database the snapshot was built from.
+        :type db_path: str.
+        :return: The size of the snapshot in bytes.
+        :rtype: int.
+        """
+
+        # The sections, including the string table
+        sections = OrderedDict(self.sections)
+        sections["strings.offsets"] = self.string_offsets
+        sections["strings.data"] = array("B", self.string_data)
+        # The size and checksum of the database
+        db_size, checksum = get_db_checksum(db_path)
+
+        # The offset of the first section
+        offset = HEADER.size + ENTRY.size * len(sections)
+        # The directory and the padded section data
+        directory = b""
+        data = bytearray()
+        for name, values in sections.items():
+            # Each section starts at a multiple of 8 bytes
+            padding = -(offset + len(data)) % 8
+            data += b"\x00" * padding
+            directory += ENTRY.pack(name.encode("utf-8"),
+                                    values.typecode.encode("ascii"),
+                                    offset + len(data), len(values))
+            data += values.tobytes()
+
+        # The checksum of the directory and sections
+        data_checksum = zlib.crc32(data, zlib.crc32(directory))
+        # The folder of the snapshot file
+        folder = os.path.dirname(os.path.abspath(path))
+        # The snapshot is written to a temporary file in the same folder
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(HEADER.pack(MAGIC, BYTE_ORDER, VERSION,
+                                     len(sections), db_size, checksum,
+                                     data_checksum))
+                fh.write(directory)
+                fh.write(data)
+            # The temporary file replaces the snapshot file
+            os.replace(tmp_path, path)
+        except OSError:
+            os.remove(tmp_path)
+            raise
+
+        return os.path.getsize(path)
+
+class Snapshot():
+    """Used to read a snapshot file through a memory map.
+
+    The arrays are returned as memoryview objects of the memory map, so they
+    are not copied. The strings are decoded when they are read.
+
+    Methods
+    -------
+    __init__()
+        Opens the snapshot and checks that it matches the database.
+    has()
+        Checks if the snapshot contains the given section.
+    get_array()
+        Returns the given section as an array of numbers.
+    get_string()
+        Returns the string at the given position in the string table.
+    get_strings()
+        Returns the strings of the given section.
+    _check()
+        Checks the header of the snapshot and reads its directory.
+    _close()
+        Closes the memory map.
+    """
+
+    def __init__(self, path: str, db_path: str) -> None:
+        """Opens the snapshot and checks that it matches the database.
+
+        :param path: The path of the snapshot file.
+        :type path: str.
+        :param db_path: The path of the database.
+        :type db_path: str.
+        :raises SnapshotError: If the snapshot is not valid or was built
+            from another version of the database.
+        :raises OSError: If the snapshot or the database cannot be read.
+        """
+
+        # The snapshot file is mapped into memory
+        with open(path, "rb") as fh:
+            self.mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        # The memory map as a memoryview
+        self.view = memoryview(self.mm)
+        try:
+            self._check(path, db_path)
+        except (KeyError, struct.error):
+            # The directory or the string table is not complete
+            self._close()
+            raise SnapshotError("The snapshot %s is not valid" % path)
+        except Exception:
+            # The memory map is closed if the snapshot is not used
+            self._close()
+            raise
+
+    def has(self, name: str) -> bool:
+        """Checks if the snapshot contains the given section.
+
+        :param name: The section name.
+        :type name: str.
+        :return: True if the section exists.
+        :rtype: bool.
+        """
+
+        return name in self.sections
+
+    def get_array(self, name: str) -> memoryview:
+        """Returns the given section as an array of numbers.
+
+        :param name: The section name.
+        :type name: str.
+        :return: The numbers in the section.
+        :rtype: memoryview.
+        """
+
+        # The type code, offset and number of items of the section
+        typecode, offset, size = self.sections[name]
+        # The number of bytes in each item
+        item_size = array(typecode).itemsize
+
+        return self.view[offset:offset + size * item_size].cast(typecode)
+
+    def get_string(self, pos: int) -> str:
+        """Returns the string at the given position in the string table.
+
+        :param pos: The position of the string.
+        :type pos: int.
+        :return: The string.
+        :rtype: str.
+        """
+
+        return str(self.string_data[
+            self.string_offsets[pos]:self.string_offsets[pos + 1]], "utf-8")
+
+    def get_strings(self, name: str, start: int = 0, end: int = None) -> list:
+        """Returns the strings of the given section.
+
+        :param name: The section name.
+        :type name: str.
+        :param start: The position of the first string.
+        :type start: int.
+        :param end: The position after the last string. All remaining
+            strings are returned if it is not given.
+        :type end: int.
+        :return: The strings.
+        :rtype: list.
+        """
+
+        return [self.get_string(pos)
+                for pos in self.get_array(name)[start:end]]
+
+    def _check(self, path: str, db_path: str) -> None:
+        """Checks the header of the snapshot and reads its directory.
+
+        The checksum of the directory and sections is checked, so a
+        truncated or changed snapshot is not used. Each section must lie
+        within the file and the string offsets must cover the string data.
+
+        :param path: The path of the snapshot file.
+        :type path: str.
+        :param db_path: The path of the database.
+        :type db_path: str.
+        :raises SnapshotError: If the snapshot is not valid or was built
+            from another version of the database.
+        :raises OSError: If the database cannot be read.
+        """
+
+        # If the file is too small to contain the header
+        if len(self.view) < HEADER.size:
+            raise SnapshotError("The snapshot %s is not valid" % path)
+
+        # The header is read
+        (magic, byte_order, version, count, db_size, checksum,
+         data_checksum) = HEADER.unpack_from(self.view)
+        # If the file is not a snapshot with the current format
+        if (magic != MAGIC or byte_order != BYTE_ORDER or
+                version != VERSION):
+            raise SnapshotError("The snapshot %s is not valid" % path)
+        # If the database has changed since the snapshot was built
+        if get_db_checksum(db_path) != (db_size, checksum):
+            raise SnapshotError("The snapshot %s is stale" % path)
+        # If the directory or sections are truncated or changed
+        with self.view[HEADER.size:] as data:
+            if zlib.crc32(data) != data_checksum:
+                raise SnapshotError("The snapshot %s is corrupt" % path)
+
+        # The offset of the first section
+        data_start = HEADER.size + ENTRY.size * count
+        # The type code, offset and number of items of each section
+        self.sections = {}
+        for pos in range(count):
+            name, typecode, offset, size = ENTRY.unpack_from(
+                self.view, HEADER.size + ENTRY.size * pos)
+            typecode = typecode.rstrip(b"\x00").decode("ascii")
+            # If the type code is not an array type code
+            if len(typecode) != 1 or typecode not in array_typecodes:
+                raise SnapshotError("The snapshot %s is not valid" % path)
+            # If the section is not within the file
+            end = offset + size * array(typecode).itemsize
+            if offset < data_start or end > len(self.view):
+                raise SnapshotError("The snapshot %s is not valid" % path)
+            self.sections[name.rstrip(b"\x00").decode("utf-8")] = (
+                typecode, offset, size)
+        # The string table
+        self.string_offsets = self.get_array("strings.offsets")
+        self.string_data = self.get_array("strings.data")
+        # If the string offsets do not cover the string data
+        if (len(self.string_offsets) == 0 or self.string_offsets[0] != 0 or
+                self.string_offsets[-1] != len(self.string_data)):
+            raise SnapshotError("The snapshot %s is not valid" % path)
+
+    def _close(self) -> None:
+        """Closes the memory map.
+
+        The snapshot must not be used after it is closed. The arrays of the
+        string table are released first, since the memory map cannot be
+        closed while they refer to it.
+        """
+
+        for name in ["string_offsets", "string_data"]:
+            # If the array was read
+            if hasattr(self, name):
+                getattr(self, name).release()
+        self.view.release()
+        self.mm.close()
+
+def load_snapshot(path: str, db_path: str) -> Snapshot:
+    """Loads the given snapshot if it matches the database.
+
+    :param path: The path of the snapshot file. A leading ~ is replaced with
+        the home folder of the user.
+    :type path: str.
+    :param db_path: The path of the database.
+    :type db_path: str.
+    :return: The snapshot. It is None if the snapshot does not exist, is not
+        valid or was built from another version of the database.
+    :rtype: Snapshot.
+    """
+
+    # The path of the snapshot file
+    path = os.path.expanduser(path)
+    # If the snapshot has not been built
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        snapshot = Snapshot(path, db_path)
+    except (OSError, ValueError, SnapshotError) as e:
+        # The reason is logged, since a stale snapshot is expected after
+        # the database changes
+        logging.getLogger(__name__).debug("Snapshot is not used: %s", e)
+        snapshot = None
+
+    return snapshot
+
+def build_quran_snapshot(db_path: str, path: str,
+                         backend: str = "sqlite") -> dict:
+    """Builds the snapshot of the quran meta data.
+
+    :param db_path: The path of the quran database.
+    :type db_path: str.
+    :param path: The path of the snapshot file.
+    :type path: str.
+    :param backend: The database backend.
+    :type backend: str.
+    :return: The number of sections, the size of the snapshot in bytes and
+        the time taken in seconds.
+    :rtype: dict.
+    """
+
+    from source.qapi import QuranApi
+
+    # The start time
+    start = time.perf_counter()
+    # The meta data is read from the database
+    api = QuranApi(db_path, "English", profile={"read_only": True},
+                   backend=backend)
+    writer = SnapshotWriter()
+    # The navigation index
+    arrays = api.index.get_arrays()
+    for name in ["ruku_sura", "ruku_start", "ruku_end", "ruku_first_id",
+                 "sura_offset"]:
+        writer.add_array("quran." + name, arrays[name].typecode,
+                         arrays[name])
+    writer.add_strings("quran.sura_tnames", arrays["sura_tnames"])
+    writer.add_strings("quran.sura_names", arrays["sura_names"])
+    # The language meta data
+    metas = list(api.lang_meta.values())
+    writer.add_strings("quran.languages", [m.language for m in metas])
+    writer.add_strings("quran.tbl_names", [m.tbl_name for m in metas])
+    writer.add_array("quran.rtl", "B", [m.rtl for m in metas])
+    writer.add_strings("quran.font_families", [m.font_family for m in metas])
+    writer.add_array("quran.font_sizes", "H", [m.font_size for m in metas])
+    api.close()
+
+    # The snapshot statistics
+    stats = {
+        "sections": len(writer.sections) + 2,
+        "size": writer.write(path, db_path),
+        "time": time.perf_counter() - start
+    }
+
+    return stats
+
+def build_hadith_snapshot(db_path: str, path: str,
+                          backend: str = "sqlite") -> dict:
+    """Builds the snapshot of the hadith meta data.
+
+    The sources, books and hadith titles of each language are added. The
+    books of each source are ordered by book number.
+
+    :param db_path: The path of the hadith database.
+    :type db_path: str.
+    :param path: The path of the snapshot file.
+    :type path: str.
+    :param backend: The database backend.
+    :type backend: str.
+    :return: The number of sections, the size of the snapshot in bytes and
+        the time taken in seconds.
+    :rtype: dict.
+    """
+
+    from source.hapi import HadithApi
+
+    # The start time
+    start = time.perf_counter()
+    # The meta data is read from the database
+    api = HadithApi(db_path, HADITH_LANGS[0], book_cache_size=1,
+                    prefetch_count=0, profile={"read_only": True},
+                    backend=backend)
+    writer = SnapshotWriter()
+    # Each language is added
+    for lang in HADITH_LANGS:
+        api.set_lang(lang)
+        # The hadith sources
+        sources = api.get_source_list()
+        # The position of the first book of each source
+        source_books = array("I", [0])
+        # The position of the first title of each book
+        book_titles = array("I", [0])
+        # The id and name of each book
+        book_ids, book_names = array("I"), []
+        # The id and title of each hadith
+        title_ids, titles = array("I"), []
+        for source in sources:
+            for book_id, book in api.get_book_list(source):
+                book_ids.append(book_id)
+                book_names.append(book)
+                for hadith_id, title in api.get_title_list(book_id):
+                    title_ids.append(hadith_id)
+                    titles.append(title)
+                book_titles.append(len(title_ids))
+            source_books.append(len(book_ids))
+
+        writer.add_strings(lang + ".sources", sources)
+        writer.add_array(lang + ".source_books", "I", source_books)
+        writer.add_array(lang + ".book_ids", "I", book_ids)
+        writer.add_strings(lang + ".book_names", book_names)
+        writer.add_array(lang + ".book_titles", "I", book_titles)
+        writer.add_array(lang + ".title_ids", "I", title_ids)
+        writer.add_strings(lang + ".titles", titles)
+    api.close()
+
+    # The snapshot statistics
+    stats = {
+        "sections": len(writer.sections) + 2,
+        "size": writer.write(path, db_path),
+        "time": time.perf_counter() - start
+    }
+
+    return stats
+
+if __name__ == "__main__":
+    # The command line arguments
+    parser = argparse.ArgumentParser(
+        description="Builds the meta data snapshot of a reader.")
+    parser.add_argument("reader", choices=["quran", "hadith"],
+                        help="The reader whose meta data is compiled.")
+    parser.add_argument("--db", help="The path of the database. The path in "
+                        "the reader configuration is used by default.")
+    parser.add_argument("--out", help="The path of the snapshot. The path in "
+                        "the reader configuration is used by default.")
+    parser.add_argument("--backend", choices=["qtsql", "sqlite"],
+                        default="sqlite", help="The database backend.")
+    args = parser.parse_args()
+
+    # If the quran snapshot is built
+    if args.reader == "quran":
+        from source.qconfig import QConfig
+        config = QConfig().get_config()
+        build = build_quran_snapshot
+    else:
+        from source.hconfig import HConfig
+        config = HConfig().get_config()
+        build = build_hadith_snapshot
+    # The paths of the database and snapshot
+    db_path = args.db or config["db_path"]
+    path = os.path.expanduser(args.out or config["snapshot_path"])
+
+    # The snapshot is built
+    stats = build(db_path, path, args.backend)
+    print("%d sections written in %.2f s, snapshot size %.1f KB" % (
+        stats["sections"], stats["time"], stats["size"] / 1024))
+    # The time taken to load the snapshot
+    start = time.perf_counter()
+    Snapshot(path, db_path)
+    print("Snapshot loaded in %.1f us" % (
+        (time.perf_counter() - start) * 1000000))
@@ -0,0 +1,79 @@
+import os, json, tempfile
+
+class StateStore():
+    """This class is used to save the reader state in a small json file.
+
+    The state is kept outside the content database, so the content database
+    can be opened read only. Each reader uses its own state file. The file is
+    written to a temporary file first, which then replaces the state file, so
+    the state file is never left partly written.
+
+    Methods
+    -------
+    load()
+        Reads the state from the state file.
+    save()
+        Writes the given state to the state file.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initializes the state store.
+
+        :param path: The path of the state file. A leading ~ is replaced
+            with the home folder of the user.
+        :type path: str.
+        """
+
+        # The path of the state file
+        self.path = os.path.expanduser(path)
+
+    def load(self) -> dict:
+        """Reads the state from the state file.
+
+        :return: The saved state. It is empty if the state file does not
+            exist or cannot be read.
+        :rtype: dict.
+        """
+
+        try:
+            # The state file is read
+            with open(self.path, encoding="utf-8") as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            state = {}
+
+        # If the file does not contain a json object
+        if not isinstance(state, dict):
+            state = {}
+
+        return state
+
+    def save(self, state: dict) -> None:
+        """Writes the given state to the state file.
+
+        The folder of the state file is created if it does not exist.
+
+        :param state: The state to save.
+        :type state: dict.
+        """
+
+        # The folder of the state file
+        folder = os.path.dirname(self.path) or "."
+        # The path of the temporary file
+        tmp_path = None
+        try:
+            # The folder is created if it does not exist
+            os.makedirs(folder, exist_ok=True)
+            # The state is written to a temporary file in the same folder
+            fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(state, fh)
+                fh.flush()
+                os.fsync(fh.fileno())
+            # The temporary file replaces the state file
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # If the temporary file was created, then it is removed
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            print("State could not be saved: " + str(e))
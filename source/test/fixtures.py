@@ -0,0 +1,23 @@
+import shutil, tempfile
+from source.bench.fixture import FixtureGenerator
+
+def create_fixture(test_case) -> tuple:
+    """Builds small fixture databases in a temporary folder for a unit test.
+
+    The folder is removed by a cleanup function of the test case, so it is
+    removed even if the test fails. The search indexes are not built.
+
+    :param test_case: The test case that uses the databases.
+    :type test_case: unittest.TestCase.
+    :return: The temporary folder and the path of each database.
+    :rtype: tuple.
+    """
+
+    # The temporary folder
+    out_dir = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, out_dir)
+    # The fixture databases are built
+    paths = FixtureGenerator(out_dir, hadith_scale=0.05,
+                             search=False).generate()
+
+    return (out_dir, paths)
@@ -0,0 +1,141 @@
+import os, sqlite3, tempfile, unittest
+from typing import NamedTuple
+from source.api import Api, ApiError
+from source.backends import create_backend
+
+class Record(NamedTuple):
+    """A row of the test table.
+    """
+
+    # The row id
+    id: int
+    # The row text
+    text: str
+
+class TestBackend(unittest.TestCase):
+    """Used to test that the QtSql and sqlite backends give the same results.
+    """
+
+    def setUp(self) -> None:
+        """Creates a test database
+        """
+
+        # The test database
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        con = sqlite3.connect(self.db_path)
+        con.execute("CREATE TABLE `test` (`id` INTEGER PRIMARY KEY, `text`)")
+        con.executemany("INSERT INTO `test` VALUES (?, ?)",
+                        [(1, "one"), (2, None), (3, "three")])
+        con.commit()
+        con.close()
+
+    def tearDown(self) -> None:
+        """Removes the test database
+        """
+
+        os.remove(self.db_path)
+
+    def test_fetch(self) -> None:
+        """Used to test that both backends fetch the same rows
+        """
+
+        # The sql query
+        sql = "SELECT id, text FROM `test` WHERE id>=? ORDER BY id"
+        # The rows fetched by each backend
+        results = []
+        # The query cache statistics of each backend
+        query_stats = {
+            "qtsql": {"hits": 1, "misses": 1, "size": 1},
+            "sqlite": {"cached_statements": 128}
+        }
+        for name in ["qtsql", "sqlite"]:
+            api = Api(self.db_path, backend=name)
+            results.append(api._fetch_data(sql, [2], 2))
+            api._fetch_data(sql, [1], 2)
+            # Check the query cache statistics
+            self.assertEqual(api.get_query_stats(), query_stats[name])
+            api.close()
+        # Check that the rows are the same
+        self.assertEqual(results[0], [[2, ""], [3, "three"]])
+        self.assertEqual(results[0], results[1])
+
+    def test_iterate(self) -> None:
+        """Used to test the row, column and record fetch functions
+        """
+
+        # The sql query
+        sql = "SELECT id, text FROM `test` ORDER BY id"
+        for name in ["qtsql", "sqlite"]:
+            api = Api(self.db_path, backend=name)
+            # Check that the rows are yielded as tuples
+            rows = api._iter_data(sql, [], 2)
+            self.assertEqual(next(rows), (1, "one"))
+            self.assertEqual(list(rows), [(2, ""), (3, "three")])
+            # Check that the rows can be returned as records
+            rows = list(api._iter_data(sql, [], 2, Record))
+            self.assertEqual(rows[2].text, "three")
+            # Check that the first field of each row is returned
+            self.assertEqual(api._fetch_column(
+                "SELECT text FROM `test` ORDER BY id", []),
+                ["one", "", "three"])
+            # Check that the first row is returned
+            self.assertEqual(api._fetch_row(sql, [], 2, Record),
+                             Record(1, "one"))
+            self.assertIsNone(
+                api._fetch_row("SELECT id FROM `test` WHERE id=?", [9], 1))
+            api.close()
+
+    def test_update(self) -> None:
+        """Used to test the update queries and transactions
+        """
+
+        for name in ["qtsql", "sqlite"]:
+            api = Api(self.db_path, backend=name)
+            # A row is added in a transaction
+            api._begin()
+            api._update_data("INSERT INTO `test` VALUES (?, ?)", [9, name])
+            api._commit()
+            # Check that the row is added
+            rows = api._fetch_data("SELECT text FROM `test` WHERE id=9", [], 1)
+            self.assertEqual(rows, [[name]])
+            api._update_data("DELETE FROM `test` WHERE id=9", [])
+            # A failed insert is rolled back
+            api._begin()
+            api._update_data("INSERT INTO `test` VALUES (?, ?)", [10, name])
+            with self.assertRaises(ApiError):
+                api._update_data("INSERT INTO `missing` VALUES (?)", [1])
+            api._rollback()
+            # Check that the row is not added and a new transaction starts
+            rows = api._fetch_data("SELECT text FROM `test` WHERE id=10", [],
+                                   1)
+            self.assertEqual(rows, [])
+            api._begin()
+            api._commit()
+            api.close()
+
+    def test_errors(self) -> None:
+        """Used to test that the database errors are raised
+        """
+
+        for name in ["qtsql", "sqlite"]:
+            api = Api(self.db_path, profile={"read_only": True},
+                      backend=name)
+            # Check that an invalid query raises an error
+            with self.assertRaises(ApiError):
+                api._fetch_data("SELECT * FROM `missing`", [], 1)
+            # Check that a read only database cannot be changed
+            with self.assertRaises(ApiError):
+                api._update_data("DELETE FROM `test`", [])
+            # Check that a value that cannot be bound raises an error
+            if name == "sqlite":
+                with self.assertRaises(ApiError):
+                    api._fetch_data("SELECT * FROM `test` WHERE id=?",
+                                    [10 ** 20], 1)
+            api.close()
+        # Check that an unknown backend raises an error
+        with self.assertRaises(ApiError):
+            create_backend("unknown", self.db_path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from source.cache import PageCache
+
+class TestCache(unittest.TestCase):
+    """Used to test the PageCache class.
+    """
+
+    def setUp(self) -> None:
+        """Creates a page cache that holds 100 bytes
+        """
+
+        # The page cache
+        self.cache = PageCache(100)
+        # The evicted pages
+        self.evicted = []
+        self.cache._evict = self.evicted.append
+
+    def test_get(self) -> None:
+        """Used to test the get function
+        """
+
+        # A page is added
+        self.cache.put(("Urdu", 1, 1), "page 1", 40, 5)
+        # Check that the page is returned
+        self.assertEqual(self.cache.get(("Urdu", 1, 1)), "page 1")
+        # Check that a missing page returns None
+        self.assertIsNone(self.cache.get(("Urdu", 1, 2)))
+        # The cache statistics
+        stats = self.cache.get_stats()
+        # Check that the hits, misses and saved time are counted
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+        self.assertEqual(stats["saved_time"], 5)
+
+    def test_put(self) -> None:
+        """Used to test the put function
+        """
+
+        # Three pages are added
+        self.cache.put(1, "page 1", 40, 5)
+        self.cache.put(2, "page 2", 40, 5)
+        # The first page is used, so the second page is the oldest
+        self.cache.get(1)
+        self.cache.put(3, "page 3", 40, 5)
+        # Check that the least recently used page is evicted
+        self.assertEqual(self.evicted, ["page 2"])
+        self.assertEqual(list(self.cache.pages), [1, 3])
+        self.assertEqual(self.cache.get_stats()["size"], 80)
+        # A page that is larger than the cache is added
+        self.cache.put(4, "page 4", 200, 5)
+        # Check that the most recently used page is not evicted
+        self.assertEqual(list(self.cache.pages), [4])
+        self.assertEqual(self.evicted, ["page 2", "page 1", "page 3"])
+
+    def test_prefetch(self) -> None:
+        """Used to test that the prefetched pages and their hits are counted
+        """
+
+        # Three pages are prefetched
+        self.cache.put(1, "page 1", 30, 5, prefetch=True)
+        self.cache.put(2, "page 2", 30, 5, prefetch=True)
+        self.cache.put(3, "page 3", 30, 5, prefetch=True)
+        # The first page is used twice, so it is counted as one prefetch hit
+        self.cache.get(1)
+        self.cache.get(1)
+        # The second page is shown, so it is no longer counted as prefetched
+        self.cache.put(2, "page 2", 30, 5)
+        self.cache.get(2)
+        # The third page is evicted before it is used
+        self.cache.put(4, "page 4", 30, 5)
+        self.cache.put(5, "page 5", 30, 5)
+        self.cache.put(3, "page 3", 30, 5)
+        self.cache.get(3)
+        # The cache statistics
+        stats = self.cache.get_stats()
+        # Check that only the first page is counted as a prefetch hit
+        self.assertEqual(stats["prefetches"], 3)
+        self.assertEqual(stats["prefetch_hits"], 1)
+        self.assertAlmostEqual(stats["prefetch_hit_ratio"], 1 / 3)
+        self.assertEqual(self.cache.prefetched, set())
+        # Check that the ratio is 0 if no page was prefetched
+        self.assertEqual(PageCache(100).get_stats()["prefetch_hit_ratio"], 0)
+
+    def test_clear(self) -> None:
+        """Used to test the clear function
+        """
+
+        # A page is added and the cache is cleared
+        self.cache.put(1, "page 1", 40, 5)
+        self.cache.clear()
+        # Check that the page is evicted
+        self.assertEqual(self.evicted, ["page 1"])
+        self.assertEqual(self.cache.get_stats()["size"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
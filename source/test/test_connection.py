@@ -0,0 +1,120 @@
+import os, sqlite3, tempfile, threading, unittest
+from PyQt5.QtSql import QSqlDatabase, QSqlQuery
+from source.connection import ConnectionManager, PoolError
+from source.qtbackend import QtSqlConnectionManager
+
+class TestConnection(unittest.TestCase):
+    """Used to test the ConnectionManager class with the QtSql connections.
+    """
+
+    def setUp(self) -> None:
+        """Creates a test database and a connection manager
+        """
+
+        # The test database
+        fd, self.db_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        con = sqlite3.connect(self.db_path)
+        con.execute("CREATE TABLE `test` (`id` INTEGER PRIMARY KEY)")
+        con.close()
+        # The connection manager
+        self.manager = QtSqlConnectionManager(max_connections=3, max_idle=1)
+
+    def tearDown(self) -> None:
+        """Removes the test database
+        """
+
+        os.remove(self.db_path)
+
+    def test_acquire(self) -> None:
+        """Used to test the acquire and release functions
+        """
+
+        # The connection profile
+        profile = {"read_only": True, "query_only": True}
+        # Two connections are used at the same time
+        name1 = self.manager.acquire(self.db_path, profile)
+        name2 = self.manager.acquire(self.db_path, profile)
+        # Check that each connection has its own name
+        self.assertNotEqual(name1, name2)
+        # Check that the profile is applied
+        query = QSqlQuery(QSqlDatabase.database(name1, False))
+        query.exec("PRAGMA query_only")
+        query.next()
+        self.assertEqual(query.value(0), 1)
+        del query
+        # The connections are released
+        self.manager.release(name1)
+        self.manager.release(name2)
+        # Check that one idle connection is kept open
+        self.assertEqual(self.manager.get_stats()["idle"], 1)
+        # Check that the idle connection is reused
+        self.assertEqual(self.manager.acquire(self.db_path, profile), name1)
+        # Check that a different profile gets a new connection
+        self.assertNotIn(self.manager.acquire(self.db_path), [name1, name2])
+        self.assertEqual(self.manager.get_stats(),
+                         {"open": 2, "idle": 0, "opened": 3, "reused": 1})
+
+    def test_limits(self) -> None:
+        """Used to test the named connections and connection limit
+        """
+
+        # A named connection is opened
+        self.manager.acquire(self.db_path, con_name="named")
+        # Check that the name cannot be used twice
+        with self.assertRaises(PoolError):
+            self.manager.acquire(self.db_path, con_name="named")
+        # The connection limit is reached
+        self.manager.acquire(self.db_path)
+        self.manager.acquire(self.db_path)
+        # Check that no more connections are opened
+        with self.assertRaises(PoolError):
+            self.manager.acquire(self.db_path)
+        # Check that a released named connection is closed
+        self.manager.release("named")
+        self.assertFalse(QSqlDatabase.contains("named"))
+        self.assertEqual(self.manager.get_stats()["open"], 2)
+
+    def test_close_thread(self) -> None:
+        """Used to test that the connections are pooled per thread
+        """
+
+        # The connection names used by the other thread
+        names = []
+
+        def run():
+            """A connection is used and released in another thread"""
+            names.append(self.manager.acquire(self.db_path))
+            self.manager.release(names[0])
+            # Check that the idle connection is closed
+            self.manager.close_thread()
+
+        # A connection is released in the current thread
+        name = self.manager.acquire(self.db_path)
+        self.manager.release(name)
+        # The other thread is run
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        # Check that the other thread did not use the idle connection
+        self.assertNotEqual(names[0], name)
+        self.assertEqual(self.manager.get_stats()["open"], 1)
+        self.manager.close_thread()
+        self.assertEqual(self.manager.get_stats()["open"], 0)
+
+    def test_abstract(self) -> None:
+        """Used to test that a connection manager must implement the methods
+        that open and close the connections
+        """
+
+        class PartialManager(ConnectionManager):
+            """A connection manager that does not close its connections"""
+            def _open(self, name: str, db_path: str, profile: dict) -> None:
+                pass
+
+        # Check that the incomplete connection managers are not created
+        self.assertRaises(TypeError, ConnectionManager)
+        self.assertRaises(TypeError, PartialManager)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import csv, json, os, sqlite3, unittest, zipfile
+from source.export import export_languages
+from source.test.fixtures import create_fixture
+
+class TestExport(unittest.TestCase):
+    """Used to test the translation exporter.
+    """
+
+    def setUp(self) -> None:
+        """Builds the fixture databases in a temporary folder
+        """
+
+        # The fixture databases are built in a temporary folder
+        self.out_dir, self.paths = create_fixture(self)
+        # The folder of the exported files
+        self.export_dir = os.path.join(self.out_dir, "export")
+
+    def test_quran(self) -> None:
+        """Used to test the export of the quran translations in each format
+        """
+
+        for fmt in ["jsonl", "csv", "html", "epub"]:
+            # The translations are exported by two worker processes
+            results = list(export_languages(
+                "quran", self.paths["quran"], ["English", "Arabic"], fmt,
+                self.export_dir, workers=2))
+            # Check that all ayas of each language were exported
+            self.assertEqual(sorted(r["lang"] for r in results),
+                             ["Arabic", "English"])
+            for result in results:
+                self.assertEqual(result["rows"], 6236)
+                self.assertTrue(os.path.isfile(result["path"]))
+
+        # Check the first row of the json lines file
+        path = os.path.join(self.export_dir, "quran-english.jsonl")
+        with open(path, encoding="utf-8") as json_file:
+            row = json.loads(json_file.readline())
+        self.assertEqual((row["id"], row["sura"], row["ayat"]), (1, 1, 1))
+        # Check the header and number of lines of the csv file
+        path = os.path.join(self.export_dir, "quran-arabic.csv")
+        with open(path, encoding="utf-8", newline="") as csv_file:
+            rows = list(csv.reader(csv_file))
+        self.assertEqual(rows[0],
+                         ["id", "sura", "sura_name", "ayat", "ruku", "text"])
+        self.assertEqual(len(rows), 6237)
+        # Check that the epub starts with the mimetype and has 114 chapters
+        path = os.path.join(self.export_dir, "quran-arabic.epub")
+        with zipfile.ZipFile(path) as book:
+            names = book.namelist()
+            self.assertEqual(names[0], "mimetype")
+            self.assertIn(b"page-progression-direction=\"rtl\"",
+                          book.read("OEBPS/content.opf"))
+            # Check that the language tag is used for the book and pages
+            self.assertIn(b"<dc:language>ar</dc:language>",
+                          book.read("OEBPS/content.opf"))
+            for name in ["OEBPS/nav.xhtml", "OEBPS/chapter1.xhtml"]:
+                self.assertIn(b" lang=\"ar\" xml:lang=\"ar\"",
+                              book.read(name))
+        self.assertEqual(
+            len([n for n in names if n.startswith("OEBPS/chapter")]), 114)
+
+    def test_shifted_ids(self) -> None:
+        """Used to test that the ayas are exported if the row ids of the text
+        table do not match the ayat meta data
+        """
+
+        # The row ids of the English text table are shifted
+        con = sqlite3.connect(self.paths["quran"])
+        tbl = con.execute("SELECT tbl_name FROM ic_quranic_tbl_meta_data"
+                          " WHERE language='English'").fetchone()[0]
+        con.execute("UPDATE `" + tbl + "` SET id=id+100000")
+        con.commit()
+        con.close()
+        # The translation is exported
+        result = list(export_languages(
+            "quran", self.paths["quran"], ["English"], "jsonl",
+            self.export_dir, workers=1))[0]
+        # Check that all ayas were exported with their ruku
+        self.assertEqual(result["rows"], 6236)
+        with open(result["path"], encoding="utf-8") as json_file:
+            row = json.loads(json_file.readline())
+        self.assertEqual((row["sura"], row["ayat"], row["ruku"]), (1, 1, 1))
+
+    def test_hadith(self) -> None:
+        """Used to test the export of the hadith in the current process
+        """
+
+        # The hadith are exported in the current process
+        result = next(export_languages(
+            "hadith", self.paths["hadith"], ["English"], "jsonl",
+            self.export_dir, workers=1))
+        # Check that each hadith was exported with its source and book
+        with open(result["path"], encoding="utf-8") as json_file:
+            rows = [json.loads(line) for line in json_file]
+        self.assertEqual(len(rows), result["rows"])
+        self.assertGreater(len(rows), 0)
+        self.assertEqual(sorted(rows[0]),
+                         ["book", "id", "source", "text", "title"])
+
+if __name__ == '__main__':
+    unittest.main()
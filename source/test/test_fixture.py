@@ -0,0 +1,63 @@
+import shutil, tempfile, unittest
+from source.bench.fixture import FixtureGenerator
+from source.hapi import HadithApi
+from source.qapi import QuranApi
+
+class TestFixture(unittest.TestCase):
+    """Used to test the benchmark fixture generator.
+    """
+
+    def setUp(self) -> None:
+        """Builds the fixture databases in a temporary folder
+        """
+
+        # The temporary folder
+        self.out_dir = tempfile.mkdtemp()
+        # The fixture databases are built
+        self.paths = FixtureGenerator(self.out_dir, lang_count=4,
+                                      hadith_scale=0.2).generate()
+
+    def tearDown(self) -> None:
+        """Removes the temporary folder
+        """
+
+        shutil.rmtree(self.out_dir)
+
+    def test_quran(self) -> None:
+        """Used to test that the quran database can be read by QuranApi
+        """
+
+        api = QuranApi(self.paths["quran"], "Urdu",
+                       profile={"read_only": True}, backend="sqlite")
+        # Check the number of suras, rukus and languages
+        self.assertEqual(len(api.get_sura_names()), 114)
+        self.assertEqual(api.get_ruku_count(2), 40)
+        self.assertEqual(len(api.get_lang_list()), 4)
+        # Check that each ayat of the last ruku has text
+        last = api.get_prev_ruku(1, 1)
+        self.assertEqual(last, {"sura": 114, "sura_ruku": 1})
+        self.assertEqual(len(api.get_ayat_text(114, 1)), 6)
+        # Check that the search indexes were built
+        self.assertTrue(api.has_search_index("English"))
+        self.assertGreater(len(api.search("mercy", "English")), 0)
+        api.close()
+
+    def test_hadith(self) -> None:
+        """Used to test that the hadith database can be read by HadithApi
+        """
+
+        api = HadithApi(self.paths["hadith"], "English",
+                        profile={"read_only": True}, backend="sqlite")
+        # Check the number of sources and books
+        source_list = api.get_source_list()
+        self.assertEqual(len(source_list), 5)
+        self.assertEqual(len(api.get_book_list(source_list[0])), 95)
+        # Check that the first hadith has a title and text
+        hadith_id, title = api.get_title_list(1)[0]
+        self.assertGreater(len(api.get_hadith_text(hadith_id)), 0)
+        # Check that the search index was built
+        self.assertTrue(api.has_search_index())
+        api.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os, struct, tempfile, unittest
+from source.fonts import FontRegistry
+
+def make_font(family: str) -> bytes:
+    """Returns the data of a font file that only contains a name table.
+
+    :param family: The font family name.
+    :type family: str.
+    :return: The font file data.
+    :rtype: bytes.
+    """
+
+    # The family name in the Windows encoding
+    name = family.encode("utf-16-be")
+    # The name table with a single family name record
+    table = struct.pack(">HHH", 0, 1, 18)
+    table += struct.pack(">HHHHHH", 3, 1, 0x409, 1, len(name), 0) + name
+    # The font header and the table record of the name table
+    data = struct.pack(">LHHHH", 0x00010000, 1, 16, 0, 0)
+    data += b"name" + struct.pack(">LLL", 0, 28, len(table))
+
+    return data + table
+
+class TestFonts(unittest.TestCase):
+    """Used to test the FontRegistry class.
+    """
+
+    def setUp(self) -> None:
+        """Creates a fonts folder with two font files and a text file
+        """
+
+        # The temporary fonts folder
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        # The font files are created
+        for file, family in (("nafees.ttf", "Nafees"), ("xb.ttf", "XB Zar")):
+            with open(os.path.join(self.tmp_dir.name, file), "wb") as fh:
+                fh.write(make_font(family))
+        # A file that is not a font file
+        with open(os.path.join(self.tmp_dir.name, "readme.txt"), "w") as fh:
+            fh.write("fonts")
+        # The font registry
+        self.fonts = FontRegistry(self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Removes the fonts folder
+        """
+
+        self.tmp_dir.cleanup()
+
+    def test_get_font_map(self) -> None:
+        """Used to test the get_font_map function
+        """
+
+        # The font map
+        font_map = self.fonts.get_font_map()
+        # Check that the font families are read from the font files
+        self.assertEqual(sorted(font_map), ["nafees", "xb zar"])
+        # Check that the font family is mapped to the font file
+        self.assertEqual(font_map["nafees"],
+                         [os.path.join(self.tmp_dir.name, "nafees.ttf")])
+
+    def test_get_family_key(self) -> None:
+        """Used to test the _get_family_key function
+        """
+
+        # Check that the foundry name is removed
+        self.assertEqual(self.fonts._get_family_key("Nafees [PYRS]"), "nafees")
+        # Check that the family name is converted to lower case
+        self.assertEqual(self.fonts._get_family_key("XB Zar"), "xb zar")
+
+    def test_get_stats(self) -> None:
+        """Used to test the get_stats function
+        """
+
+        # Check that the fonts folder is not scanned on startup
+        self.assertEqual(self.fonts.get_stats(), {"families": 0, "loaded": 0})
+        # The fonts folder is scanned
+        self.fonts.get_font_map()
+        # Check that no font has been loaded
+        self.assertEqual(self.fonts.get_stats(), {"families": 2, "loaded": 0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import os, unittest
+from PyQt5 import QtCore, QtWidgets
+from source.hapi import HadithApi
+from source.models import PagedListModel, create_combo_model
+from source.snapshot import build_hadith_snapshot
+from source.test.fixtures import create_fixture
+
+class TestModels(unittest.TestCase):
+    """Used to test the paged list model.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Creates the application object that is needed by the combo boxes
+        """
+
+        cls.app = (QtWidgets.QApplication.instance() or
+                   QtWidgets.QApplication([]))
+
+    def setUp(self) -> None:
+        """Creates the model with rows that record the fetched pages
+        """
+
+        # The position and size of each fetched page
+        self.fetched = []
+        # The model
+        self.model = PagedListModel(page_size=10, max_pages=3)
+        self.model.set_rows(95, self._fetch_page)
+
+    def _fetch_page(self, start: int, count: int) -> list:
+        """Returns the text and item data of the given rows
+
+        :param start: The position of the first row.
+        :type start: int.
+        :param count: The number of rows.
+        :type count: int.
+        :return: The text and item data of each row.
+        :rtype: list.
+        """
+
+        self.fetched.append((start, count))
+
+        return [("Row " + str(i), i) for i in range(start, start + count)]
+
+    def test_data(self) -> None:
+        """Used to test that the text and item data are returned for the
+        display and user roles
+        """
+
+        # The index of the last row
+        index = self.model.index(94)
+        # Check the row count and data
+        self.assertEqual(self.model.rowCount(), 95)
+        self.assertEqual(self.model.data(index), "Row 94")
+        self.assertEqual(self.model.data(index, QtCore.Qt.EditRole),
+                         "Row 94")
+        self.assertEqual(self.model.data(index, QtCore.Qt.UserRole), 94)
+        self.assertIsNone(self.model.data(index, QtCore.Qt.ToolTipRole))
+        self.assertIsNone(self.model.data(QtCore.QModelIndex()))
+        # Check that only the last page was fetched
+        self.assertEqual(self.fetched, [(90, 5)])
+        # Check that clearing the model removes the rows and pages
+        self.model.clear()
+        self.assertEqual(self.model.rowCount(), 0)
+        self.assertEqual(self.model.get_stats()["pages"], [])
+
+    def test_pages(self) -> None:
+        """Used to test that the least recently used page is removed when
+        the page cache is full
+        """
+
+        for row in [0, 5, 15, 25, 3, 35, 45]:
+            self.model.get_row(row)
+        # Check the fetched and cached pages
+        self.assertEqual(self.model.get_stats(), {
+            "rows": 95, "fetches": 5, "pages": [0, 3, 4]})
+        self.assertEqual(self.fetched[-1], (40, 10))
+
+    def test_combo_box(self) -> None:
+        """Used to test that the combo box only fetches the rows it shows
+        """
+
+        # The combo box
+        combo_box = QtWidgets.QComboBox()
+        model = create_combo_model(combo_box, page_size=10)
+        model.set_rows(5000, self._fetch_page)
+        # The combo box is laid out and shown
+        combo_box.sizeHint()
+        combo_box.show()
+        self.app.processEvents()
+        combo_box.sizeHint()
+        combo_box.setCurrentIndex(4321)
+        # Check the current item
+        self.assertEqual(combo_box.currentText(), "Row 4321")
+        self.assertEqual(combo_box.currentData(), 4321)
+        # Check that all rows were not fetched
+        self.assertLess(model.get_stats()["fetches"], 5)
+
+    def test_titles(self) -> None:
+        """Used to test that HadithApi returns the same title ids and ranges
+        with and without the snapshot
+        """
+
+        # The fixture databases are built in a temporary folder
+        out_dir, paths = create_fixture(self)
+        # The path of the snapshot
+        snap_path = os.path.join(out_dir, "hadith.snap")
+        build_hadith_snapshot(paths["hadith"], snap_path)
+        # The api objects with and without the snapshot
+        profile = {"read_only": True}
+        db_api = HadithApi(paths["hadith"], "English", profile=profile,
+                           backend="sqlite")
+        snap_api = HadithApi(paths["hadith"], "English", profile=profile,
+                             backend="sqlite", snapshot_path=snap_path)
+
+        # The books of the first source
+        books = db_api.get_book_list(db_api.get_source_list()[0])
+        for book_id, book in books[:2] + books[-1:]:
+            # The titles of the book
+            titles = [tuple(title) for title in
+                      db_api.get_title_list(book_id)]
+            ids = [title[0] for title in titles]
+            # Check the title ids
+            self.assertEqual(list(db_api.get_title_ids(book_id)), ids)
+            self.assertEqual(list(snap_api.get_title_ids(book_id)), ids)
+            # Check the title ranges
+            for api in [db_api, snap_api]:
+                self.assertEqual(api.get_title_range(
+                    book_id, ids[0], ids[-1]), titles)
+                self.assertEqual(api.get_title_range(
+                    book_id, ids[-1], ids[-1]), titles[-1:])
+        db_api.close()
+        snap_api.close()
+
+if __name__ == '__main__':
+    unittest.main()
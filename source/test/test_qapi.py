@@ -1,6 +1,8 @@
-import os, unittest
+import os, shutil, sqlite3, tempfile, unittest
+from source.bench.fixture import FixtureGenerator
 from source.qapi import QuranApi
 from source.qconfig import QConfig
+from source.test.fixtures import create_fixture
 
 class TestQuranApi(unittest.TestCase):
     """Used to test the QuranApi class.
@@ -71,5 +73,112 @@ class TestQuranApi(unittest.TestCase):
         # Check that the font size is correct
         self.assertEqual(font_details["size"], 18)        
 
+    def test_ayat_text_multi(self) -> None:
+        """Used to test that the ayat text of several languages is fetched
+        """
+
+        # The application configuration
+        config = QConfig().get_config()
+        # An instance of the QuranApi class is created
+        qapi = QuranApi(config["db_path"], config["default_lang"])
+        # The languages
+        langs = qapi.get_lang_list()[:3]
+        # The ayat text of the languages is fetched with a single query
+        ayat_texts = qapi.get_ayat_text_multi(2, 10, langs)
+        # Check that the languages are in the given order
+        self.assertEqual(list(ayat_texts.keys()), langs)
+        # Check that the current language is not changed
+        self.assertEqual(qapi.lang, config["default_lang"])
+        # Check that the ayat text of each language is correct
+        for lang in langs:
+            qapi.set_lang(lang)
+            self.assertEqual(ayat_texts[lang], qapi.get_ayat_text(2, 10))
+        # Check that the ayat text does not depend on the language order
+        self.assertEqual(qapi.get_ayat_text_multi(2, 10, langs[::-1]),
+                         dict(ayat_texts))
+        qapi.close()
+
+    def test_missing_ayat(self) -> None:
+        """Used to test that the remaining ayas are returned if the text
+        table does not contain all ayas of a ruku
+        """
+
+        # The temporary folder
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir)
+        # The fixture databases are built
+        paths = FixtureGenerator(out_dir, hadith_scale=0.05,
+                                 search=False).generate()
+        qapi = QuranApi(paths["quran"], "English", backend="sqlite")
+        # The ayat text and row id range of the ruku
+        ayat_list = qapi.get_ayat_text(2, 10)
+        # The ayat text of the ruku in another language
+        lang = [name for name in qapi.get_lang_list() if name != "English"][0]
+        other_list = qapi.get_ayat_text_multi(2, 10, [lang])[lang]
+        first_id, last_id = qapi.index.get_id_range(2, 10)
+        # The first ayat of the ruku is removed from the text table
+        con = sqlite3.connect(paths["quran"])
+        con.execute("DELETE FROM `" + qapi.tbl + "` WHERE id=?", [first_id])
+        con.commit()
+        con.close()
+        # Check that the remaining ayas are returned in order
+        self.assertEqual(qapi.get_ayat_text(2, 10), ayat_list[1:])
+        self.assertEqual(qapi.get_ayat_text_multi(2, 10, [lang, "English"]),
+                         {lang: other_list, "English": ayat_list[1:]})
+        qapi.close()
+
+    def test_reordered_ids(self) -> None:
+        """Used to test that the ayat text is read by sura and ayat number if
+        the row ids of the text table do not match the ayat meta data
+        """
+
+        # The fixture databases are built in a temporary folder
+        paths = create_fixture(self)[1]
+        qapi = QuranApi(paths["quran"], "English", backend="sqlite")
+        # The ayat text of the ruku in two languages
+        lang = [name for name in qapi.get_lang_list() if name != "English"][0]
+        ayat_texts = qapi.get_ayat_text_multi(2, 10, [lang, "English"])
+        tbl = qapi.tbl
+        qapi.close()
+        # The row ids of the English text table are reversed, so each range
+        # of row ids has the same number of rows but other ayas
+        con = sqlite3.connect(paths["quran"])
+        con.execute("UPDATE `" + tbl + "` SET id=-id")
+        con.execute("UPDATE `" + tbl + "` SET id=id+(SELECT count(*) + 1"
+                    " FROM `" + tbl + "`)")
+        con.commit()
+        con.close()
+        qapi = QuranApi(paths["quran"], "English", backend="sqlite")
+        # Check that the ayat text is not changed
+        self.assertEqual(qapi.get_ayat_text(2, 10), ayat_texts["English"])
+        self.assertEqual(qapi.get_ayat_text_multi(2, 10, [lang, "English"]),
+                         ayat_texts)
+        # Check that only the shifted table is read by sura and ayat number
+        self.assertEqual(qapi.meta_ids, {tbl: False,
+                                         qapi.get_lang_meta(lang).tbl_name:
+                                         True})
+        qapi.close()
+
+    def test_db_profile(self) -> None:
+        """Used to test that the connection profile is applied
+        """
+
+        # The application configuration
+        config = QConfig().get_config()
+        # An instance of the QuranApi class is created with the profile
+        qapi = QuranApi(config["db_path"], config["default_lang"],
+                        "profile_test", config["db_profile"])
+        # Each PRAGMA value is fetched
+        mmap_size = qapi._fetch_data("PRAGMA mmap_size", [], 1)[0][0]
+        journal_mode = qapi._fetch_data("PRAGMA journal_mode", [], 1)[0][0]
+        query_only = qapi._fetch_data("PRAGMA query_only", [], 1)[0][0]
+        # Check that the PRAGMAs are applied
+        self.assertEqual(mmap_size, config["db_profile"]["mmap_size"])
+        self.assertEqual(journal_mode, "off")
+        self.assertEqual(query_only, 1)
+        # Check that the database is read only
+        self.assertTrue(qapi.read_only)
+        qapi.close()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
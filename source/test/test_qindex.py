@@ -0,0 +1,120 @@
+import unittest
+from source.qindex import QuranIndex
+
+class TestQuranIndex(unittest.TestCase):
+    """Used to test the QuranIndex class.
+    """
+
+    def setUp(self) -> None:
+        """Creates an index of 114 suras. Each sura has one to three rukus
+        and each ruku has five ayas
+        """
+
+        # The ruku and sura rows
+        ruku_rows = []
+        sura_rows = []
+        # The row id of the first ayat of the next ruku
+        row_id = 1
+        for sura in range(1, 115):
+            # The number of rukus in the sura
+            ruku_count = sura % 3 + 1
+            for ruku in range(1, ruku_count + 1):
+                start = (ruku - 1) * 5 + 1
+                ruku_rows.append([sura, ruku, start, start + 4, row_id])
+                row_id += 5
+            sura_rows.append(["Sura-%d" % sura, "Name %d" % sura, ruku_count])
+        # The number of ayas
+        self.ayat_count = row_id - 1
+        # The index
+        self.index = QuranIndex(ruku_rows, sura_rows)
+
+    def test_ranges(self) -> None:
+        """Used to test the ruku counts and the ayat and row id ranges
+        """
+
+        # Check the sura and ruku counts
+        self.assertEqual(self.index.get_sura_count(), 114)
+        self.assertEqual(self.index.get_ruku_count(2), 3)
+        self.assertEqual(self.index.get_ruku_total(), self.ayat_count // 5)
+        self.assertEqual(self.index.get_sura_short_name(114), "Sura-114")
+        # Check the ayat and row id ranges of the third ruku of sura 2
+        self.assertEqual(self.index.get_ayat_range(2, 3),
+                         {"start": 11, "end": 15})
+        self.assertEqual(self.index.get_id_range(2, 3), (21, 25))
+
+    def test_navigation(self) -> None:
+        """Used to test that the next and previous rukus wrap around at the
+        last and first ruku
+        """
+
+        # The last ruku of the quran
+        last = {"sura": 114, "sura_ruku": self.index.get_ruku_count(114)}
+        # Check the rukus at the start and end of the quran
+        self.assertEqual(self.index.get_next_ruku(114, last["sura_ruku"]),
+                         {"sura": 1, "sura_ruku": 1})
+        self.assertEqual(self.index.get_prev_ruku(1, 1), last)
+        # Check the rukus at the end and start of a sura
+        self.assertEqual(self.index.get_next_ruku(1, 2),
+                         {"sura": 2, "sura_ruku": 1})
+        self.assertEqual(self.index.get_prev_ruku(2, 1),
+                         {"sura": 1, "sura_ruku": 2})
+
+    def test_rows(self) -> None:
+        """Used to test that each row id is found from its sura and ayat and
+        that its ruku is found from the row id
+        """
+
+        # Each ruku is checked
+        for pos in range(self.index.get_ruku_total()):
+            # The sura and ruku
+            details = self.index.get_ruku_details(pos)
+            sura = details["sura"]
+            # The ayat and row id ranges of the ruku
+            ayat_range = self.index.get_ayat_range(sura, details["sura_ruku"])
+            first_id, last_id = self.index.get_id_range(
+                sura, details["sura_ruku"])
+            # Check the first and last ayat of the ruku
+            self.assertEqual(self.index.get_row_id(sura, ayat_range["start"]),
+                             first_id)
+            self.assertEqual(self.index.get_row_id(sura, ayat_range["end"]),
+                             last_id)
+            self.assertEqual(self.index.get_row(first_id), details)
+            self.assertEqual(self.index.get_row(last_id), details)
+
+    def test_errors(self) -> None:
+        """Used to test that a sura, ruku or row id that is not in the index
+        raises an IndexError
+        """
+
+        # Check the suras and rukus that are not in the index
+        self.assertRaises(IndexError, self.index.get_ayat_range, 1, 99)
+        self.assertRaises(IndexError, self.index.get_ayat_range, 1, 0)
+        self.assertRaises(IndexError, self.index.get_id_range, 0, 1)
+        self.assertRaises(IndexError, self.index.get_next_ruku, 115, 1)
+        self.assertRaises(IndexError, self.index.get_ruku_count, 0)
+        self.assertRaises(IndexError, self.index.get_sura_short_name, 0)
+        self.assertRaises(IndexError, self.index.get_ruku_details, -1)
+        # Check the ayas and row ids that are not in the index
+        self.assertRaises(IndexError, self.index.get_row_id, 1, 0)
+        self.assertRaises(IndexError, self.index.get_row_id, 1, 11)
+        self.assertRaises(IndexError, self.index.get_row, 0)
+        self.assertRaises(IndexError, self.index.get_row,
+                          self.ayat_count + 1)
+
+    def test_arrays(self) -> None:
+        """Used to test that an index created from the arrays of another index
+        returns the same rukus
+        """
+
+        # The index is created from the arrays
+        index = QuranIndex()
+        index.set_arrays(self.index.get_arrays())
+        # Check the navigation and row lookups
+        self.assertEqual(index.get_next_ruku(114, 1),
+                         {"sura": 1, "sura_ruku": 1})
+        self.assertEqual(index.get_row(self.ayat_count),
+                         {"sura": 114, "sura_ruku": 1})
+        self.assertRaises(IndexError, index.get_ayat_range, 115, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import os, unittest
+from collections import Counter
+from source.hapi import HadithApi
+from source.qapi import QuranApi
+from source.sampler import Sampler
+from source.snapshot import build_hadith_snapshot
+from source.test.fixtures import create_fixture
+
+class TestSampler(unittest.TestCase):
+    """Used to test the Sampler class and the random selection functions.
+    """
+
+    def test_uniform(self) -> None:
+        """Used to test that the positions are in range and are repeated for
+        the same seed
+        """
+
+        # The samplers with the same seed
+        sampler1 = Sampler(10, seed=7)
+        sampler2 = Sampler(10, seed=7)
+        picks = [sampler1.get_next() for i in range(1000)]
+        # Check that the same sequence is selected
+        self.assertEqual(picks, [sampler2.get_next() for i in range(1000)])
+        # Check that all positions are selected and are in range
+        self.assertEqual(set(picks), set(range(10)))
+        # Check that each position is selected about as often
+        self.assertGreater(min(Counter(picks).values()), 50)
+        # Check that the sequence is restarted
+        sampler1.reset()
+        self.assertEqual(sampler1.get_next(), picks[0])
+        self.assertEqual(sampler1.get_remaining(), 10)
+        # Check that an empty population is rejected
+        self.assertRaises(ValueError, Sampler, 0)
+
+    def test_no_repeat(self) -> None:
+        """Used to test that no position is repeated until all positions have
+        been selected
+        """
+
+        # The sampler
+        sampler = Sampler(100, seed=3, no_repeat=True)
+        # The first shuffle
+        first = [sampler.get_next() for i in range(100)]
+        self.assertEqual(sorted(first), list(range(100)))
+        self.assertEqual(sampler.get_remaining(), 0)
+        # The second shuffle
+        second = [sampler.get_next() for i in range(100)]
+        self.assertEqual(sorted(second), list(range(100)))
+        self.assertNotEqual(first, second)
+        # Check that the same shuffle is selected for the same seed
+        sampler = Sampler(100, seed=3, no_repeat=True)
+        self.assertEqual([sampler.get_next() for i in range(100)], first)
+        # Check that only the swapped positions are stored
+        sampler = Sampler(10 ** 9, no_repeat=True)
+        picks = [sampler.get_next() for i in range(10)]
+        self.assertEqual(len(set(picks)), 10)
+        self.assertLessEqual(len(sampler.swaps), 10)
+
+    def test_api(self) -> None:
+        """Used to test the random ruku and hadith functions
+        """
+
+        # The fixture databases are built in a temporary folder
+        out_dir, paths = create_fixture(self)
+        # The path of the snapshot
+        snap_path = os.path.join(out_dir, "hadith.snap")
+        build_hadith_snapshot(paths["hadith"], snap_path)
+        profile = {"read_only": True}
+
+        # Check that all rukus are selected once in the no repeat mode
+        qapi = QuranApi(paths["quran"], "English", profile=profile,
+                        backend="sqlite")
+        qapi.set_sampler(seed=1, no_repeat=True)
+        rukus = {(r["sura"], r["sura_ruku"]) for r in
+                 (qapi.get_random_ruku() for i in range(556))}
+        self.assertEqual(len(rukus), 556)
+        qapi.close()
+
+        # The api objects with and without the snapshot
+        db_api = HadithApi(paths["hadith"], "English", profile=profile,
+                           backend="sqlite")
+        snap_api = HadithApi(paths["hadith"], "English", profile=profile,
+                             backend="sqlite", snapshot_path=snap_path)
+        # Check that the hadith ids are the same
+        self.assertEqual(list(snap_api.get_hadith_ids()),
+                         list(db_api.get_hadith_ids()))
+        # Check that the same hadith are selected for the same seed
+        db_api.set_sampler(seed=5)
+        snap_api.set_sampler(seed=5)
+        picks = [db_api.get_random_hadith() for i in range(20)]
+        self.assertEqual(picks,
+                         [snap_api.get_random_hadith() for i in range(20)])
+        # Check that the book and source of each hadith are correct
+        for hadith in picks:
+            books = db_api.get_book_list(hadith["source"])
+            self.assertIn(hadith["book_id"], [book[0] for book in books])
+            self.assertIn(hadith["id"], [title[0] for title in
+                                         db_api.get_title_list(
+                                             hadith["book_id"])])
+        db_api.close()
+        snap_api.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import shutil, tempfile, unittest
+from unittest import mock
+from source.bench.fixture import FixtureGenerator
+from source.api import ApiError
+from source.hapi import HadithApi
+from source.qapi import QuranApi
+from source.search import SearchIndexError, normalize, to_match_query
+
+class TestSearch(unittest.TestCase):
+    """Used to test the search helper functions.
+    """
+
+    def test_normalize(self) -> None:
+        """Used to test the normalize function
+        """
+
+        # Check that the diacritics are removed
+        self.assertEqual(normalize("بِسْمِ"), "بسم")
+        # Check that the forms of alef are replaced with the plain alef
+        self.assertEqual(normalize("أإآٱ"), "اااا")
+        # Check that the forms of yeh are replaced with the Arabic yeh
+        self.assertEqual(normalize("علی على"), "علي علي")
+        # Check that other text is not changed
+        self.assertEqual(normalize("Prayer"), "Prayer")
+
+    def test_to_match_query(self) -> None:
+        """Used to test the to_match_query function
+        """
+
+        # Check that each word is quoted and the last word is a prefix
+        self.assertEqual(to_match_query("day of"), '"day" "of"*')
+        # Check that query syntax characters are removed
+        self.assertEqual(to_match_query('"a" -b (c'), '"a" "b" "c"*')
+        # Check that the diacritics do not split words
+        self.assertEqual(to_match_query("بِسْمِ"), '"بِسْمِ"*')
+        # Check that text without words gives an empty query
+        self.assertEqual(to_match_query(" - "), "")
+
+    def test_missing_index(self) -> None:
+        """Used to test that searching a read only database without a search
+        index raises an error
+        """
+
+        # The temporary folder
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir)
+        # The fixture databases are built without search indexes
+        paths = FixtureGenerator(out_dir, hadith_scale=0.05,
+                                 search=False).generate()
+        profile = {"read_only": True}
+        qapi = QuranApi(paths["quran"], "English", profile=profile,
+                        backend="sqlite")
+        hapi = HadithApi(paths["hadith"], "English", profile=profile,
+                         backend="sqlite")
+        # Check that the missing index is reported
+        self.assertRaises(SearchIndexError, qapi.search, "mercy", "English")
+        self.assertRaises(SearchIndexError, hapi.search, "prayer")
+        # Check that text without words does not need the index
+        self.assertEqual(qapi.search(" - ", "English"), [])
+        qapi.close()
+        hapi.close()
+
+    def test_build_rollback(self) -> None:
+        """Used to test that a failed hadith index batch is rolled back and
+        the build can be resumed
+        """
+
+        # The temporary folder
+        out_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, out_dir)
+        # The fixture database is built without search indexes
+        paths = FixtureGenerator(out_dir, hadith_scale=0.05,
+                                 search=False).generate()
+        hapi = HadithApi(paths["hadith"], "English", backend="sqlite")
+        # The update function fails after the first batch
+        update = hapi._update_data
+        calls = []
+
+        def failing_update(sql: str, bind_values: list) -> None:
+            calls.append(sql)
+            if len(calls) > 60:
+                raise ApiError("Insert failed")
+            update(sql, bind_values)
+
+        with mock.patch.object(hapi, "_update_data", failing_update):
+            self.assertRaises(ApiError, hapi.build_search_index, 50)
+        # Check that the first batch was saved and the build is resumed
+        self.assertEqual(hapi._get_search_state(),
+                         hapi.get_hadith_ids()[49])
+        hapi.build_search_index(50)
+        self.assertTrue(hapi.has_search_index())
+        self.assertGreater(len(hapi.search("prayer")), 0)
+        hapi.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio, json, unittest
+from source.hconfig import HConfig
+from source.qconfig import QConfig
+from source.server import ApiService, ApiServer
+
+class TestServer(unittest.TestCase):
+    """Used to test the ApiService and ApiServer classes.
+    """
+
+    def setUp(self) -> None:
+        """Creates the api service
+        """
+
+        self.service = ApiService(QConfig().get_config(),
+                                  HConfig().get_config())
+
+    def get(self, target: str) -> tuple:
+        """Returns the status and json data for the given request target
+        """
+
+        # The path and query string
+        path, sep, query = target.partition("?")
+        params = dict(p.split("=") for p in query.split("&") if p)
+        status, body = self.service.handle(path, params)
+
+        return (status, json.loads(body.decode("utf-8")))
+
+    def test_service(self) -> None:
+        """Used to test the ApiService class
+        """
+
+        # Check that the sura list is returned
+        status, data = self.get("/quran/suras")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(data["suras"]), 114)
+        # Check that the ayat range is returned
+        status, data = self.get("/quran/range?sura=1&ruku=1")
+        self.assertEqual(data["start"], 1)
+        # Check that the ayat text of the ruku is returned
+        status, data = self.get("/quran/ruku?sura=1&ruku=1")
+        self.assertEqual(len(data["ayat"]), data["end"] - data["start"] + 1)
+        # Check that the titles of the first book are returned
+        status, data = self.get("/hadith/sources")
+        status, data = self.get("/hadith/books?source=" + data["sources"][0])
+        status, data = self.get("/hadith/titles?book=%d" %
+                                data["books"][0]["id"])
+        self.assertEqual(status, 200)
+        self.assertGreater(len(data["titles"]), 0)
+        # Check that a random hadith is returned
+        status, data = self.get("/hadith/random")
+        self.assertEqual(status, 200)
+        self.assertEqual(self.get("/hadith/text?id=%d" % data["id"])[0], 200)
+        # Check that the errors are returned
+        self.assertEqual(self.get("/quran/ruku?sura=115&ruku=1")[0], 404)
+        self.assertEqual(self.get("/quran/ruku?sura=1")[0], 400)
+        self.assertEqual(self.get("/quran/suras?lang=None")[0], 400)
+        self.assertEqual(self.get("/hadith/text?id=0")[0], 404)
+        self.assertEqual(
+            self.get("/hadith/text?id=99999999999999999999")[0], 400)
+        self.assertEqual(
+            self.get("/hadith/titles?book=99999999999999999999")[0], 400)
+        self.assertEqual(self.get("/unknown")[0], 404)
+        # Check that other errors are answered with a server error
+        self.service.hadith_sources = lambda params: 1 / 0
+        self.assertEqual(self.get("/hadith/sources")[0], 500)
+
+    def test_server(self) -> None:
+        """Used to test the ApiServer class
+        """
+
+        # The event loop
+        loop = asyncio.new_event_loop()
+        # The server is started on a free port
+        server = ApiServer(self.service, 2)
+        loop.run_until_complete(server.start("127.0.0.1", 0))
+        port = server.server.sockets[0].getsockname()[1]
+
+        async def fetch():
+            """Sends two requests on the same connection"""
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            request = "GET /quran/range?sura=1&ruku=1 HTTP/1.1\r\n\r\n"
+            writer.write((request * 2).encode("latin-1"))
+            # The responses
+            responses = []
+            for i in range(2):
+                status = await reader.readline()
+                # The content length header
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header == b"\r\n":
+                        break
+                    if header.lower().startswith(b"content-length:"):
+                        length = int(header.split(b":")[1])
+                body = await reader.readexactly(length)
+                responses.append((status, json.loads(body.decode("utf-8"))))
+            writer.close()
+            return responses
+
+        # The requests are sent
+        responses = loop.run_until_complete(fetch())
+        server.server.close()
+        loop.run_until_complete(server.server.wait_closed())
+        server.executor.shutdown()
+        loop.close()
+        # Check that both requests are answered
+        self.assertEqual(responses[0][0], b"HTTP/1.1 200 OK\r\n")
+        self.assertEqual(responses[1][1]["start"], 1)
+        # Check that the second response is read from the cache
+        self.assertEqual(server.get_stats()["hits"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
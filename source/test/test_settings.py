@@ -0,0 +1,84 @@
+import sys, time, unittest
+from PyQt5 import QtCore
+from source.settings import SettingsWriter
+
+class Dispatcher():
+    """Used to record the writes sent to the background thread.
+    """
+
+    def __init__(self) -> None:
+        # The submitted writes
+        self.writes = []
+
+    def submit(self, channel: str, func) -> None:
+        # The write is recorded
+        self.writes.append((channel, func))
+
+class TestSettings(unittest.TestCase):
+    """Used to test the SettingsWriter class.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Creates the application object needed by the timer
+        """
+
+        cls.app = (QtCore.QCoreApplication.instance() or
+                   QtCore.QCoreApplication(sys.argv))
+
+    def setUp(self) -> None:
+        """Creates a settings writer with a 20 ms delay
+        """
+
+        self.dispatcher = Dispatcher()
+        self.writer = SettingsWriter(self.dispatcher, 20, 50)
+
+    def wait(self, ms: int) -> None:
+        """Processes the timer events for the given time
+        """
+
+        end = time.monotonic() + ms / 1000
+        while time.monotonic() < end:
+            self.app.processEvents()
+            time.sleep(0.002)
+
+    def test_update(self) -> None:
+        """Used to test that updates are coalesced
+        """
+
+        # Three updates are made
+        for i in range(3):
+            self.writer.update(i)
+        # Check that nothing is written before the delay
+        self.assertEqual(self.dispatcher.writes, [])
+        self.wait(60)
+        # Check that only the latest update is written
+        self.assertEqual(self.dispatcher.writes, [("settings", 2)])
+        self.assertEqual(self.writer.get_stats(),
+                         {"updates": 3, "writes": 1, "saved": 2})
+
+    def test_max_delay(self) -> None:
+        """Used to test that updates are written after the maximum delay
+        """
+
+        # An update is made every 10 ms for 100 ms
+        for i in range(10):
+            self.writer.update(i)
+            self.wait(10)
+        # Check that updates were written during the updates
+        self.assertGreaterEqual(len(self.dispatcher.writes), 1)
+
+    def test_flush(self) -> None:
+        """Used to test the flush function
+        """
+
+        # An update is made and flushed
+        self.writer.update(1)
+        self.writer.flush()
+        # Check that the update is written once
+        self.assertEqual(self.dispatcher.writes, [("settings", 1)])
+        self.writer.flush()
+        self.assertEqual(len(self.dispatcher.writes), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import io, mmap, os, sqlite3, unittest, zlib
+from contextlib import redirect_stdout
+from unittest import mock
+from source.hapi import HadithApi
+from source.qapi import QuranApi
+from source.snapshot import ENTRY, HEADER, Snapshot, SnapshotError
+from source.snapshot import SnapshotWriter
+from source.snapshot import build_hadith_snapshot, build_quran_snapshot
+from source.snapshot import load_snapshot
+from source.test.fixtures import create_fixture
+
+class TestSnapshot(unittest.TestCase):
+    """Used to test the meta data snapshot.
+    """
+
+    def setUp(self) -> None:
+        """Builds the fixture databases and snapshots in a temporary folder
+        """
+
+        # The fixture databases are built in a temporary folder
+        self.out_dir, self.paths = create_fixture(self)
+        # The paths of the snapshots
+        self.quran_snap = os.path.join(self.out_dir, "quran.snap")
+        self.hadith_snap = os.path.join(self.out_dir, "hadith.snap")
+        build_quran_snapshot(self.paths["quran"], self.quran_snap)
+        build_hadith_snapshot(self.paths["hadith"], self.hadith_snap)
+
+    def test_writer(self) -> None:
+        """Used to test that arrays and strings are read back unchanged
+        """
+
+        # The path of the snapshot
+        path = os.path.join(self.out_dir, "test.snap")
+        writer = SnapshotWriter()
+        writer.add_array("numbers", "H", [1, 2, 65535])
+        writer.add_strings("names", ["a", "ب", "a", ""])
+        writer.add_array("empty", "I", [])
+        writer.write(path, self.paths["quran"])
+
+        snapshot = Snapshot(path, self.paths["quran"])
+        # Check the arrays and strings
+        self.assertEqual(snapshot.get_array("numbers").tolist(),
+                         [1, 2, 65535])
+        self.assertEqual(snapshot.get_strings("names"), ["a", "ب", "a", ""])
+        self.assertEqual(snapshot.get_strings("names", 1, 2), ["ب"])
+        self.assertEqual(len(snapshot.get_array("empty")), 0)
+        self.assertFalse(snapshot.has("missing"))
+        # Check that repeated strings are stored once
+        self.assertEqual(snapshot.get_array("names").tolist(), [0, 1, 0, 2])
+
+    def test_quran(self) -> None:
+        """Used to test that QuranApi returns the same meta data with and
+        without the snapshot
+        """
+
+        # The api objects with and without the snapshot
+        profile = {"read_only": True}
+        db_api = QuranApi(self.paths["quran"], "English", profile=profile,
+                          backend="sqlite")
+        snap_api = QuranApi(self.paths["quran"], "English", profile=profile,
+                            backend="sqlite", snapshot_path=self.quran_snap)
+        self.assertIsNone(db_api.snapshot)
+        self.assertIsNotNone(snap_api.snapshot)
+
+        # Check the language meta data and navigation functions
+        self.assertEqual(snap_api.lang_meta, db_api.lang_meta)
+        self.assertEqual(snap_api.get_sura_names(), db_api.get_sura_names())
+        for sura in [1, 2, 114]:
+            self.assertEqual(snap_api.get_ruku_count(sura),
+                             db_api.get_ruku_count(sura))
+            self.assertEqual(snap_api.get_ayat_text(sura, 1),
+                             db_api.get_ayat_text(sura, 1))
+        self.assertEqual(snap_api.get_row_id(2, 255),
+                         db_api.get_row_id(2, 255))
+        self.assertEqual(snap_api.get_row(6236), db_api.get_row(6236))
+        self.assertEqual(snap_api.get_prev_ruku(1, 1),
+                         db_api.get_prev_ruku(1, 1))
+        db_api.close()
+        snap_api.close()
+
+    def test_hadith(self) -> None:
+        """Used to test that HadithApi returns the same meta data with and
+        without the snapshot
+        """
+
+        # The api objects with and without the snapshot
+        profile = {"read_only": True}
+        db_api = HadithApi(self.paths["hadith"], "Urdu", profile=profile,
+                           backend="sqlite")
+        snap_api = HadithApi(self.paths["hadith"], "Urdu", profile=profile,
+                             backend="sqlite",
+                             snapshot_path=self.hadith_snap)
+
+        for lang in ["Urdu", "English", "Arabic"]:
+            db_api.set_lang(lang)
+            snap_api.set_lang(lang)
+            # Check the sources and books
+            sources = snap_api.get_source_list()
+            self.assertEqual(sources, db_api.get_source_list())
+            books = snap_api.get_book_list(sources[-1])
+            self.assertEqual(books, db_api.get_book_list(sources[-1]))
+            # Check the titles, text and prefetched book of each book
+            for book_id, book in books[:3] + books[-1:]:
+                self.assertEqual(snap_api.get_title_list(book_id),
+                                 db_api.get_title_list(book_id))
+                self.assertEqual(snap_api.get_cache_stats()["books"],
+                                 db_api.get_cache_stats()["books"])
+        # Check that unknown sources and books have no data
+        self.assertEqual(snap_api.get_book_list("Unknown"), [])
+        self.assertEqual(snap_api.get_title_list(999999), [])
+        db_api.close()
+        snap_api.close()
+
+    def test_stale(self) -> None:
+        """Used to test that a snapshot is not used after the database
+        changes
+        """
+
+        # Check that the snapshot matches the database
+        self.assertIsNotNone(load_snapshot(self.quran_snap,
+                                           self.paths["quran"]))
+        # The database is changed
+        con = sqlite3.connect(self.paths["quran"])
+        con.execute("CREATE TABLE ic_test (id INTEGER)")
+        con.close()
+        # The memory maps opened by the snapshot
+        maps = []
+
+        def open_map(*args, **kwargs):
+            """The memory map is opened and saved"""
+            maps.append(mmap_class(*args, **kwargs))
+            return maps[-1]
+
+        # The class of the memory maps
+        mmap_class = mmap.mmap
+        with mock.patch("source.snapshot.mmap.mmap", open_map):
+            # Check that the snapshot is no longer used
+            self.assertRaises(SnapshotError, Snapshot, self.quran_snap,
+                              self.paths["quran"])
+        # Check that the memory map is closed
+        self.assertTrue(maps[0].closed)
+        # Check that the reason is logged and not printed
+        with redirect_stdout(io.StringIO()) as out:
+            with self.assertLogs("source.snapshot", "DEBUG") as logs:
+                self.assertIsNone(load_snapshot(self.quran_snap,
+                                                self.paths["quran"]))
+        self.assertEqual(out.getvalue(), "")
+        self.assertIn("stale", logs.output[0])
+        # Check that a missing snapshot is not used
+        self.assertIsNone(load_snapshot(self.quran_snap + ".missing",
+                                        self.paths["quran"]))
+
+    def test_invalid(self) -> None:
+        """Used to test that a truncated snapshot is not used
+        """
+
+        # The size of the snapshot
+        size = os.path.getsize(self.quran_snap)
+        for new_size in [size // 2, size - 10, HEADER.size + 10]:
+            # The snapshot is truncated
+            with open(self.quran_snap, "r+b") as fh:
+                fh.truncate(new_size)
+            # Check that the snapshot is not valid
+            self.assertRaises(SnapshotError, Snapshot, self.quran_snap,
+                              self.paths["quran"])
+        # Check that the database is used instead of the snapshot
+        api = QuranApi(self.paths["quran"], "English", backend="sqlite",
+                       snapshot_path=self.quran_snap)
+        self.assertIsNone(api.snapshot)
+        self.assertEqual(api.get_ruku_count(2), 40)
+        api.close()
+
+    def test_sections(self) -> None:
+        """Used to test that a section outside the file is not used, even if
+        the checksum of the snapshot matches
+        """
+
+        # The snapshot data
+        with open(self.quran_snap, "rb") as fh:
+            data = bytearray(fh.read())
+        # The number of items of the first section is increased
+        name, typecode, offset, size = ENTRY.unpack_from(data, HEADER.size)
+        ENTRY.pack_into(data, HEADER.size, name, typecode, offset,
+                        len(data))
+        # The checksum of the changed data is saved in the header
+        header = list(HEADER.unpack_from(data))
+        header[-1] = zlib.crc32(data[HEADER.size:])
+        HEADER.pack_into(data, 0, *header)
+        with open(self.quran_snap, "wb") as fh:
+            fh.write(data)
+        # Check that the snapshot is not valid
+        self.assertRaises(SnapshotError, Snapshot, self.quran_snap,
+                          self.paths["quran"])
+
+if __name__ == '__main__':
+    unittest.main()
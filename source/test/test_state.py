@@ -0,0 +1,102 @@
+import os, shutil, sqlite3, tempfile, unittest
+from source.hapi import HadithApi
+from source.qapi import QuranApi
+from source.state import StateStore
+from source.test.fixtures import create_fixture
+
+class TestState(unittest.TestCase):
+    """Used to test the StateStore class.
+    """
+
+    def setUp(self) -> None:
+        """Creates a state store in a temporary folder
+        """
+
+        # The temporary folder
+        self.folder = tempfile.mkdtemp()
+        # The state file is in a sub folder that does not exist
+        self.path = os.path.join(self.folder, "reader", "quran.json")
+        self.store = StateStore(self.path)
+
+    def tearDown(self) -> None:
+        """Removes the temporary folder
+        """
+
+        shutil.rmtree(self.folder)
+
+    def test_save(self) -> None:
+        """Used to test the save function
+        """
+
+        # The state is saved twice
+        self.store.save({"language": "Urdu", "row_id": 1})
+        self.store.save({"language": "English", "row_id": 8})
+        # Check that the latest state is loaded
+        self.assertEqual(self.store.load(),
+                         {"language": "English", "row_id": 8})
+        # Check that no temporary file is left
+        self.assertEqual(os.listdir(os.path.dirname(self.path)),
+                         ["quran.json"])
+
+    def test_load(self) -> None:
+        """Used to test the load function
+        """
+
+        # Check that a missing state file gives an empty state
+        self.assertEqual(self.store.load(), {})
+        # An invalid state file is written
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as fh:
+            fh.write("[1, 2")
+        # Check that an invalid state file gives an empty state
+        self.assertEqual(self.store.load(), {})
+        # A state file that does not contain an object is written
+        with open(self.path, "w") as fh:
+            fh.write("[1, 2]")
+        self.assertEqual(self.store.load(), {})
+
+    def test_legacy_settings(self) -> None:
+        """Used to test that the settings saved in the database by older
+        versions are only used if they exist
+        """
+
+        # The fixture databases are built in a temporary folder
+        paths = create_fixture(self)[1]
+        for api_class, name, tbl in [
+                (QuranApi, "quran", "ic_quranic_settings"),
+                (HadithApi, "hadith", "ic_hadith_settings")]:
+            api = api_class(paths[name], "English", backend="sqlite")
+            # Check that the saved settings are returned
+            self.assertEqual(api.get_settings()["row_id"], 1)
+            con = sqlite3.connect(paths[name])
+            # Check that an empty settings table gives no settings
+            con.execute("DELETE FROM `" + tbl + "`")
+            con.commit()
+            self.assertIsNone(api.get_settings())
+            # Check that a missing settings table gives no settings
+            con.execute("DROP TABLE `" + tbl + "`")
+            con.commit()
+            con.close()
+            self.assertIsNone(api.get_settings())
+            api.close()
+
+    def test_unknown_row(self) -> None:
+        """Used to test that a saved row id that is not in the database
+        raises an IndexError, so the readers can show the first row
+        """
+
+        # The fixture databases are built in a temporary folder
+        paths = create_fixture(self)[1]
+        qapi = QuranApi(paths["quran"], "English", backend="sqlite")
+        hapi = HadithApi(paths["hadith"], "English", backend="sqlite")
+        # Check the known and unknown rows
+        self.assertIn("title", hapi.get_row(1))
+        self.assertRaises(IndexError, hapi.get_row, 10**9)
+        self.assertRaises(IndexError, qapi.get_row, 10**9)
+        # Check that the supported languages are listed
+        self.assertEqual(hapi.get_lang_list(), ["Urdu", "English", "Arabic"])
+        qapi.close()
+        hapi.close()
+
+if __name__ == '__main__':
+    unittest.main()
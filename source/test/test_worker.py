@@ -0,0 +1,51 @@
+import unittest
+from unittest import mock
+from PyQt5 import QtCore, QtWidgets
+from source.worker import DataDispatcher
+
+class FakeApi(list):
+    """Used as the api object of the background thread.
+    """
+
+    def close(self) -> None:
+        """Closes the api object
+        """
+
+class TestWorker(unittest.TestCase):
+    """Used to test the DataDispatcher and DataWorker classes.
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Creates the application object that runs the event loop
+        """
+
+        cls.app = (QtWidgets.QApplication.instance() or
+                   QtWidgets.QApplication([]))
+
+    def test_error(self) -> None:
+        """Used to test that an error in an api call stops the event loop
+        and runs the aboutToQuit handlers
+        """
+
+        # The dispatcher with an api object that is an empty list
+        dispatcher = DataDispatcher(FakeApi)
+        # The results and the aboutToQuit calls
+        results, quits = [], []
+        self.app.aboutToQuit.connect(lambda: quits.append(True))
+        dispatcher.submit("ok", lambda api: len(api), results.append)
+        dispatcher.submit("error", lambda api: api[0], results.append)
+        # The event loop is stopped if it does not exit
+        QtCore.QTimer.singleShot(5000, lambda: self.app.exit(2))
+        with mock.patch("source.worker.show_error") as show_error:
+            status = self.app.exec_()
+        dispatcher.stop()
+        # Check that the error is shown and the application exits normally
+        self.assertEqual(status, 1)
+        self.assertEqual(results, [0])
+        self.assertEqual(quits, [True])
+        self.assertIn("IndexError", show_error.call_args[0][0])
+        self.assertEqual(dispatcher.callbacks, {})
+
+if __name__ == '__main__':
+    unittest.main()
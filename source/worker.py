@@ -0,0 +1,346 @@
+import sys, traceback
+
+from PyQt5 import QtCore, QtWidgets
+
+from source.api import ApiError
+from source.connection import close_thread_connections
+
+def show_error(msg: str) -> None:
+    """Displays the given error message in a message box.
+
+    The error message is also printed to console.
+
+    :param msg: The error message.
+    :type msg: str.
+    """
+
+    QtWidgets.QMessageBox.critical(
+        None,
+        "Islam Companion - Error!",
+        msg,
+    )
+
+    # The error message is printed to console
+    print(msg)
+
+def excepthook(exc_type: type, exc: BaseException, tb) -> None:
+    """Handles the exceptions that are not caught in the gui thread.
+
+    The message of an ApiError is displayed and the application exits. Other
+    exceptions are printed to console. It is set as sys.excepthook by the
+    readers.
+
+    :param exc_type: The exception class.
+    :type exc_type: type.
+    :param exc: The exception.
+    :type exc: BaseException.
+    :param tb: The traceback of the exception.
+    :type tb: traceback.
+    """
+
+    # If the exception is not a database error
+    if not issubclass(exc_type, ApiError):
+        sys.__excepthook__(exc_type, exc, tb)
+        return
+
+    # The error message is displayed
+    show_error(str(exc))
+    # The application object
+    app = QtWidgets.QApplication.instance()
+    # If the event loop is running, it is stopped, so the application exits
+    if app is not None:
+        app.exit(1)
+
+class DataWorker(QtCore.QObject):
+    """
+    This class runs api calls in a background thread. It creates its own api
+    object in the background thread, so the thread has its own database
+    connection.
+
+    Methods
+    -------
+    __init__()
+        The class constructor. It sets the function used to create the api
+        object.
+    open()
+        Creates the api object in the background thread.
+    run()
+        Runs the given api call, unless a newer call was made on the same
+        channel.
+    _get_error()
+        Returns the error message of the given exception.
+    close()
+        Closes the api object and its connection and stops the background
+        thread.
+    """
+
+    # Emitted with the request id, channel and result of an api call
+    finished = QtCore.pyqtSignal(int, str, object)
+    # Emitted with the request id, channel and error message of an api call
+    failed = QtCore.pyqtSignal(int, str, str)
+
+    def __init__(self, api_factory, latest: dict) -> None:
+        """It sets the function used to create the api object.
+
+        :param api_factory: The function that returns a new api object. It is
+            called in the background thread.
+        :type api_factory: callable.
+        :param latest: The id of the latest request on each channel. It is
+            updated by the gui thread.
+        :type latest: dict.
+        """
+
+        # The parent class constructor is called
+        super().__init__()
+        # The function used to create the api object
+        self.api_factory = api_factory
+        # The id of the latest request on each channel
+        self.latest = latest
+        # The api object used by the background thread
+        self.api = None
+
+    @QtCore.pyqtSlot()
+    def open(self) -> None:
+        """Creates the api object in the background thread.
+
+        If the api object cannot be created, the error is sent to the gui
+        thread.
+        """
+
+        try:
+            self.api = self.api_factory()
+        except Exception as err:
+            # The error is sent to the gui thread
+            self.failed.emit(0, "open", self._get_error(err))
+
+    @QtCore.pyqtSlot(int, str, object)
+    def run(self, request_id: int, channel: str, func) -> None:
+        """Runs the given api call, unless a newer call was made on the same
+        channel.
+
+        :param request_id: The request id.
+        :type request_id: int.
+        :param channel: The name of the channel.
+        :type channel: str.
+        :param func: The function to run. It is called with the api object.
+        :type func: callable.
+        """
+
+        # If a newer request was made on the same channel
+        if self.latest.get(channel) != request_id:
+            # The request is skipped
+            return
+
+        try:
+            # The api call is run
+            result = func(self.api)
+        except Exception as err:
+            # The error is sent to the gui thread, so the error is not hidden
+            # by a callback that is never called
+            self.failed.emit(request_id, channel, self._get_error(err))
+            return
+
+        # The result is sent to the gui thread
+        self.finished.emit(request_id, channel, result)
+
+    def _get_error(self, err: Exception) -> str:
+        """Returns the error message of the given exception.
+
+        The traceback of errors that are not database errors is printed to
+        console.
+
+        :param err: The exception.
+        :type err: Exception.
+        :return: The error message.
+        :rtype: str.
+        """
+
+        # If the exception is a database error
+        if isinstance(err, ApiError):
+            return str(err)
+        # The traceback is printed to console
+        traceback.print_exc()
+
+        return "%s: %s" % (type(err).__name__, err)
+
+    @QtCore.pyqtSlot()
+    def close(self) -> None:
+        """Closes the api object and its connection and stops the background
+        thread.
+        """
+
+        # If the api object was created
+        if self.api is not None:
+            # The database connection is released
+            self.api.close()
+        # The pooled connections of the background thread are closed, since
+        # they cannot be used by other threads
+        close_thread_connections()
+        # The background thread is stopped
+        self.thread().quit()
+
+
+class DataDispatcher(QtCore.QObject):
+    """
+    This class sends api calls to a DataWorker running in a background thread.
+    The results are delivered to callbacks in the gui thread.
+
+    Each api call is made on a named channel. If a new call is made on a
+    channel before the previous call has run, then the previous call is
+    cancelled. If the previous call has already run, its result is ignored.
+
+    Methods
+    -------
+    __init__()
+        The class constructor. It starts the background thread.
+    submit()
+        Sends an api call to the background thread.
+    cancel()
+        Cancels the pending api call on the given channel.
+    stop()
+        Stops the background thread and waits for it to finish.
+    _deliver()
+        Calls the callback for the given api call result.
+    _fail()
+        Displays the given api call error and ends the program.
+    """
+
+    # Emitted to send an api call to the worker
+    _requested = QtCore.pyqtSignal(int, str, object)
+    # Emitted to stop the worker
+    _stop_requested = QtCore.pyqtSignal()
+
+    def __init__(self, api_factory) -> None:
+        """It starts the background thread.
+
+        :param api_factory: The function that returns a new api object. It is
+            called in the background thread. The api object must not use a
+            named connection of another thread.
+        :type api_factory: callable.
+        """
+
+        # The parent class constructor is called
+        super().__init__()
+        # The id of the last request
+        self.request_id = 0
+        # The callback for each pending request
+        self.callbacks = {}
+        # The id of the latest request on each channel
+        self.latest = {}
+
+        # The background thread
+        self.thread = QtCore.QThread()
+        # The worker is created and moved to the background thread
+        self.worker = DataWorker(api_factory, self.latest)
+        self.worker.moveToThread(self.thread)
+        # The worker creates the api object when the thread starts
+        self.thread.started.connect(self.worker.open)
+        # The api calls are sent to the worker
+        self._requested.connect(self.worker.run)
+        self._stop_requested.connect(self.worker.close)
+        # The results are delivered in the gui thread
+        self.worker.finished.connect(self._deliver)
+        self.worker.failed.connect(self._fail)
+        # The background thread is started
+        self.thread.start()
+
+    def submit(self, channel: str, func, callback=None) -> int:
+        """Sends an api call to the background thread.
+
+        :param channel: The name of the channel. Older calls on the same
+            channel are cancelled.
+        :type channel: str.
+        :param func: The function to run. It is called with the api object
+            of the background thread and returns the result.
+        :type func: callable.
+        :param callback: The function called with the result in the gui
+            thread.
+        :type callback: callable.
+        :return: The request id.
+        :rtype: int.
+        """
+
+        # The request id is increased
+        self.request_id += 1
+        # The callback of the previous request on the channel is removed, as
+        # the previous request is now stale
+        self.callbacks.pop(self.latest.get(channel), None)
+        # The request is marked as the latest on its channel
+        self.latest[channel] = self.request_id
+        # If a callback is given
+        if callback is not None:
+            # The callback is saved
+            self.callbacks[self.request_id] = callback
+        # The api call is sent to the worker
+        self._requested.emit(self.request_id, channel, func)
+
+        return self.request_id
+
+    def cancel(self, channel: str) -> None:
+        """Cancels the pending api call on the given channel.
+
+        If the call has not run, it is skipped. If it has run, its result is
+        ignored.
+
+        :param channel: The name of the channel.
+        :type channel: str.
+        """
+
+        # The callback of the pending request is removed
+        self.callbacks.pop(self.latest.get(channel), None)
+        # The channel no longer has a latest request
+        self.latest[channel] = 0
+
+    def stop(self) -> None:
+        """Stops the background thread and waits for it to finish.
+        """
+
+        # If the background thread is running
+        if self.thread.isRunning():
+            # The worker is stopped
+            self._stop_requested.emit()
+            # The background thread is waited for
+            self.thread.wait()
+
+    @QtCore.pyqtSlot(int, str, object)
+    def _deliver(self, request_id: int, channel: str, result) -> None:
+        """Calls the callback for the given api call result.
+
+        The result is ignored if a newer call was made on the same channel.
+
+        :param request_id: The request id.
+        :type request_id: int.
+        :param channel: The name of the channel.
+        :type channel: str.
+        :param result: The result of the api call.
+        :type result: object.
+        """
+
+        # The callback for the request. Callbacks of stale requests have
+        # already been removed
+        callback = self.callbacks.pop(request_id, None)
+        # If the result is not stale and a callback was given
+        if self.latest.get(channel) == request_id and callback is not None:
+            # The callback is called
+            callback(result)
+
+    @QtCore.pyqtSlot(int, str, str)
+    def _fail(self, request_id: int, channel: str, msg: str) -> None:
+        """Displays the given api call error and ends the program.
+
+        :param request_id: The request id.
+        :type request_id: int.
+        :param channel: The name of the channel.
+        :type channel: str.
+        :param msg: The error message.
+        :type msg: str.
+        """
+
+        # The callback of the failed request is removed
+        self.callbacks.pop(request_id, None)
+        # The error message is displayed
+        show_error(msg)
+
+        # The event loop is stopped, so the application exits after the
+        # aboutToQuit handlers have saved the settings
+        QtWidgets.QApplication.instance().exit(1)